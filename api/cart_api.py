@@ -1,10 +1,18 @@
 from __future__ import annotations
 
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
 from rest_framework import status, permissions
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from core.factory import get_cart_service, get_order_service
+from cart.context import get_cart_context
+from cart.models import SavedCart
+from core.domain.dto import CartLineRecord
+from core.factory import get_cart_service, get_order_service, get_saved_cart_service
+from core.utils.order_lines import STATUS_MESSAGES, parse_order_csv, parse_order_items, parse_order_text
+from orders import idempotency
+from orders.stock import InsufficientStock, StockReservationConflict
 
 
 class CartDetailAPIView(APIView):
@@ -12,27 +20,64 @@ class CartDetailAPIView(APIView):
     Retourne le contenu du panier courant pour l'utilisateur authentifié.
 
     Cette vue est un simple adaptateur HTTP -> service de domaine.
+
+    La réponse porte un ``ETag`` calculé sans tarification, à partir de la
+    session et du cache commun (révision du panier, empreinte des prix) :
+    un ``If-None-Match`` correspondant reçoit un 304 sans que les produits
+    soient relus ni le panier tarifé.  Avec le cache commun par défaut
+    (table ``core_shared_cache``), ces deux lectures sont des requêtes
+    SQL ; avec Redis (``SHARED_CACHE_URL``), seule la session est lue en
+    base.  Avec ``?since=<révision>``, seules les
+    lignes modifiées depuis cette révision sont renvoyées (``items``),
+    ainsi que les produits retirés (``removed``) ; ``full`` vaut ``true``
+    si le panier complet a dû être renvoyé.
     """
 
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request, *args, **kwargs):
-        service = get_cart_service()
-        cart = service.get_cart(request)
+        since = request.query_params.get("since")
+        if since is not None:
+            try:
+                since = int(since)
+            except ValueError:
+                return Response({"detail": "since doit être un entier."}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Calculé avant la tarification : un prix modifié pendant le
+        # calcul rendra l'ETag périmé, jamais l'inverse.
+        etag = get_cart_context(request).etag()
+        if etag in parse_etags(request.headers.get("If-None-Match", "")):
+            return self._with_etag(Response(status=status.HTTP_304_NOT_MODIFIED), etag)
+
+        changes = get_cart_service().get_cart_changes(request, since)
         data = {
-            "total": str(cart.total or 0),
-            "items": [
-                {
-                    "product_id": it.product.id,
-                    "sku": it.product.sku,
-                    "quantity": it.quantity,
-                    "unit_price": str(it.unit_price) if it.unit_price is not None else None,
-                    "total_price": str(it.total_price) if it.total_price is not None else None,
-                }
-                for it in cart.items
-            ],
+            "revision": changes.revision,
+            "total": str(changes.total or 0),
+            "items": [_serialize_line(it) for it in changes.items],
         }
-        return Response(data)
+        if since is not None:
+            data.update(since=since, full=changes.full, removed=changes.removed)
+        return self._with_etag(Response(data), etag)
+
+    @staticmethod
+    def _with_etag(response, etag: str):
+        response["ETag"] = etag
+        # Le navigateur doit revalider à chaque fois (réponse propre à l'utilisateur)
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+
+def _serialize_line(it) -> dict:
+    # Frontière de l'API : les lignes internes, non validées, sont validées
+    # en ``CartItemDTO`` avant d'être exposées (voir ``core.domain.dto``).
+    line = it.to_dto() if isinstance(it, CartLineRecord) else it
+    return {
+        "product_id": line.product.id,
+        "sku": line.product.sku,
+        "quantity": line.quantity,
+        "unit_price": str(line.unit_price) if line.unit_price is not None else None,
+        "total_price": str(line.total_price) if line.total_price is not None else None,
+    }
 
 
 class CartAddItemAPIView(APIView):
@@ -54,6 +99,135 @@ class CartAddItemAPIView(APIView):
         )
 
 
+class CartBulkAddAPIView(APIView):
+    """
+    Ajoute plusieurs articles au panier en un appel (commande rapide).
+
+    Trois formats sont acceptés :
+
+    * JSON ``{"lines": [{"sku": "A-1", "quantity": 12}, ...]}`` ;
+    * ``{"text": "A-1 12\nB-2 24"}`` (bloc-notes de commande) ;
+    * multipart avec un fichier CSV ``file`` (colonnes code et quantité).
+
+    La réponse détaille le statut de chaque ligne ; les lignes en erreur
+    (référence inconnue, produit inactif, quantité invalide) n'empêchent
+    pas l'ajout des autres.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        try:
+            if "file" in request.FILES:
+                lines = parse_order_csv(request.FILES["file"])
+            elif "lines" in request.data:
+                items = request.data["lines"]
+                if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+                    raise ValueError("lines doit être une liste d'objets.")
+                lines = parse_order_items(items)
+            else:
+                lines = parse_order_text(str(request.data.get("text", "")))
+        except (ValueError, UnicodeDecodeError) as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        if not lines:
+            return Response({"detail": "Aucune ligne à ajouter."}, status=status.HTTP_400_BAD_REQUEST)
+
+        result = get_cart_service().add_items(request, lines)
+        return Response(serialize_bulk_result(result), status=status.HTTP_200_OK)
+
+
+def serialize_bulk_result(result) -> dict:
+    """Représentation JSON d'un ``BulkAddResult`` (ajout en masse, recommande)."""
+    return {
+        "total": str(result.cart.total or 0),
+        "added": sum(1 for line in result.lines if line.ok),
+        "errors": len(result.errors),
+        "lines": [
+            {
+                "line": line.line,
+                "code": line.code,
+                "requested": line.requested,
+                "status": line.status,
+                "message": STATUS_MESSAGES[line.status],
+                "product_id": line.product_id,
+                "quantity": line.quantity,
+            }
+            for line in result.lines
+        ],
+    }
+
+
+def _serialize_saved_cart(saved) -> dict:
+    return {
+        "id": saved.id,
+        "name": saved.name,
+        "client_id": saved.client_id,
+        "lines": [{"product_id": pid, "quantity": qty} for pid, qty in saved.lines],
+    }
+
+
+class SavedCartListAPIView(APIView):
+    """
+    Listes de commande enregistrées de l'utilisateur et de ses clients.
+
+    ``GET`` les liste ; ``POST {"name": ..., "client": <id optionnel>}``
+    enregistre le panier courant sous ce nom (une liste homonyme du même
+    propriétaire est remplacée).
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        saved_carts = get_saved_cart_service().list_for_user(request.user.id)
+        return Response([_serialize_saved_cart(saved) for saved in saved_carts])
+
+    def post(self, request, *args, **kwargs):
+        client_id = request.data.get("client")
+        try:
+            client_id = int(client_id) if client_id not in (None, "") else None
+            saved = get_saved_cart_service().save_current_cart(
+                request, str(request.data.get("name", "")), user_id=request.user.id, client_id=client_id
+            )
+        except ValueError as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        except PermissionError as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_403_FORBIDDEN)
+        return Response(_serialize_saved_cart(saved), status=status.HTTP_201_CREATED)
+
+
+class SavedCartDetailAPIView(APIView):
+    """
+    Suppression d'une liste de commande enregistrée.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def delete(self, request, pk, *args, **kwargs):
+        try:
+            get_saved_cart_service().delete(pk, request.user.id)
+        except SavedCart.DoesNotExist:
+            return Response({"detail": "Liste introuvable."}, status=status.HTTP_404_NOT_FOUND)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class SavedCartLoadAPIView(APIView):
+    """
+    Ajoute au panier courant le contenu d'une liste enregistrée.
+
+    La réponse suit le format de ``cart/bulk-add/`` : les produits
+    supprimés ou désactivés depuis l'enregistrement sont signalés.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, pk, *args, **kwargs):
+        try:
+            result = get_saved_cart_service().load(request, pk, request.user.id)
+        except SavedCart.DoesNotExist:
+            return Response({"detail": "Liste introuvable."}, status=status.HTTP_404_NOT_FOUND)
+        return Response(serialize_bulk_result(result), status=status.HTTP_200_OK)
+
+
 class CartClearAPIView(APIView):
     """
     Vide entièrement le panier courant.
@@ -70,20 +244,67 @@ class CartClearAPIView(APIView):
 class CartCheckoutAPIView(APIView):
     """
     Crée une commande à partir du panier courant.
+
+    Avec un en-tête ``Idempotency-Key``, la réponse est mémorisée
+    (``orders.idempotency``) : une requête renvoyée avec la même clé reçoit
+    la même réponse, marquée ``Idempotent-Replayed: true``, sans nouvelle
+    commande.  Un doublon concurrent attend la fin du premier traitement.
+
+    Un conflit passager sur le stock (``StockReservationConflict``) donne
+    une réponse 409 sans ``shortages`` ; il n'est pas mémorisé : la même
+    clé peut être renvoyée.
     """
 
     permission_classes = [permissions.IsAuthenticated]
 
     def post(self, request, *args, **kwargs):
+        try:
+            return self._post(request)
+        except StockReservationConflict as exc:
+            return Response(
+                {"detail": str(exc), "product_ids": exc.product_ids}, status=status.HTTP_409_CONFLICT
+            )
+
+    def _post(self, request):
+        key = request.headers.get(idempotency.HEADER)
+        if key is None:
+            code, body = self._checkout(request)
+            return Response(body, status=code)
+        if not key or len(key) > idempotency.MAX_KEY_LENGTH:
+            return Response(
+                {"detail": f"{idempotency.HEADER} doit contenir de 1 à {idempotency.MAX_KEY_LENGTH} caractères."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            code, body, replayed = idempotency.run_once(
+                request.user, key, request.path, lambda: self._checkout(request)
+            )
+        except idempotency.IdempotencyKeyMismatch as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+        response = Response(body, status=code)
+        if replayed:
+            response["Idempotent-Replayed"] = "true"
+        return response
+
+    def _checkout(self, request) -> tuple[int, dict]:
         service = get_order_service()
         user_id = request.user.id if request.user.is_authenticated else None
-        order = service.create_order_from_current_cart(request, user_id=user_id)
-        return Response(
+        try:
+            order = service.create_order_from_current_cart(request, user_id=user_id)
+        except InsufficientStock as exc:
+            shortages = [
+                {"product_id": product_id, "requested": requested, "available": available}
+                for product_id, (requested, available) in exc.shortages.items()
+            ]
+            return status.HTTP_409_CONFLICT, {"detail": str(exc), "shortages": shortages}
+        except ValueError as exc:
+            return status.HTTP_400_BAD_REQUEST, {"detail": str(exc)}
+        return (
+            status.HTTP_201_CREATED,
             {
                 "id": order.id,
                 "order_number": order.order_number,
                 "total": str(order.total),
                 "status": order.status,
             },
-            status=status.HTTP_201_CREATED,
         )
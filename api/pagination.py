@@ -0,0 +1,123 @@
+"""Pagination par curseur (keyset) des commandes et factures.
+
+La pagination par numéro de page (``OFFSET``) relit toutes les lignes
+précédentes : un ERP qui parcourt l'historique complet ralentit à chaque
+page.  Ici chaque page reprend après la dernière ligne de la précédente ::
+
+    WHERE (created_at, id) < (<curseur>) ORDER BY created_at DESC, id DESC
+
+ce qui suit l'index ``(created_at, id)`` quelle que soit la profondeur.
+
+Paramètres :
+
+* ``ordering`` : ``-created_at`` (défaut, plus récentes d'abord),
+  ``created_at`` ou ``updated_at`` (commandes modifiées, plus anciennes
+  modifications d'abord) ;
+* ``cursor`` : jeton opaque renvoyé par la page précédente ;
+* ``page_size`` : 1 à ``max_page_size`` lignes.
+
+La réponse contient ``next`` (URL de la page suivante, ``null`` en fin de
+parcours), ``cursor`` (position après la dernière ligne renvoyée, à
+conserver pour reprendre plus tard une synchronisation) et ``results``.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from collections import OrderedDict
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """Pagination par curseur sur ``(<champ date>, id)``."""
+
+    cursor_query_param = "cursor"
+    ordering_param = "ordering"
+    page_size_query_param = "page_size"
+    max_page_size = 500
+    #: Ordre de parcours -> (champ date, décroissant)
+    orderings = {
+        "-created_at": ("created_at", True),
+        "created_at": ("created_at", False),
+        "updated_at": ("updated_at", False),
+    }
+    default_ordering = "-created_at"
+    invalid_cursor_message = "Curseur invalide."
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.ordering = request.query_params.get(self.ordering_param, self.default_ordering)
+        if self.ordering not in self.orderings:
+            raise ValidationError({self.ordering_param: f"Valeurs possibles : {', '.join(self.orderings)}."})
+        field, descending = self.orderings[self.ordering]
+        page_size = self.get_page_size(request)
+
+        self.cursor = request.query_params.get(self.cursor_query_param)
+        if self.cursor:
+            value, pk = self.decode_cursor(self.cursor)
+            if descending:
+                queryset = queryset.filter(Q(**{f"{field}__lt": value}) | Q(**{field: value, "pk__lt": pk}))
+            else:
+                queryset = queryset.filter(Q(**{f"{field}__gt": value}) | Q(**{field: value, "pk__gt": pk}))
+        prefix = "-" if descending else ""
+        queryset = queryset.order_by(f"{prefix}{field}", f"{prefix}pk")
+
+        # Une ligne de plus que la page : indique s'il reste des résultats
+        rows = list(queryset[: page_size + 1])
+        self.has_next = len(rows) > page_size
+        self.page = rows[:page_size]
+        if self.page:
+            last = self.page[-1]
+            self.cursor = self.encode_cursor(getattr(last, field), last.pk)
+        return self.page
+
+    def get_paginated_response(self, data):
+        next_url = None
+        if self.has_next:
+            next_url = replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, self.cursor)
+        return Response(OrderedDict([("next", next_url), ("cursor", self.cursor), ("results", data)]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "cursor": {"type": "string", "nullable": True},
+                "results": schema,
+            },
+        }
+
+    def get_page_size(self, request) -> int:
+        default = api_settings.PAGE_SIZE or 20
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, default))
+        except ValueError:
+            return default
+        return max(1, min(size, self.max_page_size))
+
+    def encode_cursor(self, value, pk: int) -> str:
+        payload = json.dumps([self.ordering, value.isoformat(), pk], separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    def decode_cursor(self, token: str):
+        try:
+            padded = token + "=" * (-len(token) % 4)
+            ordering, value, pk = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            moment = parse_datetime(value)
+            pk = int(pk)
+        except (binascii.Error, UnicodeDecodeError, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        # Un curseur ne vaut que pour l'ordre qui l'a produit
+        if moment is None or ordering != self.ordering:
+            raise NotFound(self.invalid_cursor_message)
+        return moment, pk
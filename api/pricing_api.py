@@ -6,11 +6,15 @@ d'un produit pour une quantité donnée en tenant compte des règles
 avancées (quantité, marque, famille, prix plancher).  Il est destiné
 aux intégrations externes (ex: front B2B, ERP) qui souhaitent
 prévisualiser le prix final sans passer par le processus de commande.
+
+Le mode « paliers » (``quantities``) renvoie en un appel la grille de
+prix par quantité d'un ou plusieurs produits, le prix de base de chaque
+produit n'étant calculé qu'une fois.
 """
 
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework import permissions
+from rest_framework import permissions, status
 from django.shortcuts import get_object_or_404
 
 from catalog.models import Product
@@ -25,14 +29,23 @@ class PricingPreviewAPIView(APIView):
 
         L'endpoint attend un paramètre ``quantity`` dans la chaîne de
         requête.  S'il n'est pas fourni ou invalide, la valeur 1 est
-        utilisée par défaut.
+        utilisée par défaut.  Avec ``quantities`` (liste séparée par des
+        virgules, ou ``auto`` pour les seuils de remise), l'endpoint
+        renvoie la grille de paliers du produit.
         """
+        product = get_object_or_404(Product, pk=product_id)
+        pricing_service = get_pricing_service()
+        if "quantities" in request.query_params:
+            try:
+                quantities = _parse_quantities(request.query_params["quantities"])
+            except ValueError as exc:
+                return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+            ladder = pricing_service.preview_price_ladder([product], request.user, quantities)
+            return Response({"product_id": product.id, "tiers": _tiers(ladder[product.id])})
         try:
             quantity = int(request.query_params.get("quantity", 1))
         except Exception:
             quantity = 1
-        product = get_object_or_404(Product, pk=product_id)
-        pricing_service = get_pricing_service()
         unit_price = pricing_service.preview_price(product, request.user, quantity)
         return Response(
             {
@@ -41,3 +54,67 @@ class PricingPreviewAPIView(APIView):
                 "unit_price": unit_price,
             }
         )
+
+
+class PricingLadderAPIView(APIView):
+    """Grilles de prix par quantité pour plusieurs produits.
+
+    ``GET /api/pricing/ladder/?product_ids=1,2,3&quantities=10,50,100``
+
+    ``quantities`` est optionnel : absent (ou ``auto``), les paliers sont
+    les seuils des remises par quantité applicables au client.  Les
+    produits inconnus sont ignorés.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+    max_products = 100
+
+    def get(self, request):
+        try:
+            product_ids = _parse_ids(request.query_params.get("product_ids", ""))
+            quantities = _parse_quantities(request.query_params.get("quantities", "auto"))
+        except ValueError as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        if not product_ids:
+            return Response({"detail": "product_ids est obligatoire."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(product_ids) > self.max_products:
+            return Response(
+                {"detail": f"Au plus {self.max_products} produits par requête."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        products = list(Product.objects.filter(pk__in=product_ids))
+        ladder = get_pricing_service().preview_price_ladder(products, request.user, quantities)
+        order = {product_id: position for position, product_id in enumerate(product_ids)}
+        return Response(
+            {
+                "products": [
+                    {"product_id": product_id, "tiers": _tiers(tiers)}
+                    for product_id, tiers in sorted(ladder.items(), key=lambda item: order[item[0]])
+                ]
+            }
+        )
+
+
+def _parse_ids(raw: str) -> list[int]:
+    try:
+        ids = [int(value) for value in raw.split(",") if value.strip()]
+    except ValueError:
+        raise ValueError("product_ids doit être une liste d'entiers séparés par des virgules.")
+    return list(dict.fromkeys(ids))
+
+
+def _parse_quantities(raw: str):
+    """Retourne la liste des quantités demandées, ou ``None`` pour ``auto``."""
+    if raw.strip().lower() in {"", "auto"}:
+        return None
+    try:
+        quantities = [int(value) for value in raw.split(",") if value.strip()]
+    except ValueError:
+        raise ValueError("quantities doit être une liste d'entiers séparés par des virgules.")
+    if any(quantity <= 0 for quantity in quantities):
+        raise ValueError("Les quantités doivent être positives.")
+    return quantities
+
+
+def _tiers(tiers) -> list[dict]:
+    return [{"quantity": quantity, "unit_price": str(price)} for quantity, price in tiers]
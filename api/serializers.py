@@ -45,6 +45,7 @@ class OrderSerializer(serializers.ModelSerializer):
             "order_number",
             "status",
             "created_at",
+            "updated_at",
             "email",
             "first_name",
             "last_name",
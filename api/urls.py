@@ -27,8 +27,12 @@ from django.urls import path, include
 from .cart_api import (
     CartDetailAPIView,
     CartAddItemAPIView,
+    CartBulkAddAPIView,
     CartClearAPIView,
     CartCheckoutAPIView,
+    SavedCartDetailAPIView,
+    SavedCartListAPIView,
+    SavedCartLoadAPIView,
 )
 from .auth_api import LoginAPIView, RefreshTokenAPIView
 
@@ -37,7 +41,11 @@ urlpatterns += [
     # Panier
     path("cart/", CartDetailAPIView.as_view(), name="cart-detail-api"),
     path("cart/add/", CartAddItemAPIView.as_view(), name="cart-add-api"),
+    path("cart/bulk-add/", CartBulkAddAPIView.as_view(), name="cart-bulk-add-api"),
     path("cart/clear/", CartClearAPIView.as_view(), name="cart-clear-api"),
+    path("cart/saved/", SavedCartListAPIView.as_view(), name="saved-cart-list-api"),
+    path("cart/saved/<int:pk>/", SavedCartDetailAPIView.as_view(), name="saved-cart-detail-api"),
+    path("cart/saved/<int:pk>/load/", SavedCartLoadAPIView.as_view(), name="saved-cart-load-api"),
     path("cart/checkout/", CartCheckoutAPIView.as_view(), name="cart-checkout-api"),
     # Authentification JWT
     path("auth/login/", LoginAPIView.as_view(), name="jwt-login"),
@@ -49,4 +57,9 @@ urlpatterns += [
         __import__("api.pricing_api", fromlist=["PricingPreviewAPIView"]).PricingPreviewAPIView.as_view(),
         name="pricing-preview",
     ),
+    path(
+        "pricing/ladder/",
+        __import__("api.pricing_api", fromlist=["PricingLadderAPIView"]).PricingLadderAPIView.as_view(),
+        name="pricing-ladder",
+    ),
 ]
@@ -5,16 +5,37 @@ serialiseurs, permettant l'intégration avec des systèmes externes
 (SAGE X3, Biziipad). Actuellement, seuls les endpoints de
 consultation sont implémentés pour les commandes/factures.
 """
-from rest_framework import viewsets, permissions
+from rest_framework import viewsets, permissions, status
 from django.db import models
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.generics import ListAPIView
+from rest_framework.response import Response
 
 from .serializers import OrderSerializer, InvoiceSerializer, ProductSerializer
 from .serializers import QuoteSerializer
 from quotes.models import Quote
 
 from core.factory import get_order_service, get_product_service
-
+from orders.models import Order
+
+from .cart_api import serialize_bulk_result
+from .pagination import KeysetPagination
+
+
+def _orders_queryset(request, *, only_paid: bool):
+    """Commandes filtrées par les paramètres ``status``, ``from``, ``to`` et ``updated_since``."""
+    params = request.query_params
+    try:
+        return get_order_service().get_orders_queryset(
+            status=params.get("status"),
+            from_date=params.get("from"),
+            to_date=params.get("to"),
+            updated_since=params.get("updated_since"),
+            only_paid=only_paid,
+        )
+    except ValueError as exc:
+        raise ValidationError({"detail": str(exc)})
 
 
 class OrderViewSet(viewsets.ReadOnlyModelViewSet):
@@ -24,29 +45,53 @@ class OrderViewSet(viewsets.ReadOnlyModelViewSet):
     commande via `/api/orders/` et `/api/orders/{id}/`. Les
     utilisateurs doivent être authentifiés (API token) pour accéder
     à ces données.
+
+    La liste est paginée par curseur (``api.pagination``) : un ERP
+    parcourt tout l'historique, ou seulement les commandes modifiées
+    (``?ordering=updated_at``), à coût constant par page.
     """
 
     serializer_class = OrderSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         """
         Récupère le queryset des commandes via le service métier.
-        
+
         La vue ne construit plus directement le queryset sur le modèle
-        ``Order`` ; elle délègue cette responsabilité à
+        ``Order`` ; elle délègue cette responsabilité à
         ``OrderService`` exposé par la factory centrale.
         """
-        service = get_order_service()
-        status = self.request.query_params.get("status")
-        from_date = self.request.query_params.get("from")
-        to_date = self.request.query_params.get("to")
-        return service.get_orders_queryset(
-            status=status,
-            from_date=from_date,
-            to_date=to_date,
-            only_paid=False,
-        )
+        return _orders_queryset(self.request, only_paid=False)
+
+    @action(detail=True, methods=["post"])
+    def reorder(self, request, pk=None):
+        """Ajoute au panier les lignes de cette commande (``POST /api/orders/{id}/reorder/``)."""
+        return self._reorder(request, [pk])
+
+    @action(detail=False, methods=["post"], url_path="reorder")
+    def reorder_many(self, request):
+        """Ajoute au panier les lignes de plusieurs commandes.
+
+        Corps : ``{"orders": [12, 15]}``.  Les produits devenus
+        indisponibles sont signalés ligne par ligne (``status``).
+        """
+        order_ids = request.data.get("orders")
+        if not isinstance(order_ids, list) or not order_ids:
+            return Response({"detail": "orders doit être une liste non vide."}, status=status.HTTP_400_BAD_REQUEST)
+        return self._reorder(request, order_ids)
+
+    def _reorder(self, request, order_ids):
+        try:
+            order_ids = [int(order_id) for order_id in order_ids]
+        except (TypeError, ValueError):
+            return Response({"detail": "Identifiant de commande invalide."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            result = get_order_service().reorder(request, order_ids, user_id=request.user.id)
+        except Order.DoesNotExist as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_404_NOT_FOUND)
+        return Response(serialize_bulk_result(result))
 
 
 class InvoiceViewSet(viewsets.ReadOnlyModelViewSet):
@@ -59,6 +104,7 @@ class InvoiceViewSet(viewsets.ReadOnlyModelViewSet):
 
     serializer_class = InvoiceSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         """
@@ -68,16 +114,7 @@ class InvoiceViewSet(viewsets.ReadOnlyModelViewSet):
         ayant le statut ``paid``. Le filtrage est centralisé dans
         ``OrderService``.
         """
-        service = get_order_service()
-        status = self.request.query_params.get("status")
-        from_date = self.request.query_params.get("from")
-        to_date = self.request.query_params.get("to")
-        return service.get_orders_queryset(
-            status=status,
-            from_date=from_date,
-            to_date=to_date,
-            only_paid=True,
-        )
+        return _orders_queryset(self.request, only_paid=True)
 
 
 class ProductSearchView(ListAPIView):
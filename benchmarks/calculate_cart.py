@@ -0,0 +1,107 @@
+"""Micro-benchmark du coût par ligne de ``calculate_cart``.
+
+Compare le chemin historique, où chaque ligne de panier est construite
+et validée sous forme de ``ProductDTO`` / ``CartItemDTO`` pydantic, au
+chemin léger basé sur les records ``__slots__`` (``ProductRecord`` /
+``CartLineRecord``) :
+
+* **avant** : lignes construites comme l'ancien ``SessionCartRepository``
+  (DTOs validés), puis chaque ligne tarifée revalidée en ``CartItemDTO``
+  comme le faisait l'ancien ``calculate_cart`` ;
+* **après** : lignes construites en records, tarifées sans validation.
+
+Le cache Django est désactivé et les promotions sont résolues par un
+port vide : on mesure uniquement la construction des objets et le moteur
+de prix.  Aucun réglage Django n'est nécessaire ::
+
+    python -m benchmarks.calculate_cart --lines 50 --repeat 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import timeit
+from decimal import Decimal
+
+from core.domain.dto import CartItemDTO, CartLineRecord, ProductDTO, ProductRecord, UserRecord
+from core.ports.promo_catalog_port import PromoCatalogPort
+from core.services.pricing_service import PromoAwareB2BPricingService
+
+
+class _NoPromoPort(PromoCatalogPort):
+    def get_applicable_promo(self, product_dto, user_dto):
+        return None
+
+    def get_applicable_promos(self, product_dtos, user_dto):
+        return {}
+
+
+class _UncachedPricingService(PromoAwareB2BPricingService):
+    @staticmethod
+    def _get_cache():
+        return None
+
+
+def _rows(count: int) -> list[dict]:
+    return [
+        dict(
+            id=i,
+            sku=f"SKU{i}",
+            price=Decimal("100.00") + i,
+            discount_price=Decimal("90.00") if i % 3 == 0 else None,
+            price_wholesaler=Decimal("80.00") + i,
+            price_big_retail=None,
+            price_small_retail=None,
+            title=f"Produit {i}",
+            is_active=True,
+            unit_price=None,
+        )
+        for i in range(1, count + 1)
+    ]
+
+
+def run(lines: int = 50, repeat: int = 200) -> dict[str, float]:
+    """Retourne le coût moyen par ligne (µs) avant et après."""
+    service = _UncachedPricingService(_NoPromoPort())
+    user = UserRecord(id=1, client_type="wholesaler", customer_number="C1", is_b2b_verified=False)
+    rows = _rows(lines)
+
+    def before() -> None:
+        items = [CartItemDTO(product=ProductDTO(**row), quantity=10) for row in rows]
+        result = service.calculate_cart(items, user.to_dto())
+        [
+            CartItemDTO(
+                product=line.product,
+                quantity=line.quantity,
+                unit_price=line.unit_price,
+                total_price=line.total_price,
+            )
+            for line in result.items
+        ]
+
+    def after() -> None:
+        items = [CartLineRecord(product=ProductRecord(**row), quantity=10) for row in rows]
+        service.calculate_cart(items, user)
+
+    timings = {}
+    for name, func in (("before", before), ("after", after)):
+        func()  # échauffement
+        best = min(timeit.repeat(func, number=repeat, repeat=3))
+        timings[name] = best / repeat / lines * 1_000_000
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=50, help="lignes par panier")
+    parser.add_argument("--repeat", type=int, default=200, help="paniers tarifés par mesure")
+    args = parser.parse_args()
+    timings = run(args.lines, args.repeat)
+    print(f"calculate_cart, {args.lines} lignes par panier")
+    print(f"  avant (DTOs pydantic) : {timings['before']:.2f} µs/ligne")
+    print(f"  après (records)       : {timings['after']:.2f} µs/ligne")
+    print(f"  gain                  : x{timings['before'] / timings['after']:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+"""Suite de benchmarks de la tarification, avec seuils de régression.
+
+Mesure les chemins chauds du pricing sur un jeu de données synthétique
+(``benchmarks.pricing_data``) :
+
+* ``engine.determine_price`` : moteur pur, un produit par opération ;
+* ``unit_price.cold`` / ``unit_price.warm`` : ``get_unit_price`` sur un
+  modèle ``Product``, sans puis avec les prix en cache ;
+* ``cart.calculate[N]`` : ``calculate_cart`` d'un panier de N lignes
+  (cache chaud) ;
+* ``cart.reprice_one[N]`` : même panier tarifé de façon incrémentale
+  (``CartPriceState``) après modification d'une seule quantité ;
+* ``promo.resolve[N]`` : ``DjangoPromoCatalogAdapter.get_applicable_promos``
+  sur 20 produits avec N catalogues actifs (index chaud) ;
+* ``promo.index_build[N]`` : reconstruction de l'index des promotions ;
+* ``checkout[N]`` : ``CheckoutService.checkout`` d'un panier de N lignes
+  (tarification, réservation du stock, commande et lignes).
+
+Chaque cas est mesuré ``repeat`` fois ; on conserve la médiane et le
+minimum en microsecondes par opération.  ``compare`` confronte deux
+résultats et signale les cas dont la médiane se dégrade au-delà d'un
+seuil relatif.
+
+Toutes les données sont créées dans une transaction annulée à la fin :
+rien n'est conservé en base et aucun callback ``on_commit`` (tâches
+Celery) n'est déclenché.  Les versions de prix des produits créés sont
+retirées du cache partagé à la sortie.  À lancer via la commande
+``bench_pricing``, de préférence sur une base et un cache de
+développement.
+"""
+
+from __future__ import annotations
+
+import platform
+import statistics
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone as dt_timezone
+from importlib import import_module
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Sequence
+
+import django
+from django.conf import settings
+from django.db import transaction
+from django.test import RequestFactory
+
+from benchmarks import pricing_data
+from cart.context import get_cart_context
+from catalog.models import Product
+from core.adapters.orm_promo_adapter import DjangoPromoCatalogAdapter
+from core.adapters.pricing_rules_store import reset_pricing_rules
+from core.adapters.pricing_versions import PRODUCT_VERSION_KEY, bump_promo_generation
+from core.adapters.promo_index import PromoIndex, reset_promo_index
+from core.domain.cart_pricing import CartPriceState
+from core.domain.dto import CartLineRecord
+from core.domain.pricing_engine import PricingEngine
+from core.factory import get_pricing_service
+from core.utils.shared_cache import SHARED_CACHE_ALIAS, get_shared_cache
+from orders.forms import CheckoutForm
+from orders.services import CheckoutService
+
+FORMAT_VERSION = 1
+
+DEFAULT_CART_SIZES = (1, 20, 200)
+DEFAULT_CATALOG_COUNTS = (0, 10, 1000)
+DEFAULT_THRESHOLD = 0.25
+
+# Nombre de produits par résolution de promotions (une page catalogue).
+PROMO_BATCH = 20
+
+# Coordonnées de livraison des commandes créées par ``checkout[N]``.
+CHECKOUT_DATA = {
+    "email": "bench@example.com",
+    "first_name": "Bench",
+    "last_name": "Checkout",
+    "address1": "1 rue du Benchmark",
+    "city": "Paris",
+    "postcode": "75001",
+    "country": "France",
+}
+
+
+@dataclass(frozen=True)
+class Comparison:
+    """Comparaison d'un cas entre une référence et une nouvelle mesure."""
+
+    name: str
+    baseline_us: float
+    current_us: float
+    threshold: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current_us / self.baseline_us if self.baseline_us else float("inf")
+
+    @property
+    def regressed(self) -> bool:
+        return self.ratio > 1 + self.threshold
+
+
+def measure(
+    run: Callable[[], None],
+    ops: int,
+    repeat: int,
+    setup: Optional[Callable[[], None]] = None,
+) -> Dict[str, float]:
+    """Chronomètre ``run`` (``ops`` opérations) ``repeat`` fois.
+
+    ``setup`` est appelé avant chaque échantillon, hors chronométrage.
+    Un premier passage non mesuré sert d'échauffement.
+    """
+    if setup is not None:
+        setup()
+    run()
+    samples: List[float] = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        run()
+        samples.append((time.perf_counter() - start) / ops * 1_000_000)
+    return {
+        "median_us": round(statistics.median(samples), 3),
+        "min_us": round(min(samples), 3),
+        "ops": ops,
+        "samples": repeat,
+    }
+
+
+def run_pricing_benchmarks(
+    products: int = 500,
+    repeat: int = 7,
+    cart_sizes: Sequence[int] = DEFAULT_CART_SIZES,
+    catalog_counts: Sequence[int] = DEFAULT_CATALOG_COUNTS,
+    seed: int = 42,
+) -> Dict[str, object]:
+    """Exécute la suite et retourne ``{"meta": ..., "results": ...}``."""
+    if products < max(cart_sizes, default=0) or products < PROMO_BATCH:
+        raise ValueError("Le nombre de produits doit couvrir le plus grand panier et un lot de promotions.")
+
+    product_ids: List[int] = []
+    results: Dict[str, Dict[str, float]] = {}
+    try:
+        with transaction.atomic():
+            dataset_products = pricing_data.create_products(products, seed=seed)
+            product_ids = [product.pk for product in dataset_products]
+            users = pricing_data.create_users()
+            _refresh_pricing_state()
+            results.update(_bench_engine(dataset_products, users, repeat))
+            results.update(_bench_unit_price(dataset_products, users, repeat))
+            results.update(_bench_cart(dataset_products, users, repeat, cart_sizes))
+            results.update(_bench_promos(dataset_products, users, repeat, catalog_counts, seed))
+            results.update(_bench_checkout(dataset_products, users, repeat, cart_sizes))
+            transaction.set_rollback(True)
+    finally:
+        # Les identifiants annulés seront réutilisés : leurs versions ne
+        # doivent pas désigner les prix calculés ici.
+        get_shared_cache().delete_many([PRODUCT_VERSION_KEY.format(product_id=pid) for pid in product_ids])
+        _refresh_pricing_state()
+
+    return {
+        "meta": {
+            "format": FORMAT_VERSION,
+            "created_at": datetime.now(dt_timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "machine": platform.machine(),
+            "cache_backend": settings.CACHES["default"]["BACKEND"],
+            "shared_cache_backend": settings.CACHES[SHARED_CACHE_ALIAS]["BACKEND"],
+            "database": settings.DATABASES["default"]["ENGINE"],
+            "products": products,
+            "repeat": repeat,
+            "seed": seed,
+        },
+        "results": results,
+    }
+
+
+def compare(
+    baseline: Mapping[str, object],
+    current: Mapping[str, object],
+    threshold: float = DEFAULT_THRESHOLD,
+) -> List[Comparison]:
+    """Compare les médianes des cas présents dans les deux résultats."""
+    baseline_results = baseline.get("results", {})
+    current_results = current.get("results", {})
+    return [
+        Comparison(
+            name=name,
+            baseline_us=baseline_results[name]["median_us"],
+            current_us=current_results[name]["median_us"],
+            threshold=threshold,
+        )
+        for name in current_results
+        if name in baseline_results
+    ]
+
+
+# ----------------------------------------------------------------------
+# Cas mesurés
+# ----------------------------------------------------------------------
+def _refresh_pricing_state() -> None:
+    """Oublie les structures du processus (index, règles) et force leur rechargement."""
+    reset_promo_index()
+    reset_pricing_rules()
+
+
+def _bench_engine(products, users, repeat: int) -> Dict[str, Dict[str, float]]:
+    service = get_pricing_service()
+    product_dtos = [service._to_product_dto(product) for product in products]
+    user_dto = service._to_user_dto(users["wholesaler"])
+
+    def run() -> None:
+        for product_dto in product_dtos:
+            PricingEngine.determine_price(product_dto, user_dto)
+
+    return {"engine.determine_price": measure(run, len(product_dtos), repeat)}
+
+
+def _bench_unit_price(products, users, repeat: int) -> Dict[str, Dict[str, float]]:
+    service = get_pricing_service()
+    user = users["wholesaler"]
+    version_keys = [PRODUCT_VERSION_KEY.format(product_id=product.pk) for product in products]
+
+    def run() -> None:
+        for product in products:
+            service.get_unit_price(product, user)
+
+    return {
+        # Versions retirées du cache : chaque appel recalcule et réécrit le prix.
+        "unit_price.cold": measure(run, len(products), repeat, setup=lambda: get_shared_cache().delete_many(version_keys)),
+        "unit_price.warm": measure(run, len(products), repeat),
+    }
+
+
+def _bench_cart(products, users, repeat: int, cart_sizes: Iterable[int]) -> Dict[str, Dict[str, float]]:
+    service = get_pricing_service()
+    user_dto = service._to_user_dto(users["big_retail"])
+    results = {}
+    for size in cart_sizes:
+        records = [service._to_product_dto(product) for product in products[:size]]
+
+        def run(records=records) -> None:
+            lines = [CartLineRecord(product=record, quantity=12) for record in records]
+            service.calculate_cart(lines, user_dto)
+
+        results[f"cart.calculate[{size}]"] = measure(run, 1, repeat)
+
+        state = CartPriceState()
+        service.calculate_cart([CartLineRecord(product=record, quantity=12) for record in records], user_dto, state)
+        quantities = iter(range(13, 10**9))
+
+        def reprice_one(records=records, state=state) -> None:
+            lines = [CartLineRecord(product=record, quantity=12) for record in records]
+            lines[0].quantity = next(quantities)
+            service.calculate_cart(lines, user_dto, state)
+
+        results[f"cart.reprice_one[{size}]"] = measure(reprice_one, 1, repeat)
+    return results
+
+
+def _bench_promos(products, users, repeat: int, catalog_counts: Iterable[int], seed: int) -> Dict[str, Dict[str, float]]:
+    adapter = DjangoPromoCatalogAdapter()
+    service = get_pricing_service()
+    product_dtos = [service._to_product_dto(product) for product in products[:PROMO_BATCH]]
+    user_dto = service._to_user_dto(users["wholesaler"])
+    results = {}
+    for count in catalog_counts:
+        catalogs = pricing_data.create_promo_catalogs(products, count, seed=seed)
+        # ``bulk_create`` n'émet pas de signal : on publie la génération à la main.
+        bump_promo_generation()
+        reset_promo_index()
+
+        def resolve() -> None:
+            adapter.get_applicable_promos(product_dtos, user_dto)
+
+        results[f"promo.resolve[{count}]"] = measure(resolve, 1, repeat)
+        results[f"promo.index_build[{count}]"] = measure(PromoIndex.build, 1, repeat)
+        pricing_data.delete_promo_catalogs(catalogs)
+    return results
+
+
+def _bench_checkout(products, users, repeat: int, cart_sizes: Iterable[int]) -> Dict[str, Dict[str, float]]:
+    # Stock suffisant pour toutes les commandes créées pendant la mesure
+    Product.objects.filter(pk__in=[product.pk for product in products]).update(stock=10**9)
+    session_store = import_module(settings.SESSION_ENGINE).SessionStore
+    form = CheckoutForm(CHECKOUT_DATA)
+    form.is_valid()
+    service = CheckoutService()
+    results = {}
+    for size in cart_sizes:
+        cart = {str(product.pk): {"qty": 12} for product in products[:size]}
+        request = None
+
+        def setup(cart=cart) -> None:
+            # Nouvelle requête et nouveau panier, hors chronométrage
+            nonlocal request
+            request = RequestFactory().post("/")
+            request.user = users["big_retail"]
+            request.session = session_store()
+            request.session["cart"] = dict(cart)
+            get_cart_context(request)
+
+        def run() -> None:
+            service.checkout(request, form)
+
+        results[f"checkout[{size}]"] = measure(run, 1, repeat, setup=setup)
+    return results
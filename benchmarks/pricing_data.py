@@ -0,0 +1,119 @@
+"""Générateur de données synthétiques pour les benchmarks de tarification.
+
+Crée, avec une graine fixe, un catalogue de produits aux grilles B2B
+variées, un utilisateur par type de client et un nombre choisi de
+catalogues de promotion actifs.  Les données sont destinées à être
+créées dans une transaction annulée en fin de benchmark
+(voir ``core.management.commands.bench_pricing``).
+"""
+
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass, field
+from datetime import timedelta
+from decimal import Decimal
+from typing import Dict, List
+
+from django.utils import timezone
+
+from catalog.models import Brand, Category, Product, PromoCatalog, PromoItem
+from core.domain.pricing_segments import CLIENT_TYPES
+from userauths.models import User
+
+
+@dataclass
+class PricingDataset:
+    products: List[Product]
+    users: Dict[str, User]
+    catalogs: List[PromoCatalog] = field(default_factory=list)
+
+
+def _price(rng: random.Random, low: int = 100, high: int = 100_000) -> Decimal:
+    return Decimal(rng.randint(low, high)).scaleb(-2)
+
+
+def create_products(count: int, seed: int = 42, prefix: str = "BENCH") -> List[Product]:
+    """Crée ``count`` produits en une requête ``bulk_create``."""
+    rng = random.Random(seed)
+    category = Category.objects.create(name=f"{prefix} catégorie", slug=f"{prefix.lower()}-categorie")
+    brand = Brand.objects.create(name=f"{prefix} marque", slug=f"{prefix.lower()}-marque")
+    products = []
+    for index in range(count):
+        price = _price(rng)
+        products.append(
+            Product(
+                title=f"{prefix} produit {index}",
+                slug=f"{prefix.lower()}-produit-{index}",
+                sku=f"{prefix}-{index}",
+                article_code=f"{prefix}-{index}",
+                category=category,
+                brand=brand,
+                price=price,
+                discount_price=(price * Decimal("0.9")).quantize(Decimal("0.01")) if rng.random() < 0.3 else None,
+                price_wholesaler=(price * Decimal("0.7")).quantize(Decimal("0.01")) if rng.random() < 0.8 else None,
+                price_big_retail=(price * Decimal("0.8")).quantize(Decimal("0.01")) if rng.random() < 0.8 else None,
+                price_small_retail=(price * Decimal("0.9")).quantize(Decimal("0.01")) if rng.random() < 0.8 else None,
+            )
+        )
+    return Product.objects.bulk_create(products)
+
+
+def create_users(prefix: str = "bench") -> Dict[str, User]:
+    """Crée un utilisateur vérifié, avec numéro client, par type de client."""
+    return {
+        client_type: User.objects.create_user(
+            username=f"{prefix}-{client_type}",
+            password=None,
+            client_type=client_type,
+            customer_number=f"{prefix.upper()}-{client_type.upper()}",
+            is_b2b_verified=True,
+        )
+        for client_type in CLIENT_TYPES
+    }
+
+
+def create_promo_catalogs(
+    products: List[Product],
+    count: int,
+    items_per_catalog: int = 5,
+    seed: int = 42,
+    prefix: str = "BENCH",
+) -> List[PromoCatalog]:
+    """Crée ``count`` catalogues actifs et leurs items en deux ``bulk_create``.
+
+    Un catalogue sur trois cible un type de client ; un item sur dix est
+    réservé à des numéros clients.
+    """
+    if not count:
+        return []
+    rng = random.Random(seed)
+    now = timezone.now()
+    catalogs = PromoCatalog.objects.bulk_create(
+        [
+            PromoCatalog(
+                title=f"{prefix} promo {index}",
+                start_date=now - timedelta(days=1),
+                end_date=now + timedelta(days=30),
+                target_client_type=rng.choice(CLIENT_TYPES) if index % 3 == 0 else None,
+            )
+            for index in range(count)
+        ]
+    )
+    items = []
+    for catalog in catalogs:
+        for product in rng.sample(products, min(items_per_catalog, len(products))):
+            items.append(
+                PromoItem(
+                    catalog=catalog,
+                    product=product,
+                    promo_price=(product.price * Decimal("0.6")).quantize(Decimal("0.01")),
+                    allowed_customer_numbers=[f"{prefix}-WHOLESALER"] if rng.random() < 0.1 else [],
+                )
+            )
+    PromoItem.objects.bulk_create(items)
+    return catalogs
+
+
+def delete_promo_catalogs(catalogs: List[PromoCatalog]) -> None:
+    PromoCatalog.objects.filter(pk__in=[catalog.pk for catalog in catalogs]).delete()
@@ -1,3 +1,24 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import Cart, CartLine, SavedCart
+
+
+class CartLineInline(admin.TabularInline):
+    model = CartLine
+    extra = 0
+    raw_id_fields = ("product",)
+
+
+@admin.register(Cart)
+class CartAdmin(admin.ModelAdmin):
+    list_display = ("user", "created_at")
+    search_fields = ("user__username", "user__email", "user__customer_number")
+    raw_id_fields = ("user",)
+    inlines = [CartLineInline]
+
+
+@admin.register(SavedCart)
+class SavedCartAdmin(admin.ModelAdmin):
+    list_display = ("name", "user", "client", "line_count", "updated_at")
+    search_fields = ("name", "user__username", "client__name")
+    raw_id_fields = ("user", "client", "created_by")
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class CartConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'cart'
+
+    def ready(self) -> None:
+        # Fusion du panier de session à la connexion
+        from . import signals  # noqa: F401
@@ -2,12 +2,16 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from decimal import Decimal
-from typing import Any, Dict, Iterator, Optional
+from typing import Any, Callable, Dict, Iterator, Optional
 from django.contrib.auth.decorators import login_required
 from django.conf import settings
 from django.utils.functional import cached_property
 from django.apps import apps
 
+from core.domain.quantity_rules import normalize_quantity as _normalize_quantity
+
+from .revisions import REVISION_SESSION_ID, cart_lock, is_newer, merge_line, read_shared, write_shared
+
 # ``get_pricing_service`` n'est plus utilisé dans ce module ; le prix
 # unitaire est désormais calculé au niveau du service de panier.
 
@@ -49,6 +53,14 @@ def _unit_price_of(product: Any) -> Decimal:
     return Decimal("0.00")
 
 
+def normalize_quantity(product: Any, qty: int) -> int:
+    """Applique ``MIN_QTY`` et les règles MOQ / PCB du produit à ``qty`` (> 0).
+
+    Voir ``core.domain.quantity_rules.normalize_quantity``.
+    """
+    return _normalize_quantity(product, qty, MIN_QTY)
+
+
 @dataclass
 class CartRow:
     """Représente une ligne du panier avec les informations calculées."""
@@ -79,11 +91,62 @@ class Cart:
         if cart is None:
             cart = self.session[CART_SESSION_ID] = {}
         self._cart: Dict[str, Dict[str, Any]] = cart
-
-    def _save(self) -> None:
+        # Révision partagée sur laquelle repose ``_cart`` (voir ``cart.revisions``)
+        self._shared_revision = int(self.session.get(REVISION_SESSION_ID, 0))
+        shared = read_shared(self.session.session_key)
+        if is_newer(shared, self._shared_revision):
+            # Une requête parallèle a modifié le panier après l'écriture
+            # de cette session : la copie partagée fait foi.
+            self._shared_revision, self._cart = shared
+            self._store_in_session()
+        # Incrémenté à chaque modification : permet aux calculs mémorisés
+        # pour la requête (voir ``cart.context.CartContext``) de se périmer.
+        self.revision = 0
+
+    def _store_in_session(self) -> None:
         self.session[CART_SESSION_ID] = self._cart
+        self.session[REVISION_SESSION_ID] = self._shared_revision
         self.session.modified = True
 
+    def _save(self) -> None:
+        self._store_in_session()
+        self.revision += 1
+        # Des lignes ajoutées par une requête parallèle peuvent porter sur
+        # des produits non chargés : la correspondance sera rechargée.
+        products_map = self.__dict__.get("_products_map")
+        if products_map is not None and not set(map(int, self._cart)) <= set(products_map):
+            del self.__dict__["_products_map"]
+
+    def _mutate(self, op: Callable[[Dict[str, Dict[str, Any]]], bool]) -> None:
+        """Applique ``op`` aux lignes du panier par compare-and-swap.
+
+        ``op`` modifie en place le dictionnaire de lignes qu'il reçoit et
+        retourne ``True`` s'il a changé quelque chose.  Si une autre
+        requête a écrit le panier depuis sa lecture, ``op`` est rejoué
+        sur les lignes à jour : chaque opération ne porte que sur ses
+        propres lignes, les autres modifications sont conservées.
+        """
+        session_key = self.session.session_key
+        if not session_key:
+            if op(self._cart):
+                self._save()
+            return
+        with cart_lock(session_key):
+            shared = read_shared(session_key)
+            rebased = is_newer(shared, self._shared_revision)
+            if rebased:
+                self._shared_revision, self._cart = shared
+            changed = op(self._cart)
+            if changed:
+                self._shared_revision += 1
+                write_shared(session_key, self._shared_revision, self._cart)
+        if changed or rebased:
+            self._save()
+
+    def _loaded_product(self, pid: int) -> Optional[Any]:
+        """Retourne le produit ``pid`` s'il a déjà été chargé, sans requête."""
+        return self.__dict__.get("_products_map", {}).get(pid)
+
 
     def add(
         self,
@@ -112,42 +175,23 @@ class Cart:
             q_int = int(q) if q is not None else 1
         except Exception:
             q_int = 1
-        current = int(self._cart.get(pid_str, {}).get("qty", 0))
-        product_obj = product or Product.objects.get(pk=int(pid))
-
-        min_qty = MIN_QTY
-        prod_min = getattr(product_obj, "min_order_qty", None)
-        if isinstance(prod_min, int) and prod_min > 0:
-            min_qty = max(min_qty, prod_min)
-
-        pcb = None
-        order_in_packs = getattr(product_obj, "order_in_packs", False)
-        if order_in_packs:
-            try:
-                pcb_val = int(getattr(product_obj, "pcb_qty", 1))
-                if pcb_val > 1:
-                    pcb = pcb_val
-            except Exception:
-                pcb = None
-
-        new_qty = q_int if override else (current + q_int)
-        if new_qty <= 0:
-            if pid_str in self._cart:
-                del self._cart[pid_str]
-                self._save()
-            return
-        if new_qty < min_qty:
-            new_qty = min_qty
-        if pcb:
-            new_qty = ((new_qty + pcb - 1) // pcb) * pcb
-
-        self._cart[pid_str] = {
-            "qty": new_qty,
-            # On ne stocke plus de prix en session afin de respecter la règle
-            # du single source of truth.  Le prix sera calculé par le service
-            # de panier.
-        }
-        self._save()
+        product_obj = product or self._loaded_product(int(pid)) or Product.objects.get(pk=int(pid))
+        products_map = self.__dict__.get("_products_map")
+        if products_map is not None:
+            products_map.setdefault(int(pid), product_obj)
+
+        def op(lines: Dict[str, Dict[str, Any]]) -> bool:
+            current = int(lines.get(pid_str, {}).get("qty", 0))
+            new_qty = q_int if override else (current + q_int)
+            if new_qty <= 0:
+                return lines.pop(pid_str, None) is not None
+            # On ne stocke plus de prix en session afin de respecter la
+            # règle du single source of truth.  Le prix sera calculé par
+            # le service de panier.
+            lines[pid_str] = {"qty": normalize_quantity(product_obj, new_qty)}
+            return True
+
+        self._mutate(op)
 
     def update(self, product_id: int, qty: int) -> None:
         """Fixe la quantité à qty (>=0)."""
@@ -155,13 +199,55 @@ class Cart:
 
     def remove(self, product_id: int) -> None:
         pid_str = str(int(product_id))
-        if pid_str in self._cart:
-            del self._cart[pid_str]
-            self._save()
+        self._mutate(lambda lines: lines.pop(pid_str, None) is not None)
 
     def clear(self) -> None:
-        self._cart = {}
-        self._save()
+        def op(lines: Dict[str, Dict[str, Any]]) -> bool:
+            lines.clear()
+            return True
+
+        self._mutate(op)
+
+    def replace(self, quantities: Dict[int, int]) -> None:
+        """Remplace tout le contenu par ``{product_id: quantité}`` déjà normalisé.
+
+        Utilisé par les repositories pour enregistrer le panier calculé
+        par le service.  Seules les lignes qui diffèrent du panier lu
+        sont écrites : si une requête parallèle a modifié le panier
+        entre-temps, ses lignes sont conservées et une ligne modifiée des
+        deux côtés est fusionnée (``cart.revisions.merge_line``).  Les
+        produits déjà chargés restent en mémoire ; les autres seront
+        chargés à la prochaine itération.
+        """
+        base = self.quantities()
+        target = {int(pid): int(qty) for pid, qty in quantities.items() if int(qty) > 0}
+        changed = [pid for pid in base.keys() | target.keys() if base.get(pid) != target.get(pid)]
+
+        def op(lines: Dict[str, Dict[str, Any]]) -> bool:
+            modified = False
+            for pid in changed:
+                key = str(pid)
+                current = int(lines[key]["qty"]) if key in lines else None
+                merged = merge_line(base.get(pid), target.get(pid), current)
+                if merged == current:
+                    continue
+                modified = True
+                if merged is None:
+                    del lines[key]
+                else:
+                    lines[key] = {"qty": merged}
+            return modified
+
+        self._mutate(op)
+
+    def quantities(self) -> Dict[int, int]:
+        """Retourne ``{product_id: quantité}`` lu dans la session, sans requête."""
+        quantities = {}
+        for pid_str, entry in self._cart.items():
+            qty = int(entry.get("qty", 0))
+            if qty > 0:
+                quantities[int(pid_str)] = qty
+        return quantities
 
     def __len__(self) -> int:
         return sum(int(v.get("qty", 0)) for v in self._cart.values())
@@ -0,0 +1,111 @@
+"""Contexte de panier propre à une requête.
+
+Un même affichage (page panier, checkout) lisait le panier plusieurs
+fois : le repository de session, la vue et le context processor
+construisaient chacun leur ``Cart`` et rechargeaient les produits, puis
+``CheckoutService`` recommençait.  ``CartContext`` est créé une fois par
+requête (``CartContextMiddleware``) et partagé par tous ces appelants :
+
+* un seul objet ``Cart``, donc une seule requête de chargement des
+  produits (``Cart._products_map``) ;
+* le panier tarifé calculé par ``CartService.get_cart`` est mémorisé et
+  réutilisé tant que le panier n'est pas modifié (``Cart.revision``) ;
+* chaque tarification rafraîchit le résumé du panier en session
+  (``cart.summary``), relu ensuite sans tarification par le context
+  processor.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Optional
+
+from django.utils.functional import cached_property
+
+from .cart import CART_SESSION_ID, Cart
+from .summary import EMPTY_SUMMARY, CartSummary, cart_version
+
+# Attribut de la requête portant le contexte.
+REQUEST_ATTR = "cart_context"
+
+
+class CartContext:
+    """Unité de travail du panier pour une requête HTTP."""
+
+    def __init__(self, request) -> None:
+        self.request = request
+        self._priced: Optional[tuple] = None
+
+    @cached_property
+    def cart(self) -> Cart:
+        """Panier de session partagé par la requête."""
+        return Cart(self.request)
+
+    def priced(self, compute: Callable[[], Any]) -> Any:
+        """Retourne le panier tarifé, calculé par ``compute`` au plus une fois par révision.
+
+        La clé de mémorisation inclut l'utilisateur : une connexion en
+        cours de requête change la tarification.
+        """
+        user = getattr(self.request, "user", None)
+        key = (self.cart.revision, getattr(user, "pk", None))
+        if self._priced is None or self._priced[0] != key:
+            # Version calculée avant la tarification : un prix modifié
+            # pendant le calcul rendra le résumé périmé, jamais l'inverse.
+            version = cart_version(user, self.cart.quantities())
+            cart_dto = compute()
+            CartSummary.from_priced_cart(cart_dto, version).save(self.request.session)
+            self._priced = (key, cart_dto)
+        return self._priced[1]
+
+    def summary(self) -> CartSummary:
+        """Retourne le résumé du panier, retarifé seulement s'il est périmé.
+
+        Lorsque le résumé en session correspond à la version courante
+        (même contenu, même utilisateur, mêmes versions de prix), aucune
+        requête SQL ni appel au service de tarification n'a lieu.
+        """
+        if not self.request.session.get(CART_SESSION_ID):
+            return EMPTY_SUMMARY
+        user = getattr(self.request, "user", None)
+        quantities = self.cart.quantities()
+        if not quantities:
+            return EMPTY_SUMMARY
+        summary = CartSummary.from_session(self.request.session, cart_version(user, quantities))
+        if summary is None:
+            # Import local : ``core.factory`` dépend de ce module via le
+            # repository de session.
+            from core.factory import get_cart_service
+
+            get_cart_service().get_cart(self.request)
+            summary = CartSummary.from_session(self.request.session, cart_version(user, quantities))
+        return summary or EMPTY_SUMMARY
+
+    def etag(self) -> str:
+        """ETag HTTP du panier tarifé, calculé sans tarification.
+
+        Dérivé de la version du résumé (``cart_version`` : contenu du
+        panier, attributs de tarification de l'utilisateur, versions de
+        prix des produits) : il change dès que le panier tarifé peut
+        avoir changé.  Lit la révision du panier et l'empreinte des prix
+        dans le cache commun (des requêtes SQL sans Redis), jamais les
+        tables du catalogue.
+        """
+        user = getattr(self.request, "user", None)
+        return f'"{cart_version(user, self.cart.quantities())}"'
+
+    def invalidate(self) -> None:
+        """Oublie le panier tarifé mémorisé (modification hors ``Cart``)."""
+        self._priced = None
+
+
+def get_cart_context(request) -> CartContext:
+    """Retourne le contexte de panier de ``request``, créé au besoin.
+
+    Permet aux appelants de fonctionner même sans le middleware
+    (requêtes construites dans les tests, tâches…).
+    """
+    context = getattr(request, REQUEST_ATTR, None)
+    if context is None:
+        context = CartContext(request)
+        setattr(request, REQUEST_ATTR, context)
+    return context
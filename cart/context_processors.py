@@ -1,5 +1,10 @@
-from .cart import Cart
+from .context import get_cart_context
 
 def cart(request):
-    c = Cart(request)
-    return {"cart_count": len(c), "cart_total": c.total}
+    """Expose le résumé du panier (voir ``cart.summary``) à tous les gabarits."""
+    summary = get_cart_context(request).summary()
+    return {
+        "cart_count": summary.quantity,
+        "cart_lines": summary.lines,
+        "cart_total": summary.total,
+    }
@@ -3,3 +3,31 @@ from django import forms
 class AddToCartForm(forms.Form):
     quantity = forms.IntegerField(min_value=1, max_value=100, initial=1)
     override = forms.BooleanField(required=False, initial=False, widget=forms.HiddenInput)
+
+
+class OrderPadForm(forms.Form):
+    """Bloc-notes de commande : une ligne ``code quantité`` par produit, ou un fichier CSV."""
+
+    lines = forms.CharField(
+        label="Références et quantités",
+        required=False,
+        widget=forms.Textarea(attrs={"rows": 12, "placeholder": "REF-001 12\nREF-002;24"}),
+    )
+    file = forms.FileField(label="Fichier CSV", required=False)
+
+    def clean(self):
+        cleaned = super().clean()
+        if not cleaned.get("lines", "").strip() and not cleaned.get("file"):
+            raise forms.ValidationError("Saisissez au moins une ligne ou joignez un fichier CSV.")
+        return cleaned
+
+
+class SavedCartForm(forms.Form):
+    """Enregistrement du panier courant comme liste de commande."""
+
+    name = forms.CharField(label="Nom de la liste", max_length=120)
+    client = forms.TypedChoiceField(label="Partager avec", required=False, coerce=int, empty_value=None)
+
+    def __init__(self, *args, clients=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields["client"].choices = [("", "Moi uniquement")] + [(client.pk, client.name) for client in clients]
@@ -0,0 +1,29 @@
+from django.http import JsonResponse
+
+from .context import get_cart_context
+from .revisions import CartWriteConflict
+
+
+class CartContextMiddleware:
+    """Attache un ``CartContext`` à chaque requête (``request.cart_context``).
+
+    Le contexte est paresseux : aucune lecture de session ni requête SQL
+    n'a lieu tant que le panier n'est pas utilisé.  À placer après
+    ``SessionMiddleware`` et ``AuthenticationMiddleware``.
+
+    Une écriture du panier bloquée par des requêtes parallèles
+    (``CartWriteConflict``) est convertie en réponse 409 : le client peut
+    simplement renvoyer sa requête.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        get_cart_context(request)
+        return self.get_response(request)
+
+    def process_exception(self, request, exception):
+        if isinstance(exception, CartWriteConflict):
+            return JsonResponse({"detail": str(exception)}, status=409)
+        return None
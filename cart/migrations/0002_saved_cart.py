@@ -0,0 +1,37 @@
+# Generated by Django 5.2.8 on 2026-10-18 09:16
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cart', '0001_initial'),
+        ('clients', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SavedCart',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=120, verbose_name='Nom')),
+                ('product_ids', models.JSONField(default=list, verbose_name='Produits')),
+                ('quantities', models.JSONField(default=list, verbose_name='Quantités')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('client', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='saved_carts', to='clients.client')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='saved_carts', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Liste de commande',
+                'verbose_name_plural': 'Listes de commande',
+                'ordering': ['name'],
+                'constraints': [models.CheckConstraint(condition=models.Q(models.Q(('client__isnull', True), ('user__isnull', False)), models.Q(('client__isnull', False), ('user__isnull', True)), _connector='OR'), name='saved_cart_single_owner'), models.UniqueConstraint(condition=models.Q(('user__isnull', False)), fields=('user', 'name'), name='uniq_saved_cart_user_name'), models.UniqueConstraint(condition=models.Q(('client__isnull', False)), fields=('client', 'name'), name='uniq_saved_cart_client_name')],
+            },
+        ),
+    ]
@@ -1,3 +1,114 @@
+from django.conf import settings
+from django.core.exceptions import ValidationError
 from django.db import models
 
-# Create your models here.
+
+class Cart(models.Model):
+    """Panier persistant d'un utilisateur authentifié.
+
+    Utilisé par ``core.repositories.cart_db.DatabaseCartRepository``
+    (réglage ``CART_REPOSITORY = "database"``) pour retrouver le panier
+    d'un acheteur sur tous ses appareils.  Les paniers anonymes restent
+    en session.
+    """
+
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="stored_cart")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Panier enregistré"
+        verbose_name_plural = "Paniers enregistrés"
+
+    def __str__(self) -> str:
+        return f"Panier de {self.user}"
+
+
+class CartLine(models.Model):
+    """Ligne d'un panier persistant : un produit et sa quantité."""
+
+    cart = models.ForeignKey(Cart, on_delete=models.CASCADE, related_name="lines")
+    product = models.ForeignKey("catalog.Product", on_delete=models.CASCADE, related_name="+")
+    quantity = models.PositiveIntegerField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Ligne de panier"
+        verbose_name_plural = "Lignes de panier"
+        constraints = [
+            # Cible des upserts ``bulk_create(update_conflicts=True)``
+            models.UniqueConstraint(fields=["cart", "product"], name="uniq_cart_line_product"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.product_id} x {self.quantity}"
+
+
+class SavedCart(models.Model):
+    """Liste de commande enregistrée (« réassort hebdo magasin 12 »).
+
+    Appartient soit à un utilisateur, soit à un ``clients.Client`` (liste
+    partagée entre les utilisateurs liés).  Les lignes sont stockées de
+    façon compacte sous forme de deux tableaux parallèles d'identifiants
+    produit et de quantités : une liste de plusieurs centaines de lignes
+    tient dans une seule rangée et se relit sans jointure.
+    """
+
+    name = models.CharField("Nom", max_length=120)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+        related_name="saved_carts",
+    )
+    client = models.ForeignKey(
+        "clients.Client",
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+        related_name="saved_carts",
+    )
+    product_ids = models.JSONField("Produits", default=list)
+    quantities = models.JSONField("Quantités", default=list)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="+",
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Liste de commande"
+        verbose_name_plural = "Listes de commande"
+        ordering = ["name"]
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(user__isnull=False, client__isnull=True)
+                | models.Q(user__isnull=True, client__isnull=False),
+                name="saved_cart_single_owner",
+            ),
+            models.UniqueConstraint(
+                fields=["user", "name"],
+                condition=models.Q(user__isnull=False),
+                name="uniq_saved_cart_user_name",
+            ),
+            models.UniqueConstraint(
+                fields=["client", "name"],
+                condition=models.Q(client__isnull=False),
+                name="uniq_saved_cart_client_name",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return self.name
+
+    def clean(self):
+        if len(self.product_ids) != len(self.quantities):
+            raise ValidationError("Les tableaux produits et quantités doivent avoir la même longueur.")
+
+    @property
+    def line_count(self) -> int:
+        return len(self.product_ids)
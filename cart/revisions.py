@@ -0,0 +1,113 @@
+"""Écritures concurrentes du panier de session.
+
+Le bloc-notes de commande et la page panier envoient plusieurs requêtes
+d'ajout / de mise à jour en parallèle.  Chaque requête lit la session au
+début, la modifie puis la réécrit en entier à la fin : sans précaution,
+la dernière écriture gagne et les lignes ajoutées par les autres
+requêtes sont perdues.
+
+La copie de référence du panier est donc tenue dans le cache commun à
+tous les processus (``core.utils.shared_cache`` : Redis ou une table de
+la base, jamais le cache ``default`` propre à chaque worker), sous la
+forme ``(révision, lignes)`` et par clé de session ; le verrou y est
+pris aussi :
+
+* ``Cart`` relit cette copie à sa création si sa révision est
+  strictement plus récente que celle de la session (une copie plus
+  ancienne, par exemple réécrite après une éviction, est ignorée) ;
+* chaque modification est un *compare-and-swap* : sous un verrou court
+  (``cache.add``), la révision partagée est comparée à celle sur laquelle
+  la requête s'est appuyée.  Si une autre requête a écrit entre-temps,
+  la modification (une opération par ligne) est rejouée sur les lignes
+  à jour au lieu de les écraser, puis la révision est incrémentée.
+
+Sans clé de session (premier passage d'un visiteur), aucune autre
+requête ne peut partager le panier : l'écriture se fait directement.
+"""
+
+from __future__ import annotations
+
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from django.conf import settings
+
+from core.utils.shared_cache import get_shared_cache
+
+STATE_KEY = "cart:state:{session_key}"
+LOCK_KEY = "cart:lock:{session_key}"
+
+# Révision partagée sur laquelle s'appuie la copie du panier en session.
+REVISION_SESSION_ID: str = getattr(settings, "CART_REVISION_SESSION_ID", "cart_revision")
+
+# Durée maximale de détention du verrou (secondes) : un processus
+# interrompu ne bloque pas le panier au-delà.
+LOCK_TIMEOUT = 5
+LOCK_ATTEMPTS = 100
+LOCK_DELAY = 0.02
+
+
+class CartWriteConflict(RuntimeError):
+    """Le verrou du panier n'a pas pu être obtenu dans le délai imparti."""
+
+
+def read_shared(session_key: Optional[str]) -> Optional[Tuple[int, Dict[str, Dict[str, Any]]]]:
+    """Retourne ``(révision, lignes)`` du panier partagé, ou ``None`` s'il est inconnu."""
+    if not session_key:
+        return None
+    return get_shared_cache().get(STATE_KEY.format(session_key=session_key))
+
+
+def write_shared(session_key: str, revision: int, lines: Dict[str, Dict[str, Any]]) -> None:
+    get_shared_cache().set(STATE_KEY.format(session_key=session_key), (revision, lines), settings.SESSION_COOKIE_AGE)
+
+
+def is_newer(shared: Optional[Tuple[int, Any]], revision: int) -> bool:
+    """Vrai si la copie partagée ``shared`` est postérieure à ``revision``."""
+    return shared is not None and shared[0] > revision
+
+
+@contextmanager
+def cart_lock(session_key: str) -> Iterator[None]:
+    """Verrou exclusif sur le panier de ``session_key``.
+
+    Lève ``CartWriteConflict`` si le verrou reste pris au-delà de
+    ``LOCK_ATTEMPTS`` tentatives.
+    """
+    cache = get_shared_cache()
+    key = LOCK_KEY.format(session_key=session_key)
+    token = uuid.uuid4().hex
+    for _ in range(LOCK_ATTEMPTS):
+        if cache.add(key, token, LOCK_TIMEOUT):
+            break
+        time.sleep(LOCK_DELAY)
+    else:
+        raise CartWriteConflict("Le panier est en cours de modification, veuillez réessayer.")
+    try:
+        yield
+    finally:
+        # Ne libère que son propre verrou (il a pu expirer et être repris)
+        if cache.get(key) == token:
+            cache.delete(key)
+
+
+def merge_line(base: Optional[int], ours: Optional[int], theirs: Optional[int]) -> Optional[int]:
+    """Fusion à trois voies de la quantité d'une ligne (``None`` : ligne absente).
+
+    ``base`` est la quantité lue par la requête, ``ours`` celle qu'elle
+    veut écrire et ``theirs`` la quantité écrite entre-temps par une
+    autre requête.  Si seule l'une des deux a changé la ligne, son choix
+    l'emporte ; si les deux l'ont changée, les deux variations
+    s'additionnent (deux ajouts simultanés du même produit), une
+    suppression de notre part restant une suppression.
+    """
+    if theirs == base:
+        return ours
+    if ours == base:
+        return theirs
+    if ours is None or theirs is None:
+        return ours
+    merged = theirs + ours - (base or 0)
+    return merged if merged > 0 else None
@@ -0,0 +1,21 @@
+"""Récepteurs de signaux de l'application cart.
+
+À la connexion, le panier anonyme de la session est fusionné dans le
+panier enregistré de l'utilisateur lorsque le repository configuré
+(``CART_REPOSITORY``) sait le faire.
+"""
+
+from django.contrib.auth.signals import user_logged_in
+from django.dispatch import receiver
+
+
+@receiver(user_logged_in)
+def merge_session_cart_on_login(sender, request, user, **kwargs):
+    if request is None or not hasattr(request, "session"):
+        return
+    # Import local : ``core.factory`` importe les modèles de cette application
+    from core.factory import get_cart_repository
+
+    merge = getattr(get_cart_repository(), "merge_session_cart", None)
+    if merge is not None:
+        merge(request, user)
@@ -0,0 +1,97 @@
+"""Résumé du panier conservé en session.
+
+Le context processor ``cart.context_processors.cart`` s'exécute sur
+chaque page rendue.  Plutôt que de reconstruire et retarifer le panier,
+il lit un résumé compact stocké en session : nombre de lignes,
+quantité totale, total tarifé et la *version* pour laquelle ce total a
+été calculé.
+
+La version est une empreinte du contenu du panier, des attributs de
+tarification de l'utilisateur et des versions de prix des produits
+(``core.adapters.pricing_versions.get_price_fingerprint``).  Elle se
+calcule sans tarification (session, utilisateur déjà chargé, une lecture
+du cache commun : une requête SQL si ce cache est la table par défaut,
+aucune avec Redis) : tant qu'elle ne change pas, le résumé est réutilisé
+tel quel.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Any, Dict, Mapping, Optional
+
+from django.conf import settings
+
+from core.adapters.pricing_versions import get_price_fingerprint
+
+SUMMARY_SESSION_ID: str = getattr(settings, "CART_SUMMARY_SESSION_ID", "cart_summary")
+
+
+@dataclass(frozen=True)
+class CartSummary:
+    """Résumé du panier pour l'en-tête des pages."""
+
+    lines: int
+    quantity: int
+    total: Decimal
+    version: str
+
+    @classmethod
+    def from_priced_cart(cls, cart_dto, version: str) -> "CartSummary":
+        """Construit le résumé d'un ``CartDTO`` tarifé par ``CartService``."""
+        return cls(
+            lines=len(cart_dto.items),
+            quantity=sum(item.quantity for item in cart_dto.items),
+            total=cart_dto.total or Decimal("0.00"),
+            version=version,
+        )
+
+    @classmethod
+    def from_session(cls, session, version: str) -> Optional["CartSummary"]:
+        """Retourne le résumé en session s'il correspond à ``version``."""
+        data = session.get(SUMMARY_SESSION_ID)
+        if not data or data.get("version") != version:
+            return None
+        return cls(
+            lines=int(data["lines"]),
+            quantity=int(data["quantity"]),
+            total=Decimal(data["total"]),
+            version=version,
+        )
+
+    def save(self, session) -> None:
+        data = {
+            "lines": self.lines,
+            "quantity": self.quantity,
+            "total": str(self.total),
+            "version": self.version,
+        }
+        # N'écrit la session que si le résumé a changé
+        if session.get(SUMMARY_SESSION_ID) != data:
+            session[SUMMARY_SESSION_ID] = data
+
+
+EMPTY_SUMMARY = CartSummary(lines=0, quantity=0, total=Decimal("0.00"), version="")
+
+
+def cart_version(user: Any, quantities: Mapping[int, int]) -> str:
+    """Empreinte des données dont dépend le total du panier.
+
+    ``quantities`` est le contenu du panier (``Cart.quantities()``) ;
+    ``user`` l'utilisateur de la requête, dont seuls les attributs de
+    tarification sont retenus.
+    """
+    if user is not None and getattr(user, "is_authenticated", False):
+        user_part = (
+            user.pk,
+            getattr(user, "client_type", None),
+            getattr(user, "customer_number", None),
+            getattr(user, "is_b2b_verified", False),
+        )
+    else:
+        user_part = None
+    lines: Dict[int, int] = dict(sorted(quantities.items()))
+    payload = repr((user_part, lines, get_price_fingerprint(lines)))
+    return hashlib.sha1(payload.encode()).hexdigest()
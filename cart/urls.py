@@ -12,6 +12,12 @@ urlpatterns = [
     path("update/<int:product_id>/", views.update, name="cart_update"),
     path("remove/<int:product_id>/", views.remove, name="cart_remove"),
     path("clear/", views.clear, name="cart_clear"),
+    # Commande rapide : saisie ou import CSV de nombreuses références
+    path("order-pad/", views.order_pad, name="order_pad"),
+    # Listes de commande enregistrées (paniers types)
+    path("saved/", views.saved_carts, name="saved_carts"),
+    path("saved/<int:saved_cart_id>/load/", views.load_saved_cart, name="load_saved_cart"),
+    path("saved/<int:saved_cart_id>/delete/", views.delete_saved_cart, name="delete_saved_cart"),
     path("add-legacy/<int:product_id>/", views.add_legacy, name="cart_add_legacy"),
 
     # Application d'un code promo au panier
@@ -1,6 +1,8 @@
 from decimal import Decimal
 
 from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.http import Http404
 from django.shortcuts import render, redirect, get_object_or_404
 from django.urls import reverse
 from django.utils import timezone  # conservé pour compat éventuelle
@@ -8,8 +10,13 @@ from django.views.decorators.http import require_POST
 
 from catalog.models import Product
 
-from .cart import Cart
-from core.factory import get_cart_service
+from .context import get_cart_context
+from .forms import OrderPadForm, SavedCartForm
+from .models import SavedCart
+from clients.models import Client
+from core.factory import get_cart_service, get_saved_cart_service
+from core.repositories.saved_carts_django import EDITOR_ROLES
+from core.utils.order_lines import STATUS_MESSAGES, parse_order_csv, parse_order_text
 from orders.services import CheckoutService
 
 try:
@@ -32,9 +39,10 @@ def detail(request):
     service = get_cart_service()
     cart_dto = service.get_cart(request)
 
-    # Reconstruit un objet cart pour l'affichage afin de conserver
-    # l'interface attendue par les templates (``for item in cart``)
-    original_cart = Cart(request)
+    # Reprend le panier du contexte de la requête (produits déjà chargés
+    # par le service) afin de conserver l'interface attendue par les
+    # templates (``for item in cart``)
+    original_cart = get_cart_context(request).cart
     # Crée une correspondance entre id de produit et ligne tarifée
     priced_map: dict[int, object] = {ci.product.id: ci for ci in cart_dto.items}
     view_items = []
@@ -131,10 +139,9 @@ def add(request, product_id):
     except Exception:
         qty_int = 1
     override = request.POST.get("override") in ("1", "true", "True", "on")
-    # Si override est utilisé, on mettra à jour la quantité via le Cart directement
+    # Si override est utilisé, la quantité remplace celle du panier
     if override:
-        cart = Cart(request)
-        cart.update(product_id, qty_int)
+        get_cart_service().update_item(request, product_id, qty_int)
     else:
         service = get_cart_service()
         # Obtient le SKU depuis le modèle pour utiliser le service
@@ -147,33 +154,117 @@ def add(request, product_id):
 
 @require_POST
 def update(request, product_id):
-    # Met à jour directement la session puis recalcule les prix via le service
+    # Met à jour la quantité via le service (session ou panier enregistré)
     try:
         qty = int(request.POST.get("qty") or request.POST.get("quantity") or 1)
     except Exception:
         qty = 1
-    cart = Cart(request)
-    cart.update(product_id=product_id, qty=qty)
+    get_cart_service().update_item(request, product_id, qty)
     messages.info(request, "Quantité mise à jour.")
     return redirect(request.POST.get("next") or reverse("cart:detail"))
 
 
 @require_POST
 def remove(request, product_id):
-    cart = Cart(request)
-    cart.remove(product_id)
+    get_cart_service().remove_item(request, product_id)
     messages.warning(request, "Produit retiré du panier.")
     return redirect(request.POST.get("next") or reverse("cart:detail"))
 
 
 @require_POST
 def clear(request):
-    cart = Cart(request)
-    cart.clear()
+    get_cart_service().clear(request)
     messages.info(request, "Panier vidé.")
     return redirect(reverse("cart:detail"))
 
 
+def order_pad(request):
+    """Bloc-notes de commande : ajout de nombreuses références en une fois.
+
+    Les lignes sont saisies (``code quantité``) ou importées d'un fichier
+    CSV, puis ajoutées en un seul passage par ``CartService.add_items``.
+    Sans erreur, on redirige vers le panier ; sinon la page liste les
+    lignes refusées, les autres étant déjà ajoutées.
+    """
+    report = []
+    if request.method == "POST":
+        form = OrderPadForm(request.POST, request.FILES)
+        if form.is_valid():
+            try:
+                if form.cleaned_data.get("file"):
+                    lines = parse_order_csv(form.cleaned_data["file"])
+                else:
+                    lines = parse_order_text(form.cleaned_data["lines"])
+            except (ValueError, UnicodeDecodeError) as exc:
+                form.add_error(None, str(exc))
+            else:
+                result = get_cart_service().add_items(request, lines)
+                added = len(result.lines) - len(result.errors)
+                if added:
+                    messages.success(request, f"{added} ligne(s) ajoutée(s) au panier.")
+                if not result.errors:
+                    return redirect(reverse("cart:detail"))
+                report = [
+                    {"line": line, "message": STATUS_MESSAGES[line.status]} for line in result.errors
+                ]
+    else:
+        form = OrderPadForm()
+    return render(request, "cart/order_pad.html", {"form": form, "errors": report})
+
+
+@login_required
+def saved_carts(request):
+    """Listes de commande enregistrées : enregistrement du panier courant et liste des modèles."""
+    service = get_saved_cart_service()
+    clients = Client.objects.filter(
+        user_links__user=request.user, user_links__is_active=True, user_links__role__in=EDITOR_ROLES
+    )
+    form = SavedCartForm(request.POST or None, clients=clients)
+    if request.method == "POST" and form.is_valid():
+        try:
+            saved = service.save_current_cart(
+                request, form.cleaned_data["name"], user_id=request.user.id, client_id=form.cleaned_data["client"]
+            )
+        except (ValueError, PermissionError) as exc:
+            form.add_error(None, str(exc))
+        else:
+            messages.success(request, f"Panier enregistré sous « {saved.name} ».")
+            return redirect(reverse("cart:saved_carts"))
+    return render(
+        request,
+        "cart/saved_carts.html",
+        {"form": form, "saved_carts": service.list_for_user(request.user.id)},
+    )
+
+
+@login_required
+@require_POST
+def load_saved_cart(request, saved_cart_id):
+    """Ajoute au panier le contenu d'une liste enregistrée (une seule opération groupée)."""
+    try:
+        result = get_saved_cart_service().load(request, saved_cart_id, request.user.id)
+    except SavedCart.DoesNotExist:
+        raise Http404("Liste introuvable.")
+    added = len(result.lines) - len(result.errors)
+    if added:
+        messages.success(request, f"{added} ligne(s) ajoutée(s) au panier.")
+    if result.errors:
+        codes = ", ".join(line.code for line in result.errors)
+        messages.warning(request, f"Produits indisponibles, non ajoutés : {codes}.")
+    return redirect(reverse("cart:detail"))
+
+
+@login_required
+@require_POST
+def delete_saved_cart(request, saved_cart_id):
+    try:
+        get_saved_cart_service().delete(saved_cart_id, request.user.id)
+    except SavedCart.DoesNotExist:
+        raise Http404("Liste introuvable.")
+    messages.success(request, "Liste supprimée.")
+    return redirect(reverse("cart:saved_carts"))
+
+
 @require_POST
 def add_legacy(request, product_id):
     """Compatibilité pour les anciennes URL / cart/add-legacy/<id>/.
@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.utils.html import format_html
-from .models import Category, Brand, Product
+from .models import Category, Brand, Product, PricingRule
 
 # Importer les ressources pour l'import/export si django-import-export est installé
 try:
@@ -213,3 +213,11 @@ class PromoItemAdmin(admin.ModelAdmin):
     list_filter = ("catalog",)
     search_fields = ("product__title", "product__sku")
 
+
+@admin.register(PricingRule)
+class PricingRuleAdmin(admin.ModelAdmin):
+    """Administration des règles de tarification avancées (remises, plancher)."""
+    list_display = ("kind", "rate", "min_quantity", "brand", "category", "client_type", "start_date", "end_date", "is_active")
+    list_filter = ("kind", "client_type", "is_active")
+    list_editable = ("rate", "is_active")
+    autocomplete_fields = ("brand", "category")
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class CatalogConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'catalog'
+
+    def ready(self) -> None:
+        # Connecte les récepteurs d'invalidation des caches de tarification
+        from . import signals  # noqa: F401
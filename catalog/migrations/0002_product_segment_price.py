@@ -0,0 +1,27 @@
+# Generated by Django 5.2.8 on 2026-10-18 08:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductSegmentPrice',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('segment', models.CharField(max_length=64)),
+                ('price', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='segment_prices', to='catalog.product')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['segment', 'price'], name='catalog_pro_segment_30e729_idx')],
+                'constraints': [models.UniqueConstraint(fields=('product', 'segment'), name='uniq_product_segment_price')],
+            },
+        ),
+    ]
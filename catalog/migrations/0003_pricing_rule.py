@@ -0,0 +1,35 @@
+# Generated by Django 5.2.8 on 2026-10-18 08:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0002_product_segment_price'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PricingRule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('quantity', 'Remise par quantité'), ('brand', 'Remise par marque'), ('family', 'Remise par famille'), ('floor', 'Prix plancher')], max_length=20, verbose_name='Type de règle')),
+                ('rate', models.DecimalField(decimal_places=4, help_text='Remise (0.10 = 10 %) ou, pour un plancher, fraction du prix public (0.70 = 70 %).', max_digits=5, verbose_name='Taux')),
+                ('min_quantity', models.PositiveIntegerField(blank=True, null=True, verbose_name='Quantité minimale')),
+                ('client_type', models.CharField(blank=True, default='', help_text="Vide : s'applique à tous les types de client.", max_length=20, verbose_name='Type de client')),
+                ('start_date', models.DateTimeField(blank=True, null=True)),
+                ('end_date', models.DateTimeField(blank=True, null=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('brand', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='catalog.brand')),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='catalog.category')),
+            ],
+            options={
+                'verbose_name': 'Règle de tarification',
+                'verbose_name_plural': 'Règles de tarification',
+                'ordering': ['kind', 'client_type', 'min_quantity'],
+                'constraints': [models.CheckConstraint(condition=models.Q(('kind__in', ['quantity', 'brand', 'family', 'floor'])), name='pricing_rule_known_kind'), models.CheckConstraint(condition=models.Q(models.Q(('kind', 'quantity'), _negated=True), ('min_quantity__isnull', False), _connector='OR'), name='pricing_rule_quantity_threshold'), models.CheckConstraint(condition=models.Q(models.Q(('kind', 'brand'), _negated=True), ('brand__isnull', False), _connector='OR'), name='pricing_rule_brand_target'), models.CheckConstraint(condition=models.Q(models.Q(('kind', 'family'), _negated=True), ('category__isnull', False), _connector='OR'), name='pricing_rule_family_target'), models.CheckConstraint(condition=models.Q(('rate__gte', 0), ('rate__lte', 1)), name='pricing_rule_rate_range')],
+            },
+        ),
+    ]
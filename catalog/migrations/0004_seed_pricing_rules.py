@@ -0,0 +1,48 @@
+from decimal import Decimal
+
+from django.db import migrations
+from django.db.models import Q
+
+# Taux historiquement codés en dur dans ``AdvancedPricingRules``.  L'ancien
+# code reconnaissait la marque par slug ou par nom (sans casse) et la
+# famille par nom au moment du calcul ; la reprise applique la même
+# correspondance, mais seulement aux marques et catégories déjà présentes.
+# Sur une installation neuve, les règles de marque et de famille sont donc
+# à créer dans l'admin une fois le catalogue importé.
+QUANTITY_DISCOUNTS = {100: Decimal("0.20"), 50: Decimal("0.10")}
+BRAND_DISCOUNTS = {"acme": Decimal("0.05")}
+FAMILY_DISCOUNTS = {"Electronics": Decimal("0.03")}
+FLOOR_PERCENT = Decimal("0.70")
+
+
+def seed_rules(apps, schema_editor):
+    PricingRule = apps.get_model("catalog", "PricingRule")
+    Brand = apps.get_model("catalog", "Brand")
+    Category = apps.get_model("catalog", "Category")
+    rules = [
+        PricingRule(kind="quantity", min_quantity=threshold, rate=rate)
+        for threshold, rate in QUANTITY_DISCOUNTS.items()
+    ]
+    rules.append(PricingRule(kind="floor", rate=FLOOR_PERCENT))
+    for key, rate in BRAND_DISCOUNTS.items():
+        for brand in Brand.objects.filter(Q(slug__iexact=key) | Q(name__iexact=key)):
+            rules.append(PricingRule(kind="brand", brand=brand, rate=rate))
+    for key, rate in FAMILY_DISCOUNTS.items():
+        for category in Category.objects.filter(name=key):
+            rules.append(PricingRule(kind="family", category=category, rate=rate))
+    PricingRule.objects.bulk_create(rules)
+
+
+def unseed_rules(apps, schema_editor):
+    apps.get_model("catalog", "PricingRule").objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0003_pricing_rule"),
+    ]
+
+    operations = [
+        migrations.RunPython(seed_rules, unseed_rules),
+    ]
@@ -353,4 +353,129 @@ class PromoItem(models.Model):
 
 
     def __str__(self) -> str:
-        return f"{self.product} @ {self.promo_price}"
\ No newline at end of file
+        return f"{self.product} @ {self.promo_price}"
+
+
+class ProductSegmentPrice(models.Model):
+    """Prix unitaire matérialisé d'un produit pour un segment de tarification.
+
+    Une ligne par couple (produit, segment) — voir
+    ``core.domain.pricing_segments``.  La table est alimentée par la
+    tâche ``catalog.tasks.refresh_segment_prices`` à chaque invalidation
+    des prix ; elle permet de trier et filtrer la liste produits sur le
+    prix réellement payé par le visiteur, en SQL et sur index.
+    """
+
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="segment_prices")
+    segment = models.CharField(max_length=64)
+    price = models.DecimalField(max_digits=10, decimal_places=2)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["product", "segment"], name="uniq_product_segment_price"),
+        ]
+        indexes = [
+            models.Index(fields=["segment", "price"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.product_id} [{self.segment}] @ {self.price}"
+
+
+class PricingRule(models.Model):
+    """Règle de tarification avancée administrable.
+
+    Remplace les taux codés en dur de ``AdvancedPricingRules`` : remise
+    par quantité, par marque, par famille (catégorie) et prix plancher.
+    Chaque règle peut viser un type de client et une période de
+    validité.  Les règles sont compilées par processus en une structure
+    immuable (``core.adapters.pricing_rules_store``), recompilée à chaque
+    modification.
+
+    Les champs requis par chaque type de règle et la plage du taux sont
+    garantis par des contraintes de la base : une règle incomplète
+    enregistrée hors de l'admin (shell, import, fixture) est refusée au
+    lieu de faire échouer la compilation de toutes les règles.
+    """
+
+    KIND_QUANTITY = "quantity"
+    KIND_BRAND = "brand"
+    KIND_FAMILY = "family"
+    KIND_FLOOR = "floor"
+    KIND_CHOICES = [
+        (KIND_QUANTITY, "Remise par quantité"),
+        (KIND_BRAND, "Remise par marque"),
+        (KIND_FAMILY, "Remise par famille"),
+        (KIND_FLOOR, "Prix plancher"),
+    ]
+
+    kind = models.CharField("Type de règle", max_length=20, choices=KIND_CHOICES)
+    rate = models.DecimalField(
+        "Taux",
+        max_digits=5,
+        decimal_places=4,
+        help_text="Remise (0.10 = 10 %) ou, pour un plancher, fraction du prix public (0.70 = 70 %).",
+    )
+    min_quantity = models.PositiveIntegerField("Quantité minimale", null=True, blank=True)
+    brand = models.ForeignKey(Brand, on_delete=models.CASCADE, null=True, blank=True)
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, null=True, blank=True)
+    client_type = models.CharField(
+        "Type de client",
+        max_length=20,
+        blank=True,
+        default="",
+        help_text="Vide : s'applique à tous les types de client.",
+    )
+    start_date = models.DateTimeField(null=True, blank=True)
+    end_date = models.DateTimeField(null=True, blank=True)
+    is_active = models.BooleanField(default=True)
+
+    class Meta:
+        ordering = ["kind", "client_type", "min_quantity"]
+        verbose_name = "Règle de tarification"
+        verbose_name_plural = "Règles de tarification"
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(kind__in=["quantity", "brand", "family", "floor"]),
+                name="pricing_rule_known_kind",
+            ),
+            models.CheckConstraint(
+                condition=~models.Q(kind="quantity") | models.Q(min_quantity__isnull=False),
+                name="pricing_rule_quantity_threshold",
+            ),
+            models.CheckConstraint(
+                condition=~models.Q(kind="brand") | models.Q(brand__isnull=False),
+                name="pricing_rule_brand_target",
+            ),
+            models.CheckConstraint(
+                condition=~models.Q(kind="family") | models.Q(category__isnull=False),
+                name="pricing_rule_family_target",
+            ),
+            models.CheckConstraint(
+                condition=models.Q(rate__gte=0, rate__lte=1),
+                name="pricing_rule_rate_range",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        target = {
+            self.KIND_QUANTITY: f"≥ {self.min_quantity}",
+            self.KIND_BRAND: str(self.brand),
+            self.KIND_FAMILY: str(self.category),
+            self.KIND_FLOOR: "",
+        }.get(self.kind, "")
+        return f"{self.get_kind_display()} {target} : {self.rate}".strip()
+
+    def clean(self):
+        super().clean()
+        required = {
+            self.KIND_QUANTITY: ("min_quantity", self.min_quantity),
+            self.KIND_BRAND: ("brand", self.brand_id),
+            self.KIND_FAMILY: ("category", self.category_id),
+        }.get(self.kind)
+        if required and required[1] is None:
+            raise ValidationError({required[0]: "Ce champ est obligatoire pour ce type de règle."})
+        if self.rate is not None and not (Decimal("0") <= self.rate <= Decimal("1")):
+            raise ValidationError({"rate": "Le taux doit être compris entre 0 et 1."})
+        if self.start_date and self.end_date and self.start_date > self.end_date:
+            raise ValidationError({"end_date": "La date de fin doit suivre la date de début."})
@@ -0,0 +1,75 @@
+"""Récepteurs de signaux de l'application catalog.
+
+Toute modification d'un catalogue de promotion, d'un de ses items ou de
+ses utilisateurs ciblés change la génération partagée des promotions :
+les index en mémoire de chaque processus sont alors reconstruits à leur
+prochaine utilisation et les prix en cache deviennent inatteignables.
+Toute modification d'un produit change la version de ce seul produit.
+
+Toute modification d'une règle de tarification avancée change la
+génération des règles compilées.
+
+Chaque invalidation planifie en outre le recalcul de la table
+matérialisée ``ProductSegmentPrice`` pour les seuls produits concernés :
+les items du catalogue ou l'item modifié.  Les utilisateurs ciblés
+nommément n'ont pas de prix matérialisés : un changement de
+``target_users`` ne recalcule rien.
+"""
+
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from core.adapters.pricing_versions import (
+    bump_product_versions,
+    bump_promo_generation,
+    bump_rules_generation,
+    prices_invalidated,
+)
+
+from .models import PricingRule, Product, PromoCatalog, PromoItem
+from .tasks import schedule_segment_price_refresh
+
+
+@receiver(post_save, sender=PromoCatalog)
+@receiver(post_delete, sender=PromoCatalog)
+def _promo_catalog_changed(sender, instance, **kwargs):
+    # À la suppression, les items ont déjà été supprimés (et signalés) en cascade
+    bump_promo_generation(PromoItem.objects.filter(catalog_id=instance.pk).values_list("product_id", flat=True))
+
+
+@receiver(pre_save, sender=PromoItem)
+def _promo_item_saving(sender, instance, raw=False, **kwargs):
+    # Un item rattaché à un autre produit retire la promotion de l'ancien
+    if instance.pk and not raw:
+        instance._previous_product_id = (
+            PromoItem.objects.filter(pk=instance.pk).values_list("product_id", flat=True).first()
+        )
+
+
+@receiver(post_save, sender=PromoItem)
+@receiver(post_delete, sender=PromoItem)
+def _promo_item_changed(sender, instance, **kwargs):
+    bump_promo_generation([instance.product_id, getattr(instance, "_previous_product_id", None)])
+
+
+@receiver(m2m_changed, sender=PromoCatalog.target_users.through)
+def _promo_targets_changed(sender, action, **kwargs):
+    if action in {"post_add", "post_remove", "post_clear"}:
+        bump_promo_generation([])
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def _product_changed(sender, instance, **kwargs):
+    bump_product_versions([instance.pk])
+
+
+@receiver(prices_invalidated)
+def _refresh_segment_prices(sender, product_ids, **kwargs):
+    schedule_segment_price_refresh(product_ids)
+
+
+@receiver(post_save, sender=PricingRule)
+@receiver(post_delete, sender=PricingRule)
+def _pricing_rule_changed(sender, **kwargs):
+    bump_rules_generation()
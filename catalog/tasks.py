@@ -0,0 +1,169 @@
+"""Tâches Celery de l'application catalog.
+
+``refresh_segment_prices`` recalcule la table matérialisée
+``ProductSegmentPrice`` pour une liste de produits (ou tout le
+catalogue).  Elle est planifiée après chaque invalidation des prix (voir
+``catalog.signals``), une seule fois par transaction pour l'ensemble des
+produits invalidés ; les recalculs complets sont en outre regroupés par un
+délai d'attente partagé entre processus.
+
+Les fenêtres de dates des catalogues de promotion s'ouvrent et se
+ferment sans écriture en base : ``refresh_promo_boundaries``, planifiée
+périodiquement (``CELERY_BEAT_SCHEDULE``), invalide les prix des produits
+des catalogues dont une borne a été franchie depuis son dernier passage.
+"""
+
+import logging
+import threading
+from datetime import timedelta
+from typing import Iterable, List, Optional
+
+from celery import shared_task
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from kombu.exceptions import OperationalError as KombuOperationalError
+
+from core.adapters.pricing_versions import bump_promo_generation
+from core.factory import get_pricing_service
+from core.utils.shared_cache import get_shared_cache
+
+from .models import Product, ProductSegmentPrice, PromoCatalog, PromoItem
+
+logger = logging.getLogger(__name__)
+
+# Produits à recalculer au prochain commit du thread (voir
+# ``schedule_segment_price_refresh``).
+_pending = threading.local()
+
+# Nombre de produits recalculés par lot.
+BATCH_SIZE = 500
+
+# Recalcul complet en attente : les demandes suivantes s'y ajoutent.  Le
+# délai regroupe les modifications rapprochées ; la durée de vie de la clé
+# libère la place si la tâche est perdue.
+FULL_REFRESH_PENDING_KEY = "catalog:segment-prices:full-refresh"
+FULL_REFRESH_DELAY = 60
+FULL_REFRESH_PENDING_TTL = 15 * 60
+
+# Dernier instant traité par ``refresh_promo_boundaries`` ; au premier
+# passage, les bornes franchies depuis ``BOUNDARY_LOOKBACK``.
+BOUNDARY_CHECKED_KEY = "catalog:promo-boundaries:checked-at"
+BOUNDARY_LOOKBACK = timedelta(minutes=5)
+
+
+@shared_task
+def refresh_segment_prices(product_ids: Optional[List[int]] = None) -> int:
+    """Recalcule les prix par segment de ``product_ids`` (tous si ``None``).
+
+    Les prix sont calculés par ``PricingService.get_segment_prices`` puis
+    écrits par lots avec ``bulk_create(update_conflicts=True)``.  Retourne
+    le nombre de lignes écrites.
+    """
+    products = Product.objects.order_by("pk")
+    if product_ids is not None:
+        products = products.filter(pk__in=product_ids)
+    else:
+        # Les demandes arrivées à partir d'ici planifient un nouveau passage
+        get_shared_cache().delete(FULL_REFRESH_PENDING_KEY)
+    service = get_pricing_service()
+    written = 0
+    batch: List[Product] = []
+    for product in products.iterator(chunk_size=BATCH_SIZE):
+        batch.append(product)
+        if len(batch) >= BATCH_SIZE:
+            written += _write_segment_prices(service, batch)
+            batch = []
+    if batch:
+        written += _write_segment_prices(service, batch)
+    return written
+
+
+def _write_segment_prices(service, products: List[Product]) -> int:
+    rows = [
+        ProductSegmentPrice(product_id=product_id, segment=segment, price=price)
+        for segment, prices in service.get_segment_prices(products).items()
+        for product_id, price in prices.items()
+    ]
+    ProductSegmentPrice.objects.bulk_create(
+        rows,
+        batch_size=BATCH_SIZE,
+        update_conflicts=True,
+        unique_fields=["product", "segment"],
+        update_fields=["price"],
+    )
+    return len(rows)
+
+
+def schedule_segment_price_refresh(product_ids: Optional[Iterable[int]] = None) -> None:
+    """Planifie ``refresh_segment_prices`` après le commit de la transaction.
+
+    Les demandes d'une même transaction sont fusionnées en une seule tâche
+    (``None`` l'emporte : tout le catalogue).  Un recalcul complet n'est
+    planifié que si aucun n'est déjà en attente, après ``FULL_REFRESH_DELAY``
+    secondes.  Sans broker disponible, un recalcul limité à quelques
+    produits est exécuté de manière synchrone (même repli que
+    ``integrations.views.import_view``) ; un recalcul complet ne l'est pas,
+    il reste à la charge du prochain passage planifié.
+    """
+    if product_ids is None:
+        _pending.full = True
+    else:
+        ids = set(product_ids)
+        if not ids:
+            return
+        _pending.ids = getattr(_pending, "ids", set()) | ids
+    # Le premier rappel exécuté au commit emporte toutes les demandes ;
+    # celles d'une transaction annulée partent avec la suivante.
+    transaction.on_commit(_flush_pending_refresh)
+
+
+def _flush_pending_refresh() -> None:
+    full = getattr(_pending, "full", False)
+    ids = sorted(getattr(_pending, "ids", ()))
+    _pending.full = False
+    _pending.ids = set()
+    if full:
+        _enqueue_full_refresh()
+    elif ids:
+        try:
+            refresh_segment_prices.delay(ids)
+        except (KombuOperationalError, ConnectionError):
+            refresh_segment_prices(ids)
+
+
+def _enqueue_full_refresh() -> None:
+    cache = get_shared_cache()
+    if not cache.add(FULL_REFRESH_PENDING_KEY, True, FULL_REFRESH_PENDING_TTL):
+        return
+    try:
+        refresh_segment_prices.apply_async(countdown=FULL_REFRESH_DELAY)
+    except (KombuOperationalError, ConnectionError):
+        cache.delete(FULL_REFRESH_PENDING_KEY)
+        logger.warning("Recalcul complet des prix par segment non planifié : broker indisponible.")
+
+
+@shared_task
+def refresh_promo_boundaries() -> int:
+    """Invalide les prix des catalogues ouverts ou fermés depuis le dernier passage.
+
+    La génération des promotions est changée (les prix en cache de tous
+    les processus sont recalculés) et le recalcul des prix par segment des
+    produits de ces catalogues est planifié.  Retourne le nombre de
+    catalogues concernés.
+    """
+    cache = get_shared_cache()
+    now = timezone.now()
+    since = cache.get(BOUNDARY_CHECKED_KEY) or now - BOUNDARY_LOOKBACK
+    # ``end_date`` est inclusive : le catalogue se ferme juste après.
+    catalog_ids = list(
+        PromoCatalog.objects.filter(is_active=True)
+        .filter(Q(start_date__gt=since, start_date__lte=now) | Q(end_date__gte=since, end_date__lt=now))
+        .values_list("pk", flat=True)
+    )
+    if catalog_ids:
+        bump_promo_generation(
+            PromoItem.objects.filter(catalog_id__in=catalog_ids).values_list("product_id", flat=True)
+        )
+    cache.set(BOUNDARY_CHECKED_KEY, now, None)
+    return len(catalog_ids)
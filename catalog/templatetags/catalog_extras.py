@@ -8,6 +8,9 @@ utilisateur donné.  Les filtres sont enregistrés via l'instance
 
 from django import template
 
+from core.factory import get_pricing_service
+from core.services.pricing_service import PREFETCH_ATTR
+
 # Le filtre price_for_user sert à calculer le tarif d'un produit en fonction
 # d'un utilisateur en s'appuyant sur le service de pricing centralisé.
 # Il délègue entièrement le calcul à PromoAwareB2BPricingService via
@@ -18,6 +21,25 @@ from django import template
 register = template.Library()
 
 
+@register.simple_tag
+def prefetch_prices(products, user):
+    """Pré-calcule en un seul lot les prix d'une liste de produits.
+
+    À placer avant la boucle d'affichage lorsque la vue n'a pas déjà
+    tarifé la page : ``{% prefetch_prices products request.user %}``.
+    Les prix sont attachés aux instances et relus par ``price_for_user``.
+    Le tag n'affiche rien.
+    """
+    if not products or not getattr(user, "is_authenticated", False):
+        return ""
+    try:
+        get_pricing_service().prefetch_unit_prices(products, user)
+    except Exception:
+        # Même politique que ``price_for_user`` : pas d'exception dans les templates.
+        pass
+    return ""
+
+
 @register.filter
 def price_for_user(product, user):
     """Retourne le prix d'un ``product`` ajusté selon les règles de pricing pour ``user``.
@@ -31,6 +53,9 @@ def price_for_user(product, user):
     3. la promotion simple ``discount_price``,
     4. le prix public ``price`` en dernier recours.
 
+    Si la vue (ou le tag ``prefetch_prices``) a déjà tarifé la page via
+    ``prefetch_unit_prices``, le prix pré-calculé est relu directement.
+
     Parameters
     ----------
     product : catalog.models.Product
@@ -45,6 +70,11 @@ def price_for_user(product, user):
     """
     if not product:
         return None
+    prefetched = getattr(product, PREFETCH_ATTR, None)
+    if prefetched:
+        user_id = user.pk if getattr(user, "is_authenticated", False) else None
+        if user_id in prefetched:
+            return prefetched[user_id]
     try:
         pricing_service = get_pricing_service()
         # Le service renvoie toujours un Decimal. Pour un visiteur non connecté,
@@ -55,4 +85,4 @@ def price_for_user(product, user):
     except Exception:
         # En cas d'erreur inattendue (par exemple mauvaise configuration), ne
         # renvoie pas d'exception dans les templates mais retourne ``None``.
-        return None
\ No newline at end of file
+        return None
@@ -9,6 +9,7 @@ from urllib.parse import urlencode
 
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
 from django.db.models import Min, Max
+from django.db.models import Case, FilteredRelation, Value, When
 from django.db.models.functions import Coalesce
 from django.views.decorators.cache import cache_page
 from django.views.decorators.vary import vary_on_cookie
@@ -21,16 +22,40 @@ from .forms import CatalogFilterForm
 from reviews.forms import ReviewForm
 from django.db.models import Avg
 
+from core.factory import get_pricing_service
+
 @vary_on_cookie
 @cache_page(60 * 10)  # mise en cache de 10 minutes pour optimiser les performances, variation par cookie pour éviter les fuites de session
 def product_list(request):
     """
     Liste produits avec filtres: Catégorie, Marque, Prix min/max.
-    - Le tri s'applique sur le prix effectif (discount_price sinon price) ou sur la récence.
+    - Le tri s'applique sur le prix effectif du visiteur ou sur la récence.
     - Les bornes min/max de prix sont calculées APRES filtre Catégorie/Marque, AVANT filtre prix.
+
+    Le prix effectif est lu dans la table matérialisée ``ProductSegmentPrice``
+    pour le segment de tarification du visiteur (grille B2B, promotions) ;
+    un produit dont les prix n'ont pas encore été matérialisés retombe sur
+    discount_price sinon price.  Un visiteur ciblé nommément par une
+    promotion lit le segment partagé dont il relève, sauf pour les produits
+    qui le visent : leurs prix sont calculés et substitués dans la requête.
     """
-    base_qs = Product.objects.filter(is_active=True).select_related("brand", "category")
-    eff = Coalesce("discount_price", "price")
+    pricing = get_pricing_service()
+    segment = pricing.materialized_segment(request.user)
+    base_qs = (
+        Product.objects.filter(is_active=True)
+        .select_related("brand", "category")
+        .annotate(viewer_price=FilteredRelation("segment_prices", condition=Q(segment_prices__segment=segment)))
+    )
+    eff = Coalesce("viewer_price__price", "discount_price", "price")
+    own_ids = pricing.user_specific_product_ids(request.user)
+    if own_ids:
+        own_prices = pricing.get_unit_prices(Product.objects.filter(pk__in=own_ids, is_active=True), request.user)
+        if own_prices:
+            eff = Case(
+                *[When(pk=product_id, then=Value(price)) for product_id, price in own_prices.items()],
+                default=eff,
+                output_field=models.DecimalField(max_digits=10, decimal_places=2),
+            )
 
     form = CatalogFilterForm(request.GET or None)
 
@@ -88,6 +113,12 @@ def product_list(request):
     except (PageNotAnInteger, EmptyPage):
         products = paginator.page(1)
 
+    # Tarifie toute la page en un seul lot ; le filtre ``price_for_user``
+    # relit ensuite les prix attachés aux instances.
+    if request.user.is_authenticated:
+        products.object_list = list(products.object_list)
+        get_pricing_service().prefetch_unit_prices(products.object_list, request.user)
+
     # Querystring sans 'page' pour la pagination
     params = request.GET.copy()
     params.pop("page", None)
@@ -104,16 +135,23 @@ def product_list(request):
     return render(request, "catalog/product_list.html", ctx)
 def category_view(request, slug):
     category = get_object_or_404(Category, slug=slug, is_active=True)
-    products = Product.objects.filter(is_active=True, category__in=[category] + list(category.children.all()))
+    products = list(
+        Product.objects.filter(is_active=True, category__in=[category] + list(category.children.all()))
+        .select_related("brand", "category")
+    )
+    if request.user.is_authenticated:
+        get_pricing_service().prefetch_unit_prices(products, request.user)
     context = {
         "category": category,
-        "products": products.select_related("brand", "category"),
+        "products": products,
     }
     return render(request, "catalog/category.html", context)
 
 def brand_view(request, slug):
     brand = get_object_or_404(Brand, slug=slug, is_active=True)
-    products = Product.objects.filter(is_active=True, brand=brand).select_related("brand", "category")
+    products = list(Product.objects.filter(is_active=True, brand=brand).select_related("brand", "category"))
+    if request.user.is_authenticated:
+        get_pricing_service().prefetch_unit_prices(products, request.user)
     return render(request, "catalog/brand.html", {"brand": brand, "products": products})
 
 def product_detail(request, slug):
@@ -168,7 +206,10 @@ def week_selection(request):
         models.Q(selection_start__isnull=True) | models.Q(selection_start__lte=today),
         models.Q(selection_end__isnull=True) | models.Q(selection_end__gte=today),
     ).select_related("brand", "category")
+    products = list(qs)
+    if request.user.is_authenticated:
+        get_pricing_service().prefetch_unit_prices(products, request.user)
     context = {
-        "products": qs,
+        "products": products,
     }
     return render(request, "catalog/week_selection.html", context)
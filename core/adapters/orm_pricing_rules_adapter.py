@@ -0,0 +1,14 @@
+from core.adapters.pricing_rules_store import get_pricing_rules
+from core.domain.pricing_rules import CompiledPricingRules
+from core.ports.pricing_rules_port import PricingRulesPort
+
+
+class DjangoPricingRulesAdapter(PricingRulesPort):
+    """Adapter ORM des règles de tarification avancées (``catalog.PricingRule``).
+
+    Les règles sont servies depuis l'instantané compilé du processus :
+    aucune requête SQL tant qu'elles ne changent pas.
+    """
+
+    def get_rules(self) -> CompiledPricingRules:
+        return get_pricing_rules()
@@ -1,9 +1,6 @@
-from typing import Optional
+from typing import Dict, FrozenSet, Iterable, Optional
 
-from django.utils import timezone
-
-from catalog.models import PromoCatalog, PromoItem
-from decimal import Decimal
+from core.adapters.promo_index import get_promo_index
 from core.domain.dto import PromoItemDTO, ProductDTO, UserDTO
 
 
@@ -26,14 +23,14 @@ class DjangoPromoCatalogAdapter:
     ) -> Optional[PromoItemDTO]:
         """Retourne la promotion applicable à ``product_dto`` pour ``user_dto``.
 
-        Cette implémentation respecte l'ordre et les conditions suivantes :
+        Cette implémentation respecte l'ordre et les conditions suivantes :
 
         * Seuls les catalogues actifs et dans la fenêtre de dates
           (``start_date <= now <= end_date``) sont considérés.
-        * Le ciblage peut être défini à deux niveaux :
+        * Le ciblage peut être défini à deux niveaux :
             - au niveau du catalogue via ``target_client_type`` ou ``target_users`` ;
             - au niveau de l'item via ``allowed_customer_numbers`` (liste de numéros clients).
-        * Un item est applicable si :
+        * Un item est applicable si :
             - le produit est dans l'item ;
             - ``allowed_customer_numbers`` contient ``user_dto.customer_number`` ou est vide ;
             - ET le catalogue est soit non ciblé (``target_client_type`` et ``target_users`` vides),
@@ -46,68 +43,39 @@ class DjangoPromoCatalogAdapter:
         Si aucun ``user_dto`` n'est fourni ou si l'utilisateur ne possède pas
         de numéro client, aucune promo catalogue ne s'applique et ``None`` est retourné.
         """
+        return self.get_applicable_promos([product_dto], user_dto).get(product_dto.id)
 
+    def get_applicable_promos(
+        self,
+        product_dtos: Iterable[ProductDTO],
+        user_dto: Optional[UserDTO] = None,
+    ) -> Dict[int, PromoItemDTO]:
+        """Résout les promotions applicables pour tout un lot de produits.
+
+        Les règles sont strictement celles de ``get_applicable_promo``.  La
+        résolution s'appuie sur l'index en mémoire du processus
+        (``core.adapters.promo_index``) : une fois l'index construit, elle
+        ne consiste plus qu'en recherches dans des dictionnaires, après la
+        seule lecture de la génération dans le cache commun (une requête
+        SQL si ce cache est la table par défaut, aucune avec Redis).
+
+        Retourne ``{product_id: PromoItemDTO}`` pour les seuls produits
+        bénéficiant d'une promotion.
+        """
         # Sans utilisateur ou sans numéro client, pas de promo catalogue ciblée.
         if user_dto is None or not user_dto.customer_number:
-            return None
-
-        now = timezone.now()
-        # Récupère les catalogues actifs et dans la fenêtre de validité
-        catalogs_qs = PromoCatalog.objects.filter(
-            is_active=True,
-            start_date__lte=now,
-            end_date__gte=now,
-        )
-
-        # Récupère tous les items du produit dans ces catalogues actifs
-        items_qs = PromoItem.objects.filter(
-            product_id=product_dto.id,
-            catalog__in=catalogs_qs,
-        )
-
-        # Applique un filtrage de base sur les numéros clients : un item est
-        # candidat s'il ne restreint pas ``allowed_customer_numbers`` ou
-        # si le numéro client de l'utilisateur est présent dans la liste.
-        from django.db.models import Q
-        items_qs = items_qs.filter(
-            Q(allowed_customer_numbers__isnull=True) |
-            Q(allowed_customer_numbers__exact=[]) |
-            Q(allowed_customer_numbers__contains=[user_dto.customer_number])
-        )
-
-        candidates: list[tuple[int, Decimal, int, PromoItem]] = []
-        for item in items_qs.select_related("catalog"):
-            # Vérifie à nouveau les numéros clients pour déterminer la priorité
-            allowed = item.allowed_customer_numbers or []
-            priority = 4
-            if allowed and user_dto.customer_number in allowed:
-                priority = 1
-            else:
-                catalog = item.catalog
-                # Ciblage explicite par utilisateurs
-                try:
-                    # ManyToManyField ``target_users`` peut être vide ou None
-                    if catalog.target_users and catalog.target_users.filter(id=user_dto.id).exists():
-                        priority = 2
-                    elif catalog.target_client_type:
-                        if catalog.target_client_type == user_dto.client_type:
-                            priority = 3
-                        else:
-                            priority = 4
-                    else:
-                        priority = 4
-                except Exception:
-                    # Si la relation n'est pas chargée ou absente, on considère qu'il n'y a pas de ciblage
-                    if getattr(catalog, "target_client_type", None) == user_dto.client_type:
-                        priority = 3
-                    else:
-                        priority = 4
-            # Utilise l'identifiant négatif pour favoriser les items récents
-            candidates.append((priority, item.promo_price, -item.id, item))
+            return {}
+        product_ids = [dto.id for dto in product_dtos]
+        if not product_ids:
+            return {}
+        return get_promo_index().resolve(product_ids, user_dto)
+
+    def has_user_specific_promos(self, user_dto: Optional[UserDTO]) -> bool:
+        """Indique si ``user_dto`` est ciblé nommément par une promotion active."""
+        if user_dto is None or not user_dto.customer_number:
+            return False
+        return get_promo_index().is_user_targeted(user_dto)
 
-        if not candidates:
-            return None
-        # Trie par priorité croissante, puis par prix croissant, puis par id décroissant
-        candidates.sort()
-        selected_item = candidates[0][3]
-        return PromoItemDTO(promo_price=selected_item.promo_price)
+    def get_user_specific_product_ids(self, user_dto: Optional[UserDTO]) -> FrozenSet[int]:
+        """Produits dont une promotion active vise ``user_dto`` nommément."""
+        return get_promo_index().targeted_product_ids(user_dto)
@@ -0,0 +1,84 @@
+"""Règles de tarification avancées compilées, propres au processus.
+
+Les ``catalog.PricingRule`` sont chargées en une requête puis compilées
+en ``CompiledPricingRules`` (seuils triés, dictionnaires par marque et
+par catégorie).  L'instantané est partagé par tous les threads du
+processus et remplacé par une simple affectation lorsque :
+
+* la génération partagée des règles change (voir
+  ``core.adapters.pricing_versions`` et les signaux de ``catalog``) ;
+* la prochaine borne de validité d'une règle est atteinte.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Optional
+
+from django.utils import timezone
+
+from catalog.models import PricingRule
+from core.adapters.pricing_versions import get_rules_generation
+from core.domain.pricing_rules import CompiledPricingRules, PricingRuleSpec
+
+_rules: Optional[CompiledPricingRules] = None
+_lock = threading.Lock()
+
+
+def load_pricing_rules(generation: Optional[str] = None, now=None) -> CompiledPricingRules:
+    """Charge et compile les règles actives en une requête."""
+    now = now or timezone.now()
+    specs = [
+        PricingRuleSpec(
+            kind=kind,
+            rate=rate,
+            min_quantity=min_quantity,
+            brand_id=brand_id,
+            category_id=category_id,
+            client_type=client_type or None,
+            start_date=start_date,
+            end_date=end_date,
+        )
+        for kind, rate, min_quantity, brand_id, category_id, client_type, start_date, end_date in (
+            PricingRule.objects.filter(is_active=True).values_list(
+                "kind",
+                "rate",
+                "min_quantity",
+                "brand_id",
+                "category_id",
+                "client_type",
+                "start_date",
+                "end_date",
+            )
+        )
+    ]
+    return CompiledPricingRules.compile(specs, now=now, generation=generation)
+
+
+def get_pricing_rules() -> CompiledPricingRules:
+    """Retourne les règles compilées du processus, recompilées si périmées.
+
+    Même protocole que ``core.adapters.promo_index.get_promo_index`` :
+    une lecture de la génération dans le cache commun à tous les
+    processus, recompilation sérialisée par un verrou et remplacement
+    atomique de la référence.
+    """
+    global _rules
+    generation = get_rules_generation()
+    now = timezone.now()
+    rules = _rules
+    if rules is not None and not rules.is_stale(generation, now):
+        return rules
+    with _lock:
+        rules = _rules
+        if rules is None or rules.is_stale(generation, now):
+            rules = load_pricing_rules(generation=generation, now=now)
+            _rules = rules
+    return rules
+
+
+def reset_pricing_rules() -> None:
+    """Oublie les règles compilées du processus (utile pour les tests)."""
+    global _rules
+    with _lock:
+        _rules = None
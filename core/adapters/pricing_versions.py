@@ -0,0 +1,218 @@
+"""Compteurs de version partagés pour les caches de tarification.
+
+Les caches de tarification propres à chaque processus (index des
+promotions, etc.) doivent être reconstruits lorsqu'une donnée source
+change dans *n'importe quel* processus.  Plutôt que de diffuser des
+messages d'invalidation, on stocke dans le cache commun à tous les
+processus (``core.utils.shared_cache``, jamais le cache ``default``
+propre à chaque processus) un « numéro de génération » opaque : chaque
+écriture pertinente le remplace par une nouvelle valeur et chaque
+processus compare la génération courante à celle de ses structures
+locales.
+
+Deux familles de versions coexistent :
+
+* la génération des promotions (``pricing:promo:generation``), changée à
+  chaque écriture d'un ``PromoCatalog``, d'un ``PromoItem`` ou de leurs
+  utilisateurs ciblés ;
+* une version par produit (``pricing:pv:{product_id}``), changée à
+  chaque écriture du ``Product`` correspondant ;
+* la génération des règles avancées (``pricing:rules:generation``),
+  changée à chaque écriture d'une ``PricingRule``.
+
+Ces versions entrent dans les clés du cache des prix unitaires : une
+modification rend les anciennes entrées inatteignables sans avoir à les
+supprimer (ce que LocMem et Redis ne savent pas faire par motif).
+
+Les générations sont des jetons aléatoires et non des entiers
+incrémentés : ``incr`` n'est pas atomique sur tous les backends et une
+clé évincée du cache ne doit jamais revenir à une ancienne valeur.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+import uuid
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from django.db import transaction
+from django.dispatch import Signal
+
+from core.utils.shared_cache import get_shared_cache
+
+PROMO_GENERATION_KEY = "pricing:promo:generation"
+RULES_GENERATION_KEY = "pricing:rules:generation"
+PRODUCT_VERSION_KEY = "pricing:pv:{product_id}"
+
+_deferred = threading.local()
+
+#: Émis lorsque des prix deviennent invalides, avec ``product_ids`` : la
+#: liste des produits dont le prix par segment peut avoir changé, ou
+#: ``None`` si tous les prix le sont.  Permet aux structures dérivées
+#: (table ``ProductSegmentPrice``…) de se mettre à jour.
+prices_invalidated = Signal()
+
+
+def _new_token() -> str:
+    return uuid.uuid4().hex[:12]
+
+
+def get_promo_generation() -> str:
+    """Retourne la génération courante des promotions catalogue.
+
+    Si la clé est absente (cache vide ou éviction), une nouvelle
+    génération est créée : les structures locales construites avant
+    l'éviction sont alors considérées comme périmées.
+    """
+    return _get_generation(PROMO_GENERATION_KEY)
+
+
+def get_rules_generation() -> str:
+    """Retourne la génération courante des règles de tarification avancées."""
+    return _get_generation(RULES_GENERATION_KEY)
+
+
+def bump_rules_generation() -> None:
+    """Invalide les règles avancées compilées de tous les processus."""
+    _publish({RULES_GENERATION_KEY: None})
+
+
+def _get_generation(key: str) -> str:
+    return _read([key]).get(key)
+
+
+def bump_promo_generation(product_ids: Optional[Iterable[int]] = None) -> None:
+    """Invalide toutes les structures dérivées des promotions catalogue.
+
+    La génération est changée immédiatement (le processus courant voit
+    ses propres écritures) puis une seconde fois après le commit de la
+    transaction en cours : un autre processus ayant reconstruit son
+    index entre les deux à partir de données non encore validées sera
+    ainsi invalidé à nouveau.
+
+    ``product_ids`` désigne les produits dont le prix des segments partagés
+    peut avoir changé (items du catalogue modifié) ; ``None`` si on ne le
+    sait pas.  Il ne borne que ``prices_invalidated`` : la génération, elle,
+    invalide tous les prix en cache.
+    """
+    ids = None if product_ids is None else sorted({pid for pid in product_ids if pid is not None})
+    if _is_deferring():
+        _deferred.promo = True
+        if ids is None:
+            _deferred.promo_products = None
+        elif _deferred.promo_products is not None:
+            _deferred.promo_products.update(ids)
+        return
+    _publish({PROMO_GENERATION_KEY: None})
+    prices_invalidated.send(sender=None, product_ids=ids)
+
+
+def _product_key(product_id: int) -> str:
+    return PRODUCT_VERSION_KEY.format(product_id=product_id)
+
+
+def _read(keys: List[str]) -> Dict[str, str]:
+    """Lit ``keys`` en un seul ``get_many`` ; les versions absentes sont
+    initialisées avec ``add`` afin de ne jamais écraser une version publiée
+    entre-temps par un autre processus."""
+    cache = get_shared_cache()
+    found = cache.get_many(keys)
+    missing = [key for key in keys if key not in found]
+    if missing:
+        for key in missing:
+            cache.add(key, _new_token(), None)
+        found.update(cache.get_many(missing))
+    return found
+
+
+def get_price_versions(product_ids: Iterable[int]) -> Tuple[str, Dict[int, str]]:
+    """Retourne ``(génération des promotions, {product_id: version})``.
+
+    Toutes les versions sont lues en une seule lecture du cache commun.
+    """
+    keys = {product_id: _product_key(product_id) for product_id in product_ids}
+    found = _read([PROMO_GENERATION_KEY, *keys.values()])
+    return found.get(PROMO_GENERATION_KEY), {
+        product_id: found.get(key) for product_id, key in keys.items()
+    }
+
+
+def get_price_fingerprint(product_ids: Iterable[int]) -> str:
+    """Retourne une empreinte de toutes les versions dont dépendent les prix de ``product_ids``.
+
+    L'empreinte combine la génération des promotions, celle des règles
+    avancées et la version de chaque produit : elle change dès qu'un de
+    ces prix peut avoir changé.  Une seule lecture du cache commun, aucune
+    requête sur les tables de tarification.
+    """
+    keys = {product_id: _product_key(product_id) for product_id in product_ids}
+    found = _read([PROMO_GENERATION_KEY, RULES_GENERATION_KEY, *keys.values()])
+    parts = [found.get(PROMO_GENERATION_KEY), found.get(RULES_GENERATION_KEY)]
+    parts.extend(f"{product_id}={found.get(keys[product_id])}" for product_id in sorted(keys))
+    return hashlib.sha1("|".join(map(str, parts)).encode()).hexdigest()
+
+
+def bump_product_versions(product_ids: Iterable[int]) -> None:
+    """Invalide les prix en cache des produits ``product_ids``.
+
+    Comme pour ``bump_promo_generation``, les nouvelles versions sont
+    publiées immédiatement puis après le commit, en une seule écriture
+    ``set_many`` à chaque fois.
+    """
+    product_ids = [product_id for product_id in product_ids if product_id is not None]
+    if not product_ids:
+        return
+    if _is_deferring():
+        _deferred.products.update(product_ids)
+        return
+    _publish(dict.fromkeys(_product_key(product_id) for product_id in product_ids))
+    prices_invalidated.send(sender=None, product_ids=product_ids)
+
+
+def _publish(keys: Dict[str, None]) -> None:
+    def write() -> None:
+        get_shared_cache().set_many({key: _new_token() for key in keys}, None)
+
+    write()
+    transaction.on_commit(write)
+
+
+def _is_deferring() -> bool:
+    return getattr(_deferred, "depth", 0) > 0
+
+
+@contextmanager
+def deferred_price_invalidation() -> Iterator[None]:
+    """Regroupe les invalidations de prix d'un traitement de masse.
+
+    À l'intérieur du bloc, les appels à ``bump_product_versions`` et
+    ``bump_promo_generation`` (y compris ceux déclenchés par les signaux)
+    ne font qu'accumuler les identifiants concernés ; toutes les versions
+    sont publiées en une seule écriture à la sortie du bloc.  Les blocs
+    imbriqués sont publiés par le bloc le plus externe.
+    """
+    if not _is_deferring():
+        _deferred.products = set()
+        _deferred.promo = False
+        _deferred.promo_products = set()
+    _deferred.depth = getattr(_deferred, "depth", 0) + 1
+    try:
+        yield
+    finally:
+        _deferred.depth -= 1
+        if not _deferred.depth:
+            product_ids = sorted(_deferred.products)
+            promo = _deferred.promo
+            promo_products = _deferred.promo_products
+            _deferred.products = set()
+            _deferred.promo = False
+            _deferred.promo_products = set()
+            keys = dict.fromkeys(_product_key(product_id) for product_id in product_ids)
+            if promo:
+                keys[PROMO_GENERATION_KEY] = None
+            if keys:
+                _publish(keys)
+                refreshed = None if promo_products is None else sorted(promo_products.union(product_ids))
+                prices_invalidated.send(sender=None, product_ids=refreshed)
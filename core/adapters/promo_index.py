@@ -0,0 +1,241 @@
+"""Index en mémoire des promotions catalogue actives.
+
+Résoudre une promotion via l'ORM impose, à chaque défaut de cache,
+un filtre sur les fenêtres de dates de ``PromoCatalog``, un filtrage des
+``allowed_customer_numbers`` et une vérification du ciblage
+``target_users``.  Ce module charge une fois pour toutes les catalogues
+actifs et leurs items dans des dictionnaires propres au processus :
+la résolution d'un couple utilisateur/produit devient alors une simple
+recherche en mémoire, sans SQL sur les tables des promotions.
+
+L'index est reconstruit lorsque :
+
+* la génération partagée des promotions change (voir
+  ``core.adapters.pricing_versions`` et les signaux de ``catalog``) ;
+* la prochaine borne temporelle d'un catalogue est atteinte (début d'un
+  catalogue futur ou fin d'un catalogue actif).
+"""
+
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Dict, FrozenSet, Iterable, Optional, Tuple
+
+from django.utils import timezone
+
+from catalog.models import PromoCatalog, PromoItem
+from core.adapters.pricing_versions import get_promo_generation
+from core.domain.dto import PromoItemDTO, UserDTO
+
+
+@dataclass(frozen=True)
+class IndexedPromoItem:
+    """Projection immuable d'un ``PromoItem`` actif."""
+
+    id: int
+    catalog_id: int
+    product_id: int
+    promo_price: Decimal
+    target_client_type: Optional[str]
+
+
+class PromoIndex:
+    """Instantané immuable des promotions actives à un instant donné.
+
+    * ``open_items`` : ``{product_id: items}`` pour les items sans
+      restriction ``allowed_customer_numbers`` ;
+    * ``customer_items`` : ``{customer_number: {product_id: items}}`` pour
+      les items réservés à certains numéros clients ;
+    * ``catalog_users`` : ``{catalog_id: ids des target_users}``.
+
+    ``targeted_user_ids`` (union des ``target_users``) permet de savoir en
+    temps constant si un utilisateur est ciblé nommément.
+    """
+
+    def __init__(
+        self,
+        generation: Optional[str],
+        open_items: Dict[int, Tuple[IndexedPromoItem, ...]],
+        customer_items: Dict[str, Dict[int, Tuple[IndexedPromoItem, ...]]],
+        catalog_users: Dict[int, FrozenSet[int]],
+        next_boundary: Optional[datetime],
+    ) -> None:
+        self.generation = generation
+        self.open_items = open_items
+        self.customer_items = customer_items
+        self.catalog_users = catalog_users
+        self.targeted_user_ids = frozenset().union(*catalog_users.values())
+        self.next_boundary = next_boundary
+        catalog_products: Dict[int, set] = {}
+        for product_id, items in open_items.items():
+            for item in items:
+                catalog_products.setdefault(item.catalog_id, set()).add(product_id)
+        self.catalog_products = {cid: frozenset(pids) for cid, pids in catalog_products.items()}
+
+    # ------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------
+    @classmethod
+    def build(cls, generation: Optional[str] = None, now: Optional[datetime] = None) -> "PromoIndex":
+        """Charge les catalogues actifs en trois requêtes."""
+        now = now or timezone.now()
+        active_ids: list[int] = []
+        client_types: dict[int, Optional[str]] = {}
+        boundaries: list[datetime] = []
+        for catalog_id, start, end, target_client_type in PromoCatalog.objects.filter(
+            is_active=True,
+            end_date__gte=now,
+        ).values_list("id", "start_date", "end_date", "target_client_type"):
+            if start <= now:
+                active_ids.append(catalog_id)
+                client_types[catalog_id] = target_client_type
+                # ``end_date`` est inclusive : le catalogue expire juste après.
+                boundaries.append(end + timedelta(microseconds=1))
+            else:
+                boundaries.append(start)
+
+        open_items: dict[int, list[IndexedPromoItem]] = {}
+        customer_items: dict[str, dict[int, list[IndexedPromoItem]]] = {}
+        catalog_users: dict[int, set[int]] = {}
+        if active_ids:
+            for item_id, catalog_id, product_id, promo_price, allowed in PromoItem.objects.filter(
+                catalog_id__in=active_ids,
+            ).values_list("id", "catalog_id", "product_id", "promo_price", "allowed_customer_numbers"):
+                item = IndexedPromoItem(
+                    id=item_id,
+                    catalog_id=catalog_id,
+                    product_id=product_id,
+                    promo_price=promo_price,
+                    target_client_type=client_types.get(catalog_id),
+                )
+                if allowed:
+                    for customer_number in set(allowed):
+                        customer_items.setdefault(str(customer_number), {}).setdefault(
+                            product_id, []
+                        ).append(item)
+                else:
+                    open_items.setdefault(product_id, []).append(item)
+
+            through = PromoCatalog.target_users.through
+            for catalog_id, user_id in through.objects.filter(
+                promocatalog_id__in=active_ids,
+            ).values_list("promocatalog_id", "user_id"):
+                catalog_users.setdefault(catalog_id, set()).add(user_id)
+
+        return cls(
+            generation=generation,
+            open_items={pid: tuple(items) for pid, items in open_items.items()},
+            customer_items={
+                number: {pid: tuple(items) for pid, items in by_product.items()}
+                for number, by_product in customer_items.items()
+            },
+            catalog_users={cid: frozenset(users) for cid, users in catalog_users.items()},
+            next_boundary=min(boundaries) if boundaries else None,
+        )
+
+    def is_stale(self, generation: Optional[str], now: datetime) -> bool:
+        if generation != self.generation:
+            return True
+        return self.next_boundary is not None and now >= self.next_boundary
+
+    # ------------------------------------------------------------------
+    # Résolution
+    # ------------------------------------------------------------------
+    def resolve(self, product_ids: Iterable[int], user_dto: Optional[UserDTO]) -> Dict[int, PromoItemDTO]:
+        """Retourne ``{product_id: PromoItemDTO}`` pour les produits promus.
+
+        Les règles sont celles de ``DjangoPromoCatalogAdapter`` : sans
+        numéro client aucune promotion ne s'applique ; les items réservés
+        au numéro client sont prioritaires, puis le ciblage par
+        ``target_users``, puis par ``target_client_type`` ; à priorité
+        égale on retient le prix le plus bas puis l'item le plus récent.
+        """
+        if user_dto is None or not user_dto.customer_number:
+            return {}
+        reserved = self.customer_items.get(user_dto.customer_number, {})
+        promos: Dict[int, PromoItemDTO] = {}
+        for product_id in product_ids:
+            best = None
+            for item in reserved.get(product_id, ()):
+                candidate = (1, item.promo_price, -item.id)
+                if best is None or candidate < best:
+                    best = candidate
+            for item in self.open_items.get(product_id, ()):
+                candidate = (self._priority(item, user_dto), item.promo_price, -item.id)
+                if best is None or candidate < best:
+                    best = candidate
+            if best is not None:
+                promos[product_id] = PromoItemDTO(promo_price=best[1])
+        return promos
+
+    def is_user_targeted(self, user_dto: Optional[UserDTO]) -> bool:
+        """Vrai si ``user_dto`` est visé nommément par un item ou un catalogue actif."""
+        if user_dto is None or not user_dto.customer_number:
+            # Sans numéro client aucune promotion ne s'applique.
+            return False
+        return (
+            user_dto.customer_number in self.customer_items
+            or user_dto.id in self.targeted_user_ids
+        )
+
+    def targeted_product_ids(self, user_dto: Optional[UserDTO]) -> FrozenSet[int]:
+        """Produits dont la promotion vise ``user_dto`` nommément.
+
+        Items réservés à son numéro client et items des catalogues dont il
+        fait partie des ``target_users`` : hors de ces produits, son prix est
+        celui de son segment partagé.
+        """
+        if user_dto is None or not user_dto.customer_number:
+            return frozenset()
+        product_ids = set(self.customer_items.get(user_dto.customer_number, ()))
+        for catalog_id, user_ids in self.catalog_users.items():
+            if user_dto.id in user_ids:
+                product_ids.update(self.catalog_products.get(catalog_id, ()))
+        return frozenset(product_ids)
+
+    def _priority(self, item: IndexedPromoItem, user_dto: UserDTO) -> int:
+        if user_dto.id in self.catalog_users.get(item.catalog_id, ()):
+            return 2
+        if item.target_client_type and item.target_client_type == user_dto.client_type:
+            return 3
+        return 4
+
+
+_index: Optional[PromoIndex] = None
+_lock = threading.Lock()
+
+
+def get_promo_index() -> PromoIndex:
+    """Retourne l'index du processus, reconstruit s'il est périmé.
+
+    La vérification ne coûte qu'une lecture de la génération dans le
+    cache commun à tous les processus (``core.utils.shared_cache`` : une
+    clé Redis ou une ligne de la table de cache, lue par clé primaire) ;
+    une modification faite dans l'admin d'un worker est ainsi vue par
+    tous les autres à leur appel suivant.  La reconstruction est
+    sérialisée par un verrou et le nouvel index remplace l'ancien par une
+    simple affectation : les lecteurs concurrents voient toujours un index
+    complet.
+    """
+    global _index
+    generation = get_promo_generation()
+    now = timezone.now()
+    index = _index
+    if index is not None and not index.is_stale(generation, now):
+        return index
+    with _lock:
+        index = _index
+        if index is None or index.is_stale(generation, now):
+            index = PromoIndex.build(generation=generation, now=now)
+            _index = index
+    return index
+
+
+def reset_promo_index() -> None:
+    """Oublie l'index du processus (utile pour les tests)."""
+    global _index
+    with _lock:
+        _index = None
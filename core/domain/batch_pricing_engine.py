@@ -0,0 +1,161 @@
+"""Moteur de tarification vectorisé pour le repricing de masse.
+
+``PricingEngine.determine_price`` traite un produit à la fois à partir de
+DTOs pydantic : c'est adapté à l'affichage, beaucoup moins au recalcul
+d'un catalogue entier (exports, flux de prix, matérialisation des prix
+par segment) où le coût par produit domine.
+
+``BatchPricingEngine`` applique exactement les mêmes règles sur des
+colonnes NumPy de prix exprimés en centimes entiers (``int64``) :
+
+1. Promo catalogue ciblée (si fournie)  -> prix final
+2. Grille B2B (+5 % pour les comptes non vérifiés, arrondi bancaire
+   au centime comme ``Decimal.quantize``)
+3. Promo simple ``discount_price`` si ``0 < discount_price < price``
+4. Prix public ``price``
+
+Les valeurs absentes (``None``) sont codées par ``MISSING``.  Comme le
+moteur scalaire, une grille B2B à zéro est considérée comme absente.
+Le module reste pur : il ne dépend ni de Django ni de l'ORM.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Dict, Iterable, Mapping, Optional
+
+import numpy as np
+
+from core.domain.dto import ProductDTO, PromoItemDTO
+
+# Valeur sentinelle des colonnes optionnelles.
+MISSING = np.iinfo(np.int64).min
+
+_GRID_COLUMNS = {
+    "wholesaler": "price_wholesaler",
+    "big_retail": "price_big_retail",
+    "small_retail": "price_small_retail",
+}
+
+
+def to_cents(value: Optional[Decimal]) -> int:
+    """Convertit un montant en centimes entiers (``MISSING`` pour ``None``).
+
+    Lève ``ValueError`` si le montant a plus de deux décimales : le calcul
+    en centimes ne serait alors plus identique au moteur scalaire.
+    """
+    if value is None:
+        return MISSING
+    cents = Decimal(value) * 100
+    if cents != cents.to_integral_value():
+        raise ValueError(f"Montant non représentable en centimes : {value}")
+    return int(cents)
+
+
+def from_cents(cents: int) -> Decimal:
+    """Convertit des centimes entiers en ``Decimal`` à deux décimales."""
+    return Decimal(int(cents)).scaleb(-2)
+
+
+@dataclass
+class PriceColumns:
+    """Colonnes de prix d'un lot de produits, en centimes ``int64``."""
+
+    ids: np.ndarray
+    price: np.ndarray
+    discount_price: np.ndarray
+    price_wholesaler: np.ndarray
+    price_big_retail: np.ndarray
+    price_small_retail: np.ndarray
+
+    @classmethod
+    def from_dtos(cls, product_dtos: Iterable[ProductDTO]) -> "PriceColumns":
+        product_dtos = list(product_dtos)
+
+        def column(attr: str) -> np.ndarray:
+            return np.fromiter(
+                (to_cents(getattr(dto, attr)) for dto in product_dtos),
+                dtype=np.int64,
+                count=len(product_dtos),
+            )
+
+        return cls(
+            ids=np.fromiter((dto.id for dto in product_dtos), dtype=np.int64, count=len(product_dtos)),
+            price=column("price"),
+            discount_price=column("discount_price"),
+            price_wholesaler=column("price_wholesaler"),
+            price_big_retail=column("price_big_retail"),
+            price_small_retail=column("price_small_retail"),
+        )
+
+    def promo_column(self, promo_items: Optional[Mapping[int, PromoItemDTO]]) -> np.ndarray:
+        """Construit la colonne des prix promo à partir de ``{product_id: PromoItemDTO}``."""
+        promo = np.full(len(self.ids), MISSING, dtype=np.int64)
+        if promo_items:
+            for position, product_id in enumerate(self.ids.tolist()):
+                item = promo_items.get(product_id)
+                if item is not None:
+                    promo[position] = to_cents(item.promo_price)
+        return promo
+
+
+class BatchPricingEngine:
+    """Variante vectorisée de ``PricingEngine`` pour un segment d'utilisateurs.
+
+    Un appel calcule les prix de tout un lot pour un couple
+    (``client_type``, ``is_b2b_verified``) ; les promotions catalogue,
+    qui dépendent de l'utilisateur, sont fournies sous forme de colonne.
+    ``has_user=False`` correspond à ``user_dto=None`` dans le moteur
+    scalaire (visiteur anonyme : pas de grille B2B).
+    """
+
+    @staticmethod
+    def determine_prices(
+        columns: PriceColumns,
+        client_type: Optional[str] = None,
+        is_b2b_verified: bool = False,
+        promo_price: Optional[np.ndarray] = None,
+        has_user: bool = True,
+    ) -> np.ndarray:
+        """Retourne la colonne des prix unitaires finaux, en centimes."""
+        price = columns.price
+
+        # 4. Prix public, 3. promo simple
+        discount = columns.discount_price
+        has_discount = (discount != MISSING) & (discount > 0) & (discount < price)
+        result = np.where(has_discount, discount, price)
+
+        # 2. Grille B2B
+        grid_column = _GRID_COLUMNS.get(client_type) if has_user else None
+        if grid_column is not None:
+            grid = getattr(columns, grid_column)
+            base = np.where((grid != MISSING) & (grid != 0), grid, price)
+            if not is_b2b_verified:
+                base = _surcharge_5_percent(base)
+            result = base
+
+        # 1. Promo catalogue ciblée
+        if promo_price is not None:
+            result = np.where(promo_price != MISSING, promo_price, result)
+        return result
+
+    @staticmethod
+    def to_decimals(columns: PriceColumns, cents: np.ndarray) -> Dict[int, Decimal]:
+        """Convertit une colonne de résultats en ``{product_id: Decimal}``."""
+        return {
+            product_id: from_cents(value)
+            for product_id, value in zip(columns.ids.tolist(), cents.tolist())
+        }
+
+
+def _surcharge_5_percent(cents: np.ndarray) -> np.ndarray:
+    """Applique +5 % arrondi au centime, demi au pair (``ROUND_HALF_EVEN``).
+
+    ``cents * 105 / 100`` est calculé exactement en entiers : le quotient
+    est arrondi à l'unité supérieure si le reste dépasse 50, ou vaut 50
+    avec un quotient impair.
+    """
+    quotient, remainder = np.divmod(cents * 105, 100)
+    round_up = (remainder > 50) | ((remainder == 50) & (quotient % 2 == 1))
+    return quotient + round_up
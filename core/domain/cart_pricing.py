@@ -0,0 +1,193 @@
+"""État de tarification incrémentale d'un panier.
+
+Un panier B2B compte souvent plus d'une centaine de lignes ; retarifer
+toutes les lignes à chaque modification d'une seule quantité est
+inutile.  ``CartPriceState`` conserve, pour chaque produit, le prix
+unitaire calculé et la *version* sous laquelle il l'a été (version du
+produit et génération des promotions, voir
+``core.adapters.pricing_versions``), ainsi que le segment de
+tarification de l'utilisateur et le total du panier.
+
+À la tarification suivante, seules les lignes nouvelles ou dont la
+version a changé sont retarifées ; une quantité modifiée ne fait que
+recalculer le total de sa ligne (le prix unitaire du panier ne dépend
+pas de la quantité).  Le total est mis à jour par différence.
+
+L'état porte aussi une *révision* : chaque mise à jour qui change une
+ligne (quantité ou prix) l'incrémente et estampille les lignes
+modifiées ; les lignes retirées sont conservées comme « pierres
+tombales ».  ``changed_since`` en déduit les lignes modifiées depuis
+une révision donnée (API panier incrémentale).
+
+Module pur : aucune dépendance à Django.  L'état est sérialisable en
+JSON (``to_dict`` / ``from_dict``) pour être conservé en session.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+# Nombre maximal de lignes retirées mémorisées pour ``changed_since``.
+MAX_REMOVED = 200
+
+
+@dataclass(slots=True)
+class LinePrice:
+    """Prix d'une ligne du panier et version sous laquelle il a été calculé."""
+
+    quantity: int
+    unit_price: Decimal
+    total_price: Decimal
+    version: Optional[str]
+    # Révision de l'état à laquelle la quantité ou le prix a changé
+    revision: int = 0
+
+
+@dataclass(slots=True)
+class CartPriceState:
+    """Prix par ligne (``{product_id: LinePrice}``) et total d'un panier."""
+
+    segment: Optional[str] = None
+    lines: Dict[int, LinePrice] = field(default_factory=dict)
+    total: Decimal = Decimal("0")
+    revision: int = 0
+    # Révision en deçà de laquelle l'historique est incomplet
+    base: int = 0
+    # Lignes retirées : ``{product_id: révision du retrait}``
+    removed: Dict[int, int] = field(default_factory=dict)
+
+    def reset(self, segment: Optional[str]) -> None:
+        """Oublie tous les prix (changement de segment de tarification).
+
+        L'historique repart de la révision courante : toutes les lignes
+        seront estampillées à la prochaine mise à jour.
+        """
+        self.segment = segment
+        self.lines = {}
+        self.total = Decimal("0")
+        self.removed = {}
+        self.base = self.revision
+
+    def stale_products(self, versions: Mapping[int, Optional[str]]) -> List[int]:
+        """Retourne les produits à retarifer : nouveaux ou de version différente.
+
+        Une version inconnue (``None``) ne permet pas de garantir le prix
+        mémorisé : la ligne est alors toujours retarifée.
+        """
+        return [
+            product_id
+            for product_id, version in versions.items()
+            if version is None
+            or product_id not in self.lines
+            or self.lines[product_id].version != version
+        ]
+
+    def update(
+        self,
+        quantities: Mapping[int, int],
+        versions: Mapping[int, Optional[str]],
+        unit_prices: Mapping[int, Decimal],
+    ) -> None:
+        """Aligne l'état sur le panier ``{product_id: quantité}``.
+
+        ``unit_prices`` contient les prix des produits retarifés (au
+        moins ceux de ``stale_products``) ; les autres lignes gardent
+        leur prix.  Le total est corrigé de la différence de chaque
+        ligne ajoutée, modifiée ou retirée.  Si une ligne a changé, la
+        révision est incrémentée et les lignes concernées estampillées.
+        """
+        stamp = self.revision + 1
+        changed = False
+        for product_id in [pid for pid in self.lines if pid not in quantities]:
+            self.total -= self.lines.pop(product_id).total_price
+            self.removed[product_id] = stamp
+            changed = True
+        for product_id, quantity in quantities.items():
+            line = self.lines.get(product_id)
+            unit_price = unit_prices.get(product_id)
+            if unit_price is None:
+                unit_price = line.unit_price
+            total_price = unit_price * Decimal(quantity)
+            if line is None:
+                self.lines[product_id] = LinePrice(quantity, unit_price, total_price, versions.get(product_id), stamp)
+                self.removed.pop(product_id, None)
+                self.total += total_price
+                changed = True
+                continue
+            if line.quantity != quantity or line.unit_price != unit_price:
+                line.revision = stamp
+                changed = True
+            self.total += total_price - line.total_price
+            line.quantity = quantity
+            line.unit_price = unit_price
+            line.total_price = total_price
+            line.version = versions.get(product_id)
+        if changed:
+            self.revision = stamp
+            self._prune_removed()
+
+    def changed_since(self, revision: int) -> Optional[Tuple[List[int], List[int]]]:
+        """Retourne ``(produits modifiés, produits retirés)`` depuis ``revision``.
+
+        ``None`` si l'historique ne permet pas de répondre (révision
+        antérieure à ``base`` ou postérieure à la révision courante) :
+        l'appelant doit alors renvoyer le panier complet.
+        """
+        if revision < self.base or revision > self.revision:
+            return None
+        changed = [product_id for product_id, line in self.lines.items() if line.revision > revision]
+        removed = [product_id for product_id, stamp in self.removed.items() if stamp > revision]
+        return changed, removed
+
+    def _prune_removed(self) -> None:
+        """Borne le nombre de pierres tombales ; ``base`` recule d'autant."""
+        if len(self.removed) <= MAX_REMOVED:
+            return
+        kept = sorted(self.removed.items(), key=lambda item: item[1])[-MAX_REMOVED:]
+        dropped = set(self.removed) - {product_id for product_id, _ in kept}
+        self.base = max(self.base, max(self.removed[product_id] for product_id in dropped))
+        self.removed = dict(kept)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "segment": self.segment,
+            "total": str(self.total),
+            "revision": self.revision,
+            "base": self.base,
+            "removed": {str(product_id): stamp for product_id, stamp in self.removed.items()},
+            "lines": {
+                str(product_id): [
+                    line.quantity,
+                    str(line.unit_price),
+                    str(line.total_price),
+                    line.version,
+                    line.revision,
+                ]
+                for product_id, line in self.lines.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: Optional[Mapping[str, Any]]) -> "CartPriceState":
+        """Relit un état sérialisé ; un état absent ou illisible donne un état vide."""
+        if not data:
+            return cls()
+        try:
+            lines = {
+                int(product_id): LinePrice(
+                    int(quantity), Decimal(unit_price), Decimal(total_price), version, int(revision)
+                )
+                for product_id, (quantity, unit_price, total_price, version, revision) in data["lines"].items()
+            }
+            return cls(
+                segment=data["segment"],
+                lines=lines,
+                total=Decimal(data["total"]),
+                revision=int(data["revision"]),
+                base=int(data["base"]),
+                removed={int(product_id): int(stamp) for product_id, stamp in data["removed"].items()},
+            )
+        except (AttributeError, KeyError, TypeError, ValueError, ArithmeticError):
+            return cls()
@@ -19,12 +19,24 @@ values they know about (e.g. a catalogue adapter may not provide
 ``title`` or ``unit_price``).  Additional DTOs have been added for
 cart and order data, and these will be used as the canonical types
 throughout the refactored codebase.
+
+Validating a pydantic model costs several microseconds, which dominates
+cheap price lookups when products and cart lines are rebuilt on every
+pricing call.  The internal hot path (session cart repository, pricing
+service, cart pricing) therefore uses the *records* defined at the end
+of this module: ``__slots__`` dataclasses with the same attributes and
+no validation.  Records are only built from trusted data (ORM instances,
+already validated DTOs); ``to_dto()`` performs the explicit validation
+step where lines leave the process through the HTTP API
+(``api.cart_api._serialize_line``).  Domain code is duck-typed and
+accepts either form.
 """
 
 from __future__ import annotations
 
+from dataclasses import dataclass, field
 from decimal import Decimal
-from typing import List, Optional
+from typing import List, Optional, Union
 
 from pydantic import BaseModel, Field
 
@@ -53,6 +65,10 @@ class ProductDTO(BaseModel):
     # Additional merchandising attributes
     title: Optional[str] = None
     is_active: Optional[bool] = None
+    # Ordering rules (see ``core.domain.quantity_rules``)
+    min_order_qty: Optional[int] = None
+    pcb_qty: Optional[int] = None
+    order_in_packs: bool = False
     # ``unit_price`` is the final price that should be charged to the
     # customer.  It is left unset by repositories and will be
     # calculated by the pricing service.  Services should update this
@@ -92,6 +108,93 @@ class PromoItemDTO(BaseModel):
     promo_price: Decimal
 
 
+# ----------------------------------------------------------------------
+# Lightweight records for the pricing hot path
+# ----------------------------------------------------------------------
+@dataclass(slots=True)
+class ProductRecord:
+    """Unvalidated, slotted counterpart of ``ProductDTO``."""
+
+    id: int
+    sku: str
+    price: Decimal
+    discount_price: Optional[Decimal] = None
+    price_wholesaler: Optional[Decimal] = None
+    price_big_retail: Optional[Decimal] = None
+    price_small_retail: Optional[Decimal] = None
+    title: Optional[str] = None
+    is_active: Optional[bool] = None
+    min_order_qty: Optional[int] = None
+    pcb_qty: Optional[int] = None
+    order_in_packs: bool = False
+    unit_price: Optional[Decimal] = None
+
+    def to_dto(self) -> ProductDTO:
+        """Validate the record into a ``ProductDTO``."""
+        return ProductDTO(
+            id=self.id,
+            sku=self.sku,
+            price=self.price,
+            discount_price=self.discount_price,
+            price_wholesaler=self.price_wholesaler,
+            price_big_retail=self.price_big_retail,
+            price_small_retail=self.price_small_retail,
+            title=self.title,
+            is_active=self.is_active,
+            min_order_qty=self.min_order_qty,
+            pcb_qty=self.pcb_qty,
+            order_in_packs=self.order_in_packs,
+            unit_price=self.unit_price,
+        )
+
+
+@dataclass(slots=True)
+class UserRecord:
+    """Unvalidated, slotted counterpart of ``UserDTO``."""
+
+    id: int
+    email: str = ""
+    client_type: Optional[str] = None
+    customer_number: Optional[str] = None
+    is_b2b_verified: bool = False
+    pricing_mode: Optional[str] = None
+
+    def to_dto(self) -> UserDTO:
+        """Validate the record into a ``UserDTO``."""
+        return UserDTO(
+            id=self.id,
+            email=self.email,
+            client_type=self.client_type,
+            customer_number=self.customer_number,
+            is_b2b_verified=self.is_b2b_verified,
+            pricing_mode=self.pricing_mode,
+        )
+
+
+ProductLike = Union[ProductDTO, ProductRecord]
+UserLike = Union[UserDTO, UserRecord]
+
+
+@dataclass(slots=True)
+class CartLineRecord:
+    """Unvalidated, slotted counterpart of ``CartItemDTO``."""
+
+    product: ProductLike
+    quantity: int
+    unit_price: Optional[Decimal] = None
+    total_price: Optional[Decimal] = None
+
+    def to_dto(self) -> CartItemDTO:
+        """Validate the record (and its product) into a ``CartItemDTO``."""
+        product = self.product.to_dto() if isinstance(self.product, ProductRecord) else self.product
+        return CartItemDTO(
+            product=product,
+            quantity=self.quantity,
+            unit_price=self.unit_price,
+            total_price=self.total_price,
+        )
+
+
 class CartItemDTO(BaseModel):
     """DTO representing a single line item in a cart.
 
@@ -100,7 +203,7 @@ class CartItemDTO(BaseModel):
     fields during cart calculation.
     """
 
-    product: ProductDTO
+    product: ProductLike
     quantity: int
     # Pricing fields.  They are optional before pricing has been
     # calculated.  After running through the pricing service these
@@ -109,11 +212,14 @@ class CartItemDTO(BaseModel):
     total_price: Optional[Decimal] = None
 
 
+CartLine = Union[CartItemDTO, CartLineRecord]
+
+
 class CartDTO(BaseModel):
     """DTO representing a customer's cart."""
 
     user_id: Optional[int]
-    items: List[CartItemDTO] = Field(default_factory=list)
+    items: List[CartLine] = Field(default_factory=list)
     total: Optional[Decimal] = None
 
 
@@ -127,6 +233,27 @@ class OrderDTO(BaseModel):
     status: str
 
 
+class SavedCartDTO(BaseModel):
+    """DTO representing a saved cart / recurring order template.
+
+    Owned either by a user (``user_id``) or shared by a client
+    organisation (``client_id``).  Lines are kept as two parallel arrays,
+    mirroring the compact storage of the ``cart.SavedCart`` model.
+    """
+
+    id: int
+    name: str
+    user_id: Optional[int] = None
+    client_id: Optional[int] = None
+    product_ids: List[int] = Field(default_factory=list)
+    quantities: List[int] = Field(default_factory=list)
+
+    @property
+    def lines(self) -> List[tuple[int, int]]:
+        """``(product_id, quantity)`` pairs, in saved order."""
+        return list(zip(self.product_ids, self.quantities))
+
+
 class CartPricingResult(BaseModel):
     """Result returned by the pricing service when pricing a cart.
 
@@ -135,5 +262,74 @@ class CartPricingResult(BaseModel):
     separate the concerns of session management from pricing.
     """
 
-    items: List[CartItemDTO]
-    total: Decimal
\ No newline at end of file
+    items: List[CartLine]
+    total: Decimal
+
+@dataclass(slots=True)
+class OrderLine:
+    """One line keyed in by a buyer (order pad, CSV upload, bulk API).
+
+    ``code`` may be an article code, an internal SKU or an EAN.
+    ``quantity`` is ``None`` when the input could not be parsed.
+    ``line`` is the 1-based position in the source, used for reporting.
+    """
+
+    line: int
+    code: str
+    quantity: Optional[int]
+
+
+@dataclass(slots=True)
+class BulkAddLine:
+    """Outcome of one ``OrderLine`` in ``CartService.add_items``.
+
+    ``status`` is one of ``BulkAddLine.ADDED``, ``UNKNOWN``, ``INACTIVE``
+    or ``INVALID_QUANTITY``.  For added lines ``quantity`` is the
+    quantity now in the cart, after MOQ / PCB rounding.
+    """
+
+    ADDED = "added"
+    UNKNOWN = "unknown"
+    INACTIVE = "inactive"
+    INVALID_QUANTITY = "invalid_quantity"
+
+    line: int
+    code: str
+    requested: Optional[int]
+    status: str
+    product_id: Optional[int] = None
+    quantity: Optional[int] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.status == self.ADDED
+
+
+@dataclass(slots=True)
+class BulkAddResult:
+    """Priced cart and per-line report returned by ``CartService.add_items``."""
+
+    cart: CartDTO
+    lines: List[BulkAddLine]
+
+    @property
+    def errors(self) -> List[BulkAddLine]:
+        return [line for line in self.lines if not line.ok]
+
+
+@dataclass(slots=True)
+class CartChanges:
+    """Priced cart lines changed since a client-supplied revision.
+
+    Returned by ``CartService.get_cart_changes``.  When ``full`` is true
+    the history could not answer and ``items`` holds every line; otherwise
+    ``items`` holds only the lines whose quantity or price changed and
+    ``removed`` the ids of products dropped since ``since``.
+    """
+
+    revision: int
+    since: int
+    full: bool
+    total: Decimal
+    items: List[CartLine]
+    removed: List[int] = field(default_factory=list)
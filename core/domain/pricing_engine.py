@@ -1,5 +1,5 @@
 from decimal import Decimal
-from typing import Optional
+from typing import Dict, Iterable, Mapping, Optional
 
 from core.domain.pricing_rules import B2BPricingRules
 from core.domain.dto import ProductDTO, UserDTO, PromoItemDTO
@@ -55,3 +55,26 @@ class PricingEngine:
 
         # 4. Prix public
         return Decimal(product_dto.price)
+
+    @staticmethod
+    def determine_prices(
+        product_dtos: Iterable[ProductDTO],
+        user_dto: Optional[UserDTO] = None,
+        promo_items: Optional[Mapping[int, PromoItemDTO]] = None,
+    ) -> Dict[int, Decimal]:
+        """Variante par lot de ``determine_price``.
+
+        ``promo_items`` associe un ``product_id`` à la promotion catalogue
+        applicable (telle que renvoyée par
+        ``PromoCatalogPort.get_applicable_promos``).  Retourne un
+        dictionnaire ``{product_id: prix_unitaire}``.
+        """
+        promo_items = promo_items or {}
+        return {
+            product_dto.id: PricingEngine.determine_price(
+                product_dto,
+                user_dto,
+                promo_items.get(product_dto.id),
+            )
+            for product_dto in product_dtos
+        }
@@ -1,5 +1,9 @@
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
 from decimal import Decimal
-from typing import Optional
+from types import MappingProxyType
+from typing import Dict, Iterable, Mapping, Optional, Tuple
 
 
 class B2BPricingRules:
@@ -54,6 +58,156 @@ class B2BPricingRules:
         return price
 
 
+@dataclass(frozen=True)
+class PricingRuleSpec:
+    """Description pure d'une règle avancée telle que stockée en base.
+
+    ``kind`` vaut ``"quantity"`` (remise dès ``min_quantity`` unités),
+    ``"brand"`` (remise sur la marque ``brand_id``), ``"family"``
+    (remise sur la catégorie ``category_id``) ou ``"floor"`` (prix
+    plancher : ``rate`` est alors la fraction du prix public en dessous
+    de laquelle le prix ne descend pas).  ``client_type`` vide signifie
+    « tous les types de client » ; ``start_date`` / ``end_date`` bornent
+    la validité (incluses, ``None`` = sans limite).
+    """
+
+    kind: str
+    rate: Decimal
+    min_quantity: Optional[int] = None
+    brand_id: Optional[int] = None
+    category_id: Optional[int] = None
+    client_type: Optional[str] = None
+    start_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None
+
+    def is_valid_at(self, now: datetime) -> bool:
+        return (self.start_date is None or self.start_date <= now) and (
+            self.end_date is None or now <= self.end_date
+        )
+
+    @property
+    def key(self):
+        """Identifie ce que la règle tarifie (seuil, marque, catégorie, plancher)."""
+        if self.kind == "quantity":
+            return self.min_quantity
+        if self.kind == "brand":
+            return self.brand_id
+        if self.kind == "family":
+            return self.category_id
+        return None
+
+
+@dataclass(frozen=True)
+class AdvancedRuleSet:
+    """Règles avancées compilées pour un type de client.
+
+    Structure immuable optimisée pour la lecture : les seuils de quantité
+    sont triés une fois pour toutes et parcourus par ``bisect`` ; les
+    remises par marque et par famille sont des dictionnaires indexés par
+    identifiant.
+    """
+
+    quantity_thresholds: Tuple[int, ...] = ()
+    quantity_rates: Tuple[Decimal, ...] = ()
+    brand_rates: Mapping[int, Decimal] = field(default_factory=lambda: MappingProxyType({}))
+    family_rates: Mapping[int, Decimal] = field(default_factory=lambda: MappingProxyType({}))
+    floor_percent: Optional[Decimal] = None
+
+    @classmethod
+    def build(cls, specs: Iterable[PricingRuleSpec]) -> "AdvancedRuleSet":
+        """Compile une liste de règles ; en cas de doublon, la plus forte l'emporte."""
+        by_kind: Dict[str, Dict[object, Decimal]] = {"quantity": {}, "brand": {}, "family": {}, "floor": {}}
+        for spec in specs:
+            rates = by_kind[spec.kind]
+            if spec.key not in rates or spec.rate > rates[spec.key]:
+                rates[spec.key] = spec.rate
+        thresholds = sorted(by_kind["quantity"])
+        return cls(
+            quantity_thresholds=tuple(thresholds),
+            quantity_rates=tuple(by_kind["quantity"][t] for t in thresholds),
+            brand_rates=MappingProxyType(dict(by_kind["brand"])),
+            family_rates=MappingProxyType(dict(by_kind["family"])),
+            floor_percent=by_kind["floor"].get(None),
+        )
+
+    def quantity_rate(self, quantity: int) -> Decimal:
+        """Taux du plus grand seuil atteint par ``quantity`` (0 si aucun)."""
+        position = bisect_right(self.quantity_thresholds, quantity)
+        return self.quantity_rates[position - 1] if position else Decimal("0")
+
+
+EMPTY_RULE_SET = AdvancedRuleSet()
+
+
+@dataclass(frozen=True)
+class CompiledPricingRules:
+    """Instantané immuable des règles avancées valides à un instant donné.
+
+    ``rule_sets`` associe chaque type de client ciblé par au moins une
+    règle à son ``AdvancedRuleSet`` ; la clé ``None`` porte les règles
+    communes, utilisées pour les autres types de client.  Une règle
+    propre à un type de client remplace la règle commune de même objet
+    (même seuil, même marque, même catégorie, plancher).
+    ``next_boundary`` est la prochaine date à laquelle une règle entre en
+    vigueur ou expire : l'instantané doit alors être recompilé.
+    """
+
+    rule_sets: Mapping[Optional[str], AdvancedRuleSet] = field(
+        default_factory=lambda: MappingProxyType({None: EMPTY_RULE_SET})
+    )
+    next_boundary: Optional[datetime] = None
+    generation: Optional[str] = None
+
+    @classmethod
+    def compile(
+        cls,
+        specs: Iterable[PricingRuleSpec],
+        now: datetime,
+        generation: Optional[str] = None,
+    ) -> "CompiledPricingRules":
+        specs = list(specs)
+        boundaries = []
+        active = []
+        for spec in specs:
+            if spec.start_date is not None and spec.start_date > now:
+                boundaries.append(spec.start_date)
+            elif spec.is_valid_at(now):
+                active.append(spec)
+                if spec.end_date is not None:
+                    # ``end_date`` est inclusive : la règle expire juste après.
+                    boundaries.append(spec.end_date + timedelta(microseconds=1))
+        common = [spec for spec in active if not spec.client_type]
+        rule_sets: Dict[Optional[str], AdvancedRuleSet] = {None: AdvancedRuleSet.build(common)}
+        for client_type in {spec.client_type for spec in active if spec.client_type}:
+            specific = [spec for spec in active if spec.client_type == client_type]
+            overridden = {(spec.kind, spec.key) for spec in specific}
+            rule_sets[client_type] = AdvancedRuleSet.build(
+                [spec for spec in common if (spec.kind, spec.key) not in overridden] + specific
+            )
+        return cls(
+            rule_sets=MappingProxyType(rule_sets),
+            next_boundary=min(boundaries) if boundaries else None,
+            generation=generation,
+        )
+
+    def for_client_type(self, client_type: Optional[str]) -> AdvancedRuleSet:
+        return self.rule_sets.get(client_type) or self.rule_sets.get(None, EMPTY_RULE_SET)
+
+    def is_stale(self, generation: Optional[str], now: datetime) -> bool:
+        if generation != self.generation:
+            return True
+        return self.next_boundary is not None and now >= self.next_boundary
+
+
+EMPTY_RULES = CompiledPricingRules()
+
+
+def _discount(unit_price: Decimal, rate: Decimal) -> Decimal:
+    if rate > 0:
+        unit_price = (unit_price * (Decimal("1.0") - rate)).quantize(Decimal("0.01"))
+    return unit_price
+
+
 class AdvancedPricingRules:
     """Règles avancées de tarification entreprise.
 
@@ -62,99 +216,54 @@ class AdvancedPricingRules:
     des remises supplémentaires en fonction de la quantité commandée,
     de la marque ou de la famille de produits, tout en respectant un
     prix plancher minimal.
-    """
 
-    # Tableaux simples de remise par quantité.  Dans un cas réel ces
-    # valeurs seraient stockées en base ou configurables.  Ici on
-    # applique 10 % de remise à partir de 50 unités et 20 % à partir
-    # de 100 unités.  Les valeurs sont exprimées en pourcentage.
-    QUANTITY_DISCOUNTS = {
-        100: Decimal("0.20"),
-        50: Decimal("0.10"),
-    }
-    # Remises par marque (slug ou nom) → pourcentage.
-    BRAND_DISCOUNTS = {
-        "acme": Decimal("0.05"),  # 5 % de remise sur la marque Acme
-    }
-    # Remises par famille de produits (catégorie) → pourcentage.
-    FAMILY_DISCOUNTS = {
-        "Electronics": Decimal("0.03"),
-    }
-    # Prix plancher exprimé en pourcentage du prix public.  Le prix
-    # final ne descendra jamais en dessous de 70 % du prix public.
-    FLOOR_PERCENT = Decimal("0.70")
+    Les taux ne sont plus codés en dur : ils sont administrés en base
+    (``catalog.PricingRule``) puis compilés en ``AdvancedRuleSet``,
+    passé explicitement à chaque méthode.  Aucune méthode ne trie ni ne
+    lit la base.
+    """
 
-    @classmethod
-    def apply_quantity_discount(cls, unit_price: Decimal, quantity: int) -> Decimal:
+    @staticmethod
+    def apply_quantity_discount(unit_price: Decimal, quantity: int, rules: AdvancedRuleSet) -> Decimal:
         """Calcule un prix unitaire après remise par quantité.
 
         Les remises sont cumulables avec la grille B2B et les promos.
-        La remise la plus élevée applicable est choisie (ex: pour
-        120 unités, la remise de 20 % s'applique).
+        On applique la remise du plus grand seuil atteint (ex: avec des
+        seuils à 50 et 100 unités, 120 unités donnent la remise de 100).
         """
-        discount_rate = Decimal("0")
-        for threshold, rate in sorted(cls.QUANTITY_DISCOUNTS.items(), reverse=True):
-            if quantity >= threshold:
-                discount_rate = rate
-                break
-        if discount_rate > 0:
-            unit_price = (unit_price * (Decimal("1.0") - discount_rate)).quantize(
-                Decimal("0.01")
-            )
-        return unit_price
+        return _discount(unit_price, rules.quantity_rate(quantity))
 
-    @classmethod
+    @staticmethod
     def apply_brand_discount(
-        cls,
         unit_price: Decimal,
-        brand_slug: Optional[str] = None,
-        brand_name: Optional[str] = None,
+        brand_id: Optional[int],
+        rules: AdvancedRuleSet,
     ) -> Decimal:
-        """Applique une remise en fonction de la marque.
-
-        Le domaine ne dépend plus d'un objet produit concret ; seules les
-        informations nécessaires (slug / nom de la marque) sont passées.
-        """
-        discount_rate = Decimal("0")
-        if brand_slug and brand_slug.lower() in cls.BRAND_DISCOUNTS:
-            discount_rate = cls.BRAND_DISCOUNTS[brand_slug.lower()]
-        elif brand_name and brand_name in cls.BRAND_DISCOUNTS:
-            discount_rate = cls.BRAND_DISCOUNTS[brand_name]
-        if discount_rate > 0:
-            unit_price = (unit_price * (Decimal("1.0") - discount_rate)).quantize(
-                Decimal("0.01")
-            )
-        return unit_price
+        """Applique une remise en fonction de la marque (par identifiant)."""
+        if brand_id is None:
+            return unit_price
+        return _discount(unit_price, rules.brand_rates.get(brand_id, Decimal("0")))
 
-    @classmethod
+    @staticmethod
     def apply_family_discount(
-        cls,
         unit_price: Decimal,
-        category_name: Optional[str] = None,
+        category_id: Optional[int],
+        rules: AdvancedRuleSet,
     ) -> Decimal:
-        """Applique une remise basée sur la catégorie du produit.
-
-        Si le nom de la catégorie du produit figure dans
-        ``FAMILY_DISCOUNTS``, la remise correspondante est appliquée.
-        """
-        discount_rate = Decimal("0")
-        if category_name and category_name in cls.FAMILY_DISCOUNTS:
-            discount_rate = cls.FAMILY_DISCOUNTS[category_name]
-        if discount_rate > 0:
-            unit_price = (unit_price * (Decimal("1.0") - discount_rate)).quantize(
-                Decimal("0.01")
-            )
-        return unit_price
+        """Applique une remise basée sur la catégorie du produit (par identifiant)."""
+        if category_id is None:
+            return unit_price
+        return _discount(unit_price, rules.family_rates.get(category_id, Decimal("0")))
 
-    @classmethod
-    def apply_floor(cls, unit_price: Decimal, public_price: Optional[Decimal]) -> Decimal:
+    @staticmethod
+    def apply_floor(unit_price: Decimal, public_price: Optional[Decimal], rules: AdvancedRuleSet) -> Decimal:
         """Assure que le prix ne descend pas sous un prix plancher.
 
         Le prix plancher est défini comme un pourcentage du prix public.
         Si le prix actuel est inférieur à ce minimum, on le remonte au
-        prix plancher.
+        prix plancher.  Sans règle de plancher, le prix est inchangé.
         """
-        if public_price is None:
+        if public_price is None or rules.floor_percent is None:
             return unit_price
-        floor_price = (Decimal(public_price) * cls.FLOOR_PERCENT).quantize(Decimal("0.01"))
+        floor_price = (Decimal(public_price) * rules.floor_percent).quantize(Decimal("0.01"))
         return unit_price if unit_price >= floor_price else floor_price
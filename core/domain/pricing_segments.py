@@ -0,0 +1,86 @@
+"""Segments de tarification.
+
+Le prix unitaire d'un produit ne dépend que d'un petit nombre
+d'attributs de l'utilisateur : son ``client_type`` (grille B2B et
+ciblage des catalogues par type de client), la vérification de son
+compte B2B (surcharge de +5 %) et la présence d'un numéro client (sans
+numéro client, aucune promotion catalogue ne s'applique).  Tous les
+utilisateurs partageant ces attributs paient donc le même prix : ils
+forment un *segment* et peuvent partager les mêmes entrées de cache.
+
+Seuls les utilisateurs visés nommément par une promotion (numéro client
+listé dans ``allowed_customer_numbers`` ou compte présent dans
+``target_users``) reçoivent une clé propre.  Elle comprend leur numéro
+client, dont dépendent les promotions réservées.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from typing import Dict, Optional
+
+from core.domain.dto import UserDTO
+
+ANONYMOUS_SEGMENT = "anon"
+
+# Types de client connus (voir ``userauths.User.CLIENT_TYPE_CHOICES``).
+CLIENT_TYPES = ("wholesaler", "big_retail", "small_retail", "regular")
+
+# Numéro client fictif des utilisateurs représentatifs : il n'apparaît
+# dans aucune liste ``allowed_customer_numbers``.
+_SEGMENT_CUSTOMER_NUMBER = "__segment__"
+
+
+def pricing_segment(user_dto: Optional[UserDTO], user_specific: bool = False) -> str:
+    """Retourne la clé de segment de tarification de ``user_dto``.
+
+    ``user_specific`` indique que l'utilisateur est ciblé nommément par
+    au moins une promotion active ; la clé inclut alors son identifiant
+    et une empreinte de son numéro client (les promotions réservées en
+    dépendent).  Les attributs du segment restent présents dans la clé
+    afin qu'un changement de ``client_type``, de vérification ou de
+    numéro client produise une nouvelle clé.
+    """
+    if user_dto is None:
+        return ANONYMOUS_SEGMENT
+    client_type = user_dto.client_type or "regular"
+    verified = "v" if user_dto.is_b2b_verified else "nv"
+    if user_specific:
+        # Empreinte courte : un numéro client peut contenir des caractères
+        # interdits dans une clé de cache (espaces…)
+        customer = hashlib.sha1((user_dto.customer_number or "").encode()).hexdigest()[:10]
+        return f"u{user_dto.id}:{client_type}:{verified}:{customer}"
+    customer = "c" if user_dto.customer_number else "nc"
+    return f"{client_type}:{verified}:{customer}"
+
+
+def materialized_segment(user_dto: Optional[UserDTO]) -> str:
+    """Retourne le segment partagé de ``user_dto``, même s'il est ciblé nommément.
+
+    Seuls les segments partagés sont matérialisés (``segment_users``) : un
+    utilisateur ciblé nommément y lit les prix de son segment de base, ses
+    prix propres ne différant que sur les produits qui le visent.
+    """
+    return pricing_segment(user_dto)
+
+
+def segment_users() -> Dict[str, Optional[UserDTO]]:
+    """Retourne ``{segment: utilisateur représentatif}`` pour chaque segment partagé.
+
+    Le prix calculé pour l'utilisateur représentatif est celui de tout
+    utilisateur non ciblé nommément du même segment.  Utilisé pour
+    matérialiser les prix par segment (``catalog.ProductSegmentPrice``).
+    """
+    users: Dict[str, Optional[UserDTO]] = {ANONYMOUS_SEGMENT: None}
+    for client_type in CLIENT_TYPES:
+        for verified in (True, False):
+            for customer_number in (_SEGMENT_CUSTOMER_NUMBER, None):
+                user_dto = UserDTO(
+                    id=0,
+                    email="",
+                    client_type=client_type,
+                    customer_number=customer_number,
+                    is_b2b_verified=verified,
+                )
+                users[pricing_segment(user_dto)] = user_dto
+    return users
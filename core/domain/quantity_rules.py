@@ -0,0 +1,39 @@
+"""Règles de quantité de commande (MOQ / PCB).
+
+Fonctions pures partagées par le panier de session, les repositories et
+la saisie en masse : elles n'acceptent que des objets duck-typés
+(modèle ``Product``, ``ProductDTO`` ou ``ProductRecord``) exposant
+``min_order_qty``, ``pcb_qty`` et ``order_in_packs``.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+
+def normalize_quantity(product: Any, quantity: int, min_qty: int = 1) -> int:
+    """Applique les règles de quantité d'un produit à ``quantity`` (> 0).
+
+    La quantité est relevée au minimum de commande (``min_qty`` global ou
+    ``min_order_qty`` du produit, le plus grand des deux), puis arrondie
+    au multiple de PCB supérieur si le produit se commande par colis
+    (``order_in_packs``).
+    """
+    prod_min = getattr(product, "min_order_qty", None)
+    if isinstance(prod_min, int) and prod_min > 0:
+        min_qty = max(min_qty, prod_min)
+
+    pcb = None
+    if getattr(product, "order_in_packs", False):
+        try:
+            pcb_val = int(getattr(product, "pcb_qty", 1) or 1)
+            if pcb_val > 1:
+                pcb = pcb_val
+        except (TypeError, ValueError):
+            pcb = None
+
+    if quantity < min_qty:
+        quantity = min_qty
+    if pcb:
+        quantity = ((quantity + pcb - 1) // pcb) * pcb
+    return quantity
@@ -9,15 +9,20 @@ vues HTTP à ces détails d'infrastructure.
 from __future__ import annotations
 
 from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
 
 from core.repositories.products_django import DjangoProductRepository
+from core.repositories.cart_db import DatabaseCartRepository
 from core.repositories.cart_session import SessionCartRepository
 from core.repositories.orders_django import DjangoOrderRepository
+from core.repositories.saved_carts_django import DjangoSavedCartRepository
 from core.services.pricing_service import PromoAwareB2BPricingService
 from core.adapters.orm_promo_adapter import DjangoPromoCatalogAdapter
+from core.adapters.orm_pricing_rules_adapter import DjangoPricingRulesAdapter
 from core.services.cart import CartService
 from core.services.orders import OrderService
 from core.services.products import ProductService
+from core.services.saved_carts import SavedCartService
 
 
 def get_product_service() -> ProductService:
@@ -28,12 +33,38 @@ def get_product_service() -> ProductService:
 def get_pricing_service() -> PromoAwareB2BPricingService:
     """Fabrique du service de pricing centralisé."""
     promo_adapter = DjangoPromoCatalogAdapter()
-    return PromoAwareB2BPricingService(promo_catalog_adapter=promo_adapter)
+    rules_adapter = DjangoPricingRulesAdapter()
+    return PromoAwareB2BPricingService(
+        promo_catalog_adapter=promo_adapter,
+        pricing_rules_adapter=rules_adapter,
+    )
+
+
+# Implémentations de ``CartRepository`` sélectionnables par ``CART_REPOSITORY``.
+CART_REPOSITORIES = {
+    "session": SessionCartRepository,
+    "database": DatabaseCartRepository,
+}
+
+
+def get_cart_repository():
+    """Repository de panier choisi par le réglage ``CART_REPOSITORY``.
+
+    ``"session"`` (défaut) conserve le panier en session ; ``"database"``
+    l'enregistre en base pour les utilisateurs authentifiés.
+    """
+    name = getattr(settings, "CART_REPOSITORY", "session")
+    try:
+        return CART_REPOSITORIES[name]()
+    except KeyError:
+        raise ImproperlyConfigured(
+            f"CART_REPOSITORY inconnu : {name!r} (valeurs possibles : {', '.join(CART_REPOSITORIES)})"
+        )
 
 
 def get_cart_service() -> CartService:
     product_repo = DjangoProductRepository()
-    cart_repo = SessionCartRepository()
+    cart_repo = get_cart_repository()
     pricing_service = get_pricing_service()
     return CartService(
         product_repo=product_repo,
@@ -43,6 +74,14 @@ def get_cart_service() -> CartService:
 
 
 def get_order_service() -> OrderService:
-    cart_repo = SessionCartRepository()
+    cart_repo = get_cart_repository()
     order_repo = DjangoOrderRepository()
-    return OrderService(cart_repo=cart_repo, order_repo=order_repo)
+    return OrderService(cart_repo=cart_repo, order_repo=order_repo, cart_service=get_cart_service())
+
+
+def get_saved_cart_service() -> SavedCartService:
+    return SavedCartService(
+        saved_cart_repo=DjangoSavedCartRepository(),
+        cart_repo=get_cart_repository(),
+        cart_service=get_cart_service(),
+    )
@@ -1,33 +1,57 @@
 from __future__ import annotations
 
 from decimal import Decimal
-from typing import Iterable, Optional, Protocol
+from typing import Dict, Iterable, List, Optional, Protocol
+
+from core.domain.cart_pricing import CartPriceState
 
 # The domain now provides canonical DTOs in ``core.domain.dto``.
 from core.domain.dto import (
     ProductDTO,
-    CartItemDTO,
+    CartLine,
     CartDTO,
     OrderDTO,
+    OrderLine,
+    SavedCartDTO,
     UserDTO,
+    UserLike,
 )
 
 
 class ProductRepository(Protocol):
     def get_by_id(self, product_id: int) -> ProductDTO: ...
     def get_by_sku(self, sku: str) -> ProductDTO: ...
+    def get_many_by_codes(self, codes: Iterable[str]) -> Dict[str, ProductDTO]: ...
+    def get_many_by_ids(self, product_ids: Iterable[int]) -> Dict[int, ProductDTO]: ...
     def search(self, query: str | None = None) -> Iterable[ProductDTO]: ...
 
 
 class CartRepository(Protocol):
     def get_for_request(self, request) -> CartDTO: ...
     def save_for_request(self, request, cart: CartDTO) -> CartDTO: ...
+    def get_price_state(self, request) -> CartPriceState: ...
+    def save_price_state(self, request, state: CartPriceState) -> None: ...
 
 
 class OrderRepository(Protocol):
     def create_from_cart(self, cart: CartDTO, user_id: int | None) -> OrderDTO: ...
+    def assign_number(self, order_id: int) -> OrderDTO: ...
     def list_for_user(self, user_id: int) -> Iterable[OrderDTO]: ...
     def get_for_user(self, order_id: int, user_id: int) -> OrderDTO: ...
+    def get_reorder_lines(self, order_ids: Iterable[int], user_id: int) -> List[OrderLine]: ...
+
+
+class SavedCartRepository(Protocol):
+    def list_for_user(self, user_id: int) -> List[SavedCartDTO]: ...
+    def get_for_user(self, saved_cart_id: int, user_id: int) -> SavedCartDTO: ...
+    def save(
+        self,
+        name: str,
+        lines: Iterable[tuple[int, int]],
+        user_id: int,
+        client_id: int | None = None,
+    ) -> SavedCartDTO: ...
+    def delete(self, saved_cart_id: int, user_id: int) -> None: ...
 
 
 class PricingService(Protocol):
@@ -36,10 +60,21 @@ class PricingService(Protocol):
 
     - ``get_unit_price`` est la méthode principale, utilisée par les
       couches orientées domaine (Django ORM + moteur de pricing).
+    - ``get_unit_prices`` en est la variante par lot (listes, paniers).
+    - ``pricing_segment`` / ``get_segment_prices`` exposent les segments
+      de tarification (cache partagé, table ``ProductSegmentPrice``).
     - ``compute_unit_price`` reste disponible pour compatibilité avec
       l'ancien code basé sur ``ProductDTO`` minimal.
     """
 
     def get_unit_price(self, product: ProductDTO, user: Optional[UserDTO] = None) -> Decimal: ...
+    def get_unit_prices(self, products: Iterable[ProductDTO], user: Optional[UserDTO] = None) -> Dict[int, Decimal]: ...
+    def pricing_segment(self, user: Optional[UserDTO] = None) -> str: ...
+    def get_segment_prices(self, products: Iterable[ProductDTO]) -> Dict[str, Dict[int, Decimal]]: ...
     def compute_unit_price(self, product: ProductDTO, client_type: Optional[str] = None) -> Decimal: ...
-    def calculate_cart(self, items: Iterable[CartItemDTO], user: Optional[UserDTO] = None): ...
+    def calculate_cart(
+        self,
+        items: Iterable[CartLine],
+        user: Optional[UserLike] = None,
+        state: Optional[CartPriceState] = None,
+    ): ...
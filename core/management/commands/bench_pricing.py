@@ -0,0 +1,107 @@
+"""
+Commande de gestion exécutant la suite de benchmarks de la tarification.
+
+Les mesures (médiane et minimum en µs par opération) sont affichées et
+peuvent être enregistrées en JSON via ``--output``.  Avec ``--baseline``,
+chaque cas est comparé à un résultat de référence : la commande échoue
+si une médiane se dégrade de plus de ``--threshold`` (25 % par défaut).
+
+Exemple ::
+
+    python manage.py bench_pricing --output bench/main.json
+    python manage.py bench_pricing --baseline bench/main.json --threshold 0.2
+
+Les données synthétiques sont créées dans une transaction annulée (voir
+``benchmarks.pricing``).  À ne pas lancer sur la production : la base et
+le cache partagé sont sollicités pendant toute la mesure.
+"""
+
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from benchmarks.pricing import (
+    DEFAULT_CART_SIZES,
+    DEFAULT_CATALOG_COUNTS,
+    DEFAULT_THRESHOLD,
+    compare,
+    run_pricing_benchmarks,
+)
+
+
+def _sizes(value):
+    try:
+        return tuple(int(part) for part in value.split(",") if part.strip())
+    except ValueError:
+        raise CommandError(f"Liste de tailles invalide : {value}")
+
+
+class Command(BaseCommand):
+    help = "Mesure les performances de la tarification et détecte les régressions."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--products", type=int, default=500, help="Nombre de produits synthétiques.")
+        parser.add_argument("--repeat", type=int, default=7, help="Nombre d'échantillons par cas.")
+        parser.add_argument(
+            "--cart-sizes",
+            default=",".join(map(str, DEFAULT_CART_SIZES)),
+            help="Tailles de panier, séparées par des virgules.",
+        )
+        parser.add_argument(
+            "--catalogs",
+            default=",".join(map(str, DEFAULT_CATALOG_COUNTS)),
+            help="Nombres de catalogues promo actifs, séparés par des virgules.",
+        )
+        parser.add_argument("--seed", type=int, default=42, help="Graine du générateur de données.")
+        parser.add_argument("--output", type=str, help="Fichier JSON où enregistrer les résultats.")
+        parser.add_argument("--baseline", type=str, help="Résultats JSON de référence à comparer.")
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=DEFAULT_THRESHOLD,
+            help="Dégradation relative tolérée de la médiane (0.25 = +25 %%).",
+        )
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options["baseline"]:
+            baseline_path = Path(options["baseline"])
+            if not baseline_path.exists():
+                raise CommandError(f"Le fichier {baseline_path} n'existe pas.")
+            baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+
+        try:
+            report = run_pricing_benchmarks(
+                products=options["products"],
+                repeat=options["repeat"],
+                cart_sizes=_sizes(options["cart_sizes"]),
+                catalog_counts=_sizes(options["catalogs"]),
+                seed=options["seed"],
+            )
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        for name, result in report["results"].items():
+            self.stdout.write(f"{name:<28} médiane {result['median_us']:>12.2f} µs   min {result['min_us']:>12.2f} µs")
+
+        if options["output"]:
+            output_path = Path(options["output"])
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            output_path.write_text(json.dumps(report, indent=2, sort_keys=True), encoding="utf-8")
+            self.stdout.write(self.style.SUCCESS(f"Résultats enregistrés dans {output_path}"))
+
+        if baseline is None:
+            return
+        comparisons = compare(baseline, report, options["threshold"])
+        regressions = [comparison for comparison in comparisons if comparison.regressed]
+        for comparison in comparisons:
+            line = (
+                f"{comparison.name:<28} {comparison.baseline_us:>12.2f} -> "
+                f"{comparison.current_us:>12.2f} µs  (x{comparison.ratio:.2f})"
+            )
+            self.stdout.write(self.style.ERROR(line) if comparison.regressed else line)
+        if regressions:
+            names = ", ".join(comparison.name for comparison in regressions)
+            raise CommandError(f"Régression de performance au-delà de {options['threshold']:.0%} : {names}")
+        self.stdout.write(self.style.SUCCESS("Aucune régression détectée."))
@@ -0,0 +1,11 @@
+from abc import ABC, abstractmethod
+
+
+class PricingRulesPort(ABC):
+    @abstractmethod
+    def get_rules(self):
+        """Retourne les règles avancées compilées (``CompiledPricingRules``).
+
+        L'appel doit être peu coûteux : il est fait à chaque
+        prévisualisation de prix.
+        """
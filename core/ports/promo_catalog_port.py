@@ -1,7 +1,40 @@
-
 from abc import ABC, abstractmethod
 
 class PromoCatalogPort(ABC):
     @abstractmethod
     def get_applicable_promo(self, product_dto, user_dto):
         pass
+
+    def get_applicable_promos(self, product_dtos, user_dto):
+        """Variante par lot de ``get_applicable_promo``.
+
+        Retourne un dictionnaire ``{product_id: PromoItemDTO}`` ne contenant
+        que les produits pour lesquels une promotion s'applique.  Cette
+        implémentation par défaut boucle sur ``get_applicable_promo`` ; les
+        adaptateurs concrets peuvent la surcharger pour résoudre tout le
+        lot en une seule requête.
+        """
+        promos = {}
+        for product_dto in product_dtos:
+            promo = self.get_applicable_promo(product_dto, user_dto)
+            if promo is not None:
+                promos[product_dto.id] = promo
+        return promos
+
+    def has_user_specific_promos(self, user_dto):
+        """Indique si ``user_dto`` est ciblé nommément par une promotion active.
+
+        Un utilisateur ciblé nommément (numéro client ou ``target_users``)
+        ne peut pas partager le cache de prix de son segment.  Par
+        prudence, l'implémentation par défaut répond ``True`` dès qu'un
+        utilisateur est fourni.
+        """
+        return user_dto is not None
+
+    def get_user_specific_product_ids(self, user_dto):
+        """Retourne les ids des produits dont une promotion vise ``user_dto`` nommément.
+
+        Sur les autres produits, ``user_dto`` paie le prix de son segment
+        partagé.  L'implémentation par défaut n'en connaît aucun.
+        """
+        return frozenset()
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+from typing import Dict, Optional, Tuple
+
+from django.db import transaction
+
+from cart.context import get_cart_context  # type: ignore
+from cart.models import Cart as StoredCart, CartLine  # type: ignore
+from catalog.models import Product
+from core.domain.dto import CartDTO
+from core.repositories.cart_session import SessionCartRepository
+from core.utils.shared_cache import get_shared_cache
+
+# Clé du cache d'écriture immédiate : ``(cart_id, {product_id: quantité})``.
+CACHE_KEY = "cart:stored:{user_id}"
+CACHE_TTL = 24 * 3600
+
+# Marque la session comme recopie du panier enregistré de cet utilisateur.
+OWNER_SESSION_KEY = "cart_owner"
+
+
+class DatabaseCartRepository(SessionCartRepository):
+    """
+    Repository de panier persistant pour les utilisateurs authentifiés.
+
+    Le panier d'un utilisateur connecté est enregistré dans les tables
+    ``cart.Cart`` / ``cart.CartLine`` et retrouvé sur tous ses appareils ;
+    les visiteurs anonymes gardent le panier de session.
+
+    La session reste la copie de travail de la requête (vues, context
+    processor, ``CartContext``) : ``get_for_request`` y recopie le panier
+    enregistré, ``save_for_request`` normalise les quantités en session
+    puis n'écrit en base que les lignes modifiées, en une seule requête
+    d'upsert et une seule suppression.  Les lectures passent par un
+    cache mis à jour à chaque écriture (write-through), tenu dans le cache
+    commun à tous les processus (``get_shared_cache``) : une copie propre à
+    un worker, restée ancienne, serait recopiée en session par
+    ``get_for_request`` et effacerait les lignes ajoutées via un autre.
+    """
+
+    # ------------------------------------------------------------------
+    # API CartRepository
+    # ------------------------------------------------------------------
+    def get_for_request(self, request) -> CartDTO:
+        user_id = self._user_id(request)
+        if user_id is not None:
+            if request.session.get(OWNER_SESSION_KEY) != user_id:
+                # Session pas encore rattachée (connexion sans le signal,
+                # bascule depuis le repository de session…) : on fusionne.
+                self.merge_session_cart(request, request.user)
+            else:
+                _, stored = self._load(user_id)
+                cart_obj = get_cart_context(request).cart
+                if cart_obj.quantities() != stored:
+                    cart_obj.replace(stored)
+        return super().get_for_request(request)
+
+    def save_for_request(self, request, cart: CartDTO) -> CartDTO:
+        persisted = super().save_for_request(request, cart)
+        user_id = self._user_id(request)
+        if user_id is not None:
+            self._store(user_id, get_cart_context(request).cart.quantities())
+            _set_owner(request.session, user_id)
+        return persisted
+
+    def merge_session_cart(self, request, user) -> None:
+        """Fusionne le panier anonyme de la session dans le panier enregistré.
+
+        Appelé à la connexion : les quantités d'un même produit
+        s'additionnent (chacune respectant déjà MOQ et PCB, leur somme
+        aussi).  Une session qui est déjà la recopie du panier de cet
+        utilisateur n'est pas fusionnée une seconde fois.
+        """
+        if request.session.get(OWNER_SESSION_KEY) == user.pk:
+            return
+        cart_obj = get_cart_context(request).cart
+        _, merged = self._load(user.pk)
+        session_lines = cart_obj.quantities()
+        # Écarte les produits supprimés depuis leur ajout en session
+        existing = set(Product.objects.filter(id__in=session_lines).values_list("id", flat=True))
+        for product_id, quantity in session_lines.items():
+            if product_id in existing:
+                merged[product_id] = merged.get(product_id, 0) + quantity
+        self._store(user.pk, merged)
+        cart_obj.replace(merged)
+        _set_owner(request.session, user.pk)
+
+    # ------------------------------------------------------------------
+    # Persistance
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _user_id(request) -> Optional[int]:
+        user = getattr(request, "user", None)
+        if user is None or not getattr(user, "is_authenticated", False):
+            return None
+        return user.pk
+
+    def _load(self, user_id: int) -> Tuple[Optional[int], Dict[int, int]]:
+        """Retourne ``(cart_id, {product_id: quantité})``, depuis le cache si possible."""
+        key = CACHE_KEY.format(user_id=user_id)
+        cache = get_shared_cache()
+        cached = cache.get(key)
+        if cached is not None:
+            cart_id, lines = cached
+            return cart_id, dict(lines)
+        cart_id = StoredCart.objects.filter(user_id=user_id).values_list("id", flat=True).first()
+        lines: Dict[int, int] = {}
+        if cart_id is not None:
+            lines = dict(CartLine.objects.filter(cart_id=cart_id).values_list("product_id", "quantity"))
+        cache.set(key, (cart_id, lines), CACHE_TTL)
+        return cart_id, dict(lines)
+
+    def _store(self, user_id: int, quantities: Dict[int, int]) -> None:
+        """Écrit les seules différences entre ``quantities`` et le panier enregistré."""
+        cart_id, stored = self._load(user_id)
+        changed = {pid: qty for pid, qty in quantities.items() if stored.get(pid) != qty}
+        removed = [pid for pid in stored if pid not in quantities]
+        if not changed and not removed:
+            return
+        key = CACHE_KEY.format(user_id=user_id)
+        cache = get_shared_cache()
+        with transaction.atomic():
+            if cart_id is None:
+                cart_id = StoredCart.objects.get_or_create(user_id=user_id)[0].pk
+            if changed:
+                CartLine.objects.bulk_create(
+                    [CartLine(cart_id=cart_id, product_id=pid, quantity=qty) for pid, qty in changed.items()],
+                    update_conflicts=True,
+                    unique_fields=["cart", "product"],
+                    update_fields=["quantity", "updated_at"],
+                )
+            if removed:
+                CartLine.objects.filter(cart_id=cart_id, product_id__in=removed).delete()
+            # Le cache n'est réécrit qu'une fois les lignes validées ; d'ici
+            # là les lectures repassent par la base.
+            cache.delete(key)
+            state = (cart_id, dict(quantities))
+            transaction.on_commit(lambda: cache.set(key, state, CACHE_TTL))
+
+
+def _set_owner(session, user_id: int) -> None:
+    # Évite de marquer la session modifiée (et de la réécrire) sans raison
+    if session.get(OWNER_SESSION_KEY) != user_id:
+        session[OWNER_SESSION_KEY] = user_id
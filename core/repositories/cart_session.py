@@ -2,10 +2,15 @@ from __future__ import annotations
 
 # Importation du panier basé session.  On ignore le type car cette
 # classe n'est pas définie dans le domaine et dépend de Django.
-from cart.cart import Cart  # type: ignore
-from core.domain.dto import CartDTO, CartItemDTO, ProductDTO
+from cart.cart import normalize_quantity  # type: ignore
+from cart.context import get_cart_context  # type: ignore
+from core.domain.cart_pricing import CartPriceState
+from core.domain.dto import CartDTO, CartLineRecord, ProductRecord
 from core.interfaces import CartRepository
 
+# Clé de session des prix par ligne (tarification incrémentale).
+PRICE_STATE_SESSION_ID = "cart_prices"
+
 
 class SessionCartRepository(CartRepository):
     """
@@ -17,16 +22,19 @@ class SessionCartRepository(CartRepository):
 
         Cette implémentation ne calcule aucun prix.  Elle convertit
         uniquement les identifiants de produit et les quantités en
-        ``CartItemDTO`` contenant un ``ProductDTO`` minimal.  Le calcul
-        du prix est délégué au service de panier.
+        ``CartLineRecord`` contenant un ``ProductRecord`` minimal (les
+        données viennent de l'ORM : aucune validation pydantic n'est
+        nécessaire).  Le calcul du prix est délégué au service de panier.
+        Le ``Cart`` est celui du contexte de la requête : les produits ne
+        sont chargés qu'une fois, quel que soit le nombre d'appels.
         """
-        cart_obj = Cart(request)
-        items: list[CartItemDTO] = []
+        cart_obj = get_cart_context(request).cart
+        items: list[CartLineRecord] = []
         for entry in cart_obj:
             product = entry["product"]
-            # Construit un ProductDTO avec les seules informations
+            # Construit un ProductRecord avec les seules informations
             # nécessaires pour identifier le produit et calculer les prix
-            product_dto = ProductDTO(
+            product_dto = ProductRecord(
                 id=product.id,
                 sku=getattr(product, "article_code", "") or getattr(product, "sku", ""),
                 price=getattr(product, "price", None),
@@ -36,9 +44,12 @@ class SessionCartRepository(CartRepository):
                 price_small_retail=getattr(product, "price_small_retail", None),
                 title=getattr(product, "title", None),
                 is_active=getattr(product, "is_active", None),
+                min_order_qty=getattr(product, "min_order_qty", None),
+                pcb_qty=getattr(product, "pcb_qty", None),
+                order_in_packs=getattr(product, "order_in_packs", False),
                 unit_price=None,
             )
-            items.append(CartItemDTO(product=product_dto, quantity=entry["quantity"]))
+            items.append(CartLineRecord(product=product_dto, quantity=entry["quantity"]))
         user_id = request.user.id if getattr(request.user, "is_authenticated", False) else None
         return CartDTO(user_id=user_id, items=items, total=None)
 
@@ -49,16 +60,31 @@ class SessionCartRepository(CartRepository):
         stockés.  Les informations de prix et autres attributs sont
         volontairement ignorées afin de respecter la règle du single
         source of truth pour les calculs financiers.
+
+        Les quantités sont normalisées (MOQ / PCB) à partir des attributs
+        portés par les produits des lignes, sans relire la base, puis la
+        session est écrite une seule fois quel que soit le nombre de
+        lignes.
         """
-        cart_obj = Cart(request)
-        cart_obj.clear()
+        cart_obj = get_cart_context(request).cart
+        quantities: dict[int, int] = {}
         for item in cart.items:
-            cart_obj.add(
-                product_id=item.product.id,
-                quantity=item.quantity,
-                override=False,
-            )
+            if item.quantity <= 0:
+                continue
+            total = quantities.get(item.product.id, 0) + item.quantity
+            quantities[item.product.id] = normalize_quantity(item.product, total)
+        cart_obj.replace(quantities)
         # Après persistance, on ne calcule plus le total ici ; il
         # restera ``None`` jusqu'à ce que le service de panier applique
         # le moteur de pricing.
         return CartDTO(user_id=cart.user_id, items=cart.items, total=None)
+
+    def get_price_state(self, request) -> CartPriceState:
+        """Retourne les prix par ligne mémorisés en session (état vide par défaut)."""
+        return CartPriceState.from_dict(request.session.get(PRICE_STATE_SESSION_ID))
+
+    def save_price_state(self, request, state: CartPriceState) -> None:
+        """Mémorise les prix par ligne ; la session n'est réécrite que s'ils ont changé."""
+        data = state.to_dict()
+        if request.session.get(PRICE_STATE_SESSION_ID) != data:
+            request.session[PRICE_STATE_SESSION_ID] = data
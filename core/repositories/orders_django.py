@@ -1,9 +1,13 @@
 from __future__ import annotations
 
 from decimal import Decimal
-from typing import Iterable
+from typing import Dict, Iterable, List
+
+from django.db import transaction
 
 from orders.models import Order, OrderItem
+from orders.stock import reserve_stock
+from core.domain.dto import OrderLine
 from core.interfaces import OrderRepository, OrderDTO, CartDTO
 
 
@@ -22,25 +26,34 @@ class DjangoOrderRepository(OrderRepository):
         )
 
     def create_from_cart(self, cart: CartDTO, user_id: int | None) -> OrderDTO:
-        """Crée une commande à partir d'un ``CartDTO``.
+        """Crée une commande à partir d'un ``CartDTO`` tarifé.
 
-        Les identifiants de produit et les quantités sont extraits du
-        ``product`` contenu dans chaque ``CartItemDTO``.  Le prix
-        unitaire est lu directement depuis la ligne.  Le total de la
-        commande est fourni par le cart.
+        Les lignes sont construites en mémoire (``OrderItem.from_cart_line``)
+        et écrites par un seul ``bulk_create`` après réservation du stock
+        (``orders.stock.reserve_stock``), le tout dans une transaction.  Le
+        total de la commande est la somme des lignes.  La commande porte un
+        numéro provisoire : l'appelant attribue le définitif
+        (``assign_number``) en dernier dans sa transaction.
         """
-        order = Order.objects.create(
-            user_id=user_id,
-            total=cart.total or 0,
-            status="pending",
-        )
-        for item in cart.items:
-            OrderItem.objects.create(
-                order=order,
-                product_id=item.product.id,
-                quantity=item.quantity,
-                price=item.unit_price,
-            )
+        with transaction.atomic():
+            order = Order(user_id=user_id, status="pending", order_number=Order.provisional_number())
+            items: List[OrderItem] = []
+            quantities: Dict[int, int] = {}
+            total = Decimal("0")
+            for item in cart.items:
+                items.append(OrderItem.from_cart_line(order, item))
+                quantities[item.product.id] = quantities.get(item.product.id, 0) + item.quantity
+                total += item.total_price or Decimal("0")
+            reserve_stock(quantities)
+            order.subtotal = order.total = total
+            order.save()
+            OrderItem.objects.bulk_create(items)
+        return self._to_dto(order)
+
+    def assign_number(self, order_id: int) -> OrderDTO:
+        """Attribue son numéro définitif à la commande ``order_id`` (cf. ``Order.assign_number``)."""
+        order = Order.objects.get(pk=order_id)
+        order.assign_number()
         return self._to_dto(order)
 
     def list_for_user(self, user_id: int) -> Iterable[OrderDTO]:
@@ -50,3 +63,26 @@ class DjangoOrderRepository(OrderRepository):
     def get_for_user(self, order_id: int, user_id: int) -> OrderDTO:
         obj = Order.objects.get(id=order_id, user_id=user_id)
         return self._to_dto(obj)
+
+    def get_reorder_lines(self, order_ids: Iterable[int], user_id: int) -> List[OrderLine]:
+        """Retourne les lignes (SKU, quantité) de commandes passées par ``user_id``.
+
+        Les lignes de toutes les commandes sont lues en une requête, dans
+        l'ordre des commandes puis des lignes.  Lève ``Order.DoesNotExist``
+        si l'une des commandes n'existe pas ou n'appartient pas à
+        l'utilisateur.
+        """
+        order_ids = list(dict.fromkeys(order_ids))
+        owned = set(Order.objects.filter(id__in=order_ids, user_id=user_id).values_list("id", flat=True))
+        missing = [order_id for order_id in order_ids if order_id not in owned]
+        if missing:
+            raise Order.DoesNotExist(f"Commandes introuvables : {', '.join(map(str, missing))}")
+        rows = (
+            OrderItem.objects.filter(order_id__in=order_ids)
+            .order_by("order__created_at", "order_id", "id")
+            .values_list("product_sku", "quantity")
+        )
+        return [
+            OrderLine(line=number, code=sku, quantity=quantity)
+            for number, (sku, quantity) in enumerate(rows, start=1)
+        ]
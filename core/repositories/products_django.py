@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 from decimal import Decimal
-from typing import Iterable
+from typing import Dict, Iterable
+
+from django.db.models import Q
 
 from catalog.models import Product
 from core.interfaces import ProductRepository, ProductDTO
@@ -49,6 +51,9 @@ class DjangoProductRepository(ProductRepository):
             price_small_retail=small_retail,
             title=getattr(obj, "title", None),
             is_active=getattr(obj, "is_active", None),
+            min_order_qty=getattr(obj, "min_order_qty", None),
+            pcb_qty=getattr(obj, "pcb_qty", None),
+            order_in_packs=getattr(obj, "order_in_packs", False),
             unit_price=unit,
         )
 
@@ -60,11 +65,45 @@ class DjangoProductRepository(ProductRepository):
         obj = Product.objects.get(article_code=sku, is_active=True)
         return self._to_dto(obj)
 
+    def get_many_by_codes(self, codes: Iterable[str]) -> Dict[str, ProductDTO]:
+        """Résout en une requête des codes saisis par l'acheteur.
+
+        Un code peut être un code article, un SKU interne ou un EAN ; en
+        cas d'ambiguïté le code article l'emporte, puis le SKU, puis
+        l'EAN.  Les produits inactifs sont renvoyés (``is_active=False``)
+        afin que l'appelant puisse les signaler.  Retourne
+        ``{code: ProductDTO}`` pour les seuls codes reconnus.
+        """
+        codes = {code for code in codes if code}
+        if not codes:
+            return {}
+        products = list(
+            Product.objects.filter(Q(article_code__in=codes) | Q(sku__in=codes) | Q(ean__in=codes))
+        )
+        resolved: Dict[str, ProductDTO] = {}
+        # Du moins prioritaire au plus prioritaire : chaque passe écrase la précédente
+        for field in ("ean", "sku", "article_code"):
+            for obj in products:
+                code = getattr(obj, field, None)
+                if code in codes:
+                    resolved[code] = self._to_dto(obj)
+        return resolved
+
+    def get_many_by_ids(self, product_ids: Iterable[int]) -> Dict[int, ProductDTO]:
+        """Charge en une requête les produits désignés par leur identifiant.
+
+        Comme ``get_many_by_codes``, les produits inactifs sont renvoyés
+        afin que l'appelant puisse les signaler ; les identifiants
+        inconnus (produits supprimés) sont absents du résultat.
+        """
+        product_ids = set(product_ids)
+        if not product_ids:
+            return {}
+        return {obj.id: self._to_dto(obj) for obj in Product.objects.filter(pk__in=product_ids)}
+
     def search(self, query: str | None = None) -> Iterable[ProductDTO]:
         qs = Product.objects.filter(is_active=True)
         if query:
-            from django.db.models import Q
-
             qs = qs.filter(
                 Q(title__icontains=query)
                 | Q(article_code__icontains=query)
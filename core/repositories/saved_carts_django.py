@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+from typing import Iterable, List
+
+from django.db.models import Q
+
+from cart.models import SavedCart
+from clients.models import UserClientLink
+from core.interfaces import SavedCartDTO, SavedCartRepository
+
+# Rôles autorisés à modifier les listes partagées d'un client (cf. ``ClientAccessService.can_order``)
+EDITOR_ROLES = (
+    UserClientLink.Roles.OWNER,
+    UserClientLink.Roles.ADMIN,
+    UserClientLink.Roles.MEMBER,
+)
+
+
+class DjangoSavedCartRepository(SavedCartRepository):
+    """
+    Implémentation du repository de listes de commande basée sur ``cart.SavedCart``.
+
+    Un utilisateur voit ses propres listes et celles des clients auxquels
+    il est lié (lien actif) ; seuls les rôles autorisés à commander
+    peuvent créer, remplacer ou supprimer une liste partagée.
+    """
+
+    def _to_dto(self, obj: SavedCart) -> SavedCartDTO:
+        return SavedCartDTO(
+            id=obj.id,
+            name=obj.name,
+            user_id=obj.user_id,
+            client_id=obj.client_id,
+            product_ids=obj.product_ids,
+            quantities=obj.quantities,
+        )
+
+    @staticmethod
+    def _visible(user_id: int, roles: Iterable[str] | None = None):
+        links = Q(client__user_links__user_id=user_id, client__user_links__is_active=True)
+        if roles is not None:
+            links &= Q(client__user_links__role__in=roles)
+        return SavedCart.objects.filter(Q(user_id=user_id) | links)
+
+    def list_for_user(self, user_id: int) -> List[SavedCartDTO]:
+        return [self._to_dto(obj) for obj in self._visible(user_id).order_by("name", "id")]
+
+    def get_for_user(self, saved_cart_id: int, user_id: int) -> SavedCartDTO:
+        """Lève ``SavedCart.DoesNotExist`` si la liste n'est pas visible par l'utilisateur."""
+        return self._to_dto(self._visible(user_id).get(pk=saved_cart_id))
+
+    def save(
+        self,
+        name: str,
+        lines: Iterable[tuple[int, int]],
+        user_id: int,
+        client_id: int | None = None,
+    ) -> SavedCartDTO:
+        """Crée ou remplace (même nom, même propriétaire) une liste de commande.
+
+        Sans ``client_id`` la liste appartient à l'utilisateur ; sinon elle
+        est partagée par le client, ce qui suppose un lien actif avec un
+        rôle autorisé à commander (``PermissionError`` sinon).  Les
+        quantités d'un même produit sont cumulées, les lignes vides
+        ignorées.
+        """
+        quantities: dict[int, int] = {}
+        for product_id, quantity in lines:
+            if quantity > 0:
+                quantities[product_id] = quantities.get(product_id, 0) + quantity
+        if client_id is not None:
+            allowed = UserClientLink.objects.filter(
+                user_id=user_id, client_id=client_id, is_active=True, role__in=EDITOR_ROLES
+            ).exists()
+            if not allowed:
+                raise PermissionError("Vous ne pouvez pas enregistrer de liste pour ce client.")
+            owner = {"client_id": client_id}
+        else:
+            owner = {"user_id": user_id}
+        defaults = {"product_ids": list(quantities), "quantities": list(quantities.values())}
+        obj, _ = SavedCart.objects.update_or_create(
+            name=name,
+            **owner,
+            defaults=defaults,
+            create_defaults={**defaults, "created_by_id": user_id},
+        )
+        return self._to_dto(obj)
+
+    def delete(self, saved_cart_id: int, user_id: int) -> None:
+        """Lève ``SavedCart.DoesNotExist`` si la liste n'est pas modifiable par l'utilisateur."""
+        self._visible(user_id, roles=EDITOR_ROLES).get(pk=saved_cart_id).delete()
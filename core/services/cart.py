@@ -1,15 +1,16 @@
 from __future__ import annotations
 
 from decimal import Decimal
+from typing import Iterable
 
+from core.domain.dto import BulkAddLine, BulkAddResult, CartChanges, CartLineRecord, OrderLine, UserRecord
 from core.interfaces import (
     ProductRepository,
     CartRepository,
     PricingService,
     CartDTO,
-    CartItemDTO,
+    CartLine,
     ProductDTO,
-    UserDTO,
 )
 from core.utils.auth import get_current_client
 
@@ -33,6 +34,28 @@ class CartService:
         self.cart_repo = cart_repo
         self.pricing_service = pricing_service
 
+    @staticmethod
+    def _user_record(request) -> UserRecord | None:
+        """Construit le ``UserRecord`` de tarification de la requête.
+
+        Certaines installations peuvent ne pas disposer du modèle
+        utilisateur ou des champs attendus, c'est pourquoi nous utilisons
+        getattr avec des valeurs par défaut.
+        """
+        user = getattr(request, "user", None)
+        if user is None or not getattr(user, "is_authenticated", False):
+            return None
+        # Utilise le helper pour récupérer le contexte client
+        client_ctx = get_current_client(user)
+        return UserRecord(
+            id=user.id,
+            email=getattr(user, "email", ""),
+            client_type=client_ctx.client_type,
+            customer_number=getattr(user, "customer_number", None),
+            is_b2b_verified=getattr(user, "is_b2b_verified", False),
+            pricing_mode=client_ctx.pricing_mode,
+        )
+
     def get_cart(self, request, client_type: str | None = None) -> CartDTO:
         """Retourne le panier courant, recalculé via le service de tarification.
 
@@ -40,29 +63,56 @@ class CartService:
         délègue le calcul des prix au ``PricingService.calculate_cart``.  Le
         panier retourné contient des ``unit_price`` et ``total_price``
         cohérents et un ``total`` mis à jour.
+
+        Si la requête porte un contexte de panier (``request.cart_context``),
+        le résultat y est mémorisé : les appels suivants de la même
+        requête (vue, checkout…) le réutilisent tant que le panier n'est
+        pas modifié.
+        """
+        context = getattr(request, "cart_context", None)
+        if context is not None:
+            return context.priced(lambda: self._price_cart(request))
+        return self._price_cart(request)
+
+    def _price_cart(self, request) -> CartDTO:
+        """Tarifie le panier de la requête de façon incrémentale.
+
+        Les prix par ligne de la tarification précédente sont conservés
+        par le repository : seules les lignes nouvelles ou dont la
+        version de prix a changé sont retarifées.
         """
         cart = self.cart_repo.get_for_request(request)
-        # Construit un UserDTO à partir de la requête.  Certaines
-        # installations peuvent ne pas disposer du modèle utilisateur ou
-        # des champs attendus, c'est pourquoi nous utilisons getattr avec
-        # des valeurs par défaut.
-        user_dto: UserDTO | None = None
-        user = getattr(request, "user", None)
-        if user is not None and getattr(user, "is_authenticated", False):
-            # Utilise le helper pour récupérer le contexte client
-            client_ctx = get_current_client(user)
-            user_dto = UserDTO(
-                id=user.id,
-                email=getattr(user, "email", ""),
-                client_type=client_ctx.client_type,
-                customer_number=getattr(user, "customer_number", None),
-                is_b2b_verified=getattr(user, "is_b2b_verified", False),
-                pricing_mode=client_ctx.pricing_mode,
-            )
+        state = self.cart_repo.get_price_state(request)
         # Délègue le calcul des prix au service de tarification
-        pricing_result = self.pricing_service.calculate_cart(cart.items, user_dto)
+        pricing_result = self.pricing_service.calculate_cart(cart.items, self._user_record(request), state=state)
+        self.cart_repo.save_price_state(request, state)
         return CartDTO(user_id=cart.user_id, items=pricing_result.items, total=pricing_result.total)
 
+    def get_cart_changes(self, request, since: int | None = None) -> CartChanges:
+        """Retourne les lignes tarifées modifiées depuis la révision ``since``.
+
+        Le panier est tarifé comme par ``get_cart`` (incrémentalement) ;
+        la révision est celle de l'état de prix par ligne, incrémentée à
+        chaque changement de quantité ou de prix d'une ligne.  Sans
+        ``since``, ou si l'historique ne le couvre pas (état réinitialisé,
+        session perdue…), le panier complet est renvoyé avec ``full=True``.
+        """
+        cart = self.get_cart(request)
+        state = self.cart_repo.get_price_state(request)
+        changes = None if since is None else state.changed_since(since)
+        if changes is None:
+            return CartChanges(revision=state.revision, since=since or 0, full=True, total=cart.total, items=cart.items)
+        changed, removed = changes
+        changed_ids = set(changed)
+        return CartChanges(
+            revision=state.revision,
+            since=since,
+            full=False,
+            total=cart.total,
+            items=[item for item in cart.items if item.product.id in changed_ids],
+            removed=sorted(removed),
+        )
+
     def add_item(
         self,
         request,
@@ -80,37 +130,129 @@ class CartService:
         # recalculé plus tard)
         product: ProductDTO = self.product_repo.get_by_sku(sku)
         # Met à jour la liste des items en modifiant uniquement la quantité
-        items: list[CartItemDTO] = []
+        items: list[CartLine] = []
         found = False
         for item in cart.items:
             if item.product.id == product.id:
                 new_qty = item.quantity + quantity
-                items.append(CartItemDTO(product=item.product, quantity=new_qty))
+                items.append(CartLineRecord(product=item.product, quantity=new_qty))
                 found = True
             else:
                 items.append(item)
         if not found:
-            items.append(CartItemDTO(product=product, quantity=quantity))
+            items.append(CartLineRecord(product=product, quantity=quantity))
         # Met à jour le panier stocké dans la session (sans prix)
         cart.items = items
         cart.total = None
-        persisted = self.cart_repo.save_for_request(request, cart)
-        # Reconstruit le UserDTO pour le recalcul des prix
-        user_dto: UserDTO | None = None
-        user = getattr(request, "user", None)
-        if user is not None and getattr(user, "is_authenticated", False):
-            client_ctx = get_current_client(user)
-            user_dto = UserDTO(
-                id=user.id,
-                email=getattr(user, "email", ""),
-                client_type=client_ctx.client_type,
-                customer_number=getattr(user, "customer_number", None),
-                is_b2b_verified=getattr(user, "is_b2b_verified", False),
-                pricing_mode=client_ctx.pricing_mode,
+        self.cart_repo.save_for_request(request, cart)
+        # Tarifie le panier enregistré (quantités normalisées MOQ / PCB) ;
+        # seules les lignes nouvelles ou périmées sont retarifées
+        return self.get_cart(request)
+
+    def add_items(self, request, lines: Iterable[OrderLine]) -> BulkAddResult:
+        """Ajoute en une fois les lignes d'une saisie en masse (bloc-notes, CSV, API).
+
+        Les codes (code article, SKU ou EAN) sont résolus en une seule
+        requête, le panier est lu puis enregistré une seule fois et
+        tarifé une seule fois, quel que soit le nombre de lignes.  Les
+        quantités s'ajoutent à celles déjà présentes et respectent les
+        règles MOQ / PCB (appliquées par le repository).
+
+        Chaque ligne reçoit un statut (``BulkAddLine``) : les références
+        inconnues, les produits inactifs et les quantités illisibles ou
+        négatives sont signalés sans bloquer les autres lignes.
+        """
+        lines = list(lines)
+        products = self.product_repo.get_many_by_codes(
+            line.code for line in lines if line.quantity is not None and line.quantity > 0
+        )
+        return self._add_resolved(request, [(line, products.get(line.code)) for line in lines])
+
+    def add_products(self, request, lines: Iterable[tuple[int, int]]) -> BulkAddResult:
+        """Ajoute en une fois des couples ``(product_id, quantité)`` (listes enregistrées).
+
+        Même contrat que ``add_items`` : une requête produit, un
+        enregistrement et une tarification du panier, quelle que soit la
+        taille de la liste.  Les produits supprimés depuis sont signalés
+        ``unknown`` (code = identifiant), les produits désactivés
+        ``inactive``.
+        """
+        lines = list(lines)
+        products = self.product_repo.get_many_by_ids(pid for pid, _ in lines)
+        resolved = []
+        for index, (product_id, quantity) in enumerate(lines, start=1):
+            product = products.get(product_id)
+            code = product.sku if product is not None else str(product_id)
+            resolved.append((OrderLine(line=index, code=code, quantity=quantity), product))
+        return self._add_resolved(request, resolved)
+
+    def _add_resolved(self, request, resolved: list[tuple[OrderLine, ProductDTO | None]]) -> BulkAddResult:
+        """Fusionne dans le panier des lignes dont le produit est déjà résolu."""
+        cart = self.cart_repo.get_for_request(request)
+        quantities: dict[int, int] = {item.product.id: item.quantity for item in cart.items}
+        records: dict[int, ProductDTO] = {item.product.id: item.product for item in cart.items}
+
+        report: list[BulkAddLine] = []
+        for line, product in resolved:
+            if line.quantity is None or line.quantity <= 0:
+                status = BulkAddLine.INVALID_QUANTITY
+                product = None
+            elif product is None:
+                status = BulkAddLine.UNKNOWN
+            elif product.is_active is False:
+                status = BulkAddLine.INACTIVE
+            else:
+                status = BulkAddLine.ADDED
+                quantities[product.id] = quantities.get(product.id, 0) + line.quantity
+                records.setdefault(product.id, product)
+            report.append(
+                BulkAddLine(
+                    line=line.line,
+                    code=line.code,
+                    requested=line.quantity,
+                    status=status,
+                    product_id=product.id if product is not None else None,
+                )
             )
-        # Calcule les prix sur les lignes mises à jour
-        pricing_result = self.pricing_service.calculate_cart(persisted.items, user_dto)
-        return CartDTO(user_id=persisted.user_id, items=pricing_result.items, total=pricing_result.total)
+
+        if any(line.ok for line in report):
+            cart.items = [CartLineRecord(product=records[pid], quantity=qty) for pid, qty in quantities.items()]
+            cart.total = None
+            self.cart_repo.save_for_request(request, cart)
+        priced = self.get_cart(request)
+        # Quantités finales, après arrondi MOQ / PCB
+        final = {item.product.id: item.quantity for item in priced.items}
+        for line in report:
+            if line.ok:
+                line.quantity = final.get(line.product_id)
+        return BulkAddResult(cart=priced, lines=report)
+
+    def update_item(self, request, product_id: int, quantity: int) -> CartDTO:
+        """Fixe la quantité d'un produit ; une quantité nulle ou négative retire la ligne.
+
+        La quantité enregistrée respecte les règles MOQ / PCB du produit
+        (appliquées par le repository).  Retourne le panier tarifé.
+        """
+        cart = self.cart_repo.get_for_request(request)
+        items: list[CartLine] = []
+        found = False
+        for item in cart.items:
+            if item.product.id == product_id:
+                found = True
+                if quantity > 0:
+                    items.append(CartLineRecord(product=item.product, quantity=quantity))
+            else:
+                items.append(item)
+        if not found and quantity > 0:
+            items.append(CartLineRecord(product=self.product_repo.get_by_id(product_id), quantity=quantity))
+        cart.items = items
+        cart.total = None
+        self.cart_repo.save_for_request(request, cart)
+        return self.get_cart(request)
+
+    def remove_item(self, request, product_id: int) -> CartDTO:
+        """Retire un produit du panier et retourne le panier tarifé."""
+        return self.update_item(request, product_id, 0)
 
     def clear(self, request) -> CartDTO:
         """Vide complètement le panier et retourne un DTO vide.
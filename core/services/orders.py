@@ -1,9 +1,19 @@
 from __future__ import annotations
 
-from django.db import models
+from datetime import datetime, time, timedelta
+from typing import TYPE_CHECKING, Iterable
+
+from django.conf import settings
+from django.db import models, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from core.domain.dto import BulkAddResult
 from core.interfaces import CartRepository, OrderRepository, OrderDTO
 from orders.models import Order
 
+if TYPE_CHECKING:  # pragma: no cover
+    from core.services.cart import CartService
+
 
 class OrderService:
     """
@@ -15,16 +25,58 @@ class OrderService:
     un queryset pré-filtré en fonction des paramètres HTTP.
     """
 
-    def __init__(self, cart_repo: CartRepository, order_repo: OrderRepository) -> None:
+    def __init__(
+        self,
+        cart_repo: CartRepository,
+        order_repo: OrderRepository,
+        cart_service: "CartService | None" = None,
+    ) -> None:
         self.cart_repo = cart_repo
         self.order_repo = order_repo
+        self.cart_service = cart_service
 
     def create_order_from_current_cart(self, request, user_id: int | None) -> OrderDTO:
-        cart = self.cart_repo.get_for_request(request)
+        """Crée une commande à partir du panier courant, tarifé par le ``CartService``.
+
+        Le panier est vidé dans la même transaction que la création de la
+        commande : un second checkout renvoie l'erreur du panier vide.  Lève ``ValueError`` si le panier est vide ou si le stock ne couvre
+        pas une ligne (``orders.stock.InsufficientStock``),
+        ``orders.stock.StockReservationConflict`` si la réservation du stock
+        échoue sans rupture (commandes concurrentes).
+        """
+        if self.cart_service is not None:
+            cart = self.cart_service.get_cart(request)
+        else:
+            cart = self.cart_repo.get_for_request(request)
         if not cart.items:
             raise ValueError("Impossible de créer une commande depuis un panier vide.")
-        order = self.order_repo.create_from_cart(cart, user_id=user_id)
-        return order
+        with transaction.atomic():
+            order = self.order_repo.create_from_cart(cart, user_id=user_id)
+            if self.cart_service is not None:
+                self.cart_service.clear(request)
+            else:
+                cart.items = []
+                cart.total = None
+                self.cart_repo.save_for_request(request, cart)
+            # Numéro définitif en dernier : le compteur du jour n'est
+            # verrouillé que jusqu'à la fin de la transaction
+            return self.order_repo.assign_number(order.id)
+
+    def reorder(self, request, order_ids: Iterable[int], user_id: int) -> BulkAddResult:
+        """Ajoute au panier courant les lignes de commandes passées.
+
+        Les lignes de toutes les commandes sont lues en une requête puis
+        ajoutées en un seul passage par ``CartService.add_items`` : SKU
+        résolus en une requête, règles MOQ / PCB réappliquées, panier
+        enregistré et tarifé une fois.  Les produits retirés du catalogue
+        ou désactivés sont signalés ligne par ligne dans le résultat.
+        Lève ``Order.DoesNotExist`` si une commande n'appartient pas à
+        l'utilisateur.
+        """
+        if self.cart_service is None:
+            raise RuntimeError("OrderService.reorder requiert un CartService.")
+        lines = self.order_repo.get_reorder_lines(order_ids, user_id)
+        return self.cart_service.add_items(request, lines)
 
     def get_orders_queryset(
         self,
@@ -33,14 +85,22 @@ class OrderService:
         from_date: str | None = None,
         to_date: str | None = None,
         only_paid: bool = False,
+        updated_since: str | None = None,
     ):
         """
         Retourne un queryset d'objets ``Order`` filtré selon les critères
         fournis. Cette méthode encapsule toute la logique de filtrage
         utilisée par les vues API (commandes et factures).
+
+        Les dates (``AAAA-MM-JJ`` ou date-heure ISO 8601) bornent
+        ``created_at`` par un intervalle semi-ouvert : ``from_date``
+        inclus, ``to_date`` exclu (une date seule couvre toute la
+        journée).  La colonne n'est pas convertie, l'index reste
+        utilisable.  ``updated_since`` retient les commandes modifiées à
+        partir de cette date.  Lève ``ValueError`` pour une date invalide.
         """
         qs = Order.objects.all().prefetch_related("items")
-        # Filtre de base : factures uniquement
+        # Filtre de base : factures uniquement
         if only_paid:
             qs = qs.filter(status="paid")
         # Filtrage par statut spécifique si demandé
@@ -48,7 +108,30 @@ class OrderService:
             qs = qs.filter(status=status)
         # Filtrage par plage de dates (sur la date de création)
         if from_date:
-            qs = qs.filter(created_at__date__gte=from_date)
+            qs = qs.filter(created_at__gte=_parse_bound(from_date))
         if to_date:
-            qs = qs.filter(created_at__date__lte=to_date)
-        return qs.order_by("-created_at")
+            qs = qs.filter(created_at__lt=_parse_bound(to_date, end=True))
+        if updated_since:
+            qs = qs.filter(updated_at__gte=_parse_bound(updated_since))
+        return qs.order_by("-created_at", "-id")
+
+
+def _parse_bound(value: str, *, end: bool = False) -> datetime:
+    """Convertit une borne de filtre en date-heure.
+
+    Une date seule vaut le début de la journée (fuseau courant), ou le
+    début du lendemain si ``end`` est vrai.
+    """
+    # La date seule d'abord : ``parse_datetime`` l'accepte aussi (minuit)
+    day = parse_date(value)
+    if day is not None:
+        if end:
+            day += timedelta(days=1)
+        moment = datetime.combine(day, time.min)
+    else:
+        moment = parse_datetime(value)
+        if moment is None:
+            raise ValueError(f"Date invalide : {value!r}.")
+    if settings.USE_TZ and timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
@@ -1,18 +1,37 @@
 from __future__ import annotations
 
 from decimal import Decimal
-from typing import Iterable, Optional, Union
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple, Union
 
 from core.domain.dto import (
     ProductDTO,
+    ProductLike,
+    ProductRecord,
     UserDTO,
-    CartItemDTO,
+    UserLike,
+    UserRecord,
+    CartLine,
+    CartLineRecord,
     CartPricingResult,
 )
+from core.domain.cart_pricing import CartPriceState
+from core.domain.batch_pricing_engine import BatchPricingEngine, PriceColumns
 from core.domain.pricing_engine import PricingEngine
-from core.domain.pricing_rules import AdvancedPricingRules
+from core.domain.pricing_rules import EMPTY_RULES, AdvancedPricingRules, AdvancedRuleSet, CompiledPricingRules
+from core.domain.pricing_segments import materialized_segment, pricing_segment, segment_users
+from core.ports.pricing_rules_port import PricingRulesPort
 from core.ports.promo_catalog_port import PromoCatalogPort
 
+# Attribut posé sur les instances produit par ``prefetch_unit_prices`` :
+# ``{user_id | None: prix_unitaire}``.  Lu par le filtre ``price_for_user``.
+PREFETCH_ATTR = "_prefetched_unit_prices"
+
+# Durée de vie par défaut (secondes) des prix en cache, voir ``PRICING_CACHE_TTL``
+DEFAULT_CACHE_TTL = 6 * 3600
+# Durée de vie lorsque les versions ne sont pas partagées entre processus : une
+# modification faite par un autre worker n'est alors vue qu'à l'expiration.
+LOCAL_CACHE_TTL = 600
+
 
 class PromoAwareB2BPricingService:
     """Service de pricing centralisé.
@@ -30,48 +49,56 @@ class PromoAwareB2BPricingService:
     effectuée ici afin de préserver l'architecture hexagonale.
     """
 
-    def __init__(self, promo_catalog_adapter: PromoCatalogPort) -> None:
+    def __init__(
+        self,
+        promo_catalog_adapter: PromoCatalogPort,
+        pricing_rules_adapter: Optional[PricingRulesPort] = None,
+    ) -> None:
         self.promo_port = promo_catalog_adapter
+        # Sans adaptateur de règles, aucune règle avancée ne s'applique.
+        self.rules_port = pricing_rules_adapter
 
     # ------------------------------------------------------------------
     # Normalisation des entrées vers des DTOs
     # ------------------------------------------------------------------
-    def _to_product_dto(self, product: Union[ProductDTO, object]) -> ProductDTO:
-        """Convertit un objet produit en ``ProductDTO``.
+    def _to_product_dto(self, product: Union[ProductLike, object]) -> ProductLike:
+        """Convertit un objet produit en ``ProductDTO`` ou ``ProductRecord``.
 
-        Si ``product`` est déjà un ``ProductDTO``, il est renvoyé tel quel.
-        Sinon on construit un DTO minimal à partir des attributs du
-        modèle Django (ou de tout autre objet duck-typed).
+        Un ``ProductDTO`` ou un ``ProductRecord`` est renvoyé tel quel.
+        Sinon on construit un ``ProductRecord`` minimal à partir des
+        attributs du modèle Django (ou de tout autre objet duck-typed) :
+        les données de l'ORM étant déjà typées, on évite ici le coût de
+        la validation pydantic.
         """
 
-        if isinstance(product, ProductDTO):
+        if isinstance(product, (ProductDTO, ProductRecord)):
             return product
 
-        return ProductDTO(
-            id=getattr(product, "id"),
+        return ProductRecord(
+            id=product.id,
             sku=getattr(product, "article_code", "")
             or getattr(product, "sku", ""),
-            price=getattr(product, "price"),
+            price=product.price,
             discount_price=getattr(product, "discount_price", None),
             price_wholesaler=getattr(product, "price_wholesaler", None),
             price_big_retail=getattr(product, "price_big_retail", None),
             price_small_retail=getattr(product, "price_small_retail", None),
         )
 
-    def _to_user_dto(self, user: Optional[Union[UserDTO, object]]) -> Optional[UserDTO]:
-        """Convertit un utilisateur en ``UserDTO`` si nécessaire."""
+    def _to_user_dto(self, user: Optional[Union[UserLike, object]]) -> Optional[UserLike]:
+        """Convertit un utilisateur en ``UserRecord`` si nécessaire."""
 
         if user is None:
             return None
-        if isinstance(user, UserDTO):
+        if isinstance(user, (UserDTO, UserRecord)):
             return user
 
         # Objet Django ou équivalent
         if not getattr(user, "is_authenticated", False):
             return None
 
-        return UserDTO(
-            id=getattr(user, "id"),
+        return UserRecord(
+            id=user.id,
             email=getattr(user, "email", ""),
             client_type=getattr(user, "client_type", None),
             customer_number=getattr(user, "customer_number", None),
@@ -92,27 +119,191 @@ class PromoAwareB2BPricingService:
         """
 
         product_dto = self._to_product_dto(product)
+        return self.get_unit_prices([product_dto], user)[product_dto.id]
+
+    def get_unit_prices(self, products: Iterable, user: Optional[object] = None) -> Dict[int, Decimal]:
+        """Calcule les prix unitaires d'une liste de produits en un seul passage.
+
+        Variante par lot de ``get_unit_price`` destinée aux listes de
+        produits (pages catalogue, carrousels, paniers) :
+
+        * le cache est lu en une fois via ``get_many`` ;
+        * les promotions des produits absents du cache sont résolues par
+          un seul appel à ``PromoCatalogPort.get_applicable_promos`` ;
+        * les nouveaux prix sont écrits en une fois via ``set_many``.
+
+        Retourne un dictionnaire ``{product_id: prix_unitaire}``.
+        """
+
+        product_dtos = [self._to_product_dto(product) for product in products]
         user_dto = self._to_user_dto(user)
 
-        # Vérifie le cache avant de calculer le prix
+        cache = self._get_cache()
+        prices: Dict[int, Decimal] = {}
+        keys: Dict[int, str] = {}
+        if cache is not None:
+            segment = self.pricing_segment(user_dto)
+            promo_generation, product_versions = self._get_price_versions(
+                [dto.id for dto in product_dtos]
+            )
+            keys = {
+                dto.id: self._cache_key(dto, segment, product_versions.get(dto.id), promo_generation)
+                for dto in product_dtos
+            }
+            cached = cache.get_many(list(keys.values()))
+            for product_id, key in keys.items():
+                if key in cached:
+                    prices[product_id] = Decimal(str(cached[key]))
+
+        missing = [dto for dto in product_dtos if dto.id not in prices]
+        if missing:
+            promos = self.promo_port.get_applicable_promos(missing, user_dto)
+            computed = PricingEngine.determine_prices(missing, user_dto, promos)
+            prices.update(computed)
+            # Les clés étant versionnées, la durée de vie peut être longue
+            if cache is not None:
+                cache.set_many(
+                    {keys[product_id]: str(price) for product_id, price in computed.items()},
+                    self._cache_ttl(),
+                )
+        return prices
+
+    def get_segment_prices(self, products: Iterable) -> Dict[str, Dict[int, Decimal]]:
+        """Calcule les prix de ``products`` pour chaque segment partagé.
+
+        Retourne ``{segment: {product_id: prix_unitaire}}``, calculé sans
+        cache par le moteur vectorisé ``BatchPricingEngine`` (mêmes règles
+        que ``PricingEngine``) pour l'utilisateur
+        représentatif de chaque segment (voir
+        ``core.domain.pricing_segments.segment_users``).  Sert à
+        alimenter la table matérialisée ``ProductSegmentPrice``.
+        """
+
+        product_dtos = [self._to_product_dto(product) for product in products]
+        columns = PriceColumns.from_dtos(product_dtos)
+        prices: Dict[str, Dict[int, Decimal]] = {}
+        for segment, user_dto in segment_users().items():
+            promos = self.promo_port.get_applicable_promos(product_dtos, user_dto) if user_dto else {}
+            cents = BatchPricingEngine.determine_prices(
+                columns,
+                client_type=user_dto.client_type if user_dto else None,
+                is_b2b_verified=user_dto.is_b2b_verified if user_dto else False,
+                promo_price=columns.promo_column(promos),
+                has_user=user_dto is not None,
+            )
+            prices[segment] = BatchPricingEngine.to_decimals(columns, cents)
+        return prices
+
+    def prefetch_unit_prices(self, products: Iterable, user: Optional[object] = None) -> Dict[int, Decimal]:
+        """Pré-calcule les prix d'une page de produits pour les gabarits.
+
+        Les prix sont calculés en lot via ``get_unit_prices`` puis attachés
+        à chaque instance (attribut ``PREFETCH_ATTR``) afin que le filtre
+        ``price_for_user`` les relise sans nouvel appel au service.  Les
+        ``products`` doivent donc être les instances effectivement rendues
+        (liste évaluée, pas un queryset réévalué par le gabarit).
+        """
+
+        products = list(products)
+        prices = self.get_unit_prices(products, user)
+        user_dto = self._to_user_dto(user)
+        user_id = user_dto.id if user_dto is not None else None
+        for product in products:
+            price = prices.get(getattr(product, "id", None))
+            if price is None:
+                continue
+            prefetched = getattr(product, PREFETCH_ATTR, None)
+            if prefetched is None:
+                prefetched = {}
+                try:
+                    setattr(product, PREFETCH_ATTR, prefetched)
+                except AttributeError:
+                    # Objet immuable (DTO figé, namedtuple…) : rien à annoter.
+                    continue
+            prefetched[user_id] = price
+        return prices
+
+    # ------------------------------------------------------------------
+    # Cache
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _get_cache():
+        """Retourne le cache Django par défaut, ou ``None`` hors contexte Django."""
         try:  # pragma: no cover - cache absent hors contexte Django
             from django.core.cache import cache  # type: ignore
         except Exception:  # pragma: no cover
-            cache = None
-        cache_key = None
-        if cache is not None:
-            user_key = f"u{user_dto.id}" if user_dto is not None else "anon"
-            cache_key = f"pricing:unit:{user_key}:{product_dto.id}"
-            cached_price = cache.get(cache_key)
-            if cached_price is not None:
-                return Decimal(str(cached_price))
-
-        promo = self.promo_port.get_applicable_promo(product_dto, user_dto)
-        price = PricingEngine.determine_price(product_dto, user_dto, promo)
-        # Sauvegarde en cache pour 10 minutes
-        if cache is not None and cache_key is not None:
-            cache.set(cache_key, str(price), 600)
-        return price
+            return None
+        return cache
+
+    def pricing_segment(self, user: Optional[object] = None) -> str:
+        """Retourne la clé de segment de tarification de ``user``.
+
+        Les utilisateurs d'un même segment (type de client, vérification
+        B2B, présence d'un numéro client) partagent les mêmes entrées de
+        cache ; seuls ceux ciblés nommément par une promotion active
+        obtiennent une clé propre (voir ``core.domain.pricing_segments``).
+        """
+        user_dto = self._to_user_dto(user)
+        return pricing_segment(user_dto, self.promo_port.has_user_specific_promos(user_dto))
+
+    def materialized_segment(self, user: Optional[object] = None) -> str:
+        """Retourne le segment dont ``catalog.ProductSegmentPrice`` porte les prix de ``user``.
+
+        Pour un utilisateur ciblé nommément, c'est son segment partagé : ses
+        prix n'en diffèrent que sur ``user_specific_product_ids(user)``.
+        """
+        return materialized_segment(self._to_user_dto(user))
+
+    def user_specific_product_ids(self, user: Optional[object] = None) -> FrozenSet[int]:
+        """Retourne les produits sur lesquels ``user`` ne paie pas le prix de son segment."""
+        user_dto = self._to_user_dto(user)
+        if not self.promo_port.has_user_specific_promos(user_dto):
+            return frozenset()
+        return frozenset(self.promo_port.get_user_specific_product_ids(user_dto))
+
+    @staticmethod
+    def _get_price_versions(product_ids: List[int]) -> Tuple[Optional[str], Dict[int, str]]:
+        """Retourne la génération des promotions et les versions des produits.
+
+        Hors contexte Django, aucune version n'est disponible : les clés
+        restent alors valables jusqu'à expiration.
+        """
+        try:  # pragma: no cover - cache absent hors contexte Django
+            from core.adapters.pricing_versions import get_price_versions
+        except Exception:  # pragma: no cover
+            return None, {}
+        return get_price_versions(product_ids)
+
+    @staticmethod
+    def _cache_ttl() -> int:
+        """Durée de vie des prix en cache.
+
+        ``PRICING_CACHE_TTL`` n'est sûre que si les versions sont tenues dans
+        un cache commun à tous les processus ; sinon la durée reste courte.
+        """
+        try:  # pragma: no cover - réglages absents hors contexte Django
+            from django.conf import settings
+
+            from core.utils.shared_cache import is_process_local
+            if is_process_local():
+                return LOCAL_CACHE_TTL
+            return int(getattr(settings, "PRICING_CACHE_TTL", DEFAULT_CACHE_TTL))
+        except Exception:  # pragma: no cover
+            return DEFAULT_CACHE_TTL
+
+    @staticmethod
+    def _cache_key(
+        product_dto: ProductDTO,
+        segment: str,
+        product_version: Optional[str] = None,
+        promo_generation: Optional[str] = None,
+    ) -> str:
+        """Clé versionnée : ``pricing:unit:{segment}:{produit}:{version}:{génération}``.
+
+        Toute modification du produit ou des promotions change la clé ;
+        les anciennes entrées expirent d'elles-mêmes.
+        """
+        return f"pricing:unit:{segment}:{product_dto.id}:{product_version}:{promo_generation}"
 
     # ------------------------------------------------------------------
     # Prévisualisation de prix avec quantité et règles avancées
@@ -123,36 +314,82 @@ class PromoAwareB2BPricingService:
         Cette méthode accepte encore un ``product`` Django pour des
         raisons de compatibilité avec les couches de présentation, mais
         elle convertit immédiatement l'objet en DTO côté domaine. Les
-        règles avancées (quantité, marque, famille, plancher) sont
-        ensuite appliquées en utilisant uniquement les informations
-        nécessaires (slug de marque, nom de catégorie, prix public).
+        règles avancées (quantité, marque, famille, plancher) du type de
+        client sont ensuite appliquées en utilisant uniquement les
+        informations nécessaires (identifiants de marque et de catégorie,
+        prix public).  Les règles viennent de l'instantané compilé du
+        port ``PricingRulesPort`` : ni requête SQL ni tri ici.
         """
 
         # Prix unitaire de base via le moteur pur (DTO only)
         base_unit_price = self.get_unit_price(product, user)
 
-        # Extraction des informations nécessaires pour les règles avancées
-        brand = getattr(product, "brand", None)
-        brand_slug = getattr(brand, "slug", None)
-        brand_name = getattr(brand, "name", None)
-        category = getattr(product, "category", None)
-        category_name = getattr(category, "name", None)
+        rules = self._advanced_rule_set(user)
+        return self._apply_advanced_rules(product, base_unit_price, quantity, rules)
+
+    def preview_price_ladder(
+        self,
+        products: Iterable,
+        user=None,
+        quantities: Optional[Iterable[int]] = None,
+    ) -> Dict[int, List[Tuple[int, Decimal]]]:
+        """Calcule une grille de prix par quantité pour plusieurs produits.
+
+        Variante par lot de ``preview_price`` destinée aux tableaux de
+        paliers : les prix de base de tous les produits sont obtenus en un
+        seul appel à ``get_unit_prices`` et les règles avancées du type de
+        client ne sont lues qu'une fois.  Sans ``quantities``, les paliers
+        sont les seuils des remises par quantité (plus l'unité).
+
+        Retourne ``{product_id: [(quantité, prix_unitaire), ...]}``, les
+        quantités étant triées par ordre croissant.
+        """
+
+        products = list(products)
+        rules = self._advanced_rule_set(user)
+        if quantities is None:
+            ladder = sorted({1, *rules.quantity_thresholds})
+        else:
+            ladder = sorted({int(quantity) for quantity in quantities if int(quantity) > 0})
+        base_prices = self.get_unit_prices(products, user)
+
+        result: Dict[int, List[Tuple[int, Decimal]]] = {}
+        for product in products:
+            base_unit_price = base_prices[product.id]
+            # Deux quantités au même taux de remise ont le même prix final
+            by_rate: Dict[Decimal, Decimal] = {}
+            tiers = []
+            for quantity in ladder:
+                rate = rules.quantity_rate(quantity)
+                if rate not in by_rate:
+                    by_rate[rate] = self._apply_advanced_rules(product, base_unit_price, quantity, rules)
+                tiers.append((quantity, by_rate[rate]))
+            result[product.id] = tiers
+        return result
+
+    def _advanced_rule_set(self, user) -> AdvancedRuleSet:
+        user_dto = self._to_user_dto(user)
+        return self._advanced_rules().for_client_type(user_dto.client_type if user_dto else None)
+
+    @staticmethod
+    def _apply_advanced_rules(product, base_unit_price: Decimal, quantity: int, rules: AdvancedRuleSet) -> Decimal:
+        """Applique, dans l'ordre, les remises quantité / marque / famille puis le plancher."""
+        # ``brand_id`` / ``category_id`` évitent de charger les relations
+        brand_id = getattr(product, "brand_id", None)
+        category_id = getattr(product, "category_id", None)
         public_price = getattr(product, "price", None)
 
-        # Application des règles avancées dans l'ordre désiré.
-        final_price = AdvancedPricingRules.apply_quantity_discount(base_unit_price, quantity)
-        final_price = AdvancedPricingRules.apply_brand_discount(
-            final_price,
-            brand_slug=brand_slug,
-            brand_name=brand_name,
-        )
-        final_price = AdvancedPricingRules.apply_family_discount(
-            final_price,
-            category_name=category_name,
-        )
-        final_price = AdvancedPricingRules.apply_floor(final_price, public_price)
+        final_price = AdvancedPricingRules.apply_quantity_discount(base_unit_price, quantity, rules)
+        final_price = AdvancedPricingRules.apply_brand_discount(final_price, brand_id, rules)
+        final_price = AdvancedPricingRules.apply_family_discount(final_price, category_id, rules)
+        final_price = AdvancedPricingRules.apply_floor(final_price, public_price, rules)
         return final_price
 
+    def _advanced_rules(self) -> CompiledPricingRules:
+        if self.rules_port is None:
+            return EMPTY_RULES
+        return self.rules_port.get_rules()
+
     # ------------------------------------------------------------------
     # Méthodes de compatibilité / agrégats
     # ------------------------------------------------------------------
@@ -171,34 +408,80 @@ class PromoAwareB2BPricingService:
 
     def calculate_cart(
         self,
-        items: Iterable[CartItemDTO],
-        user: Optional[UserDTO] = None,
+        items: Iterable[CartLine],
+        user: Optional[UserLike] = None,
+        state: Optional[CartPriceState] = None,
     ) -> CartPricingResult:
         """Calcule le prix de chaque ligne d'un panier et le total.
 
         Cette méthode centralise l'application des règles de promotions et
         de tarification. Elle prend une liste de ``CartItemDTO`` contenant
         au minimum un ``product`` et une ``quantity`` et renvoie un
-        ``CartPricingResult`` dans lequel chaque ligne comporte un
-        ``unit_price`` et un ``total_price``. Le total du panier est la
-        somme de toutes les lignes. Aucun calcul de prix ne doit être
-        effectué en dehors de cette méthode.
+        ``CartPricingResult`` dans lequel chaque ligne est un
+        ``CartLineRecord`` comportant un ``unit_price`` et un
+        ``total_price``. Le total du panier est la somme de toutes les
+        lignes. Aucun calcul de prix ne doit être effectué en dehors de
+        cette méthode.
+
+        Avec ``state`` (prix mémorisés d'une tarification précédente du
+        même panier), seules les lignes nouvelles ou dont la version de
+        prix a changé sont retarifées et le total est mis à jour par
+        différence ; ``state`` est modifié en place.
         """
-        priced_items: list[CartItemDTO] = []
-        total = Decimal("0")
+        items = list(items)
+        if state is None:
+            # Tous les prix unitaires du panier sont résolus en un seul lot
+            unit_prices = self.get_unit_prices([item.product for item in items], user)
+            total = None
+        else:
+            unit_prices = self._reprice_changed_lines(items, user, state)
+            total = state.total
+        priced_items: list[CartLineRecord] = []
+        computed_total = Decimal("0")
         for item in items:
-            # Calcule le prix unitaire final pour le produit
-            unit_price = self.get_unit_price(item.product, user)
+            unit_price = unit_prices[item.product.id]
             line_total = unit_price * Decimal(item.quantity)
             # Met à jour le produit.unit_price pour cohérence
             item.product.unit_price = unit_price
             priced_items.append(
-                CartItemDTO(
+                CartLineRecord(
                     product=item.product,
                     quantity=item.quantity,
                     unit_price=unit_price,
                     total_price=line_total,
                 )
             )
-            total += line_total
-        return CartPricingResult(items=priced_items, total=total)
+            computed_total += line_total
+        return CartPricingResult(items=priced_items, total=computed_total if total is None else total)
+
+    def _reprice_changed_lines(
+        self,
+        items: List[CartLine],
+        user: Optional[UserLike],
+        state: CartPriceState,
+    ) -> Dict[int, Decimal]:
+        """Met ``state`` à jour pour ``items`` et retourne ``{product_id: prix_unitaire}``.
+
+        La version d'une ligne reprend les éléments de la clé du cache des
+        prix unitaires (version du produit, génération des promotions) ;
+        un changement de segment retarife tout le panier.
+        """
+        user_dto = self._to_user_dto(user)
+        segment = self.pricing_segment(user_dto)
+        if state.segment != segment:
+            state.reset(segment)
+        products: Dict[int, object] = {}
+        quantities: Dict[int, int] = {}
+        for item in items:
+            products.setdefault(item.product.id, item.product)
+            quantities[item.product.id] = quantities.get(item.product.id, 0) + item.quantity
+        promo_generation, product_versions = self._get_price_versions(list(products))
+        versions = {
+            product_id: None if product_versions.get(product_id) is None
+            else f"{product_versions[product_id]}:{promo_generation}"
+            for product_id in products
+        }
+        stale = state.stale_products(versions)
+        repriced = self.get_unit_prices([products[product_id] for product_id in stale], user_dto) if stale else {}
+        state.update(quantities, versions, repriced)
+        return {product_id: line.unit_price for product_id, line in state.lines.items()}
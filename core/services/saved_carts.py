@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+from typing import List
+
+from core.domain.dto import BulkAddResult
+from core.interfaces import CartRepository, SavedCartDTO, SavedCartRepository
+from core.services.cart import CartService
+
+
+class SavedCartService:
+    """
+    Service métier des listes de commande enregistrées (paniers types).
+
+    Une liste est enregistrée à partir du panier courant puis rechargée
+    dans le panier en une seule opération groupée : une requête produit,
+    un enregistrement et une tarification du panier, quelle que soit la
+    taille de la liste (``CartService.add_products``).
+    """
+
+    def __init__(
+        self,
+        saved_cart_repo: SavedCartRepository,
+        cart_repo: CartRepository,
+        cart_service: CartService,
+    ) -> None:
+        self.saved_cart_repo = saved_cart_repo
+        self.cart_repo = cart_repo
+        self.cart_service = cart_service
+
+    def list_for_user(self, user_id: int) -> List[SavedCartDTO]:
+        return self.saved_cart_repo.list_for_user(user_id)
+
+    def save_current_cart(self, request, name: str, user_id: int, client_id: int | None = None) -> SavedCartDTO:
+        """Enregistre le panier courant sous ``name`` (remplace une liste homonyme)."""
+        name = (name or "").strip()
+        if not name:
+            raise ValueError("Le nom de la liste est obligatoire.")
+        cart = self.cart_repo.get_for_request(request)
+        if not cart.items:
+            raise ValueError("Impossible d'enregistrer un panier vide.")
+        lines = [(item.product.id, item.quantity) for item in cart.items]
+        return self.saved_cart_repo.save(name, lines, user_id=user_id, client_id=client_id)
+
+    def load(self, request, saved_cart_id: int, user_id: int) -> BulkAddResult:
+        """Ajoute au panier courant les lignes d'une liste enregistrée.
+
+        Les quantités s'ajoutent à celles du panier, règles MOQ / PCB
+        réappliquées ; les produits supprimés ou désactivés depuis
+        l'enregistrement sont signalés ligne par ligne.
+        """
+        saved = self.saved_cart_repo.get_for_user(saved_cart_id, user_id)
+        return self.cart_service.add_products(request, saved.lines)
+
+    def delete(self, saved_cart_id: int, user_id: int) -> None:
+        self.saved_cart_repo.delete(saved_cart_id, user_id)
@@ -0,0 +1,125 @@
+"""Lecture des lignes de commande saisies en masse.
+
+Les acheteurs B2B saisissent souvent plusieurs dizaines de références
+d'un coup : bloc-notes de commande (une ligne ``code quantité`` par
+produit, séparateur espace, tabulation, ``;`` ou ``,``), fichier CSV
+exporté de leur ERP ou appel d'API.  Ce module convertit ces entrées en
+``OrderLine`` sans accès à la base ; la résolution des codes et les
+règles MOQ / PCB sont appliquées par ``CartService.add_items``.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import re
+from typing import IO, Iterable, List, Mapping, Optional, Union
+
+from core.domain.dto import BulkAddLine, OrderLine
+
+# Nombre maximal de lignes acceptées par saisie.
+MAX_ORDER_LINES = 500
+
+# Libellés des statuts de ``BulkAddLine`` pour l'affichage.
+STATUS_MESSAGES = {
+    BulkAddLine.ADDED: "Ajouté",
+    BulkAddLine.UNKNOWN: "Référence inconnue",
+    BulkAddLine.INACTIVE: "Produit indisponible",
+    BulkAddLine.INVALID_QUANTITY: "Quantité invalide",
+}
+
+CODE_COLUMNS = ("sku", "code", "article_code", "reference", "référence", "ean")
+QUANTITY_COLUMNS = ("quantity", "qty", "quantite", "quantité")
+
+_SEPARATORS = re.compile(r"[;,\t ]+")
+
+
+def parse_quantity(value: Union[str, int, None]) -> Optional[int]:
+    """Convertit une quantité saisie ; ``None`` si elle est illisible."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, int):
+        return value
+    try:
+        return int(str(value).strip())
+    except ValueError:
+        return None
+
+
+def parse_order_text(text: str) -> List[OrderLine]:
+    """Lit un bloc-notes de commande : une ligne ``code [quantité]`` par produit.
+
+    Les lignes vides et celles commençant par ``#`` sont ignorées ; une
+    quantité absente vaut 1 (relevée ensuite au minimum de commande).
+    """
+    lines = []
+    for number, raw in enumerate(text.splitlines(), start=1):
+        raw = raw.strip()
+        if not raw or raw.startswith("#"):
+            continue
+        parts = _SEPARATORS.split(raw)
+        quantity = parse_quantity(parts[1]) if len(parts) > 1 else 1
+        lines.append(OrderLine(line=number, code=parts[0], quantity=quantity))
+    return _check_size(lines)
+
+
+def parse_order_csv(source: Union[IO[bytes], IO[str], bytes, str]) -> List[OrderLine]:
+    """Lit un fichier CSV (``;``, ``,`` ou tabulation) de codes et quantités.
+
+    Avec une ligne d'en-tête, les colonnes sont reconnues par leur nom
+    (``CODE_COLUMNS`` / ``QUANTITY_COLUMNS``) ; sinon la première colonne
+    est le code et la deuxième la quantité.
+    """
+    if hasattr(source, "read"):
+        source = source.read()
+    if isinstance(source, bytes):
+        source = source.decode("utf-8-sig")
+    try:
+        dialect = csv.Sniffer().sniff(source[:2048], delimiters=";,\t")
+    except csv.Error:
+        dialect = csv.excel
+    rows = list(csv.reader(io.StringIO(source), dialect))
+    if not rows:
+        return []
+
+    header = [cell.strip().lower() for cell in rows[0]]
+    code_index = _column(header, CODE_COLUMNS)
+    first_row = 1
+    if code_index is None:
+        code_index, quantity_index, first_row = 0, 1, 0
+    else:
+        quantity_index = _column(header, QUANTITY_COLUMNS)
+
+    lines = []
+    for number, row in enumerate(rows[first_row:], start=first_row + 1):
+        code = row[code_index].strip() if len(row) > code_index else ""
+        if not code:
+            continue
+        quantity: Optional[int] = 1
+        if quantity_index is not None and len(row) > quantity_index:
+            quantity = parse_quantity(row[quantity_index])
+        lines.append(OrderLine(line=number, code=code, quantity=quantity))
+    return _check_size(lines)
+
+
+def parse_order_items(items: Iterable[Mapping]) -> List[OrderLine]:
+    """Lit une liste JSON ``[{"sku": ..., "quantity": ...}, ...]`` (API)."""
+    lines = []
+    for number, item in enumerate(items, start=1):
+        code = next((str(item[key]).strip() for key in CODE_COLUMNS if item.get(key)), "")
+        raw_quantity = next((item[key] for key in QUANTITY_COLUMNS if key in item), 1)
+        lines.append(OrderLine(line=number, code=code, quantity=parse_quantity(raw_quantity)))
+    return _check_size(lines)
+
+
+def _column(header: List[str], names: Iterable[str]) -> Optional[int]:
+    for name in names:
+        if name in header:
+            return header.index(name)
+    return None
+
+
+def _check_size(lines: List[OrderLine]) -> List[OrderLine]:
+    if len(lines) > MAX_ORDER_LINES:
+        raise ValueError(f"Trop de lignes : {len(lines)} (maximum {MAX_ORDER_LINES}).")
+    return lines
@@ -0,0 +1,35 @@
+"""Accès au cache commun à tous les processus.
+
+Le cache ``default`` est propre à chaque processus (LocMem) : il convient
+aux valeurs dont les clés sont versionnées (prix unitaires), jamais à un
+état que plusieurs processus doivent voir à l'identique.  Les générations
+et versions de tarification (``core.adapters.pricing_versions``) et la
+copie de référence du panier (``cart.revisions``) sont donc tenues dans le
+cache désigné par ``SHARED_CACHE_ALIAS`` : Redis, ou à défaut une table de
+la base (voir ``CACHES`` dans les réglages).
+"""
+
+from __future__ import annotations
+
+from django.conf import settings
+from django.core.cache import caches
+
+SHARED_CACHE_ALIAS: str = getattr(settings, "SHARED_CACHE_ALIAS", "shared")
+
+#: Backends propres à chaque processus : configurés pour l'alias commun, ils
+#: ne partagent rien entre workers.
+PROCESS_LOCAL_BACKENDS = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+def get_shared_cache():
+    """Retourne le cache commun à tous les processus."""
+    return caches[SHARED_CACHE_ALIAS]
+
+
+def is_process_local() -> bool:
+    """Vrai si le cache configuré comme commun est en fait propre au processus."""
+    backend = settings.CACHES.get(SHARED_CACHE_ALIAS, {}).get("BACKEND", "")
+    return backend in PROCESS_LOCAL_BACKENDS
@@ -2,6 +2,7 @@ from django.shortcuts import render, redirect
 from django import forms
 from django.contrib import messages
 from catalog.models import Brand, Product
+from core.factory import get_pricing_service
 
 def home(request):
     # Marques avec logo
@@ -37,6 +38,10 @@ def home(request):
             .order_by("-updated_at")[:needed]
         selection += list(fillers)
 
+    # Tarifie les deux listes en un seul lot pour les filtres ``price_for_user``
+    if request.user.is_authenticated:
+        get_pricing_service().prefetch_unit_prices(promos + selection, request.user)
+
     return render(request, "core/home.html", {
         "brands": brands,
         "promos_carousel": promos,        # carrousel du haut
@@ -8,4 +8,8 @@ class IntegrationsConfig(AppConfig):
     externes (catalogue, ERP, paiement, etc.).
     """
     default_auto_field = "django.db.models.BigAutoField"
-    name = "integrations"
\ No newline at end of file
+    name = "integrations"
+
+    def ready(self) -> None:
+        # Envoi des commandes à l'ERP, diffusé par l'outbox des commandes
+        from . import handlers  # noqa: F401
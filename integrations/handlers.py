@@ -0,0 +1,68 @@
+"""Handler de l'outbox des commandes : transmission à l'ERP.
+
+La commande est envoyée en JSON à ``ERP_ORDER_WEBHOOK_URL`` ; sans URL
+configurée, le handler ne fait rien.  L'en-tête ``Idempotency-Key`` porte
+l'UUID de l'événement : l'ERP peut ignorer un envoi rejoué après un échec
+(réponse perdue, timeout).
+"""
+
+from __future__ import annotations
+
+from django.conf import settings
+
+from orders.models import Order, OutboxEvent
+from orders.outbox import ORDER_CREATED, register_handler
+
+try:
+    import requests
+except Exception:  # pragma: no cover
+    requests = None  # peut être None en environnement restreint
+
+
+def order_payload(order: Order) -> dict:
+    return {
+        "order_number": order.order_number,
+        "created_at": order.created_at.isoformat(),
+        "email": order.email,
+        "company": order.company,
+        "first_name": order.first_name,
+        "last_name": order.last_name,
+        "address1": order.address1,
+        "address2": order.address2,
+        "city": order.city,
+        "postcode": order.postcode,
+        "country": order.country,
+        "subtotal": str(order.subtotal),
+        "discount": str(order.discount),
+        "shipping": str(order.shipping),
+        "total": str(order.total),
+        "coupon_code": order.coupon_code,
+        "lines": [
+            {
+                "sku": item.product_sku,
+                "title": item.product_title,
+                "unit_price": str(item.unit_price),
+                "quantity": item.quantity,
+                "line_total": str(item.line_total),
+            }
+            for item in order.items.all()
+        ],
+    }
+
+
+@register_handler(ORDER_CREATED, "erp")
+def push_order_to_erp(event: OutboxEvent) -> None:
+    url = getattr(settings, "ERP_ORDER_WEBHOOK_URL", "")
+    if not url:
+        return
+    if requests is None:
+        raise RuntimeError("La bibliothèque requests est requise pour l'envoi à l'ERP.")
+    order = Order.objects.prefetch_related("items").get(pk=event.payload["order_id"])
+    response = requests.post(
+        url,
+        json=order_payload(order),
+        headers={"Idempotency-Key": str(event.uuid)},
+        timeout=getattr(settings, "ERP_TIMEOUT", 10),
+    )
+    # Une erreur HTTP fait échouer le handler : il sera rejoué
+    response.raise_for_status()
@@ -19,6 +19,7 @@ from django.utils import timezone
 
 from .models import ImportTask
 from catalog.models import Product, Category, Brand
+from core.adapters.pricing_versions import deferred_price_invalidation
 
 
 @shared_task
@@ -76,97 +77,100 @@ def process_import_task(task_id: int) -> None:
         failure = 0
         errors = []
 
-        for idx, row in enumerate(records, start=1):
-            try:
-                # Normaliser les noms de colonnes
-                data = normalise_dict(row)
-
-                # Champ identifiant du produit
-                art_code = data.get('code article') or data.get('article_code') or data.get('code_article') or data.get('sku')
-                if not art_code:
-                    raise ValueError("'code article' manquant.")
-
-                # Nom complet (désignation)
-                designation = (
-                    data.get('designation')
-                    or data.get('désignation')
-                    or data.get('nom')
-                    or data.get('title')
-                )
-                if not designation:
-                    raise ValueError("'designation' manquant.")
-
-                # Stock
-                stock_val = data.get('stock') or data.get('quantite') or data.get('quantité')
-                if stock_val is None:
-                    raise ValueError("'stock' manquant.")
+        # Les invalidations de prix déclenchées par chaque ``save()`` sont
+        # regroupées et publiées en une seule écriture à la fin de l'import.
+        with deferred_price_invalidation():
+            for idx, row in enumerate(records, start=1):
                 try:
-                    stock_val = int(stock_val)
-                except Exception:
-                    raise ValueError(f"Stock invalide : {stock_val}")
-
-                # Prix
-                price_val = data.get('prix de vente') or data.get('prix') or data.get('price')
-                if price_val is None:
-                    raise ValueError("'prix de vente' manquant.")
-                from decimal import Decimal
-                try:
-                    price_val = Decimal(str(price_val).replace(',', '.'))
-                except Exception:
-                    raise ValueError(f"Prix invalide : {price_val}")
-
-                # Champs optionnels
-                ean = data.get('ean') or data.get('code ean')
-                pcb_code = data.get('pcb') or data.get('pcb_code') or data.get('code pcb')
-                image = data.get('image du produit') or data.get('image')
-                category_name = data.get('categorie') or data.get('category')
-                brand_name = data.get('marque') or data.get('brand')
-
-                # Résolution des relations
-                category = None
-                brand = None
-                if category_name:
-                    category_slug = slugify(category_name)
-                    category, _ = Category.objects.get_or_create(name=category_name, defaults={'slug': category_slug})
-                if brand_name:
-                    brand_slug = slugify(brand_name)
-                    brand, _ = Brand.objects.get_or_create(name=brand_name, defaults={'slug': brand_slug})
-
-                # Création ou mise à jour du produit
-                product, created = Product.objects.get_or_create(
-                    article_code=art_code,
-                    defaults={
-                        'sku': art_code,
-                        'title': designation,
-                        'price': price_val,
-                        'stock': stock_val,
-                        'category': category,
-                        'brand': brand,
-                        'ean': ean,
-                        'pcb_code': pcb_code,
-                    }
-                )
-                if not created:
-                    product.title = designation
-                    product.price = price_val
-                    product.stock = stock_val
-                    product.ean = ean
-                    product.pcb_code = pcb_code
-                    product.category = category
-                    product.brand = brand
-                    product.save()
-                # Mise à jour de l'image
-                if image:
-                    # Nettoyage du chemin : retirer un éventuel préfixe "media/"
-                    img_path = str(image)
-                    if img_path.startswith('media/'):
-                        img_path = img_path[len('media/') :]
-                    product.image = img_path
-                    product.save(update_fields=['image'])
-                success += 1
-            except Exception as exc:
-                failure += 1
-                errors.append(f"Ligne {idx}: {exc}")
+                    # Normaliser les noms de colonnes
+                    data = normalise_dict(row)
+
+                    # Champ identifiant du produit
+                    art_code = data.get('code article') or data.get('article_code') or data.get('code_article') or data.get('sku')
+                    if not art_code:
+                        raise ValueError("'code article' manquant.")
+
+                    # Nom complet (désignation)
+                    designation = (
+                        data.get('designation')
+                        or data.get('désignation')
+                        or data.get('nom')
+                        or data.get('title')
+                    )
+                    if not designation:
+                        raise ValueError("'designation' manquant.")
+
+                    # Stock
+                    stock_val = data.get('stock') or data.get('quantite') or data.get('quantité')
+                    if stock_val is None:
+                        raise ValueError("'stock' manquant.")
+                    try:
+                        stock_val = int(stock_val)
+                    except Exception:
+                        raise ValueError(f"Stock invalide : {stock_val}")
+
+                    # Prix
+                    price_val = data.get('prix de vente') or data.get('prix') or data.get('price')
+                    if price_val is None:
+                        raise ValueError("'prix de vente' manquant.")
+                    from decimal import Decimal
+                    try:
+                        price_val = Decimal(str(price_val).replace(',', '.'))
+                    except Exception:
+                        raise ValueError(f"Prix invalide : {price_val}")
+
+                    # Champs optionnels
+                    ean = data.get('ean') or data.get('code ean')
+                    pcb_code = data.get('pcb') or data.get('pcb_code') or data.get('code pcb')
+                    image = data.get('image du produit') or data.get('image')
+                    category_name = data.get('categorie') or data.get('category')
+                    brand_name = data.get('marque') or data.get('brand')
+
+                    # Résolution des relations
+                    category = None
+                    brand = None
+                    if category_name:
+                        category_slug = slugify(category_name)
+                        category, _ = Category.objects.get_or_create(name=category_name, defaults={'slug': category_slug})
+                    if brand_name:
+                        brand_slug = slugify(brand_name)
+                        brand, _ = Brand.objects.get_or_create(name=brand_name, defaults={'slug': brand_slug})
+
+                    # Création ou mise à jour du produit
+                    product, created = Product.objects.get_or_create(
+                        article_code=art_code,
+                        defaults={
+                            'sku': art_code,
+                            'title': designation,
+                            'price': price_val,
+                            'stock': stock_val,
+                            'category': category,
+                            'brand': brand,
+                            'ean': ean,
+                            'pcb_code': pcb_code,
+                        }
+                    )
+                    if not created:
+                        product.title = designation
+                        product.price = price_val
+                        product.stock = stock_val
+                        product.ean = ean
+                        product.pcb_code = pcb_code
+                        product.category = category
+                        product.brand = brand
+                        product.save()
+                    # Mise à jour de l'image
+                    if image:
+                        # Nettoyage du chemin : retirer un éventuel préfixe "media/"
+                        img_path = str(image)
+                        if img_path.startswith('media/'):
+                            img_path = img_path[len('media/') :]
+                        product.image = img_path
+                        product.save(update_fields=['image'])
+                    success += 1
+                except Exception as exc:
+                    failure += 1
+                    errors.append(f"Ligne {idx}: {exc}")
 
         # Mise à jour finale de la tâche
         import_task.status = 'completed' if not errors else 'failed'
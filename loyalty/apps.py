@@ -8,32 +8,11 @@ class LoyaltyConfig(AppConfig):
     name = "loyalty"
 
     def ready(self) -> None:  # type: ignore[override]
-        """Connect signal receivers when the app is ready.
+        """Enregistre le handler d'attribution des points.
 
-        The loyalty app listens for the ``order_validated`` signal to
-        award loyalty points after an order has been successfully
-        created.  Using signals decouples the loyalty logic from the
-        orders app and avoids direct imports between them.
+        Les points sont crédités par l'outbox des commandes
+        (``orders.outbox``), après la validation du checkout et hors de la
+        requête HTTP ; l'app orders n'importe toujours pas l'app loyalty.
         """
         super().ready()
-        try:
-            from django.dispatch import receiver  # type: ignore
-            from core.signals import order_validated  # type: ignore
-            from .models import LoyaltyAccount  # type: ignore
-
-            @receiver(order_validated)
-            def _award_loyalty_points(sender, order, user, **kwargs):  # type: ignore
-                # Attribue des points de fidélité à l'utilisateur connecté.
-                # 1 point par euro dépensé (hors centimes)
-                if user is None:
-                    return
-                try:
-                    account, _ = LoyaltyAccount.objects.get_or_create(user=user)
-                    account.points = account.points + int(order.total)
-                    account.save(update_fields=["points"])
-                except Exception:
-                    # En cas d'erreur (par exemple si l'app n'est pas migrée), on ignore
-                    pass
-        except Exception:
-            # Les dépendances peuvent ne pas être disponibles lors de la collecte statique.
-            pass
\ No newline at end of file
+        from . import handlers  # noqa: F401
@@ -0,0 +1,23 @@
+"""Handler de l'outbox des commandes : attribution des points de fidélité."""
+
+from __future__ import annotations
+
+from orders.models import Order, OutboxEvent
+from orders.outbox import ORDER_CREATED, register_handler
+
+from .models import LoyaltyAccount
+
+
+@register_handler(ORDER_CREATED, "loyalty")
+def award_loyalty_points(event: OutboxEvent) -> None:
+    """Crédite 1 point par euro dépensé (hors centimes) au client connecté.
+
+    Le crédit et l'enregistrement du handler comme traité partagent la même
+    transaction : les points ne sont jamais attribués deux fois, et une
+    erreur est remontée au dispatcher pour être rejouée.
+    """
+    order = Order.objects.only("user_id", "total").get(pk=event.payload["order_id"])
+    if order.user_id is None:
+        return
+    account, _ = LoyaltyAccount.objects.get_or_create(user_id=order.user_id)
+    account.add_points(int(order.total))
@@ -7,4 +7,8 @@ class NotificationsConfig(AppConfig):
     Cette app gère l'envoi et la consultation de notifications internes.
     """
     default_auto_field = "django.db.models.BigAutoField"
-    name = "notifications"
\ No newline at end of file
+    name = "notifications"
+
+    def ready(self) -> None:
+        # Notification « commande créée », diffusée par l'outbox des commandes
+        from . import handlers  # noqa: F401
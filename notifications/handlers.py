@@ -0,0 +1,20 @@
+"""Handler de l'outbox des commandes : notification interne du client."""
+
+from __future__ import annotations
+
+from orders.models import Order, OutboxEvent
+from orders.outbox import ORDER_CREATED, register_handler
+
+from .models import Notification
+
+
+@register_handler(ORDER_CREATED, "notification")
+def notify_order_created(event: OutboxEvent) -> None:
+    """Crée la notification « commande créée » pour un utilisateur connecté."""
+    order = Order.objects.only("user_id", "order_number").get(pk=event.payload["order_id"])
+    if order.user_id is None:
+        return
+    Notification.objects.create(
+        user_id=order.user_id,
+        message=f"Votre commande {order.order_number} a été créée.",
+    )
@@ -1,10 +1,15 @@
 from django.contrib import admin
-from .models import Order, OrderItem
+from django.utils import timezone
+
+from .models import Order, OrderItem, OutboxEvent
+from .services import update_order_status
+from .tasks import schedule_outbox_dispatch
 
 class OrderItemInline(admin.TabularInline):
     model = OrderItem
     extra = 0
-    readonly_fields = ("product_title", "product_sku", "unit_price", "quantity", "line_total")
+    readonly_fields = ("product_title", "product_sku", "unit_price", "quantity", "line_total", "reserved_quantity")
+    exclude = ("product",)
 
 @admin.register(Order)
 class OrderAdmin(admin.ModelAdmin):
@@ -34,10 +39,48 @@ class OrderAdmin(admin.ModelAdmin):
         message de confirmation indique combien de commandes ont été mises
         à jour.
         """
-        updated = queryset.update(status="paid")
+        updated = update_order_status(queryset, "paid")
         self.message_user(
             request,
             f"{updated} commande(s) ont été marquées comme payées.",
         )
 
-    actions = [mark_paid]
+    @admin.action(description="Annuler les commandes sélectionnées (stock rendu)")
+    def mark_canceled(self, request, queryset):
+        updated = update_order_status(queryset, "canceled")
+        self.message_user(request, f"{updated} commande(s) annulée(s), stock réservé rendu.")
+
+    @admin.action(description="Marquer les commandes sélectionnées comme remboursées (stock rendu)")
+    def mark_refunded(self, request, queryset):
+        updated = update_order_status(queryset, "refunded")
+        self.message_user(request, f"{updated} commande(s) remboursée(s), stock réservé rendu.")
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        # Statut modifié depuis le formulaire : même règle que les actions
+        if change and "status" in form.changed_data and obj.status in Order.RELEASED_STATUSES:
+            update_order_status(Order.objects.filter(pk=obj.pk), obj.status)
+
+    actions = [mark_paid, mark_canceled, mark_refunded]
+
+
+@admin.register(OutboxEvent)
+class OutboxEventAdmin(admin.ModelAdmin):
+    list_display = ("pk", "topic", "status", "attempts", "available_at", "created_at", "processed_at")
+    list_filter = ("status", "topic")
+    readonly_fields = (
+        "uuid", "topic", "payload", "status", "attempts", "available_at",
+        "completed_handlers", "last_error", "created_at", "processed_at",
+    )
+
+    @admin.action(description="Relancer les événements sélectionnés")
+    def retry(self, request, queryset):
+        """Remet les événements en attente ; seuls les handlers non aboutis seront rejoués."""
+        updated = queryset.exclude(status=OutboxEvent.DONE).update(
+            status=OutboxEvent.PENDING, attempts=0, available_at=timezone.now()
+        )
+        schedule_outbox_dispatch()
+        self.message_user(request, f"{updated} événement(s) remis en attente.")
+
+    actions = [retry]
+
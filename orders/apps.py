@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class OrdersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'orders'
+
+    def ready(self) -> None:
+        # Handlers de l'outbox (emails, signal ``order_validated``)
+        from . import handlers  # noqa: F401
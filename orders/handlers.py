@@ -0,0 +1,76 @@
+"""Handlers de l'outbox pour l'événement ``order.created``.
+
+Enregistrés au démarrage par ``OrdersConfig.ready`` ; ils s'exécutent dans
+le worker Celery (``orders.tasks.dispatch_outbox``) et plus dans la requête
+de checkout.  Chaque email est un handler distinct : un échec SMTP sur l'un
+ne renvoie pas l'autre lors de la nouvelle tentative.
+"""
+
+from __future__ import annotations
+
+from django.conf import settings
+from django.core.mail import send_mail
+
+from core.signals import order_validated
+
+from .models import Order, OutboxEvent
+from .outbox import ORDER_CREATED, register_handler
+
+
+def get_order(event: OutboxEvent) -> Order:
+    return Order.objects.select_related("user").get(pk=event.payload["order_id"])
+
+
+@register_handler(ORDER_CREATED, "email.internal")
+def send_internal_email(event: OutboxEvent) -> None:
+    """Prévient l'équipe interne (``INTERNAL_CONTACTS``) de la nouvelle commande."""
+    order = get_order(event)
+    recipients = getattr(settings, "INTERNAL_CONTACTS", [])
+    if not recipients:
+        return
+    send_mail(
+        f"[COMMANDE] Nouvelle commande {order.order_number}",
+        (
+            "Une nouvelle commande vient d'être passée.\n\n"
+            f"Numéro de commande : {order.order_number}\n"
+            f"Client : {order.first_name} {order.last_name} ({order.email})\n"
+            f"Date : {order.created_at}\n"
+            f"Total TTC : {order.total} €\n\n"
+            "Consultez l'administration pour plus de détails."
+        ),
+        getattr(settings, "DEFAULT_FROM_EMAIL", None) or None,
+        list(recipients),
+    )
+
+
+@register_handler(ORDER_CREATED, "email.customer")
+def send_customer_email(event: OutboxEvent) -> None:
+    """Envoie la confirmation de commande au client."""
+    order = get_order(event)
+    company_name = getattr(settings, "COMPANY_NAME", "Notre boutique")
+    send_mail(
+        f"Votre commande {order.order_number} chez {company_name}",
+        (
+            "Bonjour,\n\n"
+            "Nous vous remercions pour votre commande. Voici un récapitulatif :\n\n"
+            f"Numéro de commande : {order.order_number}\n"
+            f"Total TTC : {order.total} €\n\n"
+            "Nous préparerons votre commande dans les meilleurs délais.\n\n"
+            f"Cordialement,\nL'équipe {company_name}"
+        ),
+        getattr(settings, "DEFAULT_FROM_EMAIL", None) or None,
+        [order.email],
+    )
+
+
+@register_handler(ORDER_CREATED, "signal.order_validated")
+def send_order_validated(event: OutboxEvent) -> None:
+    """Émet ``core.signals.order_validated`` pour les commandes d'un utilisateur connecté.
+
+    Les receivers s'exécutent dans la transaction du handler : une erreur
+    annule leurs écritures et l'événement est rejoué.
+    """
+    order = get_order(event)
+    if order.user is None:
+        return
+    order_validated.send(sender=Order, order=order, user=order.user)
@@ -0,0 +1,78 @@
+"""Clés d'idempotence (en-tête ``Idempotency-Key``) du checkout de l'API.
+
+Un client mobile qui renvoie une requête de checkout après une coupure
+réseau réutilise la même clé : la réponse du premier traitement est
+rejouée, sans relire le panier, ni tarifer, ni créer de commande ::
+
+    status, body, replayed = run_once(user, key, request.path, handler)
+
+La clé est d'abord enregistrée (``get_or_create``, contrainte unique par
+utilisateur), puis verrouillée (``SELECT ... FOR UPDATE``) dans la
+transaction qui exécute ``handler`` et mémorise sa réponse.  Un doublon
+concurrent attend donc la fin du premier traitement puis reçoit sa
+réponse, au lieu de s'exécuter en parallèle.
+
+Les réponses 4xx sont mémorisées comme les succès ; une erreur serveur
+(5xx ou exception) ne l'est pas, la clé peut alors être réutilisée.  Les
+réponses sont conservées ``IDEMPOTENCY_KEY_TTL`` secondes, puis purgées
+par la tâche ``orders.tasks.purge_idempotency_keys``.
+"""
+
+from __future__ import annotations
+
+from datetime import timedelta
+from typing import Any, Callable, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import IdempotencyKey
+
+HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = 255
+
+Handler = Callable[[], Tuple[int, Any]]
+
+
+class IdempotencyKeyMismatch(ValueError):
+    """La clé a déjà servi pour une autre requête."""
+
+
+def get_ttl() -> timedelta:
+    return timedelta(seconds=getattr(settings, "IDEMPOTENCY_KEY_TTL", 24 * 3600))
+
+
+def run_once(user, key: str, path: str, handler: Handler) -> Tuple[int, Any, bool]:
+    """Exécute ``handler`` une seule fois par couple (utilisateur, clé).
+
+    Retourne ``(status, body, replayed)`` ; ``replayed`` vaut ``True`` si la
+    réponse provient d'un traitement précédent.  Lève
+    ``IdempotencyKeyMismatch`` si la clé a été utilisée sur un autre chemin.
+    """
+    record, _ = IdempotencyKey.objects.get_or_create(
+        user=user,
+        key=key,
+        defaults={"request_path": path, "expires_at": timezone.now() + get_ttl()},
+    )
+    with transaction.atomic():
+        # Attend la fin d'un traitement concurrent avec la même clé
+        record = IdempotencyKey.objects.select_for_update().get(pk=record.pk)
+        if record.request_path != path:
+            raise IdempotencyKeyMismatch(f"La clé {key!r} a déjà été utilisée pour {record.request_path}.")
+        if record.is_complete:
+            return record.response_status, record.response_body, True
+
+        status, body = handler()
+        if status < 500:
+            record.response_status = status
+            record.response_body = body
+            record.expires_at = timezone.now() + get_ttl()
+            record.save(update_fields=["response_status", "response_body", "expires_at"])
+        return status, body, False
+
+
+def purge_expired() -> int:
+    """Supprime les clés expirées ; retourne leur nombre."""
+    deleted, _ = IdempotencyKey.objects.filter(expires_at__lte=timezone.now()).delete()
+    return deleted
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.8 on 2026-10-18 09:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0004_seed_pricing_rules'),
+        ('orders', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='orderitem',
+            name='product',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='catalog.product'),
+        ),
+        migrations.AddField(
+            model_name='orderitem',
+            name='reserved_quantity',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
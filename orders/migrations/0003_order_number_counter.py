@@ -0,0 +1,24 @@
+# Generated by Django 5.2.8 on 2026-10-18 09:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0002_order_item_stock_reservation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderNumberCounter',
+            fields=[
+                ('day', models.DateField(primary_key=True, serialize=False)),
+                ('last_value', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Compteur de numéros de commande',
+                'verbose_name_plural': 'Compteurs de numéros de commande',
+            },
+        ),
+    ]
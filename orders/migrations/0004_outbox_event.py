@@ -0,0 +1,37 @@
+# Generated by Django 5.2.8 on 2026-10-18 09:31
+
+import django.utils.timezone
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0003_order_number_counter'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('uuid', models.UUIDField(default=uuid.uuid4, editable=False, unique=True)),
+                ('topic', models.CharField(max_length=64)),
+                ('payload', models.JSONField(default=dict)),
+                ('status', models.CharField(choices=[('pending', 'En attente'), ('done', 'Traité'), ('failed', 'En échec')], default='pending', max_length=8)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('available_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('completed_handlers', models.JSONField(blank=True, default=list)),
+                ('last_error', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Événement à diffuser',
+                'verbose_name_plural': 'Événements à diffuser',
+                'ordering': ['pk'],
+                'indexes': [models.Index(fields=['status', 'available_at'], name='outbox_pending_idx')],
+            },
+        ),
+    ]
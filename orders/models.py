@@ -1,10 +1,15 @@
-from django.db import models
+import uuid
+
+from django.db import IntegrityError, connection, models, transaction
 from django.conf import settings
 from clients.models import Client
 from decimal import Decimal
 from django.utils import timezone
 
 class Order(models.Model):
+    #: Statuts qui rendent au stock les quantités réservées (cf. ``orders.stock``)
+    RELEASED_STATUSES = ("canceled", "refunded")
+
     STATUS_CHOICES = [
         ("pending", "En attente"),
         ("paid", "Payée"),
@@ -50,29 +55,227 @@ class Order(models.Model):
     discount = models.DecimalField(max_digits=10, decimal_places=2, default=Decimal("0.00"))
 
     created_at = models.DateTimeField(auto_now_add=True)
+    # Dernière modification : flux des commandes modifiées de l'API
+    # (``?ordering=updated_at``) pour les synchronisations ERP
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ["-created_at"]
+        # Index des parcours par curseur (``api.pagination.KeysetPagination``)
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="order_created_keyset_idx"),
+            models.Index(fields=["updated_at", "id"], name="order_updated_keyset_idx"),
+            models.Index(fields=["status", "created_at", "id"], name="order_status_keyset_idx"),
+        ]
 
     def __str__(self):
         return self.order_number
 
     def save(self, *args, **kwargs):
         if not self.order_number:
-            # Format lisible YYYYMMDD-HHMM-XXXX
-            stamp = timezone.now().strftime("%Y%m%d-%H%M")
-            seq = (Order.objects.filter(created_at__date=timezone.now().date()).count() + 1)
-            self.order_number = f"{stamp}-{seq:04d}"
+            # Numéro attribué à l'enregistrement : le compteur du jour reste
+            # verrouillé jusqu'à la fin de la transaction de l'appelant (les
+            # checkouts enregistrent un numéro provisoire, cf. ``assign_number``)
+            self.order_number = self._next_number()
         super().save(*args, **kwargs)
 
+    @staticmethod
+    def _next_number() -> str:
+        """Format lisible YYYYMMDD-HHMM-XXXX ; séquence journalière ``OrderNumberCounter``."""
+        now = timezone.now()
+        seq = OrderNumberCounter.next_value(now.date())
+        return f"{now:%Y%m%d-%H%M}-{seq:04d}"
+
+    @staticmethod
+    def provisional_number() -> str:
+        """Numéro unique (sans tiret, distinct du format définitif) en attendant ``assign_number``."""
+        return uuid.uuid4().hex
+
+    def assign_number(self) -> None:
+        """Remplace le numéro provisoire de la commande enregistrée par son numéro définitif.
+
+        À appeler en dernier dans la transaction du checkout : la ligne du
+        compteur, verrouillée par l'incrément, n'est alors tenue que le
+        temps de cette mise à jour et du ``COMMIT``.
+        """
+        self.order_number = self._next_number()
+        Order.objects.filter(pk=self.pk).update(order_number=self.order_number)
+
+
+class OrderNumberCounter(models.Model):
+    """Compteur journalier des numéros de commande.
+
+    Une ligne par jour, incrémentée par un ``UPDATE ... RETURNING`` : deux
+    checkouts simultanés obtiennent toujours deux valeurs distinctes, la
+    base sérialisant les écritures sur la ligne.  L'incrément fait partie
+    de la transaction de la commande : une commande annulée par un
+    rollback rend son numéro, la séquence reste donc sans trou.
+
+    Contrepartie : la ligne du jour reste verrouillée jusqu'au ``COMMIT``
+    de cette transaction, et les checkouts du jour s'y succèdent un par
+    un.  Les checkouts attribuent donc le numéro en dernier
+    (``Order.assign_number``) pour réduire ce temps à la dernière
+    instruction.  Attribuer le numéro dans une transaction séparée
+    libérerait le verrou aussitôt, au prix de trous dans la séquence à
+    chaque commande annulée : ce n'est pas le choix retenu.
+    """
+
+    day = models.DateField(primary_key=True)
+    last_value = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Compteur de numéros de commande"
+        verbose_name_plural = "Compteurs de numéros de commande"
+
+    def __str__(self) -> str:
+        return f"{self.day} : {self.last_value}"
+
+    @classmethod
+    def next_value(cls, day) -> int:
+        """Réserve et retourne la prochaine valeur de la séquence du jour ``day``."""
+        with transaction.atomic():
+            value = cls._increment(day)
+            if value is not None:
+                return value
+            # Première commande du jour : la séquence reprend après les
+            # numéros déjà attribués ce jour-là (déploiement en cours de journée)
+            existing = Order.objects.filter(order_number__startswith=f"{day:%Y%m%d}-").count()
+            try:
+                with transaction.atomic():
+                    cls.objects.create(day=day, last_value=existing + 1)
+                return existing + 1
+            except IntegrityError:
+                # Ligne créée entre-temps par un checkout concurrent
+                return cls._increment(day)
+
+    @classmethod
+    def _increment(cls, day) -> int | None:
+        """Incrémente la ligne du jour ``day`` ; retourne sa nouvelle valeur, ``None`` si elle n'existe pas.
+
+        Une seule instruction ``UPDATE ... RETURNING`` sur PostgreSQL et
+        SQLite (3.35+) ; ailleurs (MySQL), ``UPDATE`` puis relecture.
+        """
+        if connection.vendor in ("postgresql", "sqlite") and connection.features.can_return_columns_from_insert:
+            quote = connection.ops.quote_name
+            sql = "UPDATE {table} SET {value} = {value} + 1 WHERE {day} = %s RETURNING {value}".format(
+                table=quote(cls._meta.db_table), value=quote("last_value"), day=quote("day")
+            )
+            with connection.cursor() as cursor:
+                cursor.execute(sql, [cls._meta.get_field("day").get_db_prep_value(day, connection)])
+                row = cursor.fetchone()
+            return row[0] if row else None
+        if cls.objects.filter(day=day).update(last_value=models.F("last_value") + 1):
+            return cls.objects.values_list("last_value", flat=True).get(day=day)
+        return None
+
 
 class OrderItem(models.Model):
     order = models.ForeignKey(Order, related_name="items", on_delete=models.CASCADE)
+    # Produit commandé ; le titre et le SKU restent recopiés pour l'historique
+    product = models.ForeignKey(
+        "catalog.Product", on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
     product_title = models.CharField(max_length=255)
     product_sku = models.CharField(max_length=64)
     unit_price = models.DecimalField(max_digits=10, decimal_places=2)
     quantity = models.PositiveIntegerField()
     line_total = models.DecimalField(max_digits=10, decimal_places=2)
+    # Quantité décrémentée du stock au checkout, remise à zéro une fois rendue
+    reserved_quantity = models.PositiveIntegerField(default=0)
 
     def __str__(self):
         return f"{self.product_title} x{self.quantity}"
+
+    @classmethod
+    def from_cart_line(cls, order: Order, line) -> "OrderItem":
+        """Ligne de commande (non enregistrée) à partir d'une ligne de panier tarifée.
+
+        La quantité est marquée comme réservée : l'appelant réserve le
+        stock (``orders.stock.reserve_stock``) dans la même transaction.
+        """
+        return cls(
+            order=order,
+            product_id=line.product.id,
+            product_title=getattr(line.product, "title", None) or "",
+            product_sku=line.product.sku,
+            unit_price=line.unit_price or Decimal("0"),
+            quantity=line.quantity,
+            line_total=line.total_price or Decimal("0"),
+            reserved_quantity=line.quantity,
+        )
+
+
+class OutboxEvent(models.Model):
+    """Événement à diffuser après validation d'une transaction (outbox transactionnelle).
+
+    Écrit dans la transaction qui produit l'événement (checkout), il n'existe
+    que si celle-ci est validée.  ``orders.outbox.dispatch_pending`` (tâche
+    Celery ``orders.tasks.dispatch_outbox``) le diffuse ensuite aux handlers
+    enregistrés pour son ``topic`` ; ``completed_handlers`` mémorise ceux qui
+    ont abouti, afin qu'une nouvelle tentative ne rejoue que les handlers en
+    échec.
+    """
+
+    PENDING = "pending"
+    DONE = "done"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (PENDING, "En attente"),
+        (DONE, "Traité"),
+        (FAILED, "En échec"),
+    ]
+
+    # Identifiant transmis aux systèmes externes comme clé d'idempotence
+    uuid = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    topic = models.CharField(max_length=64)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=8, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    # Date à partir de laquelle l'événement peut être (re)traité : recul
+    # exponentiel après un échec, bail pendant le traitement
+    available_at = models.DateTimeField(default=timezone.now)
+    completed_handlers = models.JSONField(default=list, blank=True)
+    last_error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Événement à diffuser"
+        verbose_name_plural = "Événements à diffuser"
+        ordering = ["pk"]
+        indexes = [models.Index(fields=["status", "available_at"], name="outbox_pending_idx")]
+
+    def __str__(self) -> str:
+        return f"{self.topic} #{self.pk} ({self.get_status_display()})"
+
+
+class IdempotencyKey(models.Model):
+    """Réponse mémorisée pour une clé ``Idempotency-Key`` d'un utilisateur.
+
+    Utilisée par le checkout de l'API (``orders.idempotency``) : une requête
+    rejouée avec la même clé reçoit la réponse enregistrée au lieu de créer
+    une seconde commande.  La ligne est créée avant le traitement et
+    verrouillée pendant celui-ci ; ``response_status`` reste vide tant que
+    la première requête n'a pas abouti.
+    """
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="+")
+    key = models.CharField(max_length=255)
+    # Requête à laquelle la clé a été associée (une clé ne sert qu'à un endpoint)
+    request_path = models.CharField(max_length=255)
+    response_status = models.PositiveSmallIntegerField(null=True, blank=True)
+    response_body = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        verbose_name = "Clé d'idempotence"
+        verbose_name_plural = "Clés d'idempotence"
+        constraints = [models.UniqueConstraint(fields=["user", "key"], name="idempotency_key_per_user")]
+
+    def __str__(self) -> str:
+        return f"{self.key} ({self.user_id})"
+
+    @property
+    def is_complete(self) -> bool:
+        return self.response_status is not None and self.expires_at > timezone.now()
@@ -0,0 +1,138 @@
+"""Outbox transactionnelle : effets de bord différés du passage de commande.
+
+``publish`` écrit un ``OutboxEvent`` dans la transaction courante (celle du
+checkout) : l'événement n'existe que si la commande est validée, et la
+requête HTTP n'attend plus ni les emails ni les autres effets de bord.
+Après le commit, la tâche Celery ``orders.tasks.dispatch_outbox`` est
+planifiée ; elle est aussi exécutée périodiquement (``CELERY_BEAT_SCHEDULE``)
+pour reprendre les événements en échec ou orphelins.
+
+Les applications enregistrent leurs handlers par sujet dans leur
+``AppConfig.ready`` ::
+
+    @register_handler(ORDER_CREATED, "loyalty")
+    def award_points(event): ...
+
+``dispatch_pending`` réserve un lot d'événements (bail ``LEASE`` ; les
+lignes déjà réservées par un autre worker sont sautées), puis exécute
+chaque handler dans son propre savepoint, avec l'enregistrement de son
+succès dans ``completed_handlers`` :
+
+* un handler qui n'écrit qu'en base (notification, fidélité) est appliqué
+  exactement une fois ;
+* un handler externe (email, ERP) l'est au moins une fois ; il reçoit
+  ``event.uuid`` comme clé d'idempotence.
+
+Un handler en échec n'empêche pas les autres ; seul lui est rejoué, avec
+un recul exponentiel, jusqu'à ``MAX_ATTEMPTS`` tentatives (statut
+``failed``, relançable depuis l'admin).
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import timedelta
+from typing import Callable, Dict, List
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutboxEvent
+
+logger = logging.getLogger(__name__)
+
+#: Commande validée ; charge utile ``{"order_id": int, "user_id": int | None}``.
+ORDER_CREATED = "order.created"
+
+#: Nombre d'événements réservés par passage du dispatcher.
+BATCH_SIZE = 100
+#: Durée de réservation d'un lot ; passé ce délai, un autre worker le reprend.
+LEASE = timedelta(minutes=5)
+MAX_ATTEMPTS = 8
+#: Premier délai avant nouvelle tentative, doublé à chaque échec.
+RETRY_DELAY = timedelta(seconds=30)
+MAX_RETRY_DELAY = timedelta(hours=1)
+
+Handler = Callable[[OutboxEvent], None]
+
+_handlers: Dict[str, Dict[str, Handler]] = {}
+
+
+def register_handler(topic: str, name: str) -> Callable[[Handler], Handler]:
+    """Enregistre un handler sous ``name`` pour les événements ``topic``.
+
+    ``name`` identifie le handler dans ``completed_handlers`` : il doit
+    rester stable d'une version à l'autre.
+    """
+
+    def decorator(handler: Handler) -> Handler:
+        _handlers.setdefault(topic, {})[name] = handler
+        return handler
+
+    return decorator
+
+
+def get_handlers(topic: str) -> Dict[str, Handler]:
+    return dict(_handlers.get(topic, {}))
+
+
+def publish(topic: str, payload: dict) -> OutboxEvent:
+    """Enregistre un événement dans la transaction courante.
+
+    La diffusion est planifiée après le commit ; un rollback supprime
+    l'événement avec le reste de la transaction.
+    """
+    event = OutboxEvent.objects.create(topic=topic, payload=payload)
+    from .tasks import schedule_outbox_dispatch
+
+    schedule_outbox_dispatch()
+    return event
+
+
+def retry_delay(attempts: int) -> timedelta:
+    return min(RETRY_DELAY * 2 ** (attempts - 1), MAX_RETRY_DELAY)
+
+
+def dispatch_pending(batch_size: int = BATCH_SIZE) -> int:
+    """Diffuse un lot d'événements disponibles ; retourne le nombre d'événements traités."""
+    now = timezone.now()
+    with transaction.atomic():
+        ids: List[int] = list(
+            OutboxEvent.objects.select_for_update(skip_locked=True)
+            .filter(status=OutboxEvent.PENDING, available_at__lte=now)
+            .order_by("pk")
+            .values_list("pk", flat=True)[:batch_size]
+        )
+        OutboxEvent.objects.filter(pk__in=ids).update(available_at=now + LEASE)
+    for event in OutboxEvent.objects.filter(pk__in=ids).order_by("pk"):
+        _dispatch(event)
+    return len(ids)
+
+
+def _dispatch(event: OutboxEvent) -> None:
+    errors: Dict[str, str] = {}
+    for name, handler in get_handlers(event.topic).items():
+        if name in event.completed_handlers:
+            continue
+        try:
+            with transaction.atomic():
+                handler(event)
+                event.completed_handlers = [*event.completed_handlers, name]
+                event.save(update_fields=["completed_handlers"])
+        except Exception as exc:
+            logger.exception("Handler %s en échec pour l'événement %s", name, event.pk)
+            errors[name] = f"{type(exc).__name__}: {exc}"
+
+    now = timezone.now()
+    if not errors:
+        event.status = OutboxEvent.DONE
+        event.processed_at = now
+        event.last_error = ""
+    else:
+        event.attempts += 1
+        event.last_error = "\n".join(f"{name}: {error}" for name, error in errors.items())
+        if event.attempts >= MAX_ATTEMPTS:
+            event.status = OutboxEvent.FAILED
+        else:
+            event.available_at = now + retry_delay(event.attempts)
+    event.save(update_fields=["status", "processed_at", "last_error", "attempts", "available_at"])
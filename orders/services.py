@@ -18,11 +18,12 @@ from typing import Tuple, Optional, Any
 from django.db import transaction
 from django.utils import timezone
 
-from cart.cart import Cart
 from core.factory import get_cart_service
 
 from .forms import CheckoutForm
 from .models import Order, OrderItem
+from .outbox import ORDER_CREATED, publish
+from .stock import reserve_stock, release_stock
 
 try:  # Coupon est optionnel (feature loyalty)
     from loyalty.models import Coupon  # type: ignore
@@ -39,12 +40,16 @@ class CheckoutService:
     * récupération du panier tarifé via le ``CartService`` de ``core``,
     * application des coupons (montant ou pourcentage),
     * calcul du sous‑total, de la remise et du total,
-    * création de l'``Order`` et des ``OrderItem`` associés,
+    * réservation du stock de toutes les lignes (``orders.stock``),
+    * création de l'``Order`` et des ``OrderItem`` associés (un seul
+      ``bulk_create`` pour les lignes),
+    * publication de l'événement ``order.created`` dans l'outbox
+      (``orders.outbox``), qui porte les notifications et les emails,
     * nettoyage du panier et du coupon en session.
 
     Les vues n'ont plus à manipuler directement les montants ni à
     connaître les règles métier : elles délèguent à ce service et se
-    concentrent sur l'IHM (messages, redirections, notifications).
+    concentrent sur l'IHM (messages, redirections).
     """
 
     def __init__(self, cart_service=None) -> None:
@@ -92,26 +97,22 @@ class CheckoutService:
     def checkout(self, request, form: CheckoutForm) -> Order:
         """Crée une commande à partir du panier courant.
 
-        Lève ``ValueError`` si le panier est vide.
+        Lève ``ValueError`` si le panier est vide et
+        ``orders.stock.InsufficientStock`` (sous-classe de ``ValueError``)
+        si le stock d'un produit ne couvre pas la quantité commandée ;
+        ``orders.stock.StockReservationConflict`` si la réservation du stock
+        échoue sans rupture (commandes concurrentes).
         """
 
-        # Panier brut (session) pour conserver l'interface utilisée par
-        # le reste du projet et permettre le nettoyage.
-        cart_session = Cart(request)
-        if len(cart_session) == 0:
-            raise ValueError("Impossible de créer une commande depuis un panier vide.")
-
-        # Panier enrichi via le service de domaine (prix calculés).
+        # Panier enrichi via le service de domaine (prix calculés).  Le
+        # contexte de la requête est partagé avec la vue : le panier tarifé
+        # par celle-ci est réutilisé tel quel.
         cart_dto = self.cart_service.get_cart(request)
-        subtotal = cart_dto.total or Decimal("0")
-
-        # Application éventuelle d'un coupon
-        discount_amount, coupon_code, _ = self.compute_coupon_discount(subtotal, request)
-        total = subtotal - discount_amount
+        if not cart_dto.items:
+            raise ValueError("Impossible de créer une commande depuis un panier vide.")
 
         data = form.cleaned_data
-
-        order = Order.objects.create(
+        order = Order(
             user=request.user if request.user.is_authenticated else None,
             email=data["email"],
             first_name=data["first_name"],
@@ -124,27 +125,60 @@ class CheckoutService:
             postcode=data["postcode"],
             country=data["country"],
             notes=data.get("notes", ""),
-            subtotal=subtotal,
             shipping=Decimal("0"),
-            total=total,
-            coupon_code=coupon_code or "",
-            discount=discount_amount,
         )
 
-        # Création des lignes de commande à partir des items tarifés
+        # Un seul passage sur le panier : lignes construites en mémoire,
+        # sous-total et quantités à réserver cumulés au fil de l'eau
+        items: list[OrderItem] = []
+        quantities: dict[int, int] = {}
+        subtotal = Decimal("0")
         for item_dto in cart_dto.items:
-            OrderItem.objects.create(
-                order=order,
-                product_title=getattr(item_dto.product, "title", ""),
-                product_sku=item_dto.product.sku,
-                unit_price=item_dto.unit_price,
-                quantity=item_dto.quantity,
-                line_total=item_dto.total_price,
-            )
-
-        # Nettoyage du panier et du coupon en session
-        cart_session.clear()
+            items.append(OrderItem.from_cart_line(order, item_dto))
+            quantities[item_dto.product.id] = quantities.get(item_dto.product.id, 0) + item_dto.quantity
+            subtotal += item_dto.total_price or Decimal("0")
+
+        # Application éventuelle d'un coupon
+        discount_amount, coupon_code, _ = self.compute_coupon_discount(subtotal, request)
+        order.subtotal = subtotal
+        order.discount = discount_amount
+        order.total = subtotal - discount_amount
+        order.coupon_code = coupon_code or ""
+
+        # Réservation du stock dans la transaction du checkout : une seule
+        # instruction conditionnelle pour toutes les lignes, tout ou rien
+        reserve_stock(quantities)
+
+        # Commande puis toutes ses lignes : deux INSERT quel que soit le
+        # nombre de lignes (``bulk_create`` reprend la clé de ``order``).
+        # Numéro provisoire : le définitif est attribué en dernier
+        order.order_number = Order.provisional_number()
+        order.save()
+        OrderItem.objects.bulk_create(items)
+
+        # Effets de bord (notification, fidélité, emails, ERP) confiés à
+        # l'outbox : l'événement est validé ou annulé avec la commande
+        publish(ORDER_CREATED, {"order_id": order.pk, "user_id": order.user_id})
+
+        # Nettoyage du panier (session ou panier enregistré) et du coupon
+        self.cart_service.clear(request)
         request.session.pop("coupon_code", None)
 
+        # Numéro définitif en dernière instruction : le compteur du jour
+        # n'est verrouillé que jusqu'au COMMIT qui suit
+        order.assign_number()
         return order
 
+
+@transaction.atomic
+def update_order_status(orders, status: str) -> int:
+    """Change le statut des commandes ``orders`` (queryset) et retourne leur nombre.
+
+    Le passage à un statut de ``Order.RELEASED_STATUSES`` (annulée,
+    remboursée) rend au stock les quantités réservées au checkout.
+    """
+    order_ids = list(orders.values_list("pk", flat=True))
+    updated = Order.objects.filter(pk__in=order_ids).update(status=status, updated_at=timezone.now())
+    if status in Order.RELEASED_STATUSES:
+        release_stock(order_ids)
+    return updated
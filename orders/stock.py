@@ -0,0 +1,130 @@
+"""Réservation du stock produit au passage de commande.
+
+Le stock est décrémenté pour toutes les lignes d'une commande par une
+seule instruction conditionnelle ::
+
+    UPDATE catalog_product
+       SET stock = stock - CASE id WHEN 1 THEN 10 WHEN 2 THEN 5 END
+     WHERE id IN (1, 2)
+       AND stock >= CASE id WHEN 1 THEN 10 WHEN 2 THEN 5 END
+
+La condition est évaluée par la base sur la ligne verrouillée par
+l'``UPDATE`` : deux commandes simultanées ne peuvent pas vendre la même
+unité, sans lecture préalable ni ``SELECT ... FOR UPDATE`` par ligne.
+Si le nombre de lignes modifiées ne correspond pas au nombre de
+produits, la réservation est annulée (savepoint) et les produits en
+rupture sont identifiés puis signalés par ``InsufficientStock``.  Si la
+relecture ne montre aucune rupture (stock rendu entre-temps par une
+autre requête) à chacune des ``RESERVE_ATTEMPTS`` tentatives, c'est un
+conflit passager et non une rupture : ``StockReservationConflict``.
+
+Les quantités réservées sont mémorisées sur les lignes de commande
+(``OrderItem.reserved_quantity``) et rendues au stock par
+``release_stock`` lors d'une annulation ou d'un remboursement.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Iterable, Mapping, Tuple
+
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Value, When
+
+from catalog.models import Product
+
+from .models import OrderItem
+
+#: Nombre de tentatives lorsque l'échec n'est plus constaté à la relecture
+#: (stock réapprovisionné ou libéré entre-temps par une autre requête).
+RESERVE_ATTEMPTS = 3
+
+
+class InsufficientStock(ValueError):
+    """Stock insuffisant pour au moins une ligne de la commande.
+
+    ``shortages`` associe à chaque produit en rupture le couple
+    ``(quantité demandée, stock disponible)``.
+    """
+
+    def __init__(self, shortages: Dict[int, Tuple[int, int]]):
+        self.shortages = shortages
+        super().__init__(f"Stock insuffisant pour {len(shortages)} produit(s).")
+
+
+class StockReservationConflict(RuntimeError):
+    """La réservation a échoué à chaque tentative sans rupture constatée.
+
+    Des commandes concurrentes modifient le stock de ``product_ids`` : la
+    commande peut simplement être renvoyée.
+    """
+
+    def __init__(self, product_ids: Iterable[int]):
+        self.product_ids = sorted(product_ids)
+        super().__init__("Le stock est en cours de modification par d'autres commandes, veuillez réessayer.")
+
+
+def _per_product(quantities: Mapping[int, int]) -> Case:
+    """Expression ``CASE id WHEN <id> THEN <quantité> ... END``."""
+    return Case(
+        *(When(pk=product_id, then=Value(quantity)) for product_id, quantity in quantities.items()),
+        output_field=IntegerField(),
+    )
+
+
+def reserve_stock(quantities: Mapping[int, int]) -> None:
+    """Décrémente en une instruction le stock de tous les produits de ``quantities``.
+
+    ``quantities`` associe un identifiant produit à la quantité commandée.
+    Tout ou rien : si un produit manque de stock, aucun stock n'est
+    décrémenté et ``InsufficientStock`` est levée ;
+    ``StockReservationConflict`` si la réservation échoue sans rupture
+    après ``RESERVE_ATTEMPTS`` tentatives.  À appeler dans la transaction
+    qui crée la commande.
+    """
+    quantities = {product_id: quantity for product_id, quantity in quantities.items() if quantity > 0}
+    if not quantities:
+        return
+    for _ in range(RESERVE_ATTEMPTS):
+        with transaction.atomic():
+            amount = _per_product(quantities)
+            updated = Product.objects.filter(pk__in=quantities, stock__gte=amount).update(
+                stock=F("stock") - amount
+            )
+            if updated == len(quantities):
+                return
+            # Réservation partielle : on annule le savepoint avant d'identifier les ruptures
+            transaction.set_rollback(True)
+        available = dict(Product.objects.filter(pk__in=quantities).values_list("pk", "stock"))
+        shortages = {
+            product_id: (quantity, available.get(product_id, 0))
+            for product_id, quantity in quantities.items()
+            if available.get(product_id, 0) < quantity
+        }
+        if shortages:
+            raise InsufficientStock(shortages)
+    raise StockReservationConflict(quantities)
+
+
+def release_stock(order_ids: Iterable[int]) -> int:
+    """Rend au stock les quantités réservées par les commandes ``order_ids``.
+
+    Idempotent : les lignes libérées voient leur ``reserved_quantity``
+    remise à zéro, une seconde libération est sans effet.  Les lignes
+    sont verrouillées le temps de l'opération pour qu'une annulation et
+    un remboursement simultanés ne rendent pas deux fois le stock.
+    Retourne le nombre de lignes libérées.
+    """
+    with transaction.atomic():
+        rows = list(
+            OrderItem.objects.select_for_update()
+            .filter(order_id__in=list(order_ids), reserved_quantity__gt=0, product__isnull=False)
+            .values_list("pk", "product_id", "reserved_quantity")
+        )
+        if not rows:
+            return 0
+        quantities: Dict[int, int] = {}
+        for _, product_id, quantity in rows:
+            quantities[product_id] = quantities.get(product_id, 0) + quantity
+        Product.objects.filter(pk__in=quantities).update(stock=F("stock") + _per_product(quantities))
+        OrderItem.objects.filter(pk__in=[pk for pk, _, _ in rows]).update(reserved_quantity=0)
+    return len(rows)
@@ -0,0 +1,48 @@
+"""Tâches Celery de l'application orders.
+
+``dispatch_outbox`` diffuse les événements de l'outbox transactionnelle
+(voir ``orders.outbox``).  Elle est planifiée après chaque commit qui
+publie un événement et exécutée périodiquement (``CELERY_BEAT_SCHEDULE``)
+pour les nouvelles tentatives.  ``purge_idempotency_keys`` supprime les
+clés d'idempotence expirées du checkout de l'API.
+"""
+
+from celery import shared_task
+from django.db import transaction
+from kombu.exceptions import OperationalError as KombuOperationalError
+
+from . import idempotency
+from .outbox import BATCH_SIZE, dispatch_pending
+
+
+@shared_task
+def dispatch_outbox(batch_size: int = BATCH_SIZE) -> int:
+    """Diffuse les événements disponibles, lot par lot ; retourne leur nombre."""
+    total = 0
+    while True:
+        dispatched = dispatch_pending(batch_size)
+        total += dispatched
+        if dispatched < batch_size:
+            return total
+
+
+@shared_task
+def purge_idempotency_keys() -> int:
+    return idempotency.purge_expired()
+
+
+def schedule_outbox_dispatch() -> None:
+    """Planifie ``dispatch_outbox`` après le commit de la transaction.
+
+    Sans broker disponible, l'événement reste en base : le passage
+    périodique du dispatcher le reprendra (pas d'exécution synchrone, qui
+    rajouterait les effets de bord à la durée de la requête).
+    """
+
+    def enqueue() -> None:
+        try:
+            dispatch_outbox.delay()
+        except (KombuOperationalError, ConnectionError):
+            pass
+
+    transaction.on_commit(enqueue)
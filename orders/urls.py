@@ -6,4 +6,5 @@ app_name = "orders"
 urlpatterns = [
     path("checkout/", views.checkout, name="checkout"),
     path("success/<str:order_number>/", views.checkout_success, name="success"),
+    path("reorder/<int:order_id>/", views.reorder, name="reorder"),
 ]
\ No newline at end of file
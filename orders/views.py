@@ -1,15 +1,18 @@
+from django.contrib.auth.decorators import login_required
+from django.http import Http404
 from django.shortcuts import render, redirect
+from django.views.decorators.http import require_POST
 from django.urls import reverse
 from django.contrib import messages
 from django.contrib.auth import get_user_model
 
-from cart.cart import Cart
-from core.signals import order_validated
-from core.factory import get_cart_service  # fabrique du service de panier
+from cart.context import get_cart_context
+from core.factory import get_cart_service, get_order_service  # fabriques des services
 
 from .forms import CheckoutForm
 from .models import Order
 from .services import CheckoutService
+from .stock import InsufficientStock, StockReservationConflict
 
 User = get_user_model()
 
@@ -23,19 +26,20 @@ def checkout(request):
 
     * vérifier que le panier n'est pas vide ;
     * gérer les formulaires et messages ;
-    * orchestrer les notifications et les emails ;
     * préparer les données de présentation pour le template.
-    """
 
-    # Panier brut (session) pour contrôle rapide
-    cart_session = Cart(request)
-    if len(cart_session) == 0:
-        messages.info(request, "Votre panier est vide.")
-        return redirect("cart:detail")
+    Notification, points de fidélité et emails sont diffusés après coup
+    par l'outbox (``orders.outbox``), hors de la requête.
+    """
 
-    # Panier enrichi via le service de domaine (prix calculés)
+    # Panier enrichi via le service de domaine (prix calculés).  Le
+    # repository y recopie au besoin le panier enregistré de l'utilisateur.
     cart_service = get_cart_service()
     cart_dto = cart_service.get_cart(request)
+    if not cart_dto.items:
+        messages.info(request, "Votre panier est vide.")
+        return redirect("cart:detail")
+    cart_session = get_cart_context(request).cart
     checkout_service = CheckoutService(cart_service=cart_service)
 
     if request.method == "POST":
@@ -43,71 +47,23 @@ def checkout(request):
         if form.is_valid():
             try:
                 order = checkout_service.checkout(request, form)
+            except InsufficientStock as exc:
+                titles = {item.product.id: item.product.title or item.product.sku for item in cart_dto.items}
+                details = ", ".join(
+                    f"{titles.get(product_id, product_id)} ({available} disponible(s))"
+                    for product_id, (_, available) in exc.shortages.items()
+                )
+                messages.error(request, f"Stock insuffisant : {details}. Ajustez les quantités de votre panier.")
+                return redirect("cart:detail")
+            except StockReservationConflict as exc:
+                # Conflit passager : le formulaire rempli est réaffiché
+                messages.error(request, str(exc))
             except ValueError:
                 messages.info(request, "Votre panier est vide.")
                 return redirect("cart:detail")
-
-            # Création d'une notification interne pour l'utilisateur connecté
-            if request.user.is_authenticated:
-                try:
-                    # Import local pour éviter les dépendances circulaires
-                    from notifications.models import Notification  # type: ignore
-
-                    Notification.objects.create(
-                        user=request.user,
-                        message=f"Votre commande {order.order_number} a été créée.",
-                    )
-                except Exception:
-                    # Laisse passer silencieusement si l'app notifications n'est pas installée
-                    pass
-
-                # Émet un signal pour permettre à des applications tierces
-                # (par exemple loyalty) de réagir à la validation d'une commande
-                try:
-                    order_validated.send(sender=Order, order=order, user=request.user)
-                except Exception:
-                    # Si l'émetteur échoue on n'empêche pas la commande de se créer
-                    pass
-
-            # Envoi d'emails (interne + confirmation client)
-            try:
-                from django.conf import settings
-                from core.utils.async_email import async_send_mail
-
-                internal_subject = f"[COMMANDE] Nouvelle commande {order.order_number}"
-                internal_body = (
-                    "Une nouvelle commande vient d'être passée.\n\n"
-                    f"Numéro de commande : {order.order_number}\n"
-                    f"Client : {order.first_name} {order.last_name} ({order.email})\n"
-                    f"Date : {order.created_at}\n"
-                    f"Total TTC : {order.total} €\n\n"
-                    "Consultez l'administration pour plus de détails."
-                )
-                from_email = getattr(settings, "DEFAULT_FROM_EMAIL", None) or None
-                async_send_mail(
-                    internal_subject,
-                    internal_body,
-                    from_email,
-                    getattr(settings, "INTERNAL_CONTACTS", []),
-                )
-
-                company_name = getattr(settings, "COMPANY_NAME", "Notre boutique")
-                client_subject = f"Votre commande {order.order_number} chez {company_name}"
-                client_body = (
-                    "Bonjour,\n\n"
-                    "Nous vous remercions pour votre commande. Voici un récapitulatif :\n\n"
-                    f"Numéro de commande : {order.order_number}\n"
-                    f"Total TTC : {order.total} €\n\n"
-                    "Nous préparerons votre commande dans les meilleurs délais.\n\n"
-                    f"Cordialement,\nL'équipe {company_name}"
-                )
-                async_send_mail(client_subject, client_body, from_email, [order.email])
-            except Exception:
-                # Ignore les erreurs d'envoi en développement
-                pass
-
-            messages.success(request, "Commande créée avec succès.")
-            return redirect("orders:success", order_number=order.order_number)
+            else:
+                messages.success(request, "Commande créée avec succès.")
+                return redirect("orders:success", order_number=order.order_number)
         else:
             messages.error(request, "Merci de corriger les erreurs.")
     else:
@@ -206,3 +162,23 @@ def checkout_success(request, order_number):
         return redirect("core:home")
     return render(request, "orders/success.html", {"order": order})
 
+
+@login_required
+@require_POST
+def reorder(request, order_id):
+    """Recommande : ajoute au panier les lignes d'une commande passée.
+
+    Les quantités respectent les règles MOQ / PCB actuelles ; les
+    produits devenus indisponibles sont listés dans un message.
+    """
+    try:
+        result = get_order_service().reorder(request, [order_id], user_id=request.user.id)
+    except Order.DoesNotExist:
+        raise Http404("Commande introuvable.")
+    added = len(result.lines) - len(result.errors)
+    if added:
+        messages.success(request, f"{added} produit(s) de la commande ajouté(s) au panier.")
+    if result.errors:
+        codes = ", ".join(line.code for line in result.errors)
+        messages.warning(request, f"Produits indisponibles, non ajoutés : {codes}.")
+    return redirect("cart:detail")
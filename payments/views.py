@@ -5,6 +5,7 @@ from django.urls import reverse
 from django.views.decorators.http import require_POST
 
 from cart.cart import Cart
+from cart.context import get_cart_context
 from orders.models import Order
 from .models import Payment
 from .paypal import create_order, capture_order
@@ -16,7 +17,7 @@ def _total_str(cart: Cart) -> str:
 
 @require_POST
 def paypal_create(request: HttpRequest):
-    cart = Cart(request)
+    cart = get_cart_context(request).cart
     data = create_order(_total_str(cart))
     return JsonResponse({"id": data.get("id")})
 
@@ -34,7 +35,7 @@ def paypal_capture(request: HttpRequest):
             order = Order.objects.get(order_number=order_number)
             # Met à jour le statut de la commande locale
             order.status = "paid"
-            order.save(update_fields=["status"])
+            order.save(update_fields=["status", "updated_at"])
             # Crée un enregistrement de paiement associé
             Payment.objects.create(
                 order=order,
@@ -50,7 +51,7 @@ def paypal_capture(request: HttpRequest):
 
 @require_POST
 def stripe_checkout(request: HttpRequest):
-    cart = Cart(request)
+    cart = get_cart_context(request).cart
     cents = int(Decimal(_total_str(cart)) * 100)
     success = request.build_absolute_uri(reverse("cart:detail"))  # remplace par orders:success si dispo
     cancel  = request.build_absolute_uri(reverse("cart:detail"))
@@ -0,0 +1,110 @@
+from datetime import datetime, timedelta
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from orders.models import Order
+from orders.services import update_order_status
+from userauths.models import User
+
+ORDER_DATA = {
+    "email": "erp@example.com",
+    "first_name": "Erp",
+    "last_name": "Sync",
+    "address1": "1 rue",
+    "city": "Paris",
+    "postcode": "75001",
+}
+
+
+class OrderKeysetPaginationTest(APITestCase):
+    def setUp(self) -> None:
+        self.user = User.objects.create_user(username="erp", password="pass")
+        self.client.force_authenticate(self.user)
+        self.base = timezone.make_aware(datetime(2024, 3, 10, 12, 0))
+        self.orders = []
+        for index in range(25):
+            order = Order.objects.create(**ORDER_DATA)
+            # Trois commandes par instant : le curseur départage par id
+            moment = self.base + timedelta(hours=index // 3)
+            Order.objects.filter(pk=order.pk).update(created_at=moment, updated_at=moment)
+            self.orders.append(order.pk)
+
+    def _walk(self, url, params):
+        ids, cursor, pages = [], None, 0
+        response = self.client.get(url, params)
+        while True:
+            self.assertEqual(response.status_code, 200)
+            pages += 1
+            ids += [row["id"] for row in response.data["results"]]
+            cursor = response.data["cursor"]
+            if not response.data["next"]:
+                return ids, cursor, pages
+            response = self.client.get(response.data["next"])
+
+    def test_walk_returns_every_order_once_newest_first(self):
+        ids, _, pages = self._walk(reverse("order-list"), {"page_size": 10})
+
+        self.assertEqual(pages, 3)
+        self.assertEqual(ids, sorted(self.orders, reverse=True))
+
+    def test_pages_use_keyset_condition_instead_of_offset(self):
+        first = self.client.get(reverse("order-list"), {"page_size": 10})
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(first.data["next"])
+
+        sql = next(q["sql"] for q in queries.captured_queries if 'FROM "orders_order"' in q["sql"])
+        self.assertNotIn("OFFSET", sql.upper())
+        self.assertIn('"orders_order"."created_at" <', sql)
+
+    def test_updated_feed_resumes_from_saved_cursor(self):
+        _, cursor, _ = self._walk(reverse("order-list"), {"ordering": "updated_at", "page_size": 10})
+        update_order_status(Order.objects.filter(pk=self.orders[0]), "paid")
+
+        response = self.client.get(reverse("order-list"), {"ordering": "updated_at", "cursor": cursor})
+
+        self.assertEqual([row["id"] for row in response.data["results"]], [self.orders[0]])
+        self.assertIsNone(response.data["next"])
+
+    def test_invoices_are_paginated_paid_orders(self):
+        paid = self.orders[::2]
+        Order.objects.filter(pk__in=paid).update(status="paid")
+
+        ids, _, _ = self._walk(reverse("invoice-list"), {"page_size": 5, "ordering": "created_at"})
+
+        self.assertEqual(ids, sorted(paid))
+
+    def test_date_filters_are_half_open_ranges_on_the_column(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                reverse("order-list"), {"from": "2024-03-10T13:00:00", "to": "2024-03-10", "page_size": 50}
+            )
+
+        # De 13 h (inclus) à la fin de la journée du 10 : commandes 3 à 24
+        self.assertEqual(sorted(row["id"] for row in response.data["results"]), sorted(self.orders[3:]))
+        sql = " ".join(q["sql"] for q in queries.captured_queries)
+        self.assertNotIn("django_datetime_cast_date", sql)
+
+        response = self.client.get(reverse("order-list"), {"to": "2024-03-10T13:00:00", "page_size": 50})
+        self.assertEqual(sorted(row["id"] for row in response.data["results"]), sorted(self.orders[:3]))
+
+    def test_invalid_parameters_are_rejected(self):
+        self.assertEqual(self.client.get(reverse("order-list"), {"cursor": "nope"}).status_code, 404)
+        self.assertEqual(self.client.get(reverse("order-list"), {"ordering": "total"}).status_code, 400)
+        self.assertEqual(self.client.get(reverse("order-list"), {"from": "10/03/2024"}).status_code, 400)
+
+        # Un curseur ne peut pas servir pour un autre ordre de parcours
+        cursor = self.client.get(reverse("order-list"), {"page_size": 5}).data["cursor"]
+        response = self.client.get(reverse("order-list"), {"ordering": "updated_at", "cursor": cursor})
+        self.assertEqual(response.status_code, 404)
+
+    def test_updated_at_follows_status_changes(self):
+        before = Order.objects.get(pk=self.orders[1]).updated_at
+
+        update_order_status(Order.objects.filter(pk=self.orders[1]), "canceled")
+
+        self.assertGreater(Order.objects.get(pk=self.orders[1]).updated_at, before)
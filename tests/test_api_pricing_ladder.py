@@ -0,0 +1,65 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from catalog.models import Brand, Category, PricingRule, Product
+
+
+class PricingLadderAPITests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        PricingRule.objects.all().delete()
+        PricingRule.objects.create(kind=PricingRule.KIND_QUANTITY, min_quantity=50, rate=Decimal("0.10"))
+        PricingRule.objects.create(kind=PricingRule.KIND_QUANTITY, min_quantity=100, rate=Decimal("0.20"))
+        category = Category.objects.create(name="Cat", slug="cat")
+        brand = Brand.objects.create(name="Brand", slug="brand")
+        self.products = [
+            Product.objects.create(
+                title=f"Produit {i}",
+                sku=f"LAD-{i}",
+                article_code=f"LAD-{i}",
+                category=category,
+                brand=brand,
+                price=Decimal("10.00") * i,
+            )
+            for i in (1, 2)
+        ]
+        self.user = get_user_model().objects.create_user(username="ladder", password="password123")
+        self.client.force_authenticate(self.user)
+
+    def test_ladder_for_many_products_with_explicit_quantities(self):
+        ids = ",".join(str(p.id) for p in reversed(self.products))
+        response = self.client.get(reverse("pricing-ladder"), {"product_ids": ids, "quantities": "100,10,50"})
+        self.assertEqual(response.status_code, 200)
+        first, second = response.data["products"]
+        self.assertEqual(first["product_id"], self.products[1].id)
+        self.assertEqual(
+            first["tiers"],
+            [
+                {"quantity": 10, "unit_price": "20.00"},
+                {"quantity": 50, "unit_price": "18.00"},
+                {"quantity": 100, "unit_price": "16.00"},
+            ],
+        )
+        self.assertEqual(second["tiers"][2], {"quantity": 100, "unit_price": "8.00"})
+
+    def test_ladder_defaults_to_rule_breakpoints(self):
+        response = self.client.get(reverse("pricing-ladder"), {"product_ids": str(self.products[0].id)})
+        self.assertEqual([t["quantity"] for t in response.data["products"][0]["tiers"]], [1, 50, 100])
+
+    def test_single_product_preview_ladder_mode(self):
+        url = reverse("pricing-preview", args=[self.products[0].id])
+        response = self.client.get(url, {"quantities": "auto"})
+        self.assertEqual(response.data["tiers"][1], {"quantity": 50, "unit_price": "9.00"})
+
+    def test_invalid_parameters(self):
+        url = reverse("pricing-ladder")
+        self.assertEqual(self.client.get(url).status_code, 400)
+        self.assertEqual(self.client.get(url, {"product_ids": "a"}).status_code, 400)
+        self.assertEqual(
+            self.client.get(url, {"product_ids": str(self.products[0].id), "quantities": "0"}).status_code,
+            400,
+        )
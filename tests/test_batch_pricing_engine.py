@@ -0,0 +1,85 @@
+import random
+from decimal import Decimal
+
+import numpy as np
+
+from core.domain.batch_pricing_engine import BatchPricingEngine, PriceColumns, from_cents, to_cents
+from core.domain.dto import ProductDTO, PromoItemDTO, UserDTO
+from core.domain.pricing_engine import PricingEngine
+
+CLIENT_TYPES = [None, "regular", "wholesaler", "big_retail", "small_retail", "unknown"]
+
+
+def _amount(rng: random.Random, allow_none: bool = True):
+    roll = rng.random()
+    if allow_none and roll < 0.25:
+        return None
+    if allow_none and roll < 0.35:
+        return Decimal("0.00")
+    return from_cents(rng.randint(1, 500_000))
+
+
+def _random_catalog(rng: random.Random, size: int):
+    products = []
+    for product_id in range(1, size + 1):
+        price = _amount(rng, allow_none=False)
+        discount = _amount(rng)
+        if discount is not None and rng.random() < 0.5:
+            # Remise plausible, strictement sous le prix public
+            discount = from_cents(rng.randint(0, to_cents(price)))
+        products.append(
+            ProductDTO(
+                id=product_id,
+                sku=f"SKU{product_id}",
+                price=price,
+                discount_price=discount,
+                price_wholesaler=_amount(rng),
+                price_big_retail=_amount(rng),
+                price_small_retail=_amount(rng),
+            )
+        )
+    promos = {
+        dto.id: PromoItemDTO(promo_price=from_cents(rng.randint(0, 500_000)))
+        for dto in products
+        if rng.random() < 0.2
+    }
+    return products, promos
+
+
+def test_batch_engine_matches_scalar_engine_on_random_catalogs():
+    rng = random.Random(20240601)
+    for _ in range(20):
+        products, promos = _random_catalog(rng, 300)
+        columns = PriceColumns.from_dtos(products)
+        promo_column = columns.promo_column(promos)
+        for client_type in CLIENT_TYPES:
+            for verified in (True, False):
+                user = UserDTO(id=1, email="", client_type=client_type, is_b2b_verified=verified)
+                cents = BatchPricingEngine.determine_prices(
+                    columns,
+                    client_type=client_type,
+                    is_b2b_verified=verified,
+                    promo_price=promo_column,
+                )
+                batch = BatchPricingEngine.to_decimals(columns, cents)
+                for dto in products:
+                    expected = PricingEngine.determine_price(dto, user, promos.get(dto.id))
+                    assert batch[dto.id] == expected, (dto, client_type, verified)
+        # Visiteur anonyme : ni grille B2B ni promo catalogue
+        cents = BatchPricingEngine.determine_prices(columns, has_user=False)
+        batch = BatchPricingEngine.to_decimals(columns, cents)
+        for dto in products:
+            assert batch[dto.id] == PricingEngine.determine_price(dto, None)
+
+
+def test_unverified_surcharge_rounds_half_even():
+    # 0,10 € * 1,05 = 0,105 -> 0,10 ; 0,30 € * 1,05 = 0,315 -> 0,32
+    columns = PriceColumns.from_dtos(
+        [
+            ProductDTO(id=1, sku="A", price=Decimal("0.10")),
+            ProductDTO(id=2, sku="B", price=Decimal("0.30")),
+        ]
+    )
+    cents = BatchPricingEngine.determine_prices(columns, client_type="wholesaler", is_b2b_verified=False)
+    assert cents.tolist() == [10, 32]
+    assert cents.dtype == np.int64
@@ -0,0 +1,142 @@
+from decimal import Decimal
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from catalog.models import Brand, Category, Product
+from core.domain.dto import CartLineRecord
+from core.services.pricing_service import PromoAwareB2BPricingService
+from core.utils.shared_cache import get_shared_cache
+from tests.utils import in_memory_shared_cache, shared_cache_queries
+from userauths.models import User
+
+
+class CartDetailETagTest(APITestCase):
+    """GET conditionnel et différentiel sur ``/api/cart/``."""
+
+    def setUp(self) -> None:
+        cache.clear()
+        category = Category.objects.create(name="Cat", slug="cat")
+        brand = Brand.objects.create(name="Brand", slug="brand")
+        self.products = [
+            Product.objects.create(
+                title=f"ETAG-{index}",
+                sku=f"ETAG-{index}",
+                article_code=f"ETAG-{index}",
+                category=category,
+                brand=brand,
+                price=Decimal("10.00"),
+                min_order_qty=1,
+            )
+            for index in range(3)
+        ]
+        self.user = User.objects.create_user(username="etag", password="pass", is_b2b_verified=True)
+        self.client.force_authenticate(self.user)
+        for product in self.products[:2]:
+            self._add(product, 10)
+
+    def _add(self, product, quantity):
+        self.client.post(reverse("cart-add-api"), {"sku": product.article_code, "quantity": quantity}, format="json")
+
+    def _get(self, **kwargs):
+        with mock.patch.object(
+            PromoAwareB2BPricingService,
+            "calculate_cart",
+            autospec=True,
+            side_effect=PromoAwareB2BPricingService.calculate_cart,
+        ) as calculate_cart:
+            response = self.client.get(reverse("cart-detail-api"), **kwargs)
+        return response, calculate_cart.call_count
+
+    def test_matching_etag_returns_304_without_pricing(self):
+        response, _ = self._get()
+        etag = response["ETag"]
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("no-cache", response["Cache-Control"])
+
+        response, calls = self._get(HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+        self.assertEqual(calls, 0)
+
+    def _not_modified_queries(self):
+        etag = self._get()[0]["ETag"]
+        with CaptureQueriesContext(connection) as queries:
+            response, _ = self._get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        return queries
+
+    def test_not_modified_reads_only_session_and_shared_cache(self):
+        queries = self._not_modified_queries()
+
+        # Session, puis cache commun : révision du panier, empreinte des prix
+        tables = [q["sql"] for q in queries.captured_queries if q not in shared_cache_queries(queries)]
+        self.assertEqual(len(queries), 3, queries.captured_queries)
+        self.assertEqual(len(shared_cache_queries(queries)), 2)
+        self.assertIn('FROM "django_session"', tables[0])
+
+    @in_memory_shared_cache
+    def test_not_modified_reads_only_session_with_in_memory_shared_cache(self):
+        get_shared_cache().clear()
+
+        queries = self._not_modified_queries()
+
+        self.assertEqual(len(queries), 1, queries.captured_queries)
+        self.assertIn('FROM "django_session"', queries[0]["sql"])
+
+    def test_etag_changes_with_cart_and_prices(self):
+        etag = self._get()[0]["ETag"]
+
+        self._add(self.products[0], 10)
+        response, calls = self._get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual((response.status_code, calls), (200, 1))
+        self.assertNotEqual(response["ETag"], etag)
+
+        etag = response["ETag"]
+        product = self.products[1]
+        product.price = Decimal("12.00")
+        product.save()
+        response, _ = self._get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["total"], "320.00")
+
+    def test_since_returns_only_changed_lines(self):
+        revision = self._get()[0].data["revision"]
+
+        self._add(self.products[0], 5)
+        response, _ = self._get(data={"since": revision})
+
+        self.assertFalse(response.data["full"])
+        self.assertEqual([line["product_id"] for line in response.data["items"]], [self.products[0].pk])
+        self.assertEqual(response.data["items"][0]["quantity"], 15)
+        self.assertEqual(response.data["removed"], [])
+        self.assertEqual(response.data["total"], "250.00")
+
+        revision = response.data["revision"]
+        self.client.post(reverse("cart-clear-api"))
+        response, _ = self._get(data={"since": revision})
+        self.assertEqual(response.data["items"], [])
+        self.assertEqual(sorted(response.data["removed"]), sorted(p.pk for p in self.products[:2]))
+
+        response, _ = self._get(data={"since": response.data["revision"]})
+        self.assertEqual((response.data["items"], response.data["removed"]), ([], []))
+
+    def test_unknown_revision_returns_full_cart(self):
+        response, _ = self._get(data={"since": 999})
+
+        self.assertTrue(response.data["full"])
+        self.assertEqual(len(response.data["items"]), 2)
+
+        self.assertEqual(self._get(data={"since": "abc"})[0].status_code, 400)
+
+    def test_lines_are_validated_at_the_api_boundary(self):
+        with mock.patch.object(CartLineRecord, "to_dto", autospec=True, side_effect=CartLineRecord.to_dto) as to_dto:
+            response, _ = self._get()
+
+        self.assertEqual(to_dto.call_count, 2)
+        self.assertEqual(response.data["items"][0]["unit_price"], "10.00")
@@ -0,0 +1,199 @@
+from decimal import Decimal
+
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from cart.context import get_cart_context
+from catalog.models import Brand, Category, Product
+from core.domain.dto import BulkAddLine, OrderLine
+from core.factory import get_cart_service
+from core.utils.order_lines import MAX_ORDER_LINES, parse_order_csv, parse_order_items, parse_order_text
+from userauths.models import User
+
+
+def test_parse_order_text_accepts_common_separators():
+    text = "A-1 12\nB-2;24\n\n# commentaire\nC-3,\t6\nD-4\nE-5 douze"
+
+    lines = parse_order_text(text)
+
+    assert [(line.line, line.code, line.quantity) for line in lines] == [
+        (1, "A-1", 12),
+        (2, "B-2", 24),
+        (5, "C-3", 6),
+        (6, "D-4", 1),
+        (7, "E-5", None),
+    ]
+
+
+def test_parse_order_csv_with_header_and_semicolons():
+    content = "\ufeffQuantite;Reference\n12;A-1\n;B-2\n3;\n".encode("utf-8")
+
+    lines = parse_order_csv(content)
+
+    assert [(line.line, line.code, line.quantity) for line in lines] == [(2, "A-1", 12), (3, "B-2", None)]
+
+
+def test_parse_order_csv_without_header():
+    lines = parse_order_csv("A-1,12\nB-2,24\n")
+
+    assert [(line.code, line.quantity) for line in lines] == [("A-1", 12), ("B-2", 24)]
+
+
+def test_parse_order_items_and_size_limit():
+    lines = parse_order_items([{"sku": "A-1", "quantity": 5}, {"ean": "123", "qty": "x"}])
+
+    assert [(line.code, line.quantity) for line in lines] == [("A-1", 5), ("123", None)]
+    try:
+        parse_order_text("A 1\n" * (MAX_ORDER_LINES + 1))
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("Le nombre de lignes doit être limité")
+
+
+class BulkAddMixin:
+    def setUp(self) -> None:
+        cache.clear()
+        category = Category.objects.create(name="Cat", slug="cat")
+        brand = Brand.objects.create(name="Brand", slug="brand")
+        self.products = [
+            Product.objects.create(
+                title=f"Bulk-{index}",
+                sku=f"SKU-{index}",
+                article_code=f"ART-{index}",
+                ean=f"400000000000{index}",
+                category=category,
+                brand=brand,
+                price=Decimal("10.00"),
+                min_order_qty=1,
+            )
+            for index in range(30)
+        ]
+        self.user = User.objects.create_user(username="bulk", password="pass", is_b2b_verified=True)
+
+
+class CartServiceAddItemsTest(BulkAddMixin, TestCase):
+    """Ajout en masse via ``CartService.add_items``."""
+
+    def _request(self):
+        request = RequestFactory().post("/")
+        request.user = self.user
+        request.session = SessionStore()
+        get_cart_context(request)
+        return request
+
+    def test_resolves_codes_and_reports_errors_per_line(self):
+        Product.objects.filter(pk=self.products[2].pk).update(is_active=False)
+        lines = [
+            OrderLine(line=1, code="ART-0", quantity=15),
+            OrderLine(line=2, code="SKU-1", quantity=30),
+            OrderLine(line=3, code="4000000000003", quantity=20),
+            OrderLine(line=4, code="ART-2", quantity=1),
+            OrderLine(line=5, code="NOPE", quantity=1),
+            OrderLine(line=6, code="ART-4", quantity=None),
+            OrderLine(line=7, code="ART-0", quantity=5),
+        ]
+
+        result = get_cart_service().add_items(self._request(), lines)
+
+        statuses = [line.status for line in result.lines]
+        self.assertEqual(
+            statuses,
+            [
+                BulkAddLine.ADDED,
+                BulkAddLine.ADDED,
+                BulkAddLine.ADDED,
+                BulkAddLine.INACTIVE,
+                BulkAddLine.UNKNOWN,
+                BulkAddLine.INVALID_QUANTITY,
+                BulkAddLine.ADDED,
+            ],
+        )
+        self.assertEqual([line.line for line in result.errors], [4, 5, 6])
+        quantities = {item.product.id: item.quantity for item in result.cart.items}
+        self.assertEqual(quantities, {self.products[0].pk: 20, self.products[1].pk: 30, self.products[3].pk: 20})
+        self.assertEqual(result.cart.total, Decimal("700.00"))
+
+    def test_applies_moq_and_pcb_and_adds_to_existing_quantity(self):
+        Product.objects.filter(pk=self.products[0].pk).update(min_order_qty=15)
+        Product.objects.filter(pk=self.products[1].pk).update(order_in_packs=True, pcb_qty=6)
+        request = self._request()
+        service = get_cart_service()
+        service.add_items(request, [OrderLine(line=1, code="ART-1", quantity=12)])
+
+        result = service.add_items(
+            request,
+            [OrderLine(line=1, code="ART-0", quantity=3), OrderLine(line=2, code="ART-1", quantity=1)],
+        )
+
+        # MOQ de 15 pour le premier produit, 12 + 1 arrondi au colis de 6 pour le second
+        self.assertEqual([line.quantity for line in result.lines], [15, 18])
+        self.assertEqual(get_cart_context(request).cart.quantities(), {self.products[0].pk: 15, self.products[1].pk: 18})
+
+    def test_query_count_does_not_grow_with_lines(self):
+        def run(count):
+            lines = [OrderLine(line=i, code=f"ART-{i}", quantity=1) for i in range(count)]
+            request = self._request()
+            with CaptureQueriesContext(connection) as queries:
+                get_cart_service().add_items(request, lines)
+            return len(queries.captured_queries)
+
+        run(2)  # échauffement (index des promotions, règles)
+        self.assertEqual(run(3), run(30))
+
+
+class CartBulkAddAPITest(BulkAddMixin, APITestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.client.force_authenticate(self.user)
+
+    def test_json_lines(self):
+        response = self.client.post(
+            reverse("cart-bulk-add-api"),
+            {"lines": [{"sku": "ART-0", "quantity": 40}, {"sku": "NOPE", "quantity": 1}]},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["added"], 1)
+        self.assertEqual(response.data["errors"], 1)
+        self.assertEqual(response.data["lines"][1]["status"], BulkAddLine.UNKNOWN)
+        self.assertEqual(response.data["total"], "400.00")
+
+    def test_csv_upload(self):
+        upload = SimpleUploadedFile("commande.csv", b"sku;quantity\nART-0;20\nSKU-1;30\n", content_type="text/csv")
+
+        response = self.client.post(reverse("cart-bulk-add-api"), {"file": upload}, format="multipart")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["added"], 2)
+        self.assertEqual(response.data["total"], "500.00")
+
+    def test_empty_input_is_rejected(self):
+        response = self.client.post(reverse("cart-bulk-add-api"), {"text": ""}, format="json")
+
+        self.assertEqual(response.status_code, 400)
+
+
+class OrderPadViewTest(BulkAddMixin, TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.client.force_login(self.user)
+
+    def test_redirects_to_cart_when_all_lines_are_added(self):
+        response = self.client.post(reverse("cart:order_pad"), {"lines": "ART-0 5\nART-1 2"})
+
+        self.assertRedirects(response, reverse("cart:detail"), fetch_redirect_response=False)
+
+    def test_lists_rejected_lines(self):
+        response = self.client.post(reverse("cart:order_pad"), {"lines": "ART-0 5\nNOPE 2"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "NOPE")
+        self.assertContains(response, "Référence inconnue")
@@ -0,0 +1,156 @@
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.cache import cache, caches
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+
+from cart import revisions
+from cart.cart import Cart
+from cart.context import get_cart_context
+from cart.revisions import CartWriteConflict, merge_line
+from catalog.models import Brand, Category, Product
+from core.factory import get_cart_service
+from core.utils.shared_cache import SHARED_CACHE_ALIAS, get_shared_cache
+
+
+def test_merge_line_keeps_both_sides():
+    assert merge_line(10, 20, 10) == 20  # seule notre requête a modifié la ligne
+    assert merge_line(10, 10, 30) == 30  # seule l'autre requête l'a modifiée
+    assert merge_line(None, 10, 10) == 20  # deux ajouts simultanés du même produit
+    assert merge_line(10, 20, 30) == 40
+    assert merge_line(10, None, 30) is None  # notre suppression l'emporte
+    assert merge_line(10, 20, None) == 20
+
+
+class ParallelCartWritesTest(TestCase):
+    """Des requêtes parallèles sur la même session ne perdent aucune ligne."""
+
+    def setUp(self) -> None:
+        cache.clear()
+        category = Category.objects.create(name="Cat", slug="cat")
+        brand = Brand.objects.create(name="Brand", slug="brand")
+        self.products = [
+            Product.objects.create(
+                title=f"PAR-{index}",
+                sku=f"PAR-{index}",
+                article_code=f"PAR-{index}",
+                category=category,
+                brand=brand,
+                price=Decimal("10.00"),
+                min_order_qty=1,
+            )
+            for index in range(3)
+        ]
+        session = SessionStore()
+        session.create()
+        self.session_key = session.session_key
+
+    def _request(self):
+        """Requête lisant la session telle qu'enregistrée à cet instant."""
+        request = RequestFactory().post("/")
+        request.user = AnonymousUser()
+        request.session = SessionStore(session_key=self.session_key)
+        request.session.load()
+        get_cart_context(request)
+        return request
+
+    def _finish(self, request):
+        """Fin de requête : la session est réécrite en entier."""
+        request.session.save()
+
+    def _quantities(self):
+        return get_cart_context(self._request()).cart.quantities()
+
+    def test_parallel_adds_of_different_products_are_kept(self):
+        first, second = self._request(), self._request()
+        get_cart_context(first).cart.add(product=self.products[0], quantity=10)
+        get_cart_context(second).cart.add(product=self.products[1], quantity=20)
+        self._finish(second)
+        self._finish(first)
+
+        self.assertEqual(self._quantities(), {self.products[0].pk: 10, self.products[1].pk: 20})
+
+    def test_parallel_adds_of_same_product_are_summed(self):
+        first, second = self._request(), self._request()
+        get_cart_context(first).cart.add(product=self.products[0], quantity=10)
+        get_cart_context(second).cart.add(product=self.products[0], quantity=15)
+        self._finish(first)
+        self._finish(second)
+
+        self.assertEqual(self._quantities(), {self.products[0].pk: 25})
+
+    def test_parallel_service_updates_merge_per_line(self):
+        setup = self._request()
+        get_cart_context(setup).cart.add(product=self.products[0], quantity=10)
+        self._finish(setup)
+        service = get_cart_service()
+
+        first, second = self._request(), self._request()
+        # Lecture du panier par les deux requêtes avant toute écriture
+        get_cart_context(first).cart.quantities()
+        get_cart_context(second).cart.quantities()
+        service.update_item(first, self.products[1].pk, 30)
+        cart = service.update_item(second, self.products[0].pk, 40)
+        self._finish(first)
+        self._finish(second)
+
+        expected = {self.products[0].pk: 40, self.products[1].pk: 30}
+        self.assertEqual({item.product.id: item.quantity for item in cart.items}, expected)
+        self.assertEqual(cart.total, Decimal("700.00"))
+        self.assertEqual(self._quantities(), expected)
+
+    def test_parallel_adds_from_two_workers_are_kept(self):
+        # Chaque worker a sa propre connexion au cache commun
+        workers = [caches.create_connection(SHARED_CACHE_ALIAS) for _ in range(2)]
+        first, second = self._request(), self._request()
+        with mock.patch.object(revisions, "get_shared_cache", return_value=workers[0]):
+            get_cart_context(first).cart.add(product=self.products[0], quantity=10)
+        with mock.patch.object(revisions, "get_shared_cache", return_value=workers[1]):
+            get_cart_context(second).cart.add(product=self.products[1], quantity=20)
+        self._finish(second)
+        self._finish(first)
+
+        self.assertEqual(self._quantities(), {self.products[0].pk: 10, self.products[1].pk: 20})
+
+    def test_stale_shared_copy_is_never_adopted(self):
+        request = self._request()
+        cart = get_cart_context(request).cart
+        cart.add(product=self.products[0], quantity=10)
+        cart.add(product=self.products[1], quantity=20)
+        self._finish(request)
+        # Copie antérieure réécrite par un autre worker (ou après une éviction)
+        other_worker = caches.create_connection(SHARED_CACHE_ALIAS)
+        other_worker.set(
+            revisions.STATE_KEY.format(session_key=self.session_key), (1, {str(self.products[0].pk): {"qty": 10}}), 60
+        )
+
+        self.assertEqual(self._quantities(), {self.products[0].pk: 10, self.products[1].pk: 20})
+
+        # Une modification ne se rebase pas non plus sur cette copie
+        request = self._request()
+        get_cart_context(request).cart.add(product=self.products[2], quantity=10)
+        self._finish(request)
+        self.assertEqual(
+            self._quantities(), {self.products[0].pk: 10, self.products[1].pk: 20, self.products[2].pk: 10}
+        )
+
+    def test_held_lock_raises_conflict(self):
+        cart = Cart(self._request())
+        get_shared_cache().add(revisions.LOCK_KEY.format(session_key=self.session_key), "other", 5)
+
+        with mock.patch.object(revisions, "LOCK_ATTEMPTS", 2), mock.patch.object(revisions, "LOCK_DELAY", 0):
+            with self.assertRaises(CartWriteConflict):
+                cart.add(product=self.products[0], quantity=10)
+
+    def test_conflict_is_reported_as_409(self):
+        self.client.post(reverse("cart:cart_add", args=[self.products[0].pk]), {"quantity": 10})
+        session_key = self.client.session.session_key
+        get_shared_cache().add(revisions.LOCK_KEY.format(session_key=session_key), "other", 5)
+
+        with mock.patch.object(revisions, "LOCK_ATTEMPTS", 1):
+            response = self.client.post(reverse("cart:cart_add", args=[self.products[1].pk]), {"quantity": 10})
+
+        self.assertEqual(response.status_code, 409)
@@ -0,0 +1,114 @@
+from decimal import Decimal
+
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.cache import cache
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from cart.context import get_cart_context
+from catalog.models import Brand, Category, Product
+from core.factory import get_cart_service
+from core.utils.shared_cache import get_shared_cache
+from tests.utils import in_memory_shared_cache, shared_cache_queries
+from userauths.models import User
+
+
+class CartContextTest(TestCase):
+    """Le panier n'est chargé et tarifé qu'une fois par requête."""
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.category = Category.objects.create(name="Cat", slug="cat")
+        self.brand = Brand.objects.create(name="Brand", slug="brand")
+        self.user = User.objects.create_user(
+            username="ctx",
+            password="pass",
+            client_type="wholesaler",
+            customer_number="C-CTX",
+            is_b2b_verified=True,
+        )
+
+    def _product(self, sku: str) -> Product:
+        return Product.objects.create(
+            title=sku,
+            sku=sku,
+            article_code=sku,
+            category=self.category,
+            brand=self.brand,
+            price=Decimal("10.00"),
+        )
+
+    def _fill_session_cart(self, session, count: int) -> None:
+        cart = session.setdefault("cart", {})
+        for index in range(count):
+            product = self._product(f"CTX-{Product.objects.count()}")
+            cart[str(product.pk)] = {"qty": 10}
+
+    def _request(self):
+        request = RequestFactory().get("/")
+        request.user = self.user
+        request.session = SessionStore()
+        self._fill_session_cart(request.session, 3)
+        # Équivalent de ``CartContextMiddleware``
+        get_cart_context(request)
+        return request
+
+    def _cart_page_queries(self, lines):
+        session = self.client.session
+        session["cart"] = {}
+        self._fill_session_cart(session, lines)
+        session.save()
+        # Premier affichage : index des promotions et résumé du panier
+        self.client.get(reverse("cart:detail"))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("cart:detail"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context["cart"]), lines)
+        return queries
+
+    def test_cart_page_query_count_does_not_depend_on_lines(self):
+        self.client.force_login(self.user)
+        for lines in (2, 8):
+            queries = self._cart_page_queries(lines)
+            # session, utilisateur, produits, réglages du site, branding,
+            # catégories du menu ; cache commun : révision du panier,
+            # générations et versions (lignes, empreinte du résumé, menu)
+            self.assertEqual(len(queries), 11, queries.captured_queries)
+            self.assertEqual(len(shared_cache_queries(queries)), 5)
+
+    @in_memory_shared_cache
+    def test_cart_page_reads_only_data_tables_with_in_memory_shared_cache(self):
+        get_shared_cache().clear()
+        self.client.force_login(self.user)
+        for lines in (2, 8):
+            queries = self._cart_page_queries(lines)
+            self.assertEqual(len(queries), 6, queries.captured_queries)
+
+    def test_priced_cart_is_reused_within_request(self):
+        request = self._request()
+        service = get_cart_service()
+
+        first = service.get_cart(request)
+        with self.assertNumQueries(0):
+            second = get_cart_service().get_cart(request)
+            len(get_cart_context(request).cart)
+
+        self.assertIs(first, second)
+        self.assertEqual(first.total, Decimal("300.00"))
+
+    def test_cart_change_invalidates_priced_cart(self):
+        request = self._request()
+        service = get_cart_service()
+        context = get_cart_context(request)
+        first = service.get_cart(request)
+        product_id = first.items[0].product.id
+
+        # Produit déjà chargé : aucune relecture pour la mise à jour
+        with self.assertNumQueries(0):
+            context.cart.update(product_id, 20)
+
+        updated = service.get_cart(request)
+        self.assertIsNot(updated, first)
+        self.assertEqual(updated.total, Decimal("400.00"))
@@ -0,0 +1,149 @@
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.cache import cache, caches
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from cart.context import get_cart_context
+from cart.models import Cart as StoredCart, CartLine
+from catalog.models import Brand, Category, Product
+from core.factory import get_cart_repository, get_cart_service
+from core.repositories import cart_db
+from core.repositories.cart_db import DatabaseCartRepository
+from core.repositories.cart_session import SessionCartRepository
+from core.utils.shared_cache import SHARED_CACHE_ALIAS
+from userauths.models import User
+
+
+@override_settings(CART_REPOSITORY="database")
+class DatabaseCartRepositoryTest(TestCase):
+    """Panier enregistré en base pour les utilisateurs connectés."""
+
+    def setUp(self) -> None:
+        cache.clear()
+        category = Category.objects.create(name="Cat", slug="cat")
+        brand = Brand.objects.create(name="Brand", slug="brand")
+        self.products = [
+            Product.objects.create(
+                title=f"DB-{index}",
+                sku=f"DB-{index}",
+                article_code=f"DB-{index}",
+                category=category,
+                brand=brand,
+                price=Decimal("10.00"),
+                min_order_qty=1,
+            )
+            for index in range(3)
+        ]
+        self.user = User.objects.create_user(username="db", password="pass", is_b2b_verified=True)
+
+    def _request(self, user=None):
+        """Nouvelle requête sur une nouvelle session (un autre appareil)."""
+        request = RequestFactory().get("/")
+        request.user = user or self.user
+        request.session = SessionStore()
+        get_cart_context(request)
+        return request
+
+    def _stored(self):
+        return dict(CartLine.objects.filter(cart__user=self.user).values_list("product__article_code", "quantity"))
+
+    def test_factory_selects_repository_from_settings(self):
+        self.assertIsInstance(get_cart_repository(), DatabaseCartRepository)
+        with override_settings(CART_REPOSITORY="session"):
+            self.assertIsInstance(get_cart_repository(), SessionCartRepository)
+            self.assertNotIsInstance(get_cart_repository(), DatabaseCartRepository)
+
+    def test_cart_follows_user_across_sessions(self):
+        service = get_cart_service()
+        service.add_item(self._request(), sku="DB-0", quantity=12)
+        service.add_item(self._request(), sku="DB-1", quantity=15)
+
+        cart = service.get_cart(self._request())
+
+        self.assertEqual({item.product.sku: item.quantity for item in cart.items}, {"DB-0": 12, "DB-1": 15})
+        self.assertEqual(cart.total, Decimal("270.00"))
+        self.assertEqual(self._stored(), {"DB-0": 12, "DB-1": 15})
+
+    def test_only_changed_lines_are_written(self):
+        service = get_cart_service()
+        request = self._request()
+        for product in self.products:
+            service.add_item(request, sku=product.article_code, quantity=10)
+
+        with CaptureQueriesContext(connection) as queries:
+            service.update_item(request, self.products[1].pk, 30)
+        # Écritures des tables du panier (le cache commun a les siennes)
+        writes = [
+            q["sql"]
+            for q in queries.captured_queries
+            if q["sql"].startswith(("INSERT", "UPDATE", "DELETE")) and '"cart_' in q["sql"]
+        ]
+
+        self.assertEqual(len(writes), 1)
+        self.assertIn("ON CONFLICT", writes[0])
+        self.assertEqual(self._stored(), {"DB-0": 10, "DB-1": 30, "DB-2": 10})
+
+        service.remove_item(request, self.products[2].pk)
+        self.assertEqual(self._stored(), {"DB-0": 10, "DB-1": 30})
+
+    def test_reads_use_write_through_cache(self):
+        repository = DatabaseCartRepository()
+        repository._store(self.user.pk, {self.products[0].pk: 10})
+        # Simule le callback ``on_commit`` qui remplit le cache
+        repository._load(self.user.pk)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(repository._load(self.user.pk)[1], {self.products[0].pk: 10})
+
+        # Une seule lecture, dans le cache commun (table ``core_shared_cache``
+        # par défaut, aucune requête avec Redis) : ni panier ni lignes
+        self.assertEqual(len(queries), 1, queries.captured_queries)
+        self.assertIn("core_shared_cache", queries[0]["sql"])
+
+    def test_lines_saved_by_another_worker_are_kept(self):
+        # Chaque worker a sa propre connexion au cache commun
+        workers = [caches.create_connection(SHARED_CACHE_ALIAS) for _ in range(2)]
+        service = get_cart_service()
+        first_device, second_device = self._request(), self._request()
+        with mock.patch.object(cart_db, "get_shared_cache", return_value=workers[1]):
+            service.add_item(second_device, sku="DB-0", quantity=10)
+        with self.captureOnCommitCallbacks(execute=True):
+            with mock.patch.object(cart_db, "get_shared_cache", return_value=workers[0]):
+                service.add_item(first_device, sku="DB-1", quantity=20)
+
+        # Simple lecture servie par l'autre worker, sur l'autre appareil
+        later = RequestFactory().get("/")
+        later.user = self.user
+        later.session = second_device.session
+        with mock.patch.object(cart_db, "get_shared_cache", return_value=workers[1]):
+            cart = service.get_cart(later)
+
+        self.assertEqual({item.product.sku: item.quantity for item in cart.items}, {"DB-0": 10, "DB-1": 20})
+        self.assertEqual(self._stored(), {"DB-0": 10, "DB-1": 20})
+
+    def test_session_cart_is_merged_on_login(self):
+        DatabaseCartRepository()._store(self.user.pk, {self.products[0].pk: 20, self.products[1].pk: 10})
+        session = self.client.session
+        session["cart"] = {str(self.products[0].pk): {"qty": 10}, str(self.products[2].pk): {"qty": 5}}
+        session.save()
+
+        self.client.login(username="db", password="pass")
+
+        self.assertEqual(self._stored(), {"DB-0": 30, "DB-1": 10, "DB-2": 5})
+        # Une seconde connexion sur la même session ne refusionne pas
+        self.client.login(username="db", password="pass")
+        self.assertEqual(self._stored(), {"DB-0": 30, "DB-1": 10, "DB-2": 5})
+
+    def test_anonymous_cart_stays_in_session(self):
+        request = RequestFactory().get("/")
+        request.user = AnonymousUser()
+        request.session = SessionStore()
+        get_cart_service().add_item(request, sku="DB-0", quantity=10)
+
+        self.assertIn(str(self.products[0].pk), request.session["cart"])
+        self.assertFalse(StoredCart.objects.exists())
@@ -0,0 +1,151 @@
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase
+
+from cart.context import get_cart_context
+from catalog.models import Brand, Category, Product
+from core.adapters.pricing_versions import bump_product_versions, bump_promo_generation
+from core.domain.cart_pricing import CartPriceState
+from core.factory import get_cart_service
+from core.services.pricing_service import PromoAwareB2BPricingService
+from userauths.models import User
+
+
+def test_state_updates_total_by_difference():
+    state = CartPriceState(segment="s")
+    state.update({1: 10, 2: 5}, {1: "a", 2: "b"}, {1: Decimal("2.00"), 2: Decimal("3.00")})
+    assert state.total == Decimal("35.00")
+
+    assert state.stale_products({1: "a", 2: "b2", 3: "c", 4: None}) == [2, 3, 4]
+    state.update({1: 20, 3: 1}, {1: "a", 3: "c"}, {3: Decimal("7.50")})
+
+    assert state.total == Decimal("47.50")
+    assert set(state.lines) == {1, 3}
+    assert state.lines[1].total_price == Decimal("40.00")
+
+
+def test_state_round_trips_and_ignores_garbage():
+    state = CartPriceState(segment="s")
+    state.update({1: 3}, {1: "v"}, {1: Decimal("1.10")})
+
+    restored = CartPriceState.from_dict(state.to_dict())
+
+    assert restored == state
+    assert CartPriceState.from_dict({"lines": "oops"}) == CartPriceState()
+    assert CartPriceState.from_dict(None) == CartPriceState()
+
+
+def test_state_tracks_changes_since_revision():
+    state = CartPriceState(segment="s")
+    state.update({1: 10, 2: 5}, {1: "a", 2: "b"}, {1: Decimal("2.00"), 2: Decimal("3.00")})
+    first = state.revision
+
+    state.update({1: 10, 2: 5}, {1: "a2", 2: "b"}, {1: Decimal("2.00")})  # version seule : rien à signaler
+    assert state.revision == first
+    state.update({1: 12}, {1: "a2"}, {})
+
+    assert state.changed_since(first) == ([1], [2])
+    assert state.changed_since(state.revision) == ([], [])
+    assert state.changed_since(state.revision + 1) is None
+    state.reset("other")
+    assert state.changed_since(first) is None
+
+
+def test_removed_history_is_bounded(monkeypatch):
+    monkeypatch.setattr("core.domain.cart_pricing.MAX_REMOVED", 2)
+    state = CartPriceState(segment="s")
+    for product_id in range(1, 5):
+        state.update({product_id: 1}, {product_id: "v"}, {product_id: Decimal("1.00")})
+
+    assert len(state.removed) == 2
+    assert state.changed_since(0) is None
+    assert state.changed_since(state.base) is not None
+
+
+class IncrementalCartPricingTest(TestCase):
+    """Seules les lignes nouvelles ou périmées sont retarifées."""
+
+    def setUp(self) -> None:
+        cache.clear()
+        category = Category.objects.create(name="Cat", slug="cat")
+        brand = Brand.objects.create(name="Brand", slug="brand")
+        self.products = [
+            Product.objects.create(
+                title=f"INC-{index}",
+                sku=f"INC-{index}",
+                article_code=f"INC-{index}",
+                category=category,
+                brand=brand,
+                price=Decimal("10.00") + index,
+                min_order_qty=1,
+            )
+            for index in range(40)
+        ]
+        self.user = User.objects.create_user(username="inc", password="pass", is_b2b_verified=True)
+        self.session = SessionStore()
+        self.session["cart"] = {str(product.pk): {"qty": 10} for product in self.products[:30]}
+
+    def _price(self):
+        """Tarifie le panier dans une nouvelle requête ; retourne le panier et les lots retarifés."""
+        request = RequestFactory().get("/")
+        request.user = self.user
+        request.session = self.session
+        get_cart_context(request)
+        with mock.patch.object(
+            PromoAwareB2BPricingService,
+            "get_unit_prices",
+            autospec=True,
+            side_effect=PromoAwareB2BPricingService.get_unit_prices,
+        ) as get_unit_prices:
+            cart = get_cart_service().get_cart(request)
+        return cart, [len(call.args[1]) for call in get_unit_prices.call_args_list]
+
+    def _expected_total(self):
+        prices = {product.pk: product.price for product in self.products}
+        return sum(prices[int(pid)] * entry["qty"] for pid, entry in self.session["cart"].items())
+
+    def test_only_changed_lines_are_repriced(self):
+        cart, batches = self._price()
+        self.assertEqual(batches, [30])
+        self.assertEqual(cart.total, self._expected_total())
+
+        # Quantité modifiée : total de la ligne recalculé, aucun prix résolu
+        self.session["cart"][str(self.products[0].pk)]["qty"] = 25
+        cart, batches = self._price()
+        self.assertEqual(batches, [])
+        self.assertEqual(cart.total, self._expected_total())
+
+        # Ligne ajoutée et ligne retirée
+        self.session["cart"][str(self.products[35].pk)] = {"qty": 10}
+        del self.session["cart"][str(self.products[1].pk)]
+        cart, batches = self._price()
+        self.assertEqual(batches, [1])
+        self.assertEqual(cart.total, self._expected_total())
+        self.assertEqual(len(cart.items), 30)
+
+    def test_stale_versions_are_repriced(self):
+        self._price()
+        Product.objects.filter(pk=self.products[2].pk).update(price=Decimal("99.00"))
+        self.products[2].price = Decimal("99.00")
+        bump_product_versions([self.products[2].pk])
+
+        cart, batches = self._price()
+
+        self.assertEqual(batches, [1])
+        self.assertEqual(cart.total, self._expected_total())
+
+        bump_promo_generation()
+        _, batches = self._price()
+        self.assertEqual(batches, [30])
+
+    def test_segment_change_reprices_everything(self):
+        self._price()
+        self.user.client_type = "wholesaler"
+        self.user.save()
+
+        _, batches = self._price()
+
+        self.assertEqual(batches, [30])
@@ -0,0 +1,122 @@
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.cache import cache
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+
+from cart.context import get_cart_context
+from cart.context_processors import cart as cart_context_processor
+from catalog.models import Brand, Category, Product
+from core.adapters.pricing_versions import bump_promo_generation
+from core.services.pricing_service import PromoAwareB2BPricingService
+from core.utils.shared_cache import get_shared_cache
+from tests.utils import in_memory_shared_cache, shared_cache_queries
+from userauths.models import User
+
+
+class CartSummaryTest(TestCase):
+    """Le résumé du panier n'est retarifé que lorsqu'il est périmé."""
+
+    def setUp(self) -> None:
+        cache.clear()
+        category = Category.objects.create(name="Cat", slug="cat")
+        brand = Brand.objects.create(name="Brand", slug="brand")
+        self.product = Product.objects.create(
+            title="SUM-1",
+            sku="SUM-1",
+            article_code="SUM-1",
+            category=category,
+            brand=brand,
+            price=Decimal("10.00"),
+        )
+        self.user = User.objects.create_user(
+            username="summary",
+            password="pass",
+            client_type="regular",
+            customer_number="C-SUM",
+            is_b2b_verified=True,
+        )
+        self.session = SessionStore()
+        self.session["cart"] = {str(self.product.pk): {"qty": 12}}
+
+    def _render_header(self):
+        """Simule une nouvelle requête partageant la même session."""
+        request = RequestFactory().get("/")
+        request.user = self.user
+        request.session = self.session
+        get_cart_context(request)
+        with mock.patch.object(
+            PromoAwareB2BPricingService,
+            "calculate_cart",
+            autospec=True,
+            side_effect=PromoAwareB2BPricingService.calculate_cart,
+        ) as calculate_cart:
+            context = cart_context_processor(request)
+        return context, calculate_cart.call_count
+
+    def _reused_summary_queries(self):
+        context, calls = self._render_header()
+        self.assertEqual(calls, 1)
+        self.assertEqual(context["cart_total"], Decimal("120.00"))
+
+        with CaptureQueriesContext(connection) as queries:
+            context, calls = self._render_header()
+        self.assertEqual(calls, 0)
+        self.assertEqual((context["cart_lines"], context["cart_count"]), (1, 12))
+        self.assertEqual(context["cart_total"], Decimal("120.00"))
+        return queries
+
+    def test_summary_is_reused_reading_only_the_fingerprint(self):
+        queries = self._reused_summary_queries()
+
+        # Empreinte des prix (générations et version du produit) lue en une
+        # requête dans le cache commun ; rien d'autre
+        self.assertEqual(len(queries), 1, queries.captured_queries)
+        self.assertEqual(len(shared_cache_queries(queries)), 1)
+
+    @in_memory_shared_cache
+    def test_summary_is_reused_without_queries_or_pricing(self):
+        get_shared_cache().clear()
+
+        queries = self._reused_summary_queries()
+
+        self.assertEqual(len(queries), 0, queries.captured_queries)
+
+    def test_cart_change_refreshes_summary(self):
+        self._render_header()
+        self.session["cart"][str(self.product.pk)]["qty"] = 20
+
+        context, calls = self._render_header()
+
+        self.assertEqual(calls, 1)
+        self.assertEqual(context["cart_total"], Decimal("200.00"))
+
+    def test_price_change_refreshes_summary(self):
+        self._render_header()
+        self.product.price = Decimal("11.00")
+        self.product.save()
+
+        context, calls = self._render_header()
+
+        self.assertEqual(calls, 1)
+        self.assertEqual(context["cart_total"], Decimal("132.00"))
+
+    def test_promo_generation_change_refreshes_summary(self):
+        self._render_header()
+        bump_promo_generation()
+
+        _, calls = self._render_header()
+
+        self.assertEqual(calls, 1)
+
+    def test_empty_cart_costs_nothing(self):
+        self.session["cart"] = {}
+
+        with self.assertNumQueries(0):
+            context, calls = self._render_header()
+
+        self.assertEqual(calls, 0)
+        self.assertEqual(context["cart_count"], 0)
@@ -0,0 +1,197 @@
+import threading
+import time
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient, APITestCase
+
+from catalog.models import Brand, Category, Product
+from orders import idempotency
+from orders.models import IdempotencyKey, Order
+from orders.stock import StockReservationConflict
+from userauths.models import User
+
+
+class IdempotencyMixin:
+    def setUp(self) -> None:
+        cache.clear()
+        category = Category.objects.create(name="Cat", slug="cat")
+        brand = Brand.objects.create(name="Brand", slug="brand")
+        self.product = Product.objects.create(
+            title="IDEM",
+            sku="IDEM",
+            article_code="IDEM",
+            category=category,
+            brand=brand,
+            price=Decimal("10.00"),
+            min_order_qty=1,
+            stock=100,
+        )
+        self.user = User.objects.create_user(username="idem", password="pass", is_b2b_verified=True)
+
+    def _client(self) -> APIClient:
+        client = APIClient()
+        client.force_authenticate(self.user)
+        client.post(reverse("cart-bulk-add-api"), {"lines": [{"sku": "IDEM", "quantity": 10}]}, format="json")
+        return client
+
+
+class CheckoutIdempotencyTest(IdempotencyMixin, APITestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.client = self._client()
+
+    def _checkout(self, key="key-1"):
+        return self.client.post(reverse("cart-checkout-api"), HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_replay_returns_stored_response_without_new_order(self):
+        first = self._checkout()
+        self.assertEqual(first.status_code, 201)
+
+        with CaptureQueriesContext(connection) as queries:
+            second = self._checkout()
+
+        self.assertEqual(second.status_code, 201)
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second["Idempotent-Replayed"], "true")
+        self.assertEqual(Order.objects.count(), 1)
+        self.assertEqual(Product.objects.get().stock, 90)
+        tables = " ".join(q["sql"] for q in queries.captured_queries)
+        for table in ("orders_order", "catalog_", "cart_", "pricing"):
+            self.assertNotIn(table, tables)
+
+    def test_new_key_creates_new_order(self):
+        self._checkout("key-1")
+        self.client.post(reverse("cart-bulk-add-api"), {"lines": [{"sku": "IDEM", "quantity": 10}]}, format="json")
+
+        response = self._checkout("key-2")
+
+        self.assertEqual(response.status_code, 201)
+        self.assertNotIn("Idempotent-Replayed", response)
+        self.assertEqual(Order.objects.count(), 2)
+
+    def test_keys_are_scoped_per_user(self):
+        self._checkout()
+        other = User.objects.create_user(username="other", password="pass", is_b2b_verified=True)
+        self.client.force_authenticate(other)
+
+        response = self._checkout()
+
+        self.assertNotIn("Idempotent-Replayed", response)
+        self.assertEqual(IdempotencyKey.objects.count(), 2)
+
+    def test_client_errors_are_replayed(self):
+        Product.objects.update(stock=5)
+
+        first = self._checkout()
+        Product.objects.update(stock=100)
+        second = self._checkout()
+
+        self.assertEqual(first.status_code, 409)
+        self.assertEqual(second.status_code, 409)
+        self.assertEqual(second.data, first.data)
+        self.assertFalse(Order.objects.exists())
+
+    def test_stock_conflict_is_not_replayed(self):
+        with mock.patch("core.repositories.orders_django.reserve_stock", side_effect=StockReservationConflict([self.product.pk])):
+            first = self._checkout()
+
+        self.assertEqual(first.status_code, 409)
+        self.assertNotIn("shortages", first.data)
+        self.assertEqual(first.data["product_ids"], [self.product.pk])
+
+        second = self._checkout()
+
+        self.assertEqual(second.status_code, 201)
+        self.assertNotIn("Idempotent-Replayed", second)
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_server_error_leaves_key_reusable(self):
+        with mock.patch("core.services.orders.OrderService.create_order_from_current_cart", side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self._checkout()
+
+        response = self._checkout()
+
+        self.assertEqual(response.status_code, 201)
+        self.assertNotIn("Idempotent-Replayed", response)
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_expired_key_runs_again(self):
+        self._checkout()
+        IdempotencyKey.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.client.post(reverse("cart-bulk-add-api"), {"lines": [{"sku": "IDEM", "quantity": 10}]}, format="json")
+
+        response = self._checkout()
+
+        self.assertEqual(response.status_code, 201)
+        self.assertNotIn("Idempotent-Replayed", response)
+        self.assertEqual(Order.objects.count(), 2)
+
+    def test_key_reused_on_another_path_is_rejected(self):
+        IdempotencyKey.objects.create(
+            user=self.user, key="key-1", request_path="/api/other/", expires_at=timezone.now() + timedelta(hours=1)
+        )
+
+        response = self._checkout()
+
+        self.assertEqual(response.status_code, 422)
+        self.assertFalse(Order.objects.exists())
+
+    def test_invalid_key_is_rejected(self):
+        self.assertEqual(self._checkout("").status_code, 400)
+        self.assertEqual(self._checkout("k" * 256).status_code, 400)
+        self.assertFalse(Order.objects.exists())
+
+    def test_purge_removes_expired_keys(self):
+        self._checkout()
+        IdempotencyKey.objects.create(
+            user=self.user, key="old", request_path="/", expires_at=timezone.now() - timedelta(seconds=1)
+        )
+
+        self.assertEqual(idempotency.purge_expired(), 1)
+        self.assertEqual(list(IdempotencyKey.objects.values_list("key", flat=True)), ["key-1"])
+
+
+class ConcurrentCheckoutIdempotencyTest(IdempotencyMixin, TransactionTestCase):
+    """Des doublons simultanés ne créent qu'une commande et reçoivent la même réponse."""
+
+    def test_concurrent_duplicates_create_one_order(self):
+        client = self._client()
+        barrier = threading.Barrier(8)
+
+        def checkout():
+            # Un client par thread, sur la même session (même panier)
+            thread_client = APIClient(raise_request_exception=False)
+            thread_client.cookies = client.cookies
+            thread_client.force_authenticate(self.user)
+            try:
+                barrier.wait()
+                while True:
+                    response = thread_client.post(reverse("cart-checkout-api"), HTTP_IDEMPOTENCY_KEY="dup")
+                    if response.status_code != 500:
+                        return response
+                    # SQLite (base de test) refuse les écritures concurrentes
+                    # au lieu d'attendre le verrou : la requête est rejouée.
+                    time.sleep(0.005)
+            finally:
+                connection.close()
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(checkout())) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(Order.objects.count(), 1)
+        self.assertEqual({response.status_code for response in results}, {201})
+        self.assertEqual({response.data["order_number"] for response in results}, {Order.objects.get().order_number})
+        self.assertEqual(sum(response.has_header("Idempotent-Replayed") for response in results), 7)
@@ -0,0 +1,133 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.cache import cache
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from cart.context import get_cart_context
+from catalog.models import Brand, Category, Product
+from loyalty.models import Coupon
+from orders.forms import CheckoutForm
+from orders.models import Order, OrderItem
+from orders.services import CheckoutService
+from userauths.models import User
+
+CHECKOUT_DATA = {
+    "email": "bulk@example.com",
+    "first_name": "Bulk",
+    "last_name": "Checkout",
+    "address1": "1 rue",
+    "city": "Paris",
+    "postcode": "75001",
+    "country": "France",
+}
+
+
+class CheckoutMixin:
+    def setUp(self) -> None:
+        cache.clear()
+        category = Category.objects.create(name="Cat", slug="cat")
+        brand = Brand.objects.create(name="Brand", slug="brand")
+        self.products = [
+            Product.objects.create(
+                title=f"BLK-{index}",
+                sku=f"BLK-{index}",
+                article_code=f"BLK-{index}",
+                category=category,
+                brand=brand,
+                price=Decimal("10.00") + index,
+                min_order_qty=1,
+                stock=1000,
+            )
+            for index in range(40)
+        ]
+        self.user = User.objects.create_user(username="bulk", password="pass", is_b2b_verified=True)
+
+
+class CheckoutPersistenceTest(CheckoutMixin, TestCase):
+    def _checkout(self, products, coupon_code=None):
+        request = RequestFactory().post("/")
+        request.user = self.user
+        request.session = SessionStore()
+        request.session["cart"] = {str(product.pk): {"qty": 10} for product in products}
+        if coupon_code:
+            request.session["coupon_code"] = coupon_code
+        get_cart_context(request)
+        form = CheckoutForm(CHECKOUT_DATA)
+        self.assertTrue(form.is_valid())
+        with CaptureQueriesContext(connection) as queries:
+            order = CheckoutService().checkout(request, form)
+        inserts = [q["sql"] for q in queries.captured_queries if q["sql"].startswith('INSERT INTO "orders_orderitem"')]
+        return order, inserts
+
+    def test_lines_are_written_with_one_insert(self):
+        order, inserts = self._checkout(self.products)
+
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(order.items.count(), 40)
+        self.assertEqual(
+            set(order.items.values_list("product_id", "quantity", "reserved_quantity")),
+            {(product.pk, 10, 10) for product in self.products},
+        )
+
+    def test_totals_are_computed_from_the_lines(self):
+        Coupon.objects.create(
+            code="TEN",
+            discount_type="percent",
+            discount_value=Decimal("10"),
+            expires_at=timezone.now() + timedelta(days=1),
+        )
+
+        order, _ = self._checkout(self.products[:3], coupon_code="TEN")
+
+        self.assertEqual(order.subtotal, Decimal("330.00"))
+        self.assertEqual(order.discount, Decimal("33.00"))
+        self.assertEqual(order.total, Decimal("297.00"))
+        self.assertEqual(order.coupon_code, "TEN")
+        self.assertEqual(sum(OrderItem.objects.values_list("line_total", flat=True)), order.subtotal)
+
+
+class CheckoutAPIPersistenceTest(CheckoutMixin, APITestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.client.force_authenticate(self.user)
+        lines = [{"sku": product.article_code, "quantity": 10} for product in self.products[:2]]
+        self.client.post(reverse("cart-bulk-add-api"), {"lines": lines}, format="json")
+
+    def test_api_checkout_persists_priced_lines_and_reserves_stock(self):
+        response = self.client.post(reverse("cart-checkout-api"))
+
+        self.assertEqual(response.status_code, 201)
+        order = Order.objects.get()
+        self.assertEqual(order.total, Decimal("210.00"))
+        self.assertEqual(
+            list(order.items.order_by("product_id").values_list("product_sku", "unit_price", "line_total")),
+            [("BLK-0", Decimal("10.00"), Decimal("100.00")), ("BLK-1", Decimal("11.00"), Decimal("110.00"))],
+        )
+        self.assertEqual(Product.objects.get(pk=self.products[0].pk).stock, 990)
+
+    def test_api_checkout_clears_the_cart(self):
+        self.assertEqual(self.client.post(reverse("cart-checkout-api")).status_code, 201)
+
+        cart = self.client.get(reverse("cart-detail-api"))
+        second = self.client.post(reverse("cart-checkout-api"))
+
+        self.assertEqual(cart.data["items"], [])
+        self.assertEqual(second.status_code, 400)
+        self.assertEqual(Order.objects.count(), 1)
+        self.assertEqual(Product.objects.get(pk=self.products[0].pk).stock, 990)
+
+    def test_api_checkout_reports_shortage(self):
+        Product.objects.filter(pk=self.products[1].pk).update(stock=5)
+
+        response = self.client.post(reverse("cart-checkout-api"))
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data["shortages"], [{"product_id": self.products[1].pk, "requested": 10, "available": 5}])
+        self.assertFalse(Order.objects.exists())
@@ -0,0 +1,200 @@
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.cache import cache
+from django.db import OperationalError, connection, transaction
+from django.test import RequestFactory, TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from cart.context import get_cart_context
+from catalog.models import Brand, Category, Product
+from orders.forms import CheckoutForm
+from orders.models import Order, OrderNumberCounter
+from orders.services import CheckoutService
+from userauths.models import User
+
+ORDER_DATA = {
+    "email": "num@example.com",
+    "first_name": "Num",
+    "last_name": "Test",
+    "address1": "1 rue",
+    "city": "Paris",
+    "postcode": "75001",
+}
+
+NUMBER_RE = re.compile(r"^\d{8}-\d{4}-(\d{4,})$")
+
+
+def _seq(order_number: str) -> int:
+    match = NUMBER_RE.match(order_number)
+    assert match, order_number
+    return int(match.group(1))
+
+
+class OrderNumberCounterTest(TestCase):
+    def test_numbers_follow_the_daily_sequence(self):
+        numbers = [Order.objects.create(**ORDER_DATA).order_number for _ in range(3)]
+
+        self.assertEqual([_seq(number) for number in numbers], [1, 2, 3])
+        self.assertTrue(numbers[0].startswith(timezone.now().strftime("%Y%m%d-")))
+        self.assertEqual(OrderNumberCounter.objects.get().last_value, 3)
+
+    def test_allocation_does_not_count_orders(self):
+        Order.objects.create(**ORDER_DATA)
+
+        with CaptureQueriesContext(connection) as queries:
+            Order.objects.create(**ORDER_DATA)
+
+        self.assertFalse([q for q in queries.captured_queries if "COUNT(" in q["sql"].upper()])
+
+    def test_allocation_is_a_single_update_returning(self):
+        Order.objects.create(**ORDER_DATA)
+
+        with CaptureQueriesContext(connection) as queries:
+            Order.objects.create(**ORDER_DATA)
+
+        counter = [q["sql"] for q in queries.captured_queries if "orders_ordernumbercounter" in q["sql"]]
+        self.assertEqual(len(counter), 1, counter)
+        self.assertIn("RETURNING", counter[0])
+
+    def test_new_counter_continues_after_existing_numbers(self):
+        for _ in range(2):
+            Order.objects.create(**ORDER_DATA)
+        OrderNumberCounter.objects.all().delete()
+
+        self.assertEqual(_seq(Order.objects.create(**ORDER_DATA).order_number), 3)
+
+    def test_rolled_back_order_gives_its_number_back(self):
+        Order.objects.create(**ORDER_DATA)
+        try:
+            with transaction.atomic():
+                Order.objects.create(**ORDER_DATA)
+                raise RuntimeError
+        except RuntimeError:
+            pass
+
+        self.assertEqual(_seq(Order.objects.create(**ORDER_DATA).order_number), 2)
+
+
+class CheckoutMixin:
+    def setUp(self) -> None:
+        cache.clear()
+        self.product = Product.objects.create(
+            title="NUM",
+            sku="NUM",
+            article_code="NUM",
+            category=Category.objects.create(name="Cat", slug="cat"),
+            brand=Brand.objects.create(name="Brand", slug="brand"),
+            price=Decimal("10.00"),
+            min_order_qty=1,
+            stock=100,
+        )
+        self.user = User.objects.create_user(username="num", password="pass", is_b2b_verified=True)
+
+    def _checkout(self, quantity=10) -> Order:
+        """Checkout web du produit dans une requête isolée."""
+        request = RequestFactory().post("/")
+        request.user = self.user
+        request.session = SessionStore()
+        request.session["cart"] = {str(self.product.pk): {"qty": quantity}}
+        get_cart_context(request)
+        form = CheckoutForm({**ORDER_DATA, "country": "France"})
+        assert form.is_valid(), form.errors
+        return CheckoutService().checkout(request, form)
+
+
+class CheckoutNumberingTest(CheckoutMixin, TestCase):
+    """Le numéro est attribué en dernière instruction du checkout (verrou du compteur bref)."""
+
+    def _statements_after_allocation(self, queries):
+        sql = [q["sql"] for q in queries.captured_queries if "SAVEPOINT" not in q["sql"]]
+        allocation = max(index for index, query in enumerate(sql) if "orders_ordernumbercounter" in query)
+        return sql[allocation + 1 :]
+
+    def test_web_checkout_allocates_number_last(self):
+        with CaptureQueriesContext(connection) as queries:
+            order = self._checkout()
+
+        after = self._statements_after_allocation(queries)
+        self.assertEqual(len(after), 1, after)
+        self.assertTrue(after[0].startswith('UPDATE "orders_order"'))
+        self.assertEqual(_seq(order.order_number), 1)
+        self.assertEqual(Order.objects.get().order_number, order.order_number)
+
+    def test_api_checkout_allocates_number_last(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        client.post(reverse("cart-bulk-add-api"), {"lines": [{"sku": "NUM", "quantity": 10}]}, format="json")
+
+        with CaptureQueriesContext(connection) as queries:
+            response = client.post(reverse("cart-checkout-api"))
+
+        self.assertEqual(response.status_code, 201)
+        after = self._statements_after_allocation(queries)
+        self.assertTrue(after[0].startswith('UPDATE "orders_order"'), after)
+        self.assertFalse([query for query in after if "catalog_product" in query or "orders_orderitem" in query])
+        self.assertEqual(response.data["order_number"], Order.objects.get().order_number)
+        self.assertEqual(_seq(response.data["order_number"]), 1)
+
+
+class ConcurrentOrderNumberTest(TransactionTestCase):
+    """Des centaines de commandes simultanées reçoivent des numéros distincts."""
+
+    def test_parallel_orders_get_unique_contiguous_numbers(self):
+        def create_order(_):
+            try:
+                while True:
+                    try:
+                        with transaction.atomic():
+                            return Order.objects.create(**ORDER_DATA).order_number
+                    except OperationalError:
+                        # SQLite (base de test) refuse les écritures concurrentes
+                        # au lieu d'attendre : la transaction est rejouée.
+                        time.sleep(0.005)
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            numbers = list(pool.map(create_order, range(200)))
+
+        self.assertEqual(len(set(numbers)), 200)
+        self.assertEqual(sorted(_seq(number) for number in numbers), list(range(1, 201)))
+        self.assertEqual(Order.objects.count(), 200)
+
+
+class ConcurrentCheckoutNumberTest(CheckoutMixin, TransactionTestCase):
+    """Des checkouts simultanés reçoivent des numéros distincts et contigus."""
+
+    def test_parallel_checkouts_get_unique_contiguous_numbers(self):
+        barrier = threading.Barrier(16)
+
+        def checkout(_):
+            try:
+                barrier.wait()
+                while True:
+                    try:
+                        return self._checkout(quantity=1).order_number
+                    except OperationalError:
+                        # SQLite (base de test) refuse les écritures concurrentes
+                        # au lieu d'attendre : le checkout est rejoué.
+                        time.sleep(0.005)
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            numbers = list(pool.map(checkout, range(48)))
+
+        stored = list(Order.objects.values_list("order_number", flat=True))
+        self.assertEqual(sorted(stored), sorted(numbers))
+        # Aucun numéro provisoire restant : tous suivent le format définitif
+        self.assertEqual(sorted(_seq(number) for number in stored), list(range(1, 49)))
+        self.assertEqual(OrderNumberCounter.objects.get().last_value, 48)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock, 100 - 48)
@@ -0,0 +1,167 @@
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.sessions.backends.db import SessionStore
+from django.core import mail
+from django.core.cache import cache
+from django.db import transaction
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils import timezone
+
+from cart.context import get_cart_context
+from catalog.models import Brand, Category, Product
+from loyalty.models import LoyaltyAccount
+from notifications.models import Notification
+from orders import outbox
+from orders.forms import CheckoutForm
+from orders.models import Order, OutboxEvent
+from orders.services import CheckoutService
+from orders.tasks import dispatch_outbox
+from userauths.models import User
+
+CHECKOUT_DATA = {
+    "email": "outbox@example.com",
+    "first_name": "Out",
+    "last_name": "Box",
+    "address1": "1 rue",
+    "city": "Paris",
+    "postcode": "75001",
+    "country": "France",
+}
+
+
+class OutboxTest(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        category = Category.objects.create(name="Cat", slug="cat")
+        brand = Brand.objects.create(name="Brand", slug="brand")
+        self.product = Product.objects.create(
+            title="OBX",
+            sku="OBX",
+            article_code="OBX",
+            category=category,
+            brand=brand,
+            price=Decimal("12.50"),
+            min_order_qty=1,
+            stock=100,
+        )
+        self.user = User.objects.create_user(username="outbox", password="pass", is_b2b_verified=True)
+
+    def _checkout(self) -> Order:
+        request = RequestFactory().post("/")
+        request.user = self.user
+        request.session = SessionStore()
+        request.session["cart"] = {str(self.product.pk): {"qty": 10}}
+        get_cart_context(request)
+        form = CheckoutForm(CHECKOUT_DATA)
+        self.assertTrue(form.is_valid())
+        return CheckoutService().checkout(request, form)
+
+    def _make_due(self) -> None:
+        OutboxEvent.objects.update(available_at=timezone.now() - timedelta(seconds=1))
+
+    def test_checkout_writes_event_without_side_effects(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            order = self._checkout()
+
+        event = OutboxEvent.objects.get()
+        self.assertEqual(event.topic, outbox.ORDER_CREATED)
+        self.assertEqual(event.payload, {"order_id": order.pk, "user_id": self.user.pk})
+        self.assertEqual(event.status, OutboxEvent.PENDING)
+        self.assertEqual(len(callbacks), 1)
+        self.assertFalse(Notification.objects.exists())
+        self.assertFalse(LoyaltyAccount.objects.exists())
+        self.assertEqual(mail.outbox, [])
+
+    def test_rolled_back_checkout_leaves_no_event(self):
+        try:
+            with transaction.atomic():
+                self._checkout()
+                raise RuntimeError
+        except RuntimeError:
+            pass
+
+        self.assertFalse(OutboxEvent.objects.exists())
+
+    def test_dispatch_runs_every_handler_once(self):
+        order = self._checkout()
+
+        self.assertEqual(dispatch_outbox(), 1)
+
+        event = OutboxEvent.objects.get()
+        self.assertEqual(event.status, OutboxEvent.DONE)
+        self.assertIsNotNone(event.processed_at)
+        self.assertEqual(set(event.completed_handlers), set(outbox.get_handlers(outbox.ORDER_CREATED)))
+        self.assertEqual(Notification.objects.get().message, f"Votre commande {order.order_number} a été créée.")
+        self.assertEqual(LoyaltyAccount.objects.get(user=self.user).points, 125)
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox), ["contact@xeros.local", "outbox@example.com"])
+
+        # Un événement traité n'est plus diffusé
+        self.assertEqual(dispatch_outbox(), 0)
+        self.assertEqual(LoyaltyAccount.objects.get(user=self.user).points, 125)
+
+    def test_failed_handler_alone_is_retried(self):
+        self._checkout()
+
+        with mock.patch("loyalty.handlers.LoyaltyAccount.add_points", side_effect=RuntimeError("boom")):
+            dispatch_outbox()
+
+        event = OutboxEvent.objects.get()
+        self.assertEqual(event.status, OutboxEvent.PENDING)
+        self.assertEqual(event.attempts, 1)
+        self.assertIn("loyalty: RuntimeError: boom", event.last_error)
+        self.assertNotIn("loyalty", event.completed_handlers)
+        self.assertGreater(event.available_at, timezone.now())
+        self.assertEqual(len(mail.outbox), 2)
+
+        # Pas de nouvelle tentative avant la fin du délai de recul
+        self.assertEqual(dispatch_outbox(), 0)
+
+        self._make_due()
+        dispatch_outbox()
+
+        event.refresh_from_db()
+        self.assertEqual(event.status, OutboxEvent.DONE)
+        self.assertEqual(LoyaltyAccount.objects.get(user=self.user).points, 125)
+        self.assertEqual(Notification.objects.count(), 1)
+        self.assertEqual(len(mail.outbox), 2)
+
+    def test_event_fails_after_max_attempts(self):
+        self._checkout()
+
+        with mock.patch("loyalty.handlers.LoyaltyAccount.add_points", side_effect=RuntimeError("boom")):
+            for _ in range(outbox.MAX_ATTEMPTS):
+                self._make_due()
+                dispatch_outbox()
+
+        event = OutboxEvent.objects.get()
+        self.assertEqual(event.status, OutboxEvent.FAILED)
+        self.assertEqual(event.attempts, outbox.MAX_ATTEMPTS)
+        self._make_due()
+        self.assertEqual(dispatch_outbox(), 0)
+
+    def test_dispatch_processes_events_in_batches(self):
+        for _ in range(3):
+            self._checkout()
+
+        self.assertEqual(outbox.dispatch_pending(batch_size=2), 2)
+        self.assertEqual(OutboxEvent.objects.filter(status=OutboxEvent.DONE).count(), 2)
+        self.assertEqual(dispatch_outbox(batch_size=2), 1)
+        self.assertFalse(OutboxEvent.objects.exclude(status=OutboxEvent.DONE).exists())
+
+    @override_settings(ERP_ORDER_WEBHOOK_URL="https://erp.example.com/orders")
+    def test_erp_receives_idempotency_key(self):
+        order = self._checkout()
+
+        with mock.patch("integrations.handlers.requests.post") as post:
+            dispatch_outbox()
+
+        event = OutboxEvent.objects.get()
+        post.assert_called_once()
+        args, kwargs = post.call_args
+        self.assertEqual(args, ("https://erp.example.com/orders",))
+        self.assertEqual(kwargs["headers"], {"Idempotency-Key": str(event.uuid)})
+        self.assertEqual(kwargs["json"]["order_number"], order.order_number)
+        self.assertEqual(kwargs["json"]["lines"][0]["quantity"], 10)
+        self.assertIn("erp", event.completed_handlers)
@@ -0,0 +1,86 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from benchmarks.pricing import compare
+from catalog.models import Product, PromoCatalog
+from orders.models import Order
+from userauths.models import User
+
+
+def _report(**medians):
+    return {"results": {name: {"median_us": value} for name, value in medians.items()}}
+
+
+def test_compare_flags_only_slowdowns_beyond_threshold():
+    baseline = _report(fast=10.0, slow=10.0, gone=5.0)
+    current = _report(fast=12.0, slow=13.0, new=1.0)
+
+    comparisons = {comparison.name: comparison for comparison in compare(baseline, current, threshold=0.25)}
+
+    # Seuls les cas présents des deux côtés sont comparés
+    assert set(comparisons) == {"fast", "slow"}
+    assert not comparisons["fast"].regressed
+    assert comparisons["slow"].regressed
+    assert round(comparisons["slow"].ratio, 2) == 1.3
+
+
+class BenchPricingCommandTest(TestCase):
+    """Exécution réduite de la commande ``bench_pricing``."""
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.tmp = Path(tempfile.mkdtemp())
+
+    def _run(self, *args):
+        call_command(
+            "bench_pricing",
+            "--products", "20",
+            "--repeat", "1",
+            "--cart-sizes", "1,5",
+            "--catalogs", "0,2",
+            *args,
+            stdout=StringIO(),
+        )
+
+    def test_writes_results_without_persisting_data(self):
+        output = self.tmp / "bench.json"
+        self._run("--output", str(output))
+
+        report = json.loads(output.read_text(encoding="utf-8"))
+        self.assertEqual(report["meta"]["products"], 20)
+        self.assertEqual(
+            set(report["results"]),
+            {
+                "engine.determine_price",
+                "unit_price.cold",
+                "unit_price.warm",
+                "cart.calculate[1]",
+                "cart.calculate[5]",
+                "cart.reprice_one[1]",
+                "cart.reprice_one[5]",
+                "promo.resolve[0]",
+                "promo.index_build[0]",
+                "promo.resolve[2]",
+                "promo.index_build[2]",
+                "checkout[1]",
+                "checkout[5]",
+            },
+        )
+        self.assertFalse(Product.objects.exists())
+        self.assertFalse(PromoCatalog.objects.exists())
+        self.assertFalse(User.objects.exists())
+        self.assertFalse(Order.objects.exists())
+
+    def test_fails_on_regression_against_baseline(self):
+        baseline = self.tmp / "baseline.json"
+        baseline.write_text(json.dumps(_report(**{"engine.determine_price": 1e-6})), encoding="utf-8")
+
+        with self.assertRaisesMessage(CommandError, "engine.determine_price"):
+            self._run("--baseline", str(baseline))
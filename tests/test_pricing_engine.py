@@ -1,6 +1,6 @@
 from decimal import Decimal
 
-from core.domain.dto import ProductDTO, UserDTO, PromoItemDTO
+from core.domain.dto import ProductDTO, ProductRecord, PromoItemDTO, UserDTO, UserRecord
 from core.domain.pricing_engine import PricingEngine
 
 
@@ -69,3 +69,31 @@ def test_unverified_b2b_has_surcharge():
 
     price = PricingEngine.determine_price(product, user, None)
     assert price == Decimal("84.00")  # 80 * 1.05
+
+
+def test_determine_prices_batch_matches_scalar():
+    products = [
+        _make_product(id=1, price_wholesaler=Decimal("80.00")),
+        _make_product(id=2, price=Decimal("50.00"), discount_price=Decimal("45.00")),
+        _make_product(id=3),
+    ]
+    user = _make_user(client_type="wholesaler")
+    promos = {3: PromoItemDTO(promo_price=Decimal("42.00"))}
+
+    prices = PricingEngine.determine_prices(products, user, promos)
+    assert prices == {
+        p.id: PricingEngine.determine_price(p, user, promos.get(p.id)) for p in products
+    }
+    assert prices[3] == Decimal("42.00")
+
+
+def test_records_price_like_dtos():
+    product = _make_product(price_wholesaler=Decimal("80.00"), discount_price=Decimal("90.00"))
+    user = _make_user(is_b2b_verified=False)
+    record = ProductRecord(**product.model_dump())
+    user_record = UserRecord(**user.model_dump())
+
+    assert PricingEngine.determine_price(record, user_record) == PricingEngine.determine_price(product, user)
+    # ``to_dto`` est l'étape de validation explicite aux frontières
+    assert record.to_dto() == product
+    assert user_record.to_dto() == user
@@ -0,0 +1,147 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from importlib import import_module
+
+from django.apps import apps
+from django.core.cache import cache
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from catalog.models import Brand, Category, PricingRule, Product
+from core.adapters.pricing_rules_store import get_pricing_rules
+from core.domain.pricing_rules import AdvancedPricingRules, CompiledPricingRules, PricingRuleSpec
+from core.factory import get_pricing_service
+from core.utils.shared_cache import get_shared_cache
+from tests.utils import in_memory_shared_cache, shared_cache_queries
+from userauths.models import User
+
+NOW = datetime(2025, 1, 15, tzinfo=dt_timezone.utc)
+
+
+def _compile(*specs):
+    return CompiledPricingRules.compile(specs, now=NOW)
+
+
+def test_quantity_discount_uses_largest_reached_threshold():
+    rules = _compile(
+        PricingRuleSpec(kind="quantity", min_quantity=100, rate=Decimal("0.20")),
+        PricingRuleSpec(kind="quantity", min_quantity=50, rate=Decimal("0.10")),
+    ).for_client_type(None)
+    assert rules.quantity_thresholds == (50, 100)
+    assert AdvancedPricingRules.apply_quantity_discount(Decimal("10.00"), 49, rules) == Decimal("10.00")
+    assert AdvancedPricingRules.apply_quantity_discount(Decimal("10.00"), 50, rules) == Decimal("9.00")
+    assert AdvancedPricingRules.apply_quantity_discount(Decimal("10.00"), 120, rules) == Decimal("8.00")
+
+
+def test_client_type_rules_override_common_rules():
+    compiled = _compile(
+        PricingRuleSpec(kind="brand", brand_id=1, rate=Decimal("0.05")),
+        PricingRuleSpec(kind="brand", brand_id=1, rate=Decimal("0.08"), client_type="wholesaler"),
+        PricingRuleSpec(kind="floor", rate=Decimal("0.70")),
+    )
+    assert compiled.for_client_type("wholesaler").brand_rates[1] == Decimal("0.08")
+    assert compiled.for_client_type("wholesaler").floor_percent == Decimal("0.70")
+    assert compiled.for_client_type("big_retail").brand_rates[1] == Decimal("0.05")
+
+
+def test_validity_dates_and_next_boundary():
+    compiled = _compile(
+        PricingRuleSpec(kind="family", category_id=3, rate=Decimal("0.03"), end_date=NOW - timedelta(days=1)),
+        PricingRuleSpec(kind="family", category_id=4, rate=Decimal("0.03"), start_date=NOW + timedelta(days=2)),
+        PricingRuleSpec(kind="family", category_id=5, rate=Decimal("0.03"), end_date=NOW + timedelta(days=1)),
+    )
+    assert dict(compiled.for_client_type(None).family_rates) == {5: Decimal("0.03")}
+    assert compiled.next_boundary == NOW + timedelta(days=1, microseconds=1)
+
+
+class PreviewPriceRulesTest(TestCase):
+    """Prévisualisation des prix à partir des règles administrées."""
+
+    def setUp(self) -> None:
+        cache.clear()
+        PricingRule.objects.all().delete()
+        self.category = Category.objects.create(name="Cat", slug="cat")
+        self.brand = Brand.objects.create(name="Acme", slug="acme")
+        self.product = Product.objects.create(
+            title="Produit",
+            sku="RULE-1",
+            article_code="RULE-1",
+            category=self.category,
+            brand=self.brand,
+            price=Decimal("100.00"),
+        )
+        self.user = User.objects.create_user(username="rules", password="pass", client_type="regular")
+        self.service = get_pricing_service()
+
+    def _compiled_preview_queries(self):
+        PricingRule.objects.create(kind=PricingRule.KIND_QUANTITY, min_quantity=10, rate=Decimal("0.10"))
+        PricingRule.objects.create(kind=PricingRule.KIND_BRAND, brand=self.brand, rate=Decimal("0.05"))
+        self.assertEqual(self.service.preview_price(self.product, self.user, 10), Decimal("85.50"))
+        get_pricing_rules()
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.service.preview_price(self.product, self.user, 10), Decimal("85.50"))
+        return queries
+
+    def test_preview_reads_only_shared_cache_once_compiled(self) -> None:
+        queries = self._compiled_preview_queries()
+
+        # Table du cache commun : génération des promotions et version du
+        # produit, puis génération des règles ; aucune table de tarification
+        self.assertEqual(len(queries), 2, queries.captured_queries)
+        self.assertEqual(len(shared_cache_queries(queries)), 2)
+
+    @in_memory_shared_cache
+    def test_preview_uses_admin_rules_without_queries_once_compiled(self) -> None:
+        get_shared_cache().clear()
+
+        queries = self._compiled_preview_queries()
+
+        self.assertEqual(len(queries), 0, queries.captured_queries)
+
+    def test_rule_change_recompiles(self) -> None:
+        rule = PricingRule.objects.create(kind=PricingRule.KIND_QUANTITY, min_quantity=10, rate=Decimal("0.10"))
+        self.assertEqual(self.service.preview_price(self.product, self.user, 10), Decimal("90.00"))
+        rule.rate = Decimal("0.20")
+        rule.save()
+        self.assertEqual(self.service.preview_price(self.product, self.user, 10), Decimal("80.00"))
+        PricingRule.objects.create(kind=PricingRule.KIND_FLOOR, rate=Decimal("0.85"))
+        self.assertEqual(self.service.preview_price(self.product, self.user, 10), Decimal("85.00"))
+        PricingRule.objects.create(
+            kind=PricingRule.KIND_FLOOR, rate=Decimal("0.95"), client_type="wholesaler"
+        )
+        self.assertEqual(self.service.preview_price(self.product, self.user, 10), Decimal("85.00"))
+
+
+class PricingRuleConstraintsTest(TestCase):
+    """Invariants de ``PricingRule.clean`` garantis hors de l'admin."""
+
+    def setUp(self) -> None:
+        PricingRule.objects.all().delete()
+        self.category = Category.objects.create(name="Electronics", slug="electronique")
+        self.brand = Brand.objects.create(name="ACME", slug="acme-industries")
+
+    def assertRejected(self, **fields) -> None:
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            PricingRule.objects.create(**fields)
+
+    def test_malformed_rules_are_rejected(self) -> None:
+        self.assertRejected(kind=PricingRule.KIND_QUANTITY, rate=Decimal("0.10"))
+        self.assertRejected(kind=PricingRule.KIND_BRAND, rate=Decimal("0.05"))
+        self.assertRejected(kind=PricingRule.KIND_FAMILY, rate=Decimal("0.03"))
+        self.assertRejected(kind=PricingRule.KIND_FLOOR, rate=Decimal("1.50"))
+        self.assertRejected(kind="unknown", rate=Decimal("0.10"))
+        self.assertEqual(PricingRule.objects.count(), 0)
+
+    def test_seed_matches_brand_by_name_and_family_by_name(self) -> None:
+        seed = import_module("catalog.migrations.0004_seed_pricing_rules")
+
+        seed.seed_rules(apps, None)
+
+        self.assertEqual(
+            PricingRule.objects.get(kind=PricingRule.KIND_BRAND).brand_id, self.brand.pk
+        )
+        self.assertEqual(
+            PricingRule.objects.get(kind=PricingRule.KIND_FAMILY).category_id, self.category.pk
+        )
+        self.assertEqual(PricingRule.objects.filter(kind=PricingRule.KIND_QUANTITY).count(), 2)
@@ -0,0 +1,113 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from catalog.models import Brand, Category, Product, PromoCatalog, PromoItem
+from core.adapters.pricing_versions import get_price_versions
+from core.domain.dto import UserDTO
+from core.domain.pricing_segments import ANONYMOUS_SEGMENT, pricing_segment
+from core.factory import get_pricing_service
+from userauths.models import User
+
+
+class PricingSegmentKeyTest(TestCase):
+    """Clés de segment dérivées des attributs de l'utilisateur."""
+
+    def test_segment_attributes(self) -> None:
+        self.assertEqual(pricing_segment(None), ANONYMOUS_SEGMENT)
+        a = UserDTO(id=1, email="", client_type="wholesaler", customer_number="A", is_b2b_verified=True)
+        b = UserDTO(id=2, email="", client_type="wholesaler", customer_number="B", is_b2b_verified=True)
+        self.assertEqual(pricing_segment(a), pricing_segment(b))
+        unverified = b.model_copy(update={"is_b2b_verified": False})
+        self.assertNotEqual(pricing_segment(a), pricing_segment(unverified))
+        no_number = b.model_copy(update={"customer_number": None})
+        self.assertNotEqual(pricing_segment(a), pricing_segment(no_number))
+        self.assertNotEqual(pricing_segment(a, user_specific=True), pricing_segment(b, user_specific=True))
+        renumbered = a.model_copy(update={"customer_number": "A2"})
+        self.assertNotEqual(pricing_segment(a, user_specific=True), pricing_segment(renumbered, user_specific=True))
+
+
+class SegmentCacheTest(TestCase):
+    """Partage du cache de prix entre utilisateurs d'un même segment."""
+
+    def setUp(self) -> None:
+        cache.clear()
+        now = timezone.now()
+        category = Category.objects.create(name="Cat", slug="cat")
+        brand = Brand.objects.create(name="Brand", slug="brand")
+        self.product = Product.objects.create(
+            title="Produit",
+            sku="SEG-1",
+            article_code="SEG-1",
+            category=category,
+            brand=brand,
+            price=Decimal("100.00"),
+        )
+        self.catalog = PromoCatalog.objects.create(
+            title="Promo",
+            start_date=now - timedelta(days=1),
+            end_date=now + timedelta(days=1),
+        )
+        self.service = get_pricing_service()
+        self.alice = self._user("alice", "C-1")
+        self.bob = self._user("bob", "C-2")
+
+    def _user(self, username: str, customer_number: str) -> User:
+        return User.objects.create_user(
+            username=username,
+            password="pass",
+            customer_number=customer_number,
+            client_type="wholesaler",
+        )
+
+    def test_same_segment_shares_cache_entries(self) -> None:
+        PromoItem.objects.create(catalog=self.catalog, product=self.product, promo_price=Decimal("80.00"))
+        self.assertEqual(self.service.pricing_segment(self.alice), self.service.pricing_segment(self.bob))
+        price = self.service.get_unit_price(self.product, self.alice)
+        generation, versions = get_price_versions([self.product.id])
+        key = self.service._cache_key(
+            self.service._to_product_dto(self.product),
+            self.service.pricing_segment(self.bob),
+            versions[self.product.id],
+            generation,
+        )
+        self.assertEqual(Decimal(cache.get(key)), price)
+        self.assertEqual(self.service.get_unit_price(self.product, self.bob), price)
+
+    def test_customer_targeted_user_gets_own_entries(self) -> None:
+        PromoItem.objects.create(
+            catalog=self.catalog,
+            product=self.product,
+            promo_price=Decimal("50.00"),
+            allowed_customer_numbers=["C-1"],
+        )
+        self.assertNotEqual(self.service.pricing_segment(self.alice), self.service.pricing_segment(self.bob))
+        self.assertEqual(self.service.get_unit_price(self.product, self.alice), Decimal("50.00"))
+        self.assertNotEqual(self.service.get_unit_price(self.product, self.bob), Decimal("50.00"))
+
+    def test_customer_number_change_drops_reserved_prices(self) -> None:
+        # Alice est ciblée nommément (``target_users``) avant comme après
+        self.catalog.target_users.add(self.alice)
+        PromoItem.objects.create(
+            catalog=self.catalog,
+            product=self.product,
+            promo_price=Decimal("50.00"),
+            allowed_customer_numbers=["C-1"],
+        )
+        self.assertEqual(self.service.get_unit_price(self.product, self.alice), Decimal("50.00"))
+
+        self.alice.customer_number = "C-9"
+        self.alice.save()
+
+        self.assertEqual(
+            self.service.get_unit_price(self.product, self.alice), self.service.get_unit_price(self.product, self.bob)
+        )
+        self.assertNotEqual(self.service.get_unit_price(self.product, self.alice), Decimal("50.00"))
+
+    def test_target_users_get_own_entries(self) -> None:
+        self.catalog.target_users.add(self.alice)
+        self.assertIn(f"u{self.alice.id}", self.service.pricing_segment(self.alice))
+        self.assertNotIn(f"u{self.bob.id}", self.service.pricing_segment(self.bob))
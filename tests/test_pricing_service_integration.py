@@ -1,13 +1,19 @@
 from decimal import Decimal
 from datetime import timedelta
 
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 
 from userauths.models import User
 from catalog.models import Product, PromoCatalog, PromoItem
 from core.services.pricing_service import PromoAwareB2BPricingService
 from core.adapters.orm_promo_adapter import DjangoPromoCatalogAdapter
+from core.adapters.pricing_versions import bump_product_versions
+from core.utils.shared_cache import get_shared_cache
+from tests.utils import in_memory_shared_cache, shared_cache_queries
 
 
 class PromoAwarePricingServiceIntegrationTest(TestCase):
@@ -21,6 +27,8 @@ class PromoAwarePricingServiceIntegrationTest(TestCase):
     """
 
     def setUp(self) -> None:
+        # Les prix sont mis en cache : on repart d'un cache vide à chaque test
+        cache.clear()
         # Service et produit de base utilisés dans plusieurs tests
         self.service = PromoAwareB2BPricingService(DjangoPromoCatalogAdapter())
         self.now = timezone.now()
@@ -135,4 +143,99 @@ class PromoAwarePricingServiceIntegrationTest(TestCase):
         )
         price = self.service.get_unit_price(self.product, self.user)
         # La promo la moins chère doit être sélectionnée
-        self.assertEqual(price, Decimal("68.00"))
\ No newline at end of file
+        self.assertEqual(price, Decimal("68.00"))
+
+    def test_batch_prices_match_single_product_prices(self) -> None:
+        """``get_unit_prices`` renvoie les mêmes prix que ``get_unit_price`` produit par produit."""
+        other = Product.objects.create(
+            title="Other Product",
+            slug="other-product",
+            sku="TP-002",
+            article_code="AC-002",
+            category=self.category,
+            brand=self.brand,
+            price=Decimal("50.00"),
+            price_wholesaler=Decimal("40.00"),
+            stock=10,
+        )
+        cat = self._create_active_catalog()
+        PromoItem.objects.create(
+            catalog=cat,
+            product=self.product,
+            promo_price=Decimal("70.00"),
+            allowed_customer_numbers=["CUST1"],
+        )
+        cache.clear()
+        prices = self.service.get_unit_prices([self.product, other], self.user)
+        cache.clear()
+        self.assertEqual(
+            prices,
+            {
+                self.product.id: self.service.get_unit_price(self.product, self.user),
+                other.id: self.service.get_unit_price(other, self.user),
+            },
+        )
+        self.assertEqual(prices[self.product.id], Decimal("70.00"))
+        self.assertEqual(prices[other.id], Decimal("40.00"))
+
+    def _batch_price_queries(self):
+        """Requêtes d'un lot de 25 produits : construction de l'index, puis index chaud."""
+        products = [self.product] + [
+            Product.objects.create(
+                title=f"P{i}",
+                slug=f"p-{i}",
+                sku=f"SKU-{i}",
+                article_code=f"AC-1{i:02d}",
+                category=self.category,
+                brand=self.brand,
+                price=Decimal("10.00"),
+                stock=1,
+            )
+            for i in range(24)
+        ]
+        cat = self._create_active_catalog()
+        for product in products[:5]:
+            PromoItem.objects.create(catalog=cat, product=product, promo_price=Decimal("5.00"))
+        cache.clear()
+        with CaptureQueriesContext(connection) as build:
+            prices = self.service.get_unit_prices(products, self.user)
+        self.assertEqual(len(prices), len(products))
+        # Cache froid mais index chaud
+        bump_product_versions([p.id for p in products])
+        with CaptureQueriesContext(connection) as warm:
+            self.service.get_unit_prices(products, self.user)
+        return build, warm
+
+    def test_batch_prices_query_count_is_independent_of_page_size(self) -> None:
+        """Un lot de produits coûte un nombre constant de requêtes promo."""
+        build, warm = self._batch_price_queries()
+
+        # Index promo : catalogues, items, target_users ; cache commun :
+        # génération (avant et après construction) et versions en une lecture
+        self.assertEqual(len(build), 6, build.captured_queries)
+        self.assertEqual(len(shared_cache_queries(build)), 3)
+        # Index chaud : cache commun seulement, génération des promotions
+        # (deux vérifications de l'index) et versions des 25 produits
+        self.assertEqual(len(warm), 3, warm.captured_queries)
+        self.assertEqual(len(shared_cache_queries(warm)), 3)
+
+    @in_memory_shared_cache
+    def test_batch_prices_without_sql_once_index_is_built(self) -> None:
+        get_shared_cache().clear()
+
+        build, warm = self._batch_price_queries()
+
+        self.assertEqual(len(build), 3, build.captured_queries)
+        self.assertEqual(len(warm), 0, warm.captured_queries)
+
+    def test_prefetched_prices_are_read_by_template_filter(self) -> None:
+        """Le filtre ``price_for_user`` relit les prix pré-calculés sans rappeler le service."""
+        from unittest import mock
+
+        from catalog.templatetags.catalog_extras import price_for_user
+
+        self.service.prefetch_unit_prices([self.product], self.user)
+        with mock.patch("catalog.templatetags.catalog_extras.get_pricing_service") as factory:
+            self.assertEqual(price_for_user(self.product, self.user), Decimal("80.00"))
+            factory.assert_not_called()
+
@@ -0,0 +1,94 @@
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from catalog.models import Brand, Category, Product, PromoCatalog, PromoItem
+from core.adapters.pricing_versions import PRODUCT_VERSION_KEY, deferred_price_invalidation, get_price_versions
+from core.factory import get_pricing_service
+from core.services.pricing_service import LOCAL_CACHE_TTL
+from core.utils.shared_cache import SHARED_CACHE_ALIAS, get_shared_cache
+from userauths.models import User
+
+
+class VersionedPriceCacheTest(TestCase):
+    """Invalidation des prix en cache par versions de produit et de promotions."""
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.category = Category.objects.create(name="Cat", slug="cat")
+        self.brand = Brand.objects.create(name="Brand", slug="brand")
+        self.product = self._product("VER-1", Decimal("100.00"))
+        self.user = User.objects.create_user(
+            username="ver",
+            password="pass",
+            customer_number="C-VER",
+            client_type="wholesaler",
+        )
+        self.service = get_pricing_service()
+
+    def _product(self, sku: str, price: Decimal) -> Product:
+        return Product.objects.create(
+            title=sku,
+            sku=sku,
+            article_code=sku,
+            category=self.category,
+            brand=self.brand,
+            price=price,
+        )
+
+    def test_product_save_invalidates_cached_price(self) -> None:
+        self.assertEqual(self.service.get_unit_price(self.product), Decimal("100.00"))
+        self.product.price = Decimal("90.00")
+        self.product.save()
+        self.assertEqual(self.service.get_unit_price(self.product), Decimal("90.00"))
+
+    def test_promo_change_invalidates_cached_price(self) -> None:
+        before = self.service.get_unit_price(self.product, self.user)
+        now = timezone.now()
+        catalog = PromoCatalog.objects.create(
+            title="Promo",
+            start_date=now - timedelta(days=1),
+            end_date=now + timedelta(days=1),
+        )
+        PromoItem.objects.create(catalog=catalog, product=self.product, promo_price=Decimal("40.00"))
+        self.assertNotEqual(before, Decimal("40.00"))
+        self.assertEqual(self.service.get_unit_price(self.product, self.user), Decimal("40.00"))
+
+    def test_version_bumped_by_another_process_is_not_served(self) -> None:
+        self.assertEqual(self.service.get_unit_price(self.product), Decimal("100.00"))
+
+        # Écriture faite par un autre worker : son cache ``default`` n'est pas
+        # celui-ci, seule la version publiée dans le cache commun est visible.
+        Product.objects.filter(pk=self.product.pk).update(price=Decimal("90.00"))
+        other_worker = caches.create_connection(SHARED_CACHE_ALIAS)
+        other_worker.set(PRODUCT_VERSION_KEY.format(product_id=self.product.pk), "autre-worker", None)
+
+        self.product.refresh_from_db()
+        self.assertEqual(self.service.get_unit_price(self.product), Decimal("90.00"))
+
+    def test_long_ttl_requires_a_shared_backend(self) -> None:
+        self.assertEqual(self.service._cache_ttl(), settings.PRICING_CACHE_TTL)
+        local = {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "local-shared"}
+        with override_settings(CACHES={**settings.CACHES, SHARED_CACHE_ALIAS: local}):
+            self.assertEqual(self.service._cache_ttl(), LOCAL_CACHE_TTL)
+
+    def test_deferred_invalidation_publishes_once(self) -> None:
+        others = [self._product(f"VER-B{i}", Decimal("10.00")) for i in range(3)]
+        ids = [self.product.id] + [p.id for p in others]
+        _, before = get_price_versions(ids)
+        shared = get_shared_cache()
+        with mock.patch.object(shared, "set_many", wraps=shared.set_many) as set_many:
+            with deferred_price_invalidation():
+                for product in [self.product, *others]:
+                    product.price = Decimal("5.00")
+                    product.save()
+                self.assertEqual(set_many.call_count, 0)
+            self.assertEqual(set_many.call_count, 1)
+        _, after = get_price_versions(ids)
+        for product_id in ids:
+            self.assertNotEqual(before[product_id], after[product_id])
@@ -0,0 +1,173 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.cache import cache, caches
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from catalog.models import Brand, Category, Product, PromoCatalog, PromoItem
+from core.adapters.orm_promo_adapter import DjangoPromoCatalogAdapter
+from core.adapters.pricing_versions import PROMO_GENERATION_KEY
+from core.adapters.promo_index import PromoIndex, get_promo_index
+from core.domain.dto import ProductDTO, UserDTO
+from core.utils.shared_cache import SHARED_CACHE_ALIAS, get_shared_cache
+from tests.utils import in_memory_shared_cache, shared_cache_queries
+from userauths.models import User
+
+
+class PromoIndexTest(TestCase):
+    """Index en mémoire des promotions et invalidation par génération."""
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.now = timezone.now()
+        self.adapter = DjangoPromoCatalogAdapter()
+        category = Category.objects.create(name="Cat", slug="cat")
+        brand = Brand.objects.create(name="Brand", slug="brand")
+        self.product = Product.objects.create(
+            title="Produit",
+            sku="IDX-1",
+            article_code="IDX-1",
+            category=category,
+            brand=brand,
+            price=Decimal("100.00"),
+        )
+        self.product_dto = ProductDTO(id=self.product.id, sku="IDX-1", price=Decimal("100.00"))
+        self.user = User.objects.create_user(
+            username="idx",
+            password="pass",
+            customer_number="C-IDX",
+            client_type="wholesaler",
+        )
+        self.user_dto = UserDTO(
+            id=self.user.id,
+            email="",
+            client_type="wholesaler",
+            customer_number="C-IDX",
+        )
+
+    def _catalog(self, **kwargs) -> PromoCatalog:
+        data = dict(
+            title="Promo",
+            start_date=self.now - timedelta(days=1),
+            end_date=self.now + timedelta(days=1),
+        )
+        data.update(kwargs)
+        return PromoCatalog.objects.create(**data)
+
+    def _promo_price(self):
+        promo = self.adapter.get_applicable_promo(self.product_dto, self.user_dto)
+        return promo.promo_price if promo else None
+
+    def _resolution_queries(self):
+        catalog = self._catalog()
+        PromoItem.objects.create(catalog=catalog, product=self.product, promo_price=Decimal("60.00"))
+        get_promo_index()
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self._promo_price(), Decimal("60.00"))
+        return queries
+
+    def test_resolution_reads_only_the_generation_once_index_is_built(self) -> None:
+        queries = self._resolution_queries()
+
+        # Vérification de la génération des promotions dans le cache commun
+        self.assertEqual(len(queries), 1, queries.captured_queries)
+        self.assertEqual(len(shared_cache_queries(queries)), 1)
+
+    @in_memory_shared_cache
+    def test_resolution_without_sql_once_index_is_built(self) -> None:
+        get_shared_cache().clear()
+
+        queries = self._resolution_queries()
+
+        self.assertEqual(len(queries), 0, queries.captured_queries)
+
+    def test_generation_published_by_another_process_rebuilds_index(self) -> None:
+        catalog = self._catalog()
+        item = PromoItem.objects.create(catalog=catalog, product=self.product, promo_price=Decimal("60.00"))
+        self.assertEqual(self._promo_price(), Decimal("60.00"))
+
+        # Modification faite par un autre worker : ni ses signaux ni son
+        # cache ``default`` ne sont visibles ici, seul le cache commun l'est.
+        PromoItem.objects.filter(pk=item.pk).update(promo_price=Decimal("55.00"))
+        other_worker = caches.create_connection(SHARED_CACHE_ALIAS)
+        other_worker.set(PROMO_GENERATION_KEY, "autre-worker", None)
+
+        self.assertEqual(self._promo_price(), Decimal("55.00"))
+
+    def test_item_changes_rebuild_index(self) -> None:
+        catalog = self._catalog()
+        item = PromoItem.objects.create(catalog=catalog, product=self.product, promo_price=Decimal("60.00"))
+        self.assertEqual(self._promo_price(), Decimal("60.00"))
+        item.promo_price = Decimal("55.00")
+        item.save()
+        self.assertEqual(self._promo_price(), Decimal("55.00"))
+        item.delete()
+        self.assertIsNone(self._promo_price())
+
+    def test_target_users_change_rebuilds_index(self) -> None:
+        targeted = self._catalog()
+        PromoItem.objects.create(catalog=targeted, product=self.product, promo_price=Decimal("70.00"))
+        other = self._catalog(target_client_type="small_retail")
+        PromoItem.objects.create(catalog=other, product=self.product, promo_price=Decimal("50.00"))
+        # Aucun ciblage explicite : les deux items ont la même priorité, le moins cher gagne
+        self.assertEqual(self._promo_price(), Decimal("50.00"))
+        targeted.target_users.add(self.user)
+        self.assertEqual(self._promo_price(), Decimal("70.00"))
+
+    def test_customer_number_restriction(self) -> None:
+        catalog = self._catalog()
+        PromoItem.objects.create(
+            catalog=catalog,
+            product=self.product,
+            promo_price=Decimal("40.00"),
+            allowed_customer_numbers=["OTHER"],
+        )
+        self.assertIsNone(self._promo_price())
+        PromoItem.objects.create(
+            catalog=catalog,
+            product=self.product,
+            promo_price=Decimal("45.00"),
+            allowed_customer_numbers=["C-IDX"],
+        )
+        self.assertEqual(self._promo_price(), Decimal("45.00"))
+
+    def test_targeted_product_ids(self) -> None:
+        other = Product.objects.create(
+            title="Autre",
+            sku="IDX-2",
+            article_code="IDX-2",
+            category=self.product.category,
+            brand=self.product.brand,
+            price=Decimal("10.00"),
+        )
+        open_catalog = self._catalog()
+        PromoItem.objects.create(catalog=open_catalog, product=self.product, promo_price=Decimal("60.00"))
+        self.assertEqual(get_promo_index().targeted_product_ids(self.user_dto), frozenset())
+
+        PromoItem.objects.create(
+            catalog=open_catalog, product=other, promo_price=Decimal("8.00"), allowed_customer_numbers=["C-IDX"]
+        )
+        self.assertEqual(get_promo_index().targeted_product_ids(self.user_dto), {other.id})
+
+        open_catalog.target_users.add(self.user)
+        self.assertEqual(get_promo_index().targeted_product_ids(self.user_dto), {self.product.id, other.id})
+
+    def test_next_catalog_boundary_triggers_rebuild(self) -> None:
+        start = self.now + timedelta(hours=1)
+        catalog = self._catalog(start_date=start, end_date=start + timedelta(hours=1))
+        PromoItem.objects.create(catalog=catalog, product=self.product, promo_price=Decimal("30.00"))
+
+        index = PromoIndex.build(generation="g", now=self.now)
+        self.assertEqual(index.next_boundary, start)
+        self.assertEqual(index.resolve([self.product.id], self.user_dto), {})
+        self.assertFalse(index.is_stale("g", self.now))
+        self.assertTrue(index.is_stale("g", start))
+
+        later = PromoIndex.build(generation="g", now=start)
+        self.assertEqual(
+            later.resolve([self.product.id], self.user_dto)[self.product.id].promo_price,
+            Decimal("30.00"),
+        )
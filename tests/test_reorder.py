@@ -0,0 +1,130 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from catalog.models import Brand, Category, Product
+from core.domain.dto import BulkAddLine
+from orders.models import Order, OrderItem
+from userauths.models import User
+
+
+class ReorderMixin:
+    def setUp(self) -> None:
+        cache.clear()
+        category = Category.objects.create(name="Cat", slug="cat")
+        brand = Brand.objects.create(name="Brand", slug="brand")
+        self.products = [
+            Product.objects.create(
+                title=f"RE-{index}",
+                sku=f"RE-{index}",
+                article_code=f"RE-{index}",
+                category=category,
+                brand=brand,
+                price=Decimal("10.00"),
+                min_order_qty=1,
+            )
+            for index in range(25)
+        ]
+        self.user = User.objects.create_user(username="re", password="pass", is_b2b_verified=True)
+
+    def _order(self, lines, user=None):
+        order = Order.objects.create(
+            user=user or self.user,
+            email="re@example.com",
+            first_name="Re",
+            last_name="Order",
+            address1="1 rue",
+            city="Paris",
+            postcode="75001",
+        )
+        OrderItem.objects.bulk_create(
+            OrderItem(
+                order=order,
+                product_title=sku,
+                product_sku=sku,
+                unit_price=Decimal("10.00"),
+                quantity=quantity,
+                line_total=Decimal("10.00") * quantity,
+            )
+            for sku, quantity in lines
+        )
+        return order
+
+
+class ReorderAPITest(ReorderMixin, APITestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.client.force_authenticate(self.user)
+
+    def test_reorder_one_order_reapplies_rules_and_reports_unavailable(self):
+        Product.objects.filter(pk=self.products[1].pk).update(min_order_qty=30)
+        Product.objects.filter(pk=self.products[2].pk).update(is_active=False)
+        order = self._order([("RE-0", 12), ("RE-1", 12), ("RE-2", 12), ("GONE-1", 12)])
+
+        response = self.client.post(reverse("order-reorder", args=[order.pk]))
+
+        self.assertEqual(response.status_code, 200)
+        statuses = [(line["code"], line["status"], line["quantity"]) for line in response.data["lines"]]
+        self.assertEqual(
+            statuses,
+            [
+                ("RE-0", BulkAddLine.ADDED, 12),
+                ("RE-1", BulkAddLine.ADDED, 30),
+                ("RE-2", BulkAddLine.INACTIVE, None),
+                ("GONE-1", BulkAddLine.UNKNOWN, None),
+            ],
+        )
+        self.assertEqual(response.data["total"], "420.00")
+
+    def test_reorder_many_orders_merges_into_current_cart(self):
+        self.client.post(reverse("cart-add-api"), {"sku": "RE-0", "quantity": 10}, format="json")
+        first = self._order([("RE-0", 10), ("RE-1", 10)])
+        second = self._order([("RE-1", 20)])
+
+        response = self.client.post(reverse("order-reorder-many"), {"orders": [first.pk, second.pk]}, format="json")
+
+        self.assertEqual(response.status_code, 200)
+        cart = self.client.get(reverse("cart-detail-api")).data
+        self.assertEqual({line["sku"]: line["quantity"] for line in cart["items"]}, {"RE-0": 20, "RE-1": 30})
+
+    def test_query_count_does_not_depend_on_order_size(self):
+        small = self._order([(f"RE-{index}", 10) for index in range(2)])
+        large = self._order([(f"RE-{index}", 10) for index in range(2, 25)])
+        # Échauffement : prix des deux commandes déjà en cache
+        for order in (small, large):
+            self.client.post(reverse("order-reorder", args=[order.pk]))
+            self.client.post(reverse("cart-clear-api"))
+
+        def count(order):
+            self.client.post(reverse("cart-clear-api"))
+            with CaptureQueriesContext(connection) as queries:
+                self.client.post(reverse("order-reorder", args=[order.pk]))
+            return len(queries.captured_queries)
+
+        self.assertEqual(count(small), count(large))
+
+    def test_orders_of_other_users_are_not_found(self):
+        other = User.objects.create_user(username="other", password="pass")
+        order = self._order([("RE-0", 10)], user=other)
+
+        response = self.client.post(reverse("order-reorder-many"), {"orders": [order.pk]}, format="json")
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(self.client.post(reverse("order-reorder-many"), {"orders": []}, format="json").status_code, 400)
+
+
+class ReorderViewTest(ReorderMixin, TestCase):
+    def test_reorder_button_fills_cart(self):
+        self.client.force_login(self.user)
+        order = self._order([("RE-0", 10), ("GONE-1", 10)])
+
+        response = self.client.post(reverse("orders:reorder", args=[order.pk]), follow=True)
+
+        self.assertRedirects(response, reverse("cart:detail"))
+        self.assertContains(response, "GONE-1")
+        self.assertEqual(self.client.session["cart"], {str(self.products[0].pk): {"qty": 10}})
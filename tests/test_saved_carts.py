@@ -0,0 +1,144 @@
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from cart.models import SavedCart
+from catalog.models import Brand, Category, Product
+from clients.models import Client, UserClientLink
+from core.domain.dto import BulkAddLine
+from userauths.models import User
+
+
+class SavedCartMixin:
+    def setUp(self) -> None:
+        cache.clear()
+        category = Category.objects.create(name="Cat", slug="cat")
+        brand = Brand.objects.create(name="Brand", slug="brand")
+        self.products = [
+            Product.objects.create(
+                title=f"SAV-{index}",
+                sku=f"SAV-{index}",
+                article_code=f"SAV-{index}",
+                category=category,
+                brand=brand,
+                price=Decimal("10.00"),
+                min_order_qty=1,
+            )
+            for index in range(30)
+        ]
+        self.user = User.objects.create_user(username="sav", password="pass", is_b2b_verified=True)
+        self.client_org = Client.objects.create(name="Magasin 12", slug="magasin-12")
+
+
+class SavedCartAPITest(SavedCartMixin, APITestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.client.force_authenticate(self.user)
+
+    def _fill_cart(self, products, quantity=10):
+        lines = [{"sku": product.article_code, "quantity": quantity} for product in products]
+        self.client.post(reverse("cart-bulk-add-api"), {"lines": lines}, format="json")
+
+    def _save(self, name, **extra):
+        return self.client.post(reverse("saved-cart-list-api"), {"name": name, **extra}, format="json")
+
+    def test_save_stores_compact_arrays_and_replaces_same_name(self):
+        self._fill_cart(self.products[:2])
+        response = self._save("Réassort hebdo")
+        self.assertEqual(response.status_code, 201)
+
+        self._fill_cart(self.products[2:3], quantity=20)
+        self._save("Réassort hebdo")
+
+        saved = SavedCart.objects.get()
+        self.assertEqual(saved.product_ids, [p.pk for p in self.products[:3]])
+        self.assertEqual(saved.quantities, [10, 10, 20])
+        self.assertEqual(saved.created_by, self.user)
+        self.assertEqual([item["name"] for item in self.client.get(reverse("saved-cart-list-api")).data], ["Réassort hebdo"])
+
+    def test_empty_cart_or_name_is_rejected(self):
+        self.assertEqual(self._save("Vide").status_code, 400)
+        self._fill_cart(self.products[:1])
+        self.assertEqual(self._save("  ").status_code, 400)
+
+    def test_load_adds_lines_and_reports_unavailable_products(self):
+        self._fill_cart(self.products[:3])
+        saved_id = self._save("Liste").data["id"]
+        self.client.post(reverse("cart-clear-api"))
+        self._fill_cart(self.products[:1])
+        Product.objects.filter(pk=self.products[1].pk).update(is_active=False)
+        gone = self.products[2].pk
+        self.products[2].delete()
+
+        response = self.client.post(reverse("saved-cart-load-api", args=[saved_id]))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(line["code"], line["status"]) for line in response.data["lines"]],
+            [("SAV-0", BulkAddLine.ADDED), ("SAV-1", BulkAddLine.INACTIVE), (str(gone), BulkAddLine.UNKNOWN)],
+        )
+        self.assertEqual(response.data["lines"][0]["quantity"], 20)
+        self.assertEqual(response.data["total"], "200.00")
+
+    def test_load_query_count_does_not_depend_on_size(self):
+        self._fill_cart(self.products[:2])
+        small = self._save("Petite").data["id"]
+        self._fill_cart(self.products[2:])
+        large = self._save("Grande").data["id"]
+
+        def count(saved_id):
+            # Nouvelle session : ni panier ni prix par ligne de la liste précédente
+            self.client.cookies.pop(settings.SESSION_COOKIE_NAME, None)
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post(reverse("saved-cart-load-api", args=[saved_id]))
+            self.assertEqual(response.data["errors"], 0)
+            return len(queries.captured_queries)
+
+        # Échauffement : prix unitaires des deux listes en cache
+        count(small)
+        count(large)
+        self.assertEqual(count(small), count(large))
+
+    def test_client_lists_are_shared_with_linked_users(self):
+        UserClientLink.objects.create(user=self.user, client=self.client_org, role=UserClientLink.Roles.MEMBER)
+        colleague = User.objects.create_user(username="colleague", password="pass")
+        UserClientLink.objects.create(user=colleague, client=self.client_org, role=UserClientLink.Roles.READ_ONLY)
+        outsider = User.objects.create_user(username="outsider", password="pass")
+        self._fill_cart(self.products[:2])
+        saved_id = self._save("Magasin", client=self.client_org.pk).data["id"]
+
+        self.client.force_authenticate(colleague)
+        self.assertEqual([item["id"] for item in self.client.get(reverse("saved-cart-list-api")).data], [saved_id])
+        self.assertEqual(self.client.post(reverse("saved-cart-load-api", args=[saved_id])).status_code, 200)
+        self.assertEqual(self._save("Copie", client=self.client_org.pk).status_code, 403)
+        self.assertEqual(self.client.delete(reverse("saved-cart-detail-api", args=[saved_id])).status_code, 404)
+
+        self.client.force_authenticate(outsider)
+        self.assertEqual(self.client.get(reverse("saved-cart-list-api")).data, [])
+        self.assertEqual(self.client.post(reverse("saved-cart-load-api", args=[saved_id])).status_code, 404)
+
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.client.delete(reverse("saved-cart-detail-api", args=[saved_id])).status_code, 204)
+        self.assertFalse(SavedCart.objects.exists())
+
+
+class SavedCartViewTest(SavedCartMixin, TestCase):
+    def test_save_then_load_from_pages(self):
+        self.client.force_login(self.user)
+        self.client.post(reverse("cart:cart_add", args=[self.products[0].pk]), {"quantity": 10})
+
+        response = self.client.post(reverse("cart:saved_carts"), {"name": "Hebdo"})
+        self.assertRedirects(response, reverse("cart:saved_carts"))
+        saved = SavedCart.objects.get(user=self.user)
+
+        response = self.client.post(reverse("cart:load_saved_cart", args=[saved.pk]))
+
+        self.assertRedirects(response, reverse("cart:detail"), fetch_redirect_response=False)
+        self.assertEqual(self.client.session["cart"], {str(self.products[0].pk): {"qty": 20}})
+        self.assertContains(self.client.get(reverse("cart:saved_carts")), "Hebdo")
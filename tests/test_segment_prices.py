@@ -0,0 +1,219 @@
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from catalog.models import Brand, Category, Product, ProductSegmentPrice, PromoCatalog, PromoItem
+from catalog.tasks import (
+    BOUNDARY_CHECKED_KEY,
+    FULL_REFRESH_DELAY,
+    refresh_promo_boundaries,
+    refresh_segment_prices,
+    schedule_segment_price_refresh,
+)
+from core.adapters.pricing_versions import get_promo_generation
+from core.domain.pricing_segments import ANONYMOUS_SEGMENT, segment_users
+from core.utils.shared_cache import get_shared_cache
+from userauths.models import User
+
+
+class SegmentPriceTableTest(TestCase):
+    """Table matérialisée des prix par segment et tri de la liste produits."""
+
+    def setUp(self) -> None:
+        cache.clear()
+        category = Category.objects.create(name="Cat", slug="cat")
+        brand = Brand.objects.create(name="Brand", slug="brand")
+        self.cheap_b2b = Product.objects.create(
+            title="Grille basse",
+            sku="SP-1",
+            article_code="SP-1",
+            category=category,
+            brand=brand,
+            price=Decimal("100.00"),
+            price_wholesaler=Decimal("30.00"),
+        )
+        self.cheap_public = Product.objects.create(
+            title="Public bas",
+            sku="SP-2",
+            article_code="SP-2",
+            category=category,
+            brand=brand,
+            price=Decimal("50.00"),
+            price_wholesaler=Decimal("60.00"),
+        )
+        self.user = User.objects.create_user(
+            username="grossiste",
+            password="pass",
+            client_type="wholesaler",
+            is_b2b_verified=True,
+        )
+
+    def test_refresh_writes_one_row_per_segment(self) -> None:
+        written = refresh_segment_prices([self.cheap_b2b.id])
+        self.assertEqual(written, len(segment_users()))
+        self.assertEqual(
+            ProductSegmentPrice.objects.get(product=self.cheap_b2b, segment="wholesaler:v:nc").price,
+            Decimal("30.00"),
+        )
+        self.assertEqual(
+            ProductSegmentPrice.objects.get(product=self.cheap_b2b, segment="wholesaler:nv:nc").price,
+            Decimal("31.50"),
+        )
+        self.assertEqual(
+            ProductSegmentPrice.objects.get(product=self.cheap_b2b, segment=ANONYMOUS_SEGMENT).price,
+            Decimal("100.00"),
+        )
+        # Un second passage met à jour les lignes existantes
+        Product.objects.filter(pk=self.cheap_b2b.pk).update(price_wholesaler=Decimal("20.00"))
+        refresh_segment_prices([self.cheap_b2b.id])
+        self.assertEqual(ProductSegmentPrice.objects.filter(product=self.cheap_b2b).count(), len(segment_users()))
+        self.assertEqual(
+            ProductSegmentPrice.objects.get(product=self.cheap_b2b, segment="wholesaler:v:nc").price,
+            Decimal("20.00"),
+        )
+
+    def _listed(self, **params):
+        response = self.client.get(reverse("catalog:product_list"), params)
+        return [p.pk for p in response.context["products"].object_list]
+
+    def test_product_list_sorts_on_viewer_price(self) -> None:
+        refresh_segment_prices()
+        self.assertEqual(self._listed(sort="price_asc"), [self.cheap_public.pk, self.cheap_b2b.pk])
+        cache.clear()
+        self.client.force_login(self.user)
+        self.assertEqual(self._listed(sort="price_asc"), [self.cheap_b2b.pk, self.cheap_public.pk])
+        self.assertEqual(self._listed(max_price="40"), [self.cheap_b2b.pk])
+
+    def test_product_list_uses_shared_segment_and_own_promos_for_targeted_user(self) -> None:
+        self.user.customer_number = "C-SP"
+        self.user.save()
+        now = timezone.now()
+        catalog = PromoCatalog.objects.create(
+            title="Promo", start_date=now - timedelta(days=1), end_date=now + timedelta(days=1)
+        )
+        PromoItem.objects.create(
+            catalog=catalog,
+            product=self.cheap_public,
+            promo_price=Decimal("20.00"),
+            allowed_customer_numbers=["C-SP"],
+        )
+        refresh_segment_prices()
+        self.client.force_login(self.user)
+
+        # Grille grossiste (segment partagé) pour SP-1, promotion propre pour SP-2
+        self.assertEqual(self._listed(sort="price_asc"), [self.cheap_public.pk, self.cheap_b2b.pk])
+        self.assertEqual(self._listed(max_price="25"), [self.cheap_public.pk])
+        self.assertEqual(self._listed(min_price="25", max_price="40"), [self.cheap_b2b.pk])
+
+    def test_product_list_falls_back_without_materialized_prices(self) -> None:
+        self.client.force_login(self.user)
+        self.assertEqual(self._listed(sort="price_asc"), [self.cheap_public.pk, self.cheap_b2b.pk])
+
+    def test_product_save_refreshes_after_commit(self) -> None:
+        with self.captureOnCommitCallbacks(execute=True):
+            self.cheap_b2b.price_wholesaler = Decimal("25.00")
+            self.cheap_b2b.save()
+        self.assertEqual(
+            ProductSegmentPrice.objects.get(product=self.cheap_b2b, segment="wholesaler:v:nc").price,
+            Decimal("25.00"),
+        )
+
+
+class SegmentRefreshSchedulingTest(TestCase):
+    """Regroupement et ciblage des recalculs de ``ProductSegmentPrice``."""
+
+    def setUp(self) -> None:
+        cache.clear()
+        category = Category.objects.create(name="Cat", slug="cat")
+        brand = Brand.objects.create(name="Brand", slug="brand")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.first, self.second, self.other = [
+                Product.objects.create(
+                    title=sku,
+                    sku=sku,
+                    article_code=sku,
+                    category=category,
+                    brand=brand,
+                    price=Decimal("10.00"),
+                )
+                for sku in ("RF-1", "RF-2", "RF-3")
+            ]
+        self.now = timezone.now()
+
+    def _catalog(self, **kwargs) -> PromoCatalog:
+        data = dict(title="Promo", start_date=self.now - timedelta(days=1), end_date=self.now + timedelta(days=1))
+        data.update(kwargs)
+        return PromoCatalog.objects.create(**data)
+
+    def test_promo_changes_refresh_their_products_once_per_transaction(self) -> None:
+        with mock.patch.object(refresh_segment_prices, "delay") as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                catalog = self._catalog()
+                PromoItem.objects.create(catalog=catalog, product=self.first, promo_price=Decimal("5.00"))
+                PromoItem.objects.create(catalog=catalog, product=self.second, promo_price=Decimal("6.00"))
+                catalog.target_client_type = "wholesaler"
+                catalog.save()
+
+        delay.assert_called_once_with([self.first.pk, self.second.pk])
+
+    def test_moved_item_refreshes_both_products(self) -> None:
+        with self.captureOnCommitCallbacks(execute=True):
+            item = PromoItem.objects.create(catalog=self._catalog(), product=self.first, promo_price=Decimal("5.00"))
+
+        with mock.patch.object(refresh_segment_prices, "delay") as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                item.product = self.second
+                item.save()
+
+        delay.assert_called_once_with([self.first.pk, self.second.pk])
+
+    def test_target_users_change_refreshes_nothing(self) -> None:
+        with self.captureOnCommitCallbacks(execute=True):
+            catalog = self._catalog()
+            PromoItem.objects.create(catalog=catalog, product=self.first, promo_price=Decimal("5.00"))
+        user = User.objects.create_user(username="cible", password="pass")
+
+        with mock.patch.object(refresh_segment_prices, "delay") as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                catalog.target_users.add(user)
+
+        delay.assert_not_called()
+
+    def test_full_refreshes_are_debounced(self) -> None:
+        with mock.patch.object(refresh_segment_prices, "apply_async") as apply_async:
+            for _ in range(2):
+                with self.captureOnCommitCallbacks(execute=True):
+                    schedule_segment_price_refresh()
+            apply_async.assert_called_once_with(countdown=FULL_REFRESH_DELAY)
+
+            # Une fois le recalcul commencé, une nouvelle demande est planifiée
+            refresh_segment_prices()
+            with self.captureOnCommitCallbacks(execute=True):
+                schedule_segment_price_refresh()
+            self.assertEqual(apply_async.call_count, 2)
+
+    def test_boundary_task_refreshes_products_of_opened_and_closed_catalogs(self) -> None:
+        with self.captureOnCommitCallbacks(execute=True):
+            opening = self._catalog(start_date=self.now + timedelta(minutes=30))
+            PromoItem.objects.create(catalog=opening, product=self.first, promo_price=Decimal("5.00"))
+            closing = self._catalog(end_date=self.now + timedelta(minutes=30))
+            PromoItem.objects.create(catalog=closing, product=self.second, promo_price=Decimal("5.00"))
+            later = self._catalog(start_date=self.now + timedelta(days=2), end_date=self.now + timedelta(days=3))
+            PromoItem.objects.create(catalog=later, product=self.other, promo_price=Decimal("5.00"))
+        get_shared_cache().set(BOUNDARY_CHECKED_KEY, self.now, None)
+        generation = get_promo_generation()
+
+        with mock.patch("catalog.tasks.timezone.now", return_value=self.now + timedelta(hours=1)):
+            with mock.patch.object(refresh_segment_prices, "delay") as delay:
+                with self.captureOnCommitCallbacks(execute=True):
+                    self.assertEqual(refresh_promo_boundaries(), 2)
+                delay.assert_called_once_with([self.first.pk, self.second.pk])
+                self.assertNotEqual(get_promo_generation(), generation)
+
+                # Bornes déjà traitées : rien à refaire
+                self.assertEqual(refresh_promo_boundaries(), 0)
@@ -0,0 +1,182 @@
+import threading
+import time
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.cache import cache
+from django.db import OperationalError, connection
+from django.test import RequestFactory, TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from cart.context import get_cart_context
+from catalog.models import Brand, Category, Product
+from orders.forms import CheckoutForm
+from orders.models import Order, OrderItem
+from orders.services import CheckoutService, update_order_status
+from orders.stock import InsufficientStock, StockReservationConflict, release_stock, reserve_stock
+from userauths.models import User
+
+CHECKOUT_DATA = {
+    "email": "stock@example.com",
+    "first_name": "Stock",
+    "last_name": "Test",
+    "address1": "1 rue du Stock",
+    "city": "Paris",
+    "postcode": "75001",
+    "country": "France",
+}
+
+
+class StockMixin:
+    def setUp(self) -> None:
+        cache.clear()
+        category = Category.objects.create(name="Cat", slug="cat")
+        brand = Brand.objects.create(name="Brand", slug="brand")
+        self.products = [
+            Product.objects.create(
+                title=f"STK-{index}",
+                sku=f"STK-{index}",
+                article_code=f"STK-{index}",
+                category=category,
+                brand=brand,
+                price=Decimal("10.00"),
+                min_order_qty=1,
+                stock=50,
+            )
+            for index in range(2)
+        ]
+        self.user = User.objects.create_user(username="stock", password="pass", is_b2b_verified=True)
+
+    def _checkout(self, quantities):
+        """Checkout d'un panier ``{produit: quantité}`` dans une requête isolée."""
+        request = RequestFactory().post("/")
+        request.user = self.user
+        request.session = SessionStore()
+        request.session["cart"] = {str(product.pk): {"qty": qty} for product, qty in quantities.items()}
+        get_cart_context(request)
+        form = CheckoutForm(CHECKOUT_DATA)
+        assert form.is_valid(), form.errors
+        return CheckoutService().checkout(request, form)
+
+    def _stock(self):
+        return list(Product.objects.order_by("pk").values_list("stock", flat=True))
+
+
+class StockReservationTest(StockMixin, TestCase):
+    def test_checkout_reserves_stock_for_every_line(self):
+        order = self._checkout({self.products[0]: 20, self.products[1]: 30})
+
+        self.assertEqual(self._stock(), [30, 20])
+        self.assertEqual(
+            sorted(order.items.values_list("product_id", "reserved_quantity")),
+            [(self.products[0].pk, 20), (self.products[1].pk, 30)],
+        )
+
+    def test_shortage_on_one_line_reserves_nothing(self):
+        with self.assertRaises(InsufficientStock) as ctx:
+            self._checkout({self.products[0]: 20, self.products[1]: 60})
+
+        self.assertEqual(ctx.exception.shortages, {self.products[1].pk: (60, 50)})
+        self.assertEqual(self._stock(), [50, 50])
+        self.assertFalse(Order.objects.exists())
+
+    def test_reservation_is_a_single_statement(self):
+        with CaptureQueriesContext(connection) as queries:
+            reserve_stock({self.products[0].pk: 10, self.products[1].pk: 10})
+
+        updates = [query["sql"] for query in queries.captured_queries if query["sql"].startswith("UPDATE")]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(self._stock(), [40, 40])
+
+    def test_cancel_and_refund_release_reservations_once(self):
+        order = self._checkout({self.products[0]: 20, self.products[1]: 30})
+        orders = Order.objects.filter(pk=order.pk)
+
+        update_order_status(orders, "canceled")
+        self.assertEqual(self._stock(), [50, 50])
+        update_order_status(orders, "refunded")
+        self.assertEqual(self._stock(), [50, 50])
+        self.assertEqual(release_stock([order.pk]), 0)
+        self.assertEqual(set(OrderItem.objects.values_list("reserved_quantity", flat=True)), {0})
+
+    def test_checkout_view_reports_shortage(self):
+        self.client.force_login(self.user)
+        self.client.post(reverse("cart:cart_add", args=[self.products[0].pk]), {"quantity": 60})
+
+        response = self.client.post(reverse("orders:checkout"), CHECKOUT_DATA, follow=True)
+
+        self.assertRedirects(response, reverse("cart:detail"))
+        self.assertContains(response, "Stock insuffisant")
+        self.assertFalse(Order.objects.exists())
+
+    def _always_conflicting(self):
+        """Réservation toujours refusée alors que la relecture montre du stock."""
+        product = mock.patch("orders.stock.Product").start()
+        self.addCleanup(mock.patch.stopall)
+        product.objects.filter.return_value.update.return_value = 0
+        product.objects.filter.return_value.values_list.return_value = [(p.pk, 50) for p in self.products]
+        return product
+
+    def test_exhausted_retries_raise_conflict_not_shortage(self):
+        product = self._always_conflicting()
+
+        with self.assertRaises(StockReservationConflict) as ctx:
+            reserve_stock({self.products[0].pk: 10, self.products[1].pk: 10})
+
+        self.assertNotIsInstance(ctx.exception, InsufficientStock)
+        self.assertEqual(ctx.exception.product_ids, [self.products[0].pk, self.products[1].pk])
+        self.assertEqual(product.objects.filter.return_value.update.call_count, 3)
+
+    def test_checkout_view_reports_conflict(self):
+        # Le récapitulatif du formulaire affiche la vignette du produit
+        Product.objects.filter(pk=self.products[0].pk).update(image="products/stk-0.jpg")
+        self.client.force_login(self.user)
+        self.client.post(reverse("cart:cart_add", args=[self.products[0].pk]), {"quantity": 10})
+        self._always_conflicting()
+
+        response = self.client.post(reverse("orders:checkout"), CHECKOUT_DATA)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "veuillez réessayer")
+        self.assertNotContains(response, "Stock insuffisant")
+        self.assertFalse(Order.objects.exists())
+
+
+class ConcurrentCheckoutTest(StockMixin, TransactionTestCase):
+    """De nombreux checkouts simultanés sur le même SKU ne survendent jamais."""
+
+    def test_parallel_checkouts_never_oversell(self):
+        product = self.products[0]
+        outcomes = []
+        barrier = threading.Barrier(20)
+
+        def run():
+            try:
+                barrier.wait()
+                while True:
+                    try:
+                        self._checkout({product: 10})
+                        outcomes.append("ok")
+                        return
+                    except InsufficientStock:
+                        outcomes.append("short")
+                        return
+                    except OperationalError:
+                        # SQLite (base de test) refuse les écritures concurrentes
+                        # au lieu d'attendre : la transaction est rejouée.
+                        time.sleep(0.01)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=run) for _ in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sorted(outcomes), ["ok"] * 5 + ["short"] * 15)
+        product.refresh_from_db()
+        self.assertEqual(product.stock, 0)
+        self.assertEqual(Order.objects.count(), 5)
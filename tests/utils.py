@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.test import override_settings
+
+from core.utils.shared_cache import SHARED_CACHE_ALIAS
+
+#: Cache commun en mémoire, comme en production avec Redis
+#: (``SHARED_CACHE_URL``) : ses lectures ne passent pas par la base.  Sans
+#: Redis, le cache commun est la table ``core_shared_cache`` et chacune de
+#: ses lectures est une requête SQL.
+in_memory_shared_cache = override_settings(
+    CACHES={
+        **settings.CACHES,
+        SHARED_CACHE_ALIAS: {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "tests-shared-cache",
+        },
+    }
+)
+
+
+def shared_cache_queries(queries):
+    """Requêtes capturées portant sur la table du cache commun."""
+    table = settings.CACHES[SHARED_CACHE_ALIAS].get("LOCATION", "")
+    return [query for query in queries.captured_queries if f'"{table}"' in query["sql"]]
@@ -183,6 +183,7 @@ MIDDLEWARE = [
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "cart.middleware.CartContextMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -267,6 +268,12 @@ EMAIL_BACKEND = env(
     default="django.core.mail.backends.console.EmailBackend",
 )
 
+# -----------------------------------------------------------------------------
+# ERP : webhook appelé pour chaque commande validée (``integrations.handlers``)
+# -----------------------------------------------------------------------------
+ERP_ORDER_WEBHOOK_URL = env("ERP_ORDER_WEBHOOK_URL", default="")
+ERP_TIMEOUT = env.int("ERP_TIMEOUT", default=10)
+
 # Whitenoise
 STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 
@@ -286,6 +293,28 @@ CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_SERIALIZER = "json"
 CELERY_TIMEZONE = "UTC"
 CELERY_TASK_ALWAYS_EAGER = env.bool("CELERY_TASK_ALWAYS_EAGER", default=DEBUG)
+# Tâches périodiques (``celery -A xeros_project beat``) : reprise de l'outbox
+# des commandes (nouvelles tentatives, événements publiés sans broker
+# disponible) et purge des clés d'idempotence expirées
+CELERY_BEAT_SCHEDULE = {
+    "orders-dispatch-outbox": {
+        "task": "orders.tasks.dispatch_outbox",
+        "schedule": 60.0,
+    },
+    "orders-purge-idempotency-keys": {
+        "task": "orders.tasks.purge_idempotency_keys",
+        "schedule": 3600.0,
+    },
+    # Ouverture et fermeture des catalogues de promotion (aucune écriture
+    # en base ne les signale)
+    "catalog-refresh-promo-boundaries": {
+        "task": "catalog.tasks.refresh_promo_boundaries",
+        "schedule": 60.0,
+    },
+}
+# Durée de conservation des réponses du checkout API rejouables par
+# ``Idempotency-Key`` (``orders.idempotency``)
+IDEMPOTENCY_KEY_TTL = env.int("IDEMPOTENCY_KEY_TTL_HOURS", default=24) * 3600
 
 try:
     import redis  # noqa: F401
@@ -411,6 +440,9 @@ CKEDITOR_5_CONFIGS = {
 }
 
 CART_SESSION_ID = "cart"
+# Stockage des paniers : "session" ou "database" (panier persistant des
+# utilisateurs connectés, voir ``core.factory.get_cart_repository``).
+CART_REPOSITORY = env("CART_REPOSITORY", default="session")
 
 try:
     from .local_settings import *
@@ -420,13 +452,45 @@ except ImportError:
 # -------------------------------------------------------------------
 # Cache configuration
 # -------------------------------------------------------------------
+# LocMem ne conserve par défaut que 300 entrées : bien trop peu pour les
+# prix unitaires versionnés (une version et un prix par produit et par
+# segment), qui seraient évincés en permanence.
 CACHES = {
     "default": {
         "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
         "LOCATION": "xeros-cache",
-    }
+        "OPTIONS": {"MAX_ENTRIES": int(env("CACHE_MAX_ENTRIES", default=50000))},
+    },
+    # Cache commun à tous les processus (workers web, Celery) : le cache
+    # ``default`` ci-dessus est propre à chaque processus et ne doit porter
+    # aucun état à partager (générations et versions des prix, index des
+    # promotions, copie de référence et verrou du panier, panier enregistré
+    # des utilisateurs connectés).  Redis si ``SHARED_CACHE_URL`` est
+    # défini, sinon une table de la base, créée par la migration
+    # ``core.0002_shared_cache_table``.
+    "shared": (
+        {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": env("SHARED_CACHE_URL"),
+        }
+        if env("SHARED_CACHE_URL", default="")
+        else {
+            "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+            "LOCATION": "core_shared_cache",
+            "OPTIONS": {"MAX_ENTRIES": int(env("SHARED_CACHE_MAX_ENTRIES", default=200000))},
+        }
+    ),
 }
 
+# Durée de vie des prix unitaires en cache.  Les clés sont versionnées par
+# produit et par génération des promotions (``core.adapters.pricing_versions``),
+# versions tenues dans le cache ``shared`` commun à tous les processus : une
+# modification invalide immédiatement les prix concernés dans tous les
+# workers, la durée de vie ne borne donc que l'occupation mémoire.  Si
+# ``shared`` est configuré avec un backend propre au processus (LocMem), la
+# durée retombe à 10 minutes (``LOCAL_CACHE_TTL``).
+PRICING_CACHE_TTL = int(env("PRICING_CACHE_TTL_HOURS", default=6)) * 3600
+
 # -------------------------------------------------------------------
 # Observabilité : intégration Sentry facultative
 # -------------------------------------------------------------------